@@ -12,16 +12,22 @@ from scipy.stats import shapiro
 import os
 from pathlib import Path
 
+from comun.carga import cargar_datos_consolidados, cargar_promedios
+from comun.normalidad import matriz_decisiones, pruebas_normalidad
+
 # ==================================================================================
 # CONFIGURACION
 # ==================================================================================
 
-RUTA_BASE = Path(r"C:\Users\doleh\Downloads\development\spring-petclinic\analisis")
-RUTA_UNITARIAS = RUTA_BASE / "unit_tests_metrics"
-RUTA_FUNCIONALES = RUTA_BASE / "functional_tests_metrics"
+RUTA_BASE = Path(".")
 
 METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
 
+# Pruebas omnibus en datos brutos (válidas por encima del límite de Shapiro-Wilk).
+# Con N_SUBMUESTRA, cada grupo se evalúa sobre una submuestra estratificada por test.
+PRUEBAS_OMNIBUS = ['dagostino', 'anderson', 'jarque_bera']
+N_SUBMUESTRA = None
+
 # ==================================================================================
 # PASO 0: CARGAR DATOS CONSOLIDADOS
 # ==================================================================================
@@ -31,50 +37,8 @@ print("PASO 1: NORMALIDAD (SHAPIRO-WILK)")
 print("=" * 100)
 print("\nPASO 0: Cargando datos consolidados...")
 
-# Buscar si ya existe el archivo consolidado
-archivo_consolidado = RUTA_BASE / "datos_consolidados.csv"
-
-if archivo_consolidado.exists():
-    print(f"  ✓ Cargando desde archivo existente: {archivo_consolidado}")
-    df_consolidated = pd.read_csv(archivo_consolidado)
-else:
-    print("  ! No encontrado archivo consolidado, creando...")
-    
-    # Cargar archivos manuales
-    archivos_unitarias = sorted(RUTA_UNITARIAS.glob("*.csv"))
-    archivos_funcionales = sorted(RUTA_FUNCIONALES.glob("*.csv"))
-    
-    dfs = []
-    
-    # Unitarias
-    for archivo in archivos_unitarias:
-        df = pd.read_csv(archivo)
-        df['category'] = 'Unitarias'
-        # Extraer grupo del nombre del archivo
-        if archivo.stem.startswith('IA_'):
-            df['group'] = 'IA'
-        else:
-            df['group'] = 'Manual'
-        df['test_name'] = archivo.stem
-        dfs.append(df)
-    
-    # Funcionales
-    for archivo in archivos_funcionales:
-        df = pd.read_csv(archivo)
-        df['category'] = 'Funcionales'
-        # Extraer grupo del nombre del archivo
-        if archivo.stem.startswith('IA_'):
-            df['group'] = 'IA'
-        else:
-            df['group'] = 'Manual'
-        df['test_name'] = archivo.stem
-        dfs.append(df)
-    
-    df_consolidated = pd.concat(dfs, ignore_index=True)
-    
-    # Guardar para próximas ejecuciones
-    df_consolidated.to_csv(archivo_consolidado, index=False)
-    print(f"  ✓ Archivo consolidado creado y guardado")
+# Ingesta incremental: solo se parsean las filas añadidas a cada CSV por clase
+df_consolidated = cargar_datos_consolidados(RUTA_BASE, incremental=True)
 
 print(f"  ✓ Total registros: {len(df_consolidated)}")
 print(f"  ✓ Grupos: {df_consolidated['group'].unique()}")
@@ -150,7 +114,8 @@ print("=" * 100)
 # Calcular promedios por test
 print("\nCalculando promedios por test (40 iteraciones cada uno)...")
 
-df_promedios = df_consolidated.groupby(['group', 'test_name'])[METRICAS].mean().reset_index()
+# Acumuladores por test mantenidos por la ingesta (equivale a groupby().mean())
+df_promedios = cargar_promedios(RUTA_BASE, METRICAS)
 
 print(f"  ✓ Tests únicos encontrados: {len(df_promedios)}")
 print(f"  ✓ Manual: {len(df_promedios[df_promedios['group'] == 'Manual'])}")
@@ -223,6 +188,26 @@ for metrica in METRICAS:
         print(f"  ├─ Min: {min_val:.6f}")
         print(f"  └─ Max: {max_val:.6f}")
 
+# ==================================================================================
+# PASO 1C: PRUEBAS OMNIBUS EN N=2,480 (D'AGOSTINO, ANDERSON-DARLING, JARQUE-BERA)
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 1C: PRUEBAS OMNIBUS EN N=2,480 (D'AGOSTINO-PEARSON, ANDERSON-DARLING, JARQUE-BERA)")
+print("=" * 100)
+
+# Todas las columnas (métrica, grupo) a la vez; escalan a millones de filas
+df_omnibus = pruebas_normalidad(df_consolidated, METRICAS, pruebas=PRUEBAS_OMNIBUS,
+                                n_submuestra=N_SUBMUESTRA)
+df_omnibus.insert(0, 'nivel', 'N=2,480')
+
+for metrica in METRICAS:
+    print(f"\n{metrica}:")
+    for _, row in df_omnibus[df_omnibus['metrica'] == metrica].iterrows():
+        resultado = "✓ SÍ es normal" if row['es_normal'] else "✗ NO es normal"
+        print(f"  {row['grupo']:<8} {row['prueba']:<12} N={row['n']:<6} "
+              f"estadístico={row['estadistico']:>14.6f}  p={row['p_value']:.8f}  {resultado}")
+
 # ==================================================================================
 # RESUMEN COMPARATIVO
 # ==================================================================================
@@ -275,33 +260,21 @@ print("│      Métrica       │   ¿Es Normal?    │    Test a usar en Paso
 print("│                    │   (Shapiro N=12) │    (Hipótesis Manual vs IA)     │")
 print("├────────────────────┼──────────────────┼─────────────────────────────────┤")
 
-for metrica in METRICAS:
-    # Revisar si ambos grupos son normales en N=12
-    datos_normal_12 = df_res_12[df_res_12['metrica'] == metrica]
-    
-    # Verificar grupo Manual
-    manual_data = datos_normal_12[datos_normal_12['grupo'] == 'Manual']
-    manual_normal = manual_data['p_value'].values[0] >= 0.05 if len(manual_data) > 0 else False
-    
-    # Verificar grupo IA
-    ia_data = datos_normal_12[datos_normal_12['grupo'] == 'IA']
-    ia_normal = ia_data['p_value'].values[0] >= 0.05 if len(ia_data) > 0 else False
-    
-    # Si solo hay Manual o si ambos son normales
-    if len(ia_data) == 0:  # Solo Manual disponible
-        ambos_normal = f"Manual: {'✓' if manual_normal else '✗'}"
-        test_a_usar = "t-Student (asumiendo IA igual)" if manual_normal else "Mann-Whitney U (asumiendo IA igual)"
-    elif manual_normal and ia_normal:
-        ambos_normal = "✓ SÍ (ambos)"
-        test_a_usar = "t-Student"
-    else:
-        ambos_normal = "✗ NO"
-        test_a_usar = "Mann-Whitney U"
-    
-    print(f"│ {metrica:<18} │ {ambos_normal:<16} │ {test_a_usar:<29} │")
+# Ambos grupos normales en N=12 → t-Student; si no → Mann-Whitney U
+df_decisiones = matriz_decisiones(df_res_12, METRICAS)
+
+for _, decision in df_decisiones.iterrows():
+    print(f"│ {decision['metrica']:<18} │ {decision['ambos_normal']:<16} │ {decision['test_a_usar']:<29} │")
 
 print("└────────────────────┴──────────────────┴─────────────────────────────┘")
 
+# La misma matriz con cada prueba omnibus en N=2,480 (solo informativa)
+print("\nContraste en N=2,480 (pruebas omnibus):")
+for prueba in PRUEBAS_OMNIBUS:
+    decisiones = matriz_decisiones(df_omnibus[df_omnibus['prueba'] == prueba], METRICAS)
+    resumen = ", ".join(f"{d['metrica']}: {d['test_a_usar']}" for _, d in decisiones.iterrows())
+    print(f"  {prueba:<12} → {resumen}")
+
 # ==================================================================================
 # GUARDAR RESULTADOS EN EXCEL
 # ==================================================================================
@@ -316,12 +289,14 @@ try:
     with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
         df_res_2480.to_excel(writer, sheet_name='Shapiro_N2480', index=False)
         df_res_12.to_excel(writer, sheet_name='Shapiro_N12', index=False)
+        df_omnibus.to_excel(writer, sheet_name='Omnibus_N2480', index=False)
     
     print(f"\n✓ Archivo guardado: {archivo_excel}")
 except ImportError:
     print("\n! Openpyxl no instalado, guardando como CSV...")
     df_res_2480.to_csv(RUTA_BASE / "01_PASO1_NORMALIDAD_N2480.csv", index=False)
     df_res_12.to_csv(RUTA_BASE / "01_PASO1_NORMALIDAD_N12.csv", index=False)
+    df_omnibus.to_csv(RUTA_BASE / "01_PASO1_NORMALIDAD_OMNIBUS_N2480.csv", index=False)
     print("✓ Archivos CSV guardados")
 
 # ==================================================================================
@@ -5,19 +5,25 @@ PASO 2: LEVENE - HOMOGENEIDAD DE VARIANZAS
 ===========================================
 Análisis riguroso N=12
 Decidiremos entre t-Student o t-Student Welch
+
+F y p-value salen de comun.homogeneidad: todas las métricas, ambos niveles,
+global y por categoría, en una sola pasada y en caché por versión del dataset.
 """
 
 import pandas as pd
 import numpy as np
-from scipy.stats import levene
 import os
 from pathlib import Path
 
+from comun.carga import cargar_datos_consolidados
+from comun.homogeneidad import TODAS, seleccionar_levene, tabla_levene
+from comun.indice import IndiceCompuesto
+
 # ==================================================================================
 # CONFIGURACION
 # ==================================================================================
 
-RUTA_BASE = Path(r"C:\Users\doleh\Downloads\development\spring-petclinic\analisis")
+RUTA_BASE = Path(".")
 METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
 
 # ==================================================================================
@@ -29,8 +35,11 @@ print("PASO 2: LEVENE - HOMOGENEIDAD DE VARIANZAS")
 print("=" * 100)
 print("\nPASO 0: Cargando datos consolidados...")
 
-archivo_consolidado = RUTA_BASE / "datos_consolidados.csv"
-df_consolidated = pd.read_csv(archivo_consolidado)
+df_consolidated = cargar_datos_consolidados(RUTA_BASE)
+indice = IndiceCompuesto(df_consolidated)
+tabla_homogeneidad = tabla_levene(RUTA_BASE, df=df_consolidated)
+levene_2480 = seleccionar_levene(tabla_homogeneidad, 'N=2480')
+levene_12 = seleccionar_levene(tabla_homogeneidad, 'N=12')
 
 print(f"  ✓ Total registros: {len(df_consolidated)}")
 print(f"  ✓ Grupos: {df_consolidated['group'].unique()}")
@@ -51,15 +60,15 @@ for metrica in METRICAS:
     print(f"╚{'═' * 96}╝")
     
     # Obtener datos por grupo
-    datos_ia = df_consolidated[df_consolidated['group'] == 'IA'][metrica].values
-    datos_manual = df_consolidated[df_consolidated['group'] == 'Manual'][metrica].values
+    datos_ia = indice.valores(metrica, 'IA')
+    datos_manual = indice.valores(metrica, 'Manual')
     
     # Calcular varianzas
     var_ia = np.var(datos_ia, ddof=1)
     var_manual = np.var(datos_manual, ddof=1)
     
-    # Ejecutar Levene
-    F_stat, p_value = levene(datos_ia, datos_manual)
+    # Levene (centro mediana) del kernel vectorizado
+    F_stat, p_value = levene_2480.loc[metrica, ['estadistico', 'p_value']]
     
     # Interpretación
     es_igual = "✓ Varianzas IGUALES" if p_value >= 0.05 else "✗ Varianzas DESIGUALES"
@@ -99,7 +108,7 @@ print("PASO 2B: LEVENE EN N=12 (ANÁLISIS RIGUROSO)")
 print("=" * 100)
 
 # Calcular promedios por test
-df_promedios = df_consolidated.groupby(['group', 'test_name'])[METRICAS].mean().reset_index()
+df_promedios = indice.medias_por_test(METRICAS)
 
 print(f"\nTests encontrados: {len(df_promedios)}")
 print(f"  Manual: {len(df_promedios[df_promedios['group'] == 'Manual'])}")
@@ -120,11 +129,8 @@ for metrica in METRICAS:
     var_ia = np.var(datos_ia, ddof=1)
     var_manual = np.var(datos_manual, ddof=1)
     
-    # Ejecutar Levene
-    if len(datos_ia) >= 2 and len(datos_manual) >= 2:
-        F_stat, p_value = levene(datos_ia, datos_manual)
-    else:
-        F_stat, p_value = np.nan, np.nan
+    # Levene (centro mediana) del kernel vectorizado: NaN si algún grupo tiene < 2 tests
+    F_stat, p_value = levene_12.loc[metrica, ['estadistico', 'p_value']]
     
     # Interpretación
     es_igual = "✓ Varianzas IGUALES" if p_value >= 0.05 else "✗ Varianzas DESIGUALES"
@@ -159,6 +165,23 @@ for metrica in METRICAS:
         'ratio_var': max(var_ia, var_manual) / min(var_ia, var_manual)
     })
 
+# ==================================================================================
+# PASO 2C: SENSIBILIDAD AL CENTRO Y POR CATEGORÍA (N=12)
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 2C: SENSIBILIDAD AL CENTRO Y POR CATEGORÍA (N=12)")
+print("=" * 100)
+print("\n  Centro: mediana = Brown-Forsythe, media = Levene original, recortada = media recortada 5%")
+
+tabla_12 = tabla_homogeneidad[tabla_homogeneidad['nivel'] == 'N=12']
+pivote = tabla_12.pivot_table(index=['category', 'metrica'], columns='centro', values='p_value', sort=False)
+print(f"\n  {'Categoría':<14} {'Métrica':<16} {'p mediana':>12} {'p media':>12} {'p recortada':>12}")
+print(f"  {'-' * 14} {'-' * 16} {'-' * 12} {'-' * 12} {'-' * 12}")
+for (categoria, metrica), fila in pivote.iterrows():
+    etiqueta = 'Global' if categoria == TODAS else categoria
+    print(f"  {etiqueta:<14} {metrica:<16} {fila['mediana']:>12.6f} {fila['media']:>12.6f} {fila['recortada']:>12.6f}")
+
 # ==================================================================================
 # MATRIZ DE DECISIONES PARA PASO 3
 # ==================================================================================
@@ -205,12 +228,14 @@ try:
     with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
         df_res_2480.to_excel(writer, sheet_name='Levene_N2480', index=False)
         df_res_12.to_excel(writer, sheet_name='Levene_N12', index=False)
+        tabla_homogeneidad.to_excel(writer, sheet_name='Levene_Centros', index=False)
     
     print(f"\n✓ Archivo guardado: {archivo_excel}")
 except ImportError:
     print("\n! Openpyxl no instalado, guardando como CSV...")
     pd.DataFrame(resultados_levene_2480).to_csv(RUTA_BASE / "02_PASO2_LEVENE_N2480.csv", index=False)
     pd.DataFrame(resultados_levene_12).to_csv(RUTA_BASE / "02_PASO2_LEVENE_N12.csv", index=False)
+    tabla_homogeneidad.to_csv(RUTA_BASE / "02_PASO2_LEVENE_CENTROS.csv", index=False)
     print("✓ Archivos CSV guardados")
 
 # ==================================================================================
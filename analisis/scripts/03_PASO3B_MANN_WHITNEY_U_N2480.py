@@ -24,13 +24,16 @@ Métrica de comparación:
 
 import pandas as pd
 import numpy as np
-from scipy.stats import mannwhitneyu
 from openpyxl import Workbook
 from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 import warnings
 warnings.filterwarnings('ignore')
 
+from comun.dominancia import dominancia_por_estrato
+from comun.estratificado import pruebas_estratificadas
+from comun.rangos import abrir_rangos
+
 print("════════════════════════════════════════════════════════════════════════════════")
 print("PASO 3B: PRUEBA DE MANN-WHITNEY U (DATOS BRUTOS N=2,480)")
 print("════════════════════════════════════════════════════════════════════════════════\n")
@@ -40,9 +43,12 @@ print("════════════════════════
 # ════════════════════════════════════════════════════════════════════════════════
 
 print("[PASO 0] Cargando datos brutos...")
-df = pd.read_csv('datos_consolidados.csv')
-print(f"  ✓ Registros cargados: {len(df):,}")
-print(f"  ✓ Grupos: {df['group'].unique().tolist()}")
+# Almacén mapeado en memoria: cada grupo es un tramo contiguo, sin copiar datos.
+# Los rangos de cada métrica se calculan una vez por versión del dataset.
+rangos = abrir_rangos('.')
+almacen = rangos.almacen
+print(f"  ✓ Registros cargados: {len(almacen):,}")
+print(f"  ✓ Grupos: {list(almacen.indice['grupos'])}")
 print(f"  ✓ Métricas disponibles: instr_pct, branch_pct, mutation_score, time_seconds\n")
 
 # ════════════════════════════════════════════════════════════════════════════════
@@ -52,8 +58,8 @@ print(f"  ✓ Métricas disponibles: instr_pct, branch_pct, mutation_score, time
 print("[PASO 1] Preparando datos para Mann-Whitney U...")
 
 # Separar por grupo
-manual_data = df[df['group'] == 'Manual']
-ia_data = df[df['group'] == 'IA']
+manual_data = almacen.dataframe(group='Manual')
+ia_data = almacen.dataframe(group='IA')
 
 print(f"  ✓ Registros Manual: {len(manual_data):,}")
 print(f"  ✓ Registros AI: {len(ia_data):,}\n")
@@ -88,17 +94,16 @@ for metrica, label in zip(metricas, labels_metricas):
     std_manual = manual_vals.std()
     std_ia = ia_vals.std()
     
-    # Mann-Whitney U test (two-sided)
-    u_stat, p_value = mannwhitneyu(manual_vals, ia_vals, alternative='two-sided')
+    # Mann-Whitney U test (two-sided) desde los rangos en caché
+    mw = rangos.mann_whitney(metrica)
+    u_stat, p_value = mw['estadistico'], mw['p_value']
     
-    # Calcular tamaño del efecto (r = Z / sqrt(N))
-    from scipy.stats import norm
-    # Aproximación: Z = (U - E[U]) / sqrt(Var[U])
-    n1, n2 = len(manual_vals), len(ia_vals)
-    E_U = (n1 * n2) / 2
-    Var_U = (n1 * n2 * (n1 + n2 + 1)) / 12
-    Z = (u_stat - E_U) / np.sqrt(Var_U)
-    r_effect = abs(Z) / np.sqrt(n1 + n2)  # Tamaño del efecto (r)
+    # Tamaño del efecto: Z = (U - E[U]) / sqrt(Var[U]) con Var[U] corregida por
+    # empates, r = |Z| / sqrt(N) y correlación biserial de rangos
+    n1, n2 = mw['n_1'], mw['n_2']
+    Z = mw['z']
+    r_effect = mw['r']
+    biserial = mw['biserial']
     
     # Interpretación de p-value
     es_significativo = "Sí" if p_value < 0.05 else "No"
@@ -118,6 +123,7 @@ for metrica, label in zip(metricas, labels_metricas):
         'Z-score': Z,
         'p-value': p_value,
         'r (effect size)': r_effect,
+        'Rank-biserial': biserial,
         'Significativo (α=0.05)': es_significativo,
     })
     
@@ -125,9 +131,36 @@ for metrica, label in zip(metricas, labels_metricas):
     print(f"    N Manual: {n1:,}  |  N AI: {n2:,}")
     print(f"    Mediana Manual: {median_manual:.4f}  |  Mediana AI: {median_ia:.4f}")
     print(f"    U-statistic: {u_stat:.2f}")
+    print(f"    Z (corregida por empates): {Z:.4f}")
     print(f"    p-value: {p_value:.6f}")
     print(f"    Significativo: {es_significativo} (α=0.05)")
 
+# Dominancia: δ de Cliff y CLES en O(n log n), global y por categoría, con IC
+# bootstrap (percentil y BCa) remuestreando sobre la misma rejilla ordenada
+print("\n  Calculando δ de Cliff y CLES (global y por categoría)...")
+df_dominancia = almacen.dataframe(columnas=['group', 'category'] + metricas)
+df_cliff = pd.concat([
+    dominancia_por_estrato(df_dominancia, metricas).assign(category='(todas)'),
+    dominancia_por_estrato(df_dominancia, metricas, claves=['category']),
+], ignore_index=True)
+for _, fila in df_cliff.iterrows():
+    print(f"    {fila['category']:<12} {fila['metrica']:<15} δ = {fila['cliffs_delta']:+.4f} "
+          f"[{fila['cliffs_delta_ic_inf_bca']:+.4f}, {fila['cliffs_delta_ic_sup_bca']:+.4f}]  "
+          f"CLES = {fila['cles']:.4f}  ({fila['interpretacion']})")
+
+# Estratificado por categoría: Unitarias y Funcionales tienen escalas de tiempo muy
+# distintas. van Elteren combina los U de cada categoría desde los rangos por
+# estrato en caché; la t estratificada pondera las diferencias de medias (CMH)
+print("\n  Pruebas estratificadas por categoría (van Elteren y t ponderada)...")
+df_estratificado = pruebas_estratificadas(rangos, metricas, 'category')
+for _, fila in df_estratificado.iterrows():
+    print(f"    {fila['metrica']:<15} MW global p = {fila['p_mann_whitney']:.6f} (r_b = {fila['biserial']:+.4f})  "
+          f"van Elteren Z = {fila['z_van_elteren']:+.4f}, p = {fila['p_van_elteren']:.6f} "
+          f"(r_b = {fila['biserial_estratificada']:+.4f})  "
+          f"t estrat. = {fila['t_estratificada']:+.4f}, p = {fila['p_t_estratificada']:.6f}")
+    if np.sign(fila['biserial']) != np.sign(fila['biserial_estratificada']):
+        print(f"      ! El sentido del efecto cambia al estratificar (paradoja de Simpson)")
+
 # ════════════════════════════════════════════════════════════════════════════════
 # PASO 3: CREAR DATAFRAME DE RESULTADOS
 # ════════════════════════════════════════════════════════════════════════════════
@@ -174,6 +207,7 @@ headers = [
     'Z-score',
     'p-value',
     'r (effect size)',
+    'Rank-biserial',
     'Significativo'
 ]
 
@@ -200,7 +234,8 @@ for row_idx, row_data in enumerate(resultados_mw, 2):
     ws1.cell(row=row_idx, column=11).value = round(row_data['Z-score'], 4)
     ws1.cell(row=row_idx, column=12).value = row_data['p-value']
     ws1.cell(row=row_idx, column=13).value = round(row_data['r (effect size)'], 4)
-    ws1.cell(row=row_idx, column=14).value = row_data['Significativo (α=0.05)']
+    ws1.cell(row=row_idx, column=14).value = round(row_data['Rank-biserial'], 4)
+    ws1.cell(row=row_idx, column=15).value = row_data['Significativo (α=0.05)']
     
     # Aplicar estilos a datos
     for col_idx in range(1, len(headers) + 1):
@@ -211,7 +246,7 @@ for row_idx, row_data in enumerate(resultados_mw, 2):
         # Formato para p-value (científico)
         if col_idx == 12:
             cell.number_format = '0.0000E+00'
-        elif col_idx in [4, 5, 6, 7, 8, 9, 10, 11, 13]:
+        elif col_idx in [4, 5, 6, 7, 8, 9, 10, 11, 13, 14]:
             cell.number_format = '0.0000'
 
 # Ajustar ancho de columnas
@@ -332,6 +367,88 @@ for row_idx, resultado_mw in enumerate(resultados_mw, 2):
 for col_idx in range(1, len(headers_comp) + 1):
     ws3.column_dimensions[get_column_letter(col_idx)].width = 18
 
+# Hoja 4: Dominancia (δ de Cliff y CLES)
+ws4 = wb.create_sheet("Dominancia_Cliff")
+
+columnas_cliff = [
+    ('category', 'Categoría'),
+    ('metrica', 'Métrica'),
+    ('n_manual', 'N Manual'),
+    ('n_ia', 'N AI'),
+    ('p_mayor', 'P(Manual > AI)'),
+    ('p_empate', 'P(Manual = AI)'),
+    ('p_menor', 'P(Manual < AI)'),
+    ('cliffs_delta', "Cliff's delta"),
+    ('cliffs_delta_ic_inf_bca', 'δ IC95 inf (BCa)'),
+    ('cliffs_delta_ic_sup_bca', 'δ IC95 sup (BCa)'),
+    ('cles', 'CLES'),
+    ('cles_ic_inf_bca', 'CLES IC95 inf (BCa)'),
+    ('cles_ic_sup_bca', 'CLES IC95 sup (BCa)'),
+    ('interpretacion', 'Magnitud'),
+]
+
+for col_idx, (_, header) in enumerate(columnas_cliff, 1):
+    cell = ws4.cell(row=1, column=col_idx)
+    cell.value = header
+    cell.fill = header_fill
+    cell.font = header_font
+    cell.alignment = header_alignment
+    cell.border = border
+
+for row_idx, (_, fila) in enumerate(df_cliff.iterrows(), 2):
+    for col_idx, (columna, _) in enumerate(columnas_cliff, 1):
+        cell = ws4.cell(row=row_idx, column=col_idx)
+        valor = fila[columna]
+        cell.value = round(float(valor), 4) if isinstance(valor, (float, np.floating)) else valor
+        cell.border = border
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        if isinstance(valor, (float, np.floating)):
+            cell.number_format = '0.0000'
+
+for col_idx in range(1, len(columnas_cliff) + 1):
+    ws4.column_dimensions[get_column_letter(col_idx)].width = 16
+
+# Hoja 5: Pruebas estratificadas por categoría
+ws5 = wb.create_sheet("Estratificado_Categoria")
+
+columnas_estratificado = [
+    ('metrica', 'Métrica', None),
+    ('n_estratos', 'Estratos', None),
+    ('n_manual', 'N Manual', None),
+    ('n_ia', 'N AI', None),
+    ('p_mann_whitney', 'p MW (sin estratificar)', '0.00E+00'),
+    ('biserial', 'Rank-biserial (sin estratificar)', '0.0000'),
+    ('z_van_elteren', 'Z van Elteren', '0.0000'),
+    ('p_van_elteren', 'p van Elteren', '0.00E+00'),
+    ('biserial_estratificada', 'Rank-biserial estratificada', '0.0000'),
+    ('diferencia_estratificada', 'Diferencia ponderada (Manual - AI)', '0.0000'),
+    ('error_estandar', 'Error estándar', '0.0000'),
+    ('t_estratificada', 't estratificada', '0.0000'),
+    ('gl', 'gl (Satterthwaite)', '0.00'),
+    ('p_t_estratificada', 'p t estratificada', '0.00E+00'),
+]
+
+for col_idx, (_, header, _) in enumerate(columnas_estratificado, 1):
+    cell = ws5.cell(row=1, column=col_idx)
+    cell.value = header
+    cell.fill = header_fill
+    cell.font = header_font
+    cell.alignment = header_alignment
+    cell.border = border
+
+for row_idx, (_, fila) in enumerate(df_estratificado.iterrows(), 2):
+    for col_idx, (columna, _, formato) in enumerate(columnas_estratificado, 1):
+        cell = ws5.cell(row=row_idx, column=col_idx)
+        valor = fila[columna]
+        cell.value = float(valor) if isinstance(valor, (float, np.floating)) else valor
+        cell.border = border
+        cell.alignment = Alignment(horizontal="center", vertical="center")
+        if formato:
+            cell.number_format = formato
+
+for col_idx in range(1, len(columnas_estratificado) + 1):
+    ws5.column_dimensions[get_column_letter(col_idx)].width = 18
+
 # Guardar archivo
 archivo_salida = '03_PASO3B_MANN_WHITNEY_U_N2480.xlsx'
 wb.save(archivo_salida)
@@ -346,7 +463,7 @@ print("RESUMEN EJECUTIVO - PASO 3B")
 print("════════════════════════════════════════════════════════════════════════════════\n")
 
 print("DATOS ANALIZADOS:")
-print(f"  • Total de registros: {len(df):,}")
+print(f"  • Total de registros: {len(almacen):,}")
 print(f"  • Manual: {len(manual_data):,} registros")
 print(f"  • AI: {len(ia_data):,} registros")
 print(f"  • Métricas: {len(metricas)}\n")
@@ -358,6 +475,7 @@ for resultado in resultados_mw:
     print(f"    p-value: {resultado['p-value']:.6f}")
     print(f"    Significativo: {resultado['Significativo (α=0.05)']}")
     print(f"    Tamaño del efecto (r): {resultado['r (effect size)']:.4f}")
+    print(f"    Correlación biserial de rangos: {resultado['Rank-biserial']:.4f}")
 
 print("\n" + "="*80)
 print("CONCLUSIÓN GENERAL:")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PASO 3C: CUBO ESTRATIFICADO - MANUAL vs IA POR CATEGORÍA Y PAR DE CLASES
+========================================================================
+Los PASOS 3 y 3B comparan Manual vs IA con Unitarias y Funcionales juntas.
+Aquí la misma batería (t-Student, Welch, Mann-Whitney y Brown-Forsythe) se
+repite en cada estrato:
+
+  • Global y por categoría, en N=2,480 y en N=12 (promedios por test)
+  • Por categoría × par de clases (test_pair: la clase Manual frente a la
+    clase IA que prueba el mismo componente), en N=2,480
+
+Cada nivel es una sola llamada vectorizada de comun.cubo; la corrección de
+Holm y Benjamini-Hochberg se aplica a todo el cubo, una familia por prueba.
+test_class no sirve como estrato directo: cada clase pertenece a un solo
+grupo, por eso el par de clases se deriva de su nombre (comun.esquema).
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from comun.carga import cargar_datos_consolidados
+from comun.cubo import TODAS, ajustar_cubo, cubo_estratificado
+from comun.esquema import COLUMNA_PAR, agregar_par
+from comun.indice import IndiceCompuesto
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+RUTA_BASE = Path(".")
+METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+ALFA = 0.05
+
+# (nivel, claves) de cada corte del cubo
+CORTES = [
+    ('N=2,480', []),
+    ('N=2,480', ['category']),
+    ('N=2,480', ['category', COLUMNA_PAR]),
+    ('N=12', []),
+    ('N=12', ['category']),
+]
+
+# ==================================================================================
+# PASO 0: CARGAR DATOS CONSOLIDADOS
+# ==================================================================================
+
+print("=" * 100)
+print("PASO 3C: CUBO ESTRATIFICADO - MANUAL vs IA POR CATEGORÍA Y PAR DE CLASES")
+print("=" * 100)
+print("\nPASO 0: Cargando datos consolidados...")
+
+df_consolidated = agregar_par(cargar_datos_consolidados(RUTA_BASE))
+
+# Promedios por test (N=12) con su categoría
+df_promedios = IndiceCompuesto(df_consolidated).medias_por_test(METRICAS)
+categoria_test = df_consolidated.groupby('test_name', observed=True)['category'].first()
+df_promedios['category'] = df_promedios['test_name'].map(categoria_test)
+
+print(f"  ✓ Total registros: {len(df_consolidated)}")
+print(f"  ✓ Pares de clases: {list(df_consolidated[COLUMNA_PAR].cat.categories)}")
+
+# ==================================================================================
+# PASO 3C-1: BATERÍA POR ESTRATO
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 3C-1: BATERÍA DE PRUEBAS POR ESTRATO")
+print("=" * 100)
+
+datos = {'N=2,480': df_consolidated, 'N=12': df_promedios}
+partes = []
+for nivel, claves in CORTES:
+    corte = cubo_estratificado(datos[nivel], METRICAS, claves)
+    for clave in ['category', COLUMNA_PAR]:
+        if clave not in corte.columns:
+            corte.insert(0, clave, TODAS)
+    corte.insert(0, 'nivel', nivel)
+    partes.append(corte)
+    n_estratos = len(corte) // (len(METRICAS) * corte['prueba'].nunique())
+    print(f"  ✓ {nivel:<8} {' × '.join(claves) or 'global':<24} {n_estratos:>4} estratos, "
+          f"{corte['p_value'].notna().sum():>4} pruebas")
+
+# Holm / BH sobre todo el cubo (una familia por prueba)
+cubo = ajustar_cubo(pd.concat(partes, ignore_index=True))
+cubo = cubo[['nivel', 'category', COLUMNA_PAR] + [c for c in cubo.columns
+                                                  if c not in ('nivel', 'category', COLUMNA_PAR)]]
+print(f"\n  Corrección conjunta: {cubo['p_value'].notna().sum()} p-values "
+      f"({cubo.groupby('prueba')['p_value'].count().min()} por familia)")
+
+# ==================================================================================
+# PASO 3C-2: RESUMEN POR ESTRATO
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 3C-2: RESUMEN POR ESTRATO")
+print("=" * 100)
+
+def imprimir_corte(nivel, prueba, columna_estrato):
+    seleccion = cubo[(cubo['nivel'] == nivel) & (cubo['prueba'] == prueba)]
+    print(f"\n  {nivel} - {prueba} (p ajustados sobre todo el cubo)")
+    print(f"  {'Estrato':<22} {'Métrica':<16} {'n M/IA':>11} {'p-value':>12} {'p Holm':>12} {'p BH':>12}  Sig.")
+    print(f"  {'-' * 22} {'-' * 16} {'-' * 11} {'-' * 12} {'-' * 12} {'-' * 12}  ----")
+    for _, fila in seleccion.iterrows():
+        estrato = fila[columna_estrato] if fila[columna_estrato] != TODAS else fila['category']
+        estrato = 'Global' if estrato == TODAS else estrato
+        sig = "✓" if fila['significativo_holm'] else ("~" if fila['significativo_bh'] else "✗")
+        print(f"  {estrato:<22} {fila['metrica']:<16} {fila['n_manual']:>5}/{fila['n_ia']:<5} "
+              f"{fila['p_value']:>12.6f} {fila['p_holm']:>12.6f} {fila['p_bh']:>12.6f}  {sig}")
+
+imprimir_corte('N=12', 'welch', 'category')
+imprimir_corte('N=2,480', 'mann_whitney', COLUMNA_PAR)
+print("\n  ✓ = significativo tras Holm, ~ = solo tras Benjamini-Hochberg, ✗ = ninguno")
+
+# ==================================================================================
+# GUARDAR RESULTADOS EN EXCEL
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("GUARDANDO RESULTADOS...")
+print("=" * 100)
+
+archivo_excel = RUTA_BASE / "03_PASO3C_CUBO_ESTRATIFICADO.xlsx"
+
+resumen = (cubo.groupby(['nivel', 'prueba'], sort=False)
+           .agg(pruebas=('p_value', 'count'),
+                significativas=('p_value', lambda p: int((p < ALFA).sum())),
+                significativas_holm=('significativo_holm', 'sum'),
+                significativas_bh=('significativo_bh', 'sum'))
+           .reset_index())
+
+try:
+    with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
+        cubo.to_excel(writer, sheet_name='Cubo', index=False)
+        resumen.to_excel(writer, sheet_name='Resumen', index=False)
+
+    print(f"\n✓ Archivo guardado: {archivo_excel}")
+except ImportError:
+    print("\n! Openpyxl no instalado, guardando como CSV...")
+    cubo.to_csv(RUTA_BASE / "03_PASO3C_CUBO_ESTRATIFICADO.csv", index=False)
+    print("✓ Archivo CSV guardado")
+
+print("\n" + "=" * 100)
+print("FIN PASO 3C - CUBO ESTRATIFICADO")
+print("=" * 100)
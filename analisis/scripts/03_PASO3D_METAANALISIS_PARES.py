@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PASO 3D: METAANÁLISIS DE EFECTOS ALEATORIOS - PARES DE CLASES MANUAL vs IA
+==========================================================================
+El N=12 de los PASOS 3 y 3C promedia cada test por separado y pierde el
+emparejamiento: cada componente (OwnerAddPet, ShowOwner, ...) tiene una
+clase Manual y una IA. Aquí cada par es un estudio:
+
+  • Efecto Manual − IA de cada par desde sus iteraciones (g de Hedges y
+    log de la razón de medias, que compara pares de escalas distintas)
+  • Combinación con efecto fijo y efectos aleatorios (DerSimonian-Laird y
+    REML), heterogeneidad (Q, I², τ²) e intervalo de predicción
+  • Datos del forest plot por métrica (comun.metaanalisis)
+
+Los pares cuya métrica es idéntica en todas las iteraciones de ambas clases
+(las coberturas, deterministas) no tienen varianza y no entran.
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from comun.carga import cargar_datos_consolidados
+from comun.esquema import COLUMNA_PAR, agregar_par
+from comun.metaanalisis import MODELO_FIJO, forest, metaanalisis
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+RUTA_BASE = Path(".")
+METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+MEDIDAS = ['hedges_g', 'log_razon']
+METODOS = ['DL', 'REML']
+ALFA = 0.05
+
+# ==================================================================================
+# PASO 0: CARGAR DATOS CONSOLIDADOS
+# ==================================================================================
+
+print("=" * 100)
+print("PASO 3D: METAANÁLISIS DE EFECTOS ALEATORIOS - PARES DE CLASES MANUAL vs IA")
+print("=" * 100)
+print("\nPASO 0: Cargando datos consolidados...")
+
+df_consolidated = agregar_par(cargar_datos_consolidados(RUTA_BASE))
+
+print(f"  ✓ Total registros: {len(df_consolidated)}")
+print(f"  ✓ Pares de clases (estudios): {len(df_consolidated[COLUMNA_PAR].cat.categories)}")
+
+# ==================================================================================
+# PASO 3D-1: EFECTOS POR PAR Y COMBINACIÓN
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 3D-1: EFECTOS POR PAR Y COMBINACIÓN (efecto > 0: Manual mayor que IA)")
+print("=" * 100)
+
+partes_estudios, partes_combinado = [], []
+for medida in MEDIDAS:
+    estudios, combinado = metaanalisis(df_consolidated, METRICAS, medida=medida, metodos=METODOS)
+    partes_estudios.append(estudios)
+    partes_combinado.append(combinado)
+
+    print(f"\n  Medida: {medida}")
+    for metrica in METRICAS:
+        filas_estudio = estudios[estudios['metrica'] == metrica]
+        filas_modelo = combinado[combinado['metrica'] == metrica]
+        k = int(filas_modelo['k'].iloc[0])
+        print(f"\n    {metrica} ({k} de {len(filas_estudio)} pares con varianza)")
+        if k == 0:
+            continue
+        print(f"    {'Par / modelo':<22} {'Efecto':>10} {'IC 95%':>22} {'Peso REML':>10}")
+        print(f"    {'-' * 22} {'-' * 10} {'-' * 22} {'-' * 10}")
+        for _, fila in filas_estudio.dropna(subset=['efecto']).iterrows():
+            print(f"    {fila['estudio']:<22} {fila['efecto']:>+10.4f} "
+                  f"[{fila['ic_inferior']:>+9.4f}, {fila['ic_superior']:>+9.4f}] {fila['peso_REML']:>9.1f}%")
+        for _, fila in filas_modelo.iterrows():
+            sig = "✓" if fila['p_value'] < ALFA else "✗"
+            print(f"    {'◆ ' + fila['modelo']:<22} {fila['efecto']:>+10.4f} "
+                  f"[{fila['ic_inferior']:>+9.4f}, {fila['ic_superior']:>+9.4f}] "
+                  f"  p = {fila['p_value']:.6f} {sig}")
+        if k > 1:
+            reml = filas_modelo[filas_modelo['modelo'] == 'REML'].iloc[0]
+            print(f"    Heterogeneidad: Q = {reml['q']:.2f} (gl = {int(reml['gl_q'])}, p = {reml['p_q']:.6f}), "
+                  f"I² = {reml['i2']:.1f}%, τ² REML = {reml['tau2']:.6f}")
+            if k >= 3:
+                print(f"    Predicción para un par nuevo (REML): "
+                      f"[{reml['prediccion_inferior']:+.4f}, {reml['prediccion_superior']:+.4f}]")
+
+estudios = pd.concat(partes_estudios, ignore_index=True)
+combinado = pd.concat(partes_combinado, ignore_index=True)
+datos_forest = pd.concat([forest(e, c) for e, c in zip(partes_estudios, partes_combinado)],
+                         ignore_index=True)
+
+# ==================================================================================
+# PASO 3D-2: FIJO vs ALEATORIOS
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 3D-2: CONCLUSIÓN POR MODELO")
+print("=" * 100)
+
+for medida in MEDIDAS:
+    seleccion = combinado[(combinado['medida'] == medida) & (combinado['k'] > 1)]
+    for metrica, filas in seleccion.groupby('metrica', sort=False):
+        fijo = filas[filas['modelo'] == MODELO_FIJO].iloc[0]
+        reml = filas[filas['modelo'] == 'REML'].iloc[0]
+        cambia = (fijo['p_value'] < ALFA) != (reml['p_value'] < ALFA)
+        print(f"  {medida:<10} {metrica:<15} fijo p = {fijo['p_value']:.6f}  REML p = {reml['p_value']:.6f}"
+              + ("  ! la heterogeneidad entre pares cambia la conclusión" if cambia else ""))
+
+# ==================================================================================
+# GUARDAR RESULTADOS EN EXCEL
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("GUARDANDO RESULTADOS...")
+print("=" * 100)
+
+archivo_excel = RUTA_BASE / "03_PASO3D_METAANALISIS_PARES.xlsx"
+
+try:
+    with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
+        estudios.to_excel(writer, sheet_name='Estudios', index=False)
+        combinado.to_excel(writer, sheet_name='Combinado', index=False)
+        datos_forest.to_excel(writer, sheet_name='Forest', index=False)
+
+    print(f"\n✓ Archivo guardado: {archivo_excel}")
+except ImportError:
+    print("\n! Openpyxl no instalado, guardando como CSV...")
+    combinado.to_csv(RUTA_BASE / "03_PASO3D_METAANALISIS_PARES.csv", index=False)
+    print("✓ Archivo CSV guardado")
+
+print("\n" + "=" * 100)
+print("FIN PASO 3D - METAANÁLISIS DE PARES")
+print("=" * 100)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+PASO 3E: COMPONENTES DE VARIANZA - ITERACIONES ANIDADAS EN CADA TEST
+====================================================================
+El PASO 3 (N=12) reduce las 40 iteraciones de cada test a su media y el
+PASO 3B (N=2,480) las trata como observaciones independientes. Aquí se mide
+cuánto de la varianza es del test y cuánto de la repetición:
+
+  • ICC, efecto de diseño y n efectivo por grupo y con ambos grupos
+  • Bootstrap por conglomerados (remuestrea tests, no filas) de la
+    diferencia Manual − IA, frente al error estándar que supone filas
+    independientes
+
+Todo sale de los acumuladores por test (n, media, M2) del almacén columnar
+(comun.componentes): el costo no depende del número de iteraciones.
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+from comun.almacen import abrir_almacen
+from comun.componentes import AMBITO_CONJUNTO, acumular_almacen, bootstrap_por_test, descomponer
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+RUTA_BASE = Path(".")
+METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+GRUPOS = ['Manual', 'IA']
+
+# ==================================================================================
+# PASO 0: ACUMULADORES POR TEST
+# ==================================================================================
+
+print("=" * 100)
+print("PASO 3E: COMPONENTES DE VARIANZA - ITERACIONES ANIDADAS EN CADA TEST")
+print("=" * 100)
+print("\nPASO 0: Acumuladores por test desde el almacén columnar...")
+
+acumuladores = acumular_almacen(abrir_almacen(RUTA_BASE), METRICAS)
+
+print(f"  ✓ Tests: {len(acumuladores)} "
+      f"({', '.join(f'{g}: {int(acumuladores.grupo(g).sum())}' for g in GRUPOS)})")
+print(f"  ✓ Iteraciones resumidas: {int(acumuladores.n[:, 0].sum())}")
+
+# ==================================================================================
+# PASO 3E-1: ICC, EFECTO DE DISEÑO Y N EFECTIVO
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 3E-1: ENTRE TESTS vs DENTRO DE CADA TEST")
+print("=" * 100)
+
+componentes = descomponer(acumuladores, GRUPOS)
+
+print(f"\n  {'Ámbito':<12} {'Métrica':<16} {'N':>6} {'Tests':>6} {'σ² entre':>12} {'σ² dentro':>12} "
+      f"{'ICC':>8} {'Ef. diseño':>11} {'n efectivo':>11}")
+print(f"  {'-' * 12} {'-' * 16} {'-' * 6} {'-' * 6} {'-' * 12} {'-' * 12} {'-' * 8} {'-' * 11} {'-' * 11}")
+for _, fila in componentes.iterrows():
+    print(f"  {fila['ambito']:<12} {fila['metrica']:<16} {fila['n']:>6} {fila['tests']:>6} "
+          f"{fila['sigma2_entre']:>12.6f} {fila['sigma2_dentro']:>12.6f} {fila['icc']:>8.4f} "
+          f"{fila['efecto_diseno']:>11.2f} {fila['n_efectivo']:>11.2f}")
+
+print("\n  ICC ≈ 1: la métrica es del test, no de la iteración (las coberturas son deterministas);")
+print("  el n efectivo queda cerca del número de tests y N=2,480 sobrestima la precisión.")
+
+# ==================================================================================
+# PASO 3E-2: BOOTSTRAP POR CONGLOMERADOS
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("PASO 3E-2: BOOTSTRAP REMUESTREANDO TESTS (Manual − IA)")
+print("=" * 100)
+
+bootstrap = bootstrap_por_test(acumuladores, grupos=GRUPOS)
+diferencias = bootstrap[bootstrap['estadistico'] == 'diferencia_medias'].set_index('metrica')
+
+print(f"\n  {'Métrica':<16} {'Diferencia':>12} {'EE filas':>10} {'EE tests':>10} {'(EE tests/EE filas)²':>22} "
+      f"{'IC 95% por tests':>26}")
+print(f"  {'-' * 16} {'-' * 12} {'-' * 10} {'-' * 10} {'-' * 22} {'-' * 26}")
+for metrica in METRICAS:
+    fila = diferencias.loc[metrica]
+    inflacion = (fila['error_estandar'] / fila['error_estandar_filas']) ** 2
+    cruza_cero = fila['ic_inf'] <= 0 <= fila['ic_sup']
+    print(f"  {metrica:<16} {fila['estimado']:>+12.4f} {fila['error_estandar_filas']:>10.4f} "
+          f"{fila['error_estandar']:>10.4f} {inflacion:>22.1f} "
+          f"[{fila['ic_inf']:>+10.4f}, {fila['ic_sup']:>+10.4f}] {'(incluye 0)' if cruza_cero else ''}")
+
+icc = bootstrap[bootstrap['estadistico'] == 'icc'].set_index('metrica')
+print(f"\n  ICC ({AMBITO_CONJUNTO}) con IC 95% por tests:")
+for metrica in METRICAS:
+    fila = icc.loc[metrica]
+    print(f"    {metrica:<16} {fila['estimado']:.4f} [{fila['ic_inf']:.4f}, {fila['ic_sup']:.4f}]")
+
+# ==================================================================================
+# GUARDAR RESULTADOS EN EXCEL
+# ==================================================================================
+
+print("\n" + "=" * 100)
+print("GUARDANDO RESULTADOS...")
+print("=" * 100)
+
+archivo_excel = RUTA_BASE / "03_PASO3E_COMPONENTES_VARIANZA.xlsx"
+
+tabla_tests = acumuladores.tests.copy()
+for j, metrica in enumerate(METRICAS):
+    tabla_tests[f'n_{metrica}'] = acumuladores.n[:, j].astype(np.int64)
+    tabla_tests[f'media_{metrica}'] = acumuladores.media[:, j]
+    tabla_tests[f'varianza_{metrica}'] = acumuladores.m2[:, j] / np.maximum(acumuladores.n[:, j] - 1, 1)
+
+try:
+    with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
+        componentes.to_excel(writer, sheet_name='Componentes', index=False)
+        bootstrap.to_excel(writer, sheet_name='Bootstrap_Tests', index=False)
+        tabla_tests.to_excel(writer, sheet_name='Acumuladores', index=False)
+
+    print(f"\n✓ Archivo guardado: {archivo_excel}")
+except ImportError:
+    print("\n! Openpyxl no instalado, guardando como CSV...")
+    componentes.to_csv(RUTA_BASE / "03_PASO3E_COMPONENTES_VARIANZA.csv", index=False)
+    print("✓ Archivo CSV guardado")
+
+print("\n" + "=" * 100)
+print("FIN PASO 3E - COMPONENTES DE VARIANZA")
+print("=" * 100)
@@ -4,19 +4,27 @@
 PASO 3: PRUEBA DE HIPÓTESIS - t-Student
 =======================================
 Comparación Manual vs IA
-Cálculo de Cohen's d (tamaño de efecto)
+Cálculo de Cohen's d (tamaño de efecto) con IC 95% bootstrap BCa
+p-value de permutaciones (exacto, 924 reparticiones) sin supuesto de normalidad
+La prueba de cada métrica (Student, Welch o Mann-Whitney) la eligen los
+supuestos de N=12 (Shapiro-Wilk y Levene) vía comun.hipotesis
 """
 
 import pandas as pd
 import numpy as np
-from scipy.stats import ttest_ind
 from pathlib import Path
 
+from comun.bootstrap import N_REMUESTREOS, intervalo, intervalos_por_grupo
+from comun.carga import cargar_datos_consolidados
+from comun.hipotesis import contrastar
+from comun.indice import IndiceCompuesto
+from comun.permutaciones import prueba_permutaciones_por_grupo
+
 # ==================================================================================
 # CONFIGURACION
 # ==================================================================================
 
-RUTA_BASE = Path(r"C:\Users\doleh\Downloads\development\spring-petclinic\analisis")
+RUTA_BASE = Path(".")
 METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
 
 # ==================================================================================
@@ -28,8 +36,7 @@ print("PASO 3: PRUEBA DE HIPÓTESIS - t-Student y Cohen's d")
 print("=" * 100)
 print("\nPASO 0: Cargando datos consolidados...")
 
-archivo_consolidado = RUTA_BASE / "datos_consolidados.csv"
-df_consolidated = pd.read_csv(archivo_consolidado)
+df_consolidated = cargar_datos_consolidados(RUTA_BASE)
 
 print(f"  ✓ Total registros: {len(df_consolidated)}")
 print(f"  ✓ Grupos: {df_consolidated['group'].unique()}")
@@ -82,12 +89,30 @@ print("PASO 3A: t-Student (ANÁLISIS RIGUROSO) - N=12")
 print("=" * 100)
 
 # Calcular promedios por test
-df_promedios = df_consolidated.groupby(['group', 'test_name'])[METRICAS].mean().reset_index()
+df_promedios = IndiceCompuesto(df_consolidated).medias_por_test(METRICAS)
 
 print(f"\nTests encontrados: {len(df_promedios)}")
 print(f"  Manual: {len(df_promedios[df_promedios['group'] == 'Manual'])}")
 print(f"  IA: {len(df_promedios[df_promedios['group'] == 'IA'])}")
 
+# IC bootstrap de diferencia de medias, d de Cohen y diferencia de medianas,
+# todas las métricas a la vez
+ic_bootstrap = intervalos_por_grupo(df_promedios, METRICAS)
+print(f"  Bootstrap: {N_REMUESTREOS} remuestreos (IC 95% percentil y BCa)")
+
+# Prueba de permutaciones de la diferencia de medias, todas las métricas a la vez
+permutaciones = prueba_permutaciones_por_grupo(df_promedios, METRICAS).set_index('metrica')
+print(f"  Permutaciones: {permutaciones['metodo'].iloc[0]} "
+      f"({permutaciones['n_permutaciones'].iloc[0]} reparticiones)")
+
+# Supuestos, selección de prueba y las tres pruebas, todas las métricas a la vez
+contraste = contrastar(df_promedios, METRICAS).set_index('metrica')
+
+print(f"\n  Selección de prueba (Shapiro-Wilk y Levene N=12, α = 0.05):")
+for metrica, fila in contraste.iterrows():
+    print(f"  ├─ {metrica:<16} Shapiro p = {fila['p_shapiro_manual']:.4f} / {fila['p_shapiro_ia']:.4f}, "
+          f"Levene p = {fila['p_levene']:.4f} → {fila['nombre_prueba']}")
+
 resultados_hipotesis = []
 
 for metrica in METRICAS:
@@ -118,34 +143,43 @@ for metrica in METRICAS:
     print(f"  ├─ Media Manual - Media IA: {diferencia:.6f}")
     print(f"  └─ Porcentaje de diferencia: {pct_diferencia:.2f}%")
     
-    # Ejecutar t-Student
-    # Verificar si usar estándar o Welch según Levene
-    if metrica == 'time_seconds':
-        # Levene rechazó igualdad → Welch
-        t_stat, p_value = ttest_ind(datos_manual, datos_ia, equal_var=False)
-        test_usado = "t-Student Welch"
-    else:
-        # Levene aceptó igualdad → t-Student estándar
-        t_stat, p_value = ttest_ind(datos_manual, datos_ia, equal_var=True)
-        test_usado = "t-Student (estándar)"
+    # Prueba elegida por los supuestos: Student si Levene acepta igualdad,
+    # Welch si la rechaza, Mann-Whitney si algún grupo no es normal
+    estadistico, p_value, simbolo = contraste.loc[metrica, ['estadistico', 'p_value', 'simbolo_estadistico']]
+    test_usado = contraste.loc[metrica, 'nombre_prueba']
     
     # Significancia estadística
     es_significativo = "✓ SÍ (p < 0.05)" if p_value < 0.05 else "✗ NO (p ≥ 0.05)"
     
     print(f"\n  Prueba de Hipótesis ({test_usado}):")
-    print(f"  ├─ t-statistic: {t_stat:.6f}")
+    print(f"  ├─ {simbolo}-statistic: {estadistico:.6f}")
     print(f"  ├─ p-value: {p_value:.8f}")
     print(f"  ├─ Significativo: {es_significativo}")
     print(f"  └─ H0: μ_Manual = μ_IA")
     
+    p_permutacion = permutaciones.loc[metrica, 'p_value']
+    print(f"\n  Prueba de Permutaciones ({permutaciones.loc[metrica, 'metodo']}):")
+    print(f"  ├─ p-value: {p_permutacion:.8f}")
+    print(f"  └─ Significativo: {'✓ SÍ (p < 0.05)' if p_permutacion < 0.05 else '✗ NO (p ≥ 0.05)'}")
+    
     # Cohen's d
     cohens_d = calcular_cohens_d(datos_manual, datos_ia)
     interpretacion_d = interpretar_cohens_d(cohens_d)
     
+    ic_diferencia = intervalo(ic_bootstrap, metrica, 'diferencia_medias')
+    ic_cohens_d = intervalo(ic_bootstrap, metrica, 'cohens_d')
+    ic_mediana = intervalo(ic_bootstrap, metrica, 'diferencia_medianas')
+    diferencia_medianas = np.median(datos_manual) - np.median(datos_ia)
+    
     print(f"\n  Tamaño de Efecto (Cohen's d):")
     print(f"  ├─ Cohen's d: {cohens_d:.6f}")
     print(f"  └─ Interpretación: {interpretacion_d}")
     
+    print(f"\n  IC 95% bootstrap BCa:")
+    print(f"  ├─ Diferencia de medias: [{ic_diferencia[0]:.6f}, {ic_diferencia[1]:.6f}]")
+    print(f"  ├─ Cohen's d: [{ic_cohens_d[0]:.6f}, {ic_cohens_d[1]:.6f}]")
+    print(f"  └─ Diferencia de medianas ({diferencia_medianas:.6f}): [{ic_mediana[0]:.6f}, {ic_mediana[1]:.6f}]")
+    
     # Dirección del efecto
     if diferencia > 0:
         direccion = "Manual > IA"
@@ -169,13 +203,23 @@ for metrica in METRICAS:
         'std_ia': std_ia,
         'diferencia_medias': diferencia,
         'pct_diferencia': pct_diferencia,
-        't_statistic': t_stat,
+        'estadistico': estadistico,
+        'simbolo_estadistico': simbolo,
         'p_value': p_value,
         'es_significativo': es_significativo,
         'test_usado': test_usado,
         'cohens_d': cohens_d,
         'interpretacion_d': interpretacion_d,
-        'direccion': direccion
+        'direccion': direccion,
+        'ic95_diferencia_inf': ic_diferencia[0],
+        'ic95_diferencia_sup': ic_diferencia[1],
+        'ic95_cohens_d_inf': ic_cohens_d[0],
+        'ic95_cohens_d_sup': ic_cohens_d[1],
+        'diferencia_medianas': diferencia_medianas,
+        'ic95_dif_medianas_inf': ic_mediana[0],
+        'ic95_dif_medianas_sup': ic_mediana[1],
+        'p_value_permutacion': p_permutacion,
+        'metodo_permutacion': permutaciones.loc[metrica, 'metodo'],
     })
 
 # ==================================================================================
@@ -233,6 +277,8 @@ archivo_excel = RUTA_BASE / "03_PASO3_HIPOTESIS_T_STUDENT.xlsx"
 try:
     with pd.ExcelWriter(archivo_excel, engine='openpyxl') as writer:
         df_resultados.to_excel(writer, sheet_name='Hipotesis_N12', index=False)
+        ic_bootstrap.to_excel(writer, sheet_name='Bootstrap_N12', index=False)
+        contraste.reset_index().to_excel(writer, sheet_name='Seleccion_Prueba_N12', index=False)
     
     print(f"\n✓ Archivo guardado: {archivo_excel}")
 except ImportError:
@@ -9,8 +9,8 @@ Script para generar 6 figuras de publicación-quality (300 DPI) para el Capítul
 - Figura 2: Box plots (N=2,480)
 - Figura 3: Q-Q plots para normalidad (N=12)
 - Figura 4: Levene p-values (N=12)
-- Figura 6: Bar plots con IC 95% (N=12)
-- Figura 7: Cohen's d (N=12)
+- Figura 6: Bar plots con IC 95% bootstrap BCa (N=12)
+- Figura 7: Cohen's d con IC 95% bootstrap BCa (N=12)
 """
 
 import pandas as pd
@@ -18,10 +18,15 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy import stats
-from scipy.stats import shapiro, levene
+from scipy.stats import shapiro
 import warnings
 warnings.filterwarnings('ignore')
 
+from comun.bootstrap import fila_intervalo, intervalo, intervalos_por_grupo
+from comun.carga import cargar_datos_consolidados
+from comun.homogeneidad import seleccionar_levene, tabla_levene
+from comun.indice import IndiceCompuesto
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CONFIGURACIÓN GLOBAL
 # ─────────────────────────────────────────────────────────────────────────────
@@ -48,15 +53,16 @@ print("=" * 100)
 
 print("\n[PASO 0] Cargando datos...")
 
-df = pd.read_csv('datos_consolidados.csv')
+df = cargar_datos_consolidados('.')
 print(f"  ✓ Datos consolidados: {len(df)} registros")
 
 # Promedios por test (N=12)
-df_promedios_raw = df.groupby('test_name')[METRICAS].mean().reset_index()
-df_group = df.groupby('test_name')['group'].first().reset_index()
-df_promedios = df_promedios_raw.merge(df_group, on='test_name')
+df_promedios = IndiceCompuesto(df).medias_por_test(METRICAS)
 print(f"  ✓ Promedios por test: {len(df_promedios)} tests")
 
+# Levene N=12 (Brown-Forsythe) desde la caché de comun.homogeneidad
+levene_n12 = seleccionar_levene(tabla_levene('.', df=df), 'N=12')
+
 datos_n12 = {
     'Manual': df_promedios[df_promedios['group'] == 'Manual'],
     'IA': df_promedios[df_promedios['group'] == 'IA']
@@ -68,12 +74,17 @@ t_student_dict = {}
 for _, row in excel_paso3.iterrows():
     metrica = row['metrica']
     t_student_dict[metrica] = {
-        't_stat': row['t_statistic'],
+        'estadistico': row['estadistico'],
+        'simbolo': row['simbolo_estadistico'],
         'p_value': row['p_value'],
         'cohens_d': row['cohens_d']
     }
 print(f"  ✓ Resultados t-Student cargados")
 
+# IC 95% bootstrap (BCa): con 6 tests por grupo no se asume normalidad
+ic_bootstrap = intervalos_por_grupo(df_promedios, METRICAS)
+print(f"  ✓ IC bootstrap calculados ({ic_bootstrap['n_remuestreos'].iloc[0]} remuestreos)")
+
 # ─────────────────────────────────────────────────────────────────────────────
 # FIGURA 1: HISTOGRAMAS (N=2,480)
 # ─────────────────────────────────────────────────────────────────────────────
@@ -197,8 +208,7 @@ levene_pvalues = []
 levene_labels = []
 
 for metrica in METRICAS:
-    stat, pval = levene(datos_n12['Manual'][metrica],
-                        datos_n12['IA'][metrica])
+    pval = levene_n12.loc[metrica, 'p_value']
     levene_pvalues.append(pval)
     levene_labels.append(metrica.replace('_', ' ').title())
 
@@ -238,29 +248,19 @@ plt.close()
 print("\n[FIGURA 6] Generando bar plots con IC 95%...")
 
 fig6, axes6 = plt.subplots(2, 2, figsize=(14, 11))
-fig6.suptitle('Figure 6: Means with 95% Confidence Intervals (N=12)', 
+fig6.suptitle('Figure 6: Means with 95% Bootstrap BCa Confidence Intervals (N=12)', 
               fontsize=16, fontweight='bold', y=0.995)
 
 for idx, metrica in enumerate(METRICAS):
     ax = axes6[idx // 2, idx % 2]
     
-    manual_data = datos_n12['Manual'][metrica].values
-    ia_data = datos_n12['IA'][metrica].values
-    
-    n_manual = len(manual_data)
-    n_ia = len(ia_data)
-    
-    mean_manual = manual_data.mean()
-    se_manual = manual_data.std() / np.sqrt(n_manual)
-    ci_manual = 1.96 * se_manual
-    
-    mean_ia = ia_data.mean()
-    se_ia = ia_data.std() / np.sqrt(n_ia)
-    ci_ia = 1.96 * se_ia
+    filas = [fila_intervalo(ic_bootstrap, metrica, f'media_{grupo}') for grupo in ['manual', 'ia']]
+    means = [fila['estimado'] for fila in filas]
+    # Barras de error asimétricas: distancia de la media a cada extremo del IC BCa
+    errors = [[max(0, fila['estimado'] - fila['ic_inf_bca']) for fila in filas],
+              [max(0, fila['ic_sup_bca'] - fila['estimado']) for fila in filas]]
     
     x_pos = np.arange(2)
-    means = [mean_manual, mean_ia]
-    errors = [ci_manual, ci_ia]
     
     bars = ax.bar(x_pos, means, yerr=errors, capsize=10, 
                   color=[COLORBLIND_BLUE, COLORBLIND_RED],
@@ -273,7 +273,8 @@ for idx, metrica in enumerate(METRICAS):
     ax.grid(True, alpha=0.3, axis='y')
     
     t_data = t_student_dict.get(metrica, {})
-    title_text = f'{LABELS_METRICAS[idx]}\nt={t_data.get("t_stat", 0):.3f}, p={t_data.get("p_value", 0):.4f}, d={t_data.get("cohens_d", 0):.3f}'
+    title_text = (f'{LABELS_METRICAS[idx]}\n{t_data.get("simbolo", "t")}={t_data.get("estadistico", 0):.3f}, '
+                  f'p={t_data.get("p_value", 0):.4f}, d={t_data.get("cohens_d", 0):.3f}')
     ax.set_title(title_text, fontsize=11, fontweight='bold')
 
 plt.tight_layout()
@@ -310,8 +311,12 @@ colors_d = [get_color_cohens_d(d) for d in cohens_d_values]
 
 y_pos = np.arange(len(METRICAS))
 levene_labels_short = [m.replace('_', ' ').title() for m in METRICAS]
+ic_d = np.array([intervalo(ic_bootstrap, metrica, 'cohens_d') for metrica in METRICAS])
+errores_d = np.maximum(0, np.vstack([np.array(cohens_d_values) - ic_d[:, 0],
+                                     ic_d[:, 1] - np.array(cohens_d_values)]))
 bars = ax7.barh(y_pos, cohens_d_values, color=colors_d, edgecolor='black', 
-                linewidth=1.5, alpha=0.8)
+                linewidth=1.5, alpha=0.8, xerr=errores_d, capsize=6,
+                error_kw={'linewidth': 1.5, 'ecolor': 'black'})
 
 ax7.axvline(x=0.2, color='gray', linestyle=':', linewidth=1.5, alpha=0.7)
 ax7.axvline(x=-0.2, color='gray', linestyle=':', linewidth=1.5, alpha=0.7)
@@ -324,8 +329,8 @@ ax7.axvline(x=0, color='black', linewidth=2)
 ax7.set_yticks(y_pos)
 ax7.set_yticklabels(levene_labels_short, fontsize=11, fontweight='bold')
 ax7.set_xlabel("Cohen's d (Effect Size)", fontsize=12, fontweight='bold')
-ax7.set_title("Figure 7: Effect Sizes - Cohen's d (N=12)", fontsize=14, fontweight='bold', pad=20)
-ax7.set_xlim(-1.2, 1.2)
+ax7.set_title("Figure 7: Effect Sizes - Cohen's d with 95% Bootstrap BCa CI (N=12)", fontsize=14, fontweight='bold', pad=20)
+ax7.set_xlim(min(-1.2, ic_d.min() - 0.1), max(1.2, ic_d.max() + 0.1))
 ax7.grid(True, alpha=0.3, axis='x')
 
 for i, (bar, d_val) in enumerate(zip(bars, cohens_d_values)):
@@ -374,7 +379,7 @@ Figuras generadas (PNG + PDF a 300 DPI):
   ✓ Figura_2_BoxPlots - Box plots (N=2,480)
   ✓ Figura_3_QQPlots - Q-Q plots (N=12)
   ✓ Figura_4_Levene - Levene p-values (N=12)
-  ✓ Figura_6_BarplotsIC95 - Medias con IC 95% (N=12)
+  ✓ Figura_6_BarplotsIC95 - Medias con IC 95% bootstrap BCa (N=12)
   ✓ Figura_7_CohenD - Effect sizes (N=12)
 
 SIGUIENTES PASOS:
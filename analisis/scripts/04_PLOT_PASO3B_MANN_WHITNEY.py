@@ -12,12 +12,14 @@ from pathlib import Path
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy.stats import mannwhitneyu
 import numpy as np
 
+from comun.carga import cargar_datos_consolidados
+from comun.rangos import abrir_rangos, mann_whitney
+from comun.validacion import verificar_columnas
+
 # Paths
 ROOT = Path(__file__).resolve().parent
-CSV = ROOT / 'datos_consolidados.csv'
 OUT_DIR = ROOT / 'figures'
 OUT_DIR.mkdir(exist_ok=True)
 
@@ -29,16 +31,14 @@ metrics = [
     ('time_seconds', 'Time (s)')
 ]
 
-# Load data
-if not CSV.exists():
-    raise FileNotFoundError(f"No existe {CSV}. Ejecuta este script desde la carpeta 'analisis' donde está 'datos_consolidados.csv'.")
+# Load data (columnar cache rebuilt from the per-class CSVs when they change)
+df = cargar_datos_consolidados(ROOT)
 
-df = pd.read_csv(CSV)
+# Shared rank cache: each metric is ranked once per dataset version
+rangos = abrir_rangos(ROOT, verbose=False)
 
-# Basic validation of expected columns
-for col, _ in metrics:
-    if col not in df.columns:
-        raise KeyError(f"Columna esperada '{col}' no encontrada en {CSV}. Columnas disponibles: {list(df.columns)}")
+# Basic validation of expected columns (all missing columns reported at once)
+verificar_columnas(df, [col for col, _ in metrics])
 
 # Create 2x2 plot
 sns.set(style='whitegrid', font_scale=1.0)
@@ -88,14 +88,19 @@ for ax, (col, title) in zip(axes, metrics):
         pd.DataFrame({col: g_ai, 'Grupo': 'IA'})
     ], ignore_index=True)
 
-    # Compute Mann-Whitney U
-    try:
-        u_stat, p_val = mannwhitneyu(g_manual, g_ai, alternative='two-sided')
-    except ValueError:
-        # If one group is constant or too small
-        u_stat, p_val = np.nan, np.nan
+    # Compute Mann-Whitney U (tie-corrected) from the cached ranks; any other
+    # grouping column is ranked on the fly
+    if g_manual.empty or g_ai.empty:
+        mw = {'estadistico': np.nan, 'p_value': np.nan, 'z': np.nan, 'biserial': np.nan}
+    elif group_col == 'group':
+        mw = rangos.mann_whitney(col)
+    else:
+        mw = mann_whitney(g_manual.to_numpy(), g_ai.to_numpy())
+    u_stat, p_val = mw['estadistico'], mw['p_value']
 
     results.append({'metric': col, 'u': float(u_stat) if not np.isnan(u_stat) else None, 'p': float(p_val) if not np.isnan(p_val) else None,
+                    'z': float(mw['z']) if not np.isnan(mw['z']) else None,
+                    'rank_biserial': float(mw['biserial']) if not np.isnan(mw['biserial']) else None,
                     'median_manual': float(np.median(g_manual)) if len(g_manual)>0 else None,
                     'median_ai': float(np.median(g_ai)) if len(g_ai)>0 else None,
                     'n_manual': int(len(g_manual)), 'n_ai': int(len(g_ai))})
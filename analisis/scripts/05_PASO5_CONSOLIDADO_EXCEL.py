@@ -18,13 +18,17 @@ Formato: Listo para copiar/pegar a Word/Google Docs
 
 import pandas as pd
 import numpy as np
-from scipy.stats import shapiro, levene, ttest_ind
+from scipy.stats import shapiro, ttest_ind
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 import warnings
 warnings.filterwarnings('ignore')
 
+from comun.carga import cargar_datos_consolidados
+from comun.homogeneidad import seleccionar_levene, tabla_levene
+from comun.indice import IndiceCompuesto
+
 print("=" * 100)
 print("PASO 5: CONSOLIDADO EXCEL PARA CAPÍTULO 4")
 print("=" * 100)
@@ -35,21 +39,22 @@ print("=" * 100)
 
 print("\n[PASO 0] Cargando datos...")
 
-df = pd.read_csv('datos_consolidados.csv')
+df = cargar_datos_consolidados('.')
 print(f"  ✓ Datos: {len(df)} registros")
 
 METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
 
 # N=12
-df_promedios_raw = df.groupby('test_name')[METRICAS].mean().reset_index()
-df_group = df.groupby('test_name')['group'].first().reset_index()
-df_promedios = df_promedios_raw.merge(df_group, on='test_name')
+df_promedios = IndiceCompuesto(df).medias_por_test(METRICAS)
 
 datos_n12 = {
     'Manual': df_promedios[df_promedios['group'] == 'Manual'],
     'IA': df_promedios[df_promedios['group'] == 'IA']
 }
 
+# Levene N=12 (Brown-Forsythe) desde la caché de comun.homogeneidad
+levene_n12 = seleccionar_levene(tabla_levene('.', df=df), 'N=12')
+
 print(f"  ✓ Promedios: {len(df_promedios)} tests")
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -167,15 +172,12 @@ df_tabla_43 = pd.DataFrame(tabla_shapiro)
 # TABLA 4.4: LEVENE (N=12)
 # ─────────────────────────────────────────────────────────────────────────────
 
-tabla_levene = []
+filas_levene = []
 
 for metrica in METRICAS:
-    datos_manual = datos_n12['Manual'][metrica]
-    datos_ia = datos_n12['IA'][metrica]
-    
-    stat, pval = levene(datos_manual, datos_ia)
+    stat, pval = levene_n12.loc[metrica, ['estadistico', 'p_value']]
     
-    tabla_levene.append({
+    filas_levene.append({
         'Métrica': metrica,
         'Test Statistic': round(stat, 6),
         'p-value': round(pval, 6),
@@ -183,7 +185,7 @@ for metrica in METRICAS:
         'Test a usar': 't-Student estándar' if pval >= 0.05 else 't-Student Welch'
     })
 
-df_tabla_44 = pd.DataFrame(tabla_levene)
+df_tabla_44 = pd.DataFrame(filas_levene)
 
 # ─────────────────────────────────────────────────────────────────────────────
 # TABLA 4.5: t-STUDENT/WELCH (N=12)
@@ -202,7 +204,8 @@ for _, row in excel_paso3.iterrows():
         'Media Manual': round(row['media_manual'], 4),
         'Media AI': round(row['media_ia'], 4),
         'Diferencia (%)': round(row['pct_diferencia'], 2),
-        't-statistic': round(row['t_statistic'], 4),
+        'Estadístico': round(row['estadistico'], 4),
+        'Tipo de estadístico': row['simbolo_estadistico'],
         'p-value': round(row['p_value'], 6),
         'Significativo (α=0.05)': 'No' if row['p_value'] >= 0.05 else 'Sí',
         'Test usado': row['test_usado']
@@ -253,7 +256,7 @@ for metrica in METRICAS:
     w_i, p_shapiro_i = shapiro(datos_ia)
     
     # Levene
-    stat, p_levene = levene(datos_manual, datos_ia)
+    p_levene = levene_n12.loc[metrica, 'p_value']
     
     # Decisión
     shapiro_ok = (p_shapiro_m > 0.05) and (p_shapiro_i > 0.05)
@@ -382,7 +385,7 @@ CONTENIDO (7 hojas):
   ✓ Tabla 4.2: Descriptivos N=12 (Media, Mediana, Desv. Est., Mín, Máx)
   ✓ Tabla 4.3: Shapiro-Wilk (W-stat, p-value, Interpretación)
   ✓ Tabla 4.4: Levene (Test Stat, p-value, Decisión)
-  ✓ Tabla 4.5: t-Student/Welch (t-stat, p-value, Diferencia %, Test usado)
+  ✓ Tabla 4.5: Prueba seleccionada (t o U, p-value, Diferencia %, Test usado)
   ✓ Tabla 4.6: Cohen's d (Magnitud, Dirección, Interpretación)
   ✓ Tabla 4.7: Resumen de Supuestos (Normalidad, Varianzas, Decisión)
 
@@ -12,9 +12,12 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+from comun.carga import cargar_datos_consolidados
+from comun.hipotesis import NOMBRES_PRUEBA, SIMBOLOS_ESTADISTICO
+from comun.indice import IndiceCompuesto
+
 # Configuración
 ROOT = Path(__file__).resolve().parent
-CSV = ROOT / 'datos_consolidados.csv'
 EXCEL_RESULTADOS = ROOT / '03_PASO3_HIPOTESIS_T_STUDENT.xlsx'
 OUT_DIR = ROOT / 'figures'
 OUT_DIR.mkdir(exist_ok=True)
@@ -33,8 +36,8 @@ print("="*80)
 
 # Cargar datos
 print("\n[1/3] Cargando datos...")
-df = pd.read_csv(CSV)
-df_promedios = df.groupby(['group', 'test_name'])[METRICAS].mean().reset_index()
+df = cargar_datos_consolidados(ROOT)
+df_promedios = IndiceCompuesto(df).medias_por_test(METRICAS)
 print(f"  ✓ Datos: {len(df)} registros")
 print(f"  ✓ Promedios: {len(df_promedios)} tests (N=12)")
 
@@ -46,12 +49,13 @@ df_t_student = pd.read_excel(EXCEL_RESULTADOS, sheet_name='Hipotesis_N12')
 t_results = {}
 for _, row in df_t_student.iterrows():
     metrica = row['Metrica']
-    # Usar Welch solo para Time (seconds), estándar para otros
-    usar_welch = metrica == 'Time (seconds)'
+    # Estándar, Welch o Mann-Whitney según la prueba que eligieron los supuestos N=12
+    prueba = {nombre: clave for clave, nombre in NOMBRES_PRUEBA.items()}[row['Prueba_Seleccionada']]
     t_results[metrica] = {
-        'p_value': row['p_value_welch'] if usar_welch else row['p_value_std'],
+        'p_value': row['p_value_seleccionado'],
         'cohens_d': row['Cohens_d'],
-        't_stat': row['t_statistic_welch'] if usar_welch else row['t_statistic_std'],
+        't_stat': row['Estadistico_Seleccionado'],
+        'simbolo': SIMBOLOS_ESTADISTICO[prueba],
         'media_manual': row['Media_Manual'],
         'media_ia': row['Media_IA'],
         'std_manual': row['SD_Manual'],
@@ -110,7 +114,7 @@ for idx, (metrica, label) in enumerate(zip(METRICAS, LABELS)):
     
     # Formatear título con estadísticas (sin redondear como en Excel)
     titulo = f'{label}\n'
-    titulo += f't={t_stat:.6f}, p={p_val:.6f} ({sig_stars}), d={cohens_d:.6f}'
+    titulo += f'{res["simbolo"]}={t_stat:.6f}, p={p_val:.6f} ({sig_stars}), d={cohens_d:.6f}'
     
     # Agregar texto con medias y desviaciones debajo del título
     stats_text = f'Manual: μ={res["media_manual"]:.6f}±{res["std_manual"]:.6f}  |  AI: μ={res["media_ia"]:.6f}±{res["std_ia"]:.6f}'
@@ -12,9 +12,10 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
+from comun.carga import cargar_datos_consolidados
+
 # Configuración
 ROOT = Path(__file__).resolve().parent
-CSV = ROOT / 'datos_consolidados.csv'
 EXCEL_RESULTADOS = ROOT / '03_PASO3B_MANN_WHITNEY_U_N2480.xlsx'
 OUT_DIR = ROOT / 'figures'
 OUT_DIR.mkdir(exist_ok=True)
@@ -33,7 +34,7 @@ print("="*80)
 
 # Cargar datos
 print("\n[1/3] Cargando datos...")
-df = pd.read_csv(CSV)
+df = cargar_datos_consolidados(ROOT)
 print(f"  ✓ Datos: {len(df)} registros")
 
 # Cargar resultados Mann-Whitney U
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+DETENCIÓN SECUENCIAL - AVISA AL RUNNER CUANDO UNA CLASE YA ES PRECISA
+=====================================================================
+Proceso de larga duración para usar junto a run_all_metrics_simple.ps1,
+desde la misma carpeta en la que corre el runner:
+
+  1. Vigila unit_tests_metrics/ y functional_tests_metrics/ (inotify en
+     Linux, sondeo en Windows) y lee solo las filas añadidas.
+  2. Actualiza la media y la varianza en línea de cada (clase, método) y
+     su semiancho con una frontera válida en cualquier momento
+     (comun.secuencial).
+  3. Cuando todos los métodos y métricas de una clase alcanzan el objetivo
+     de precisión, escribe <carpeta>/.detener/<Grupo>_<Clase>.json; el
+     bucle de iteraciones del .ps1 lo comprueba y pasa a la siguiente clase.
+
+Con MODO_SIMULACION = True no vigila nada: repite la regla sobre la campaña
+ya consolidada e informa en qué iteración se habría detenido cada clase.
+"""
+
+import time
+from pathlib import Path
+
+from comun.carga import CATEGORIAS, cargar_datos_consolidados, directorio_metricas
+from comun.secuencial import (MAX_ITERACIONES, METODOS_FRONTERA, MIN_ITERACIONES, NIVEL_CONFIANZA,
+                              OBJETIVOS, ControladorSecuencial, simular_campana)
+from comun.vigilancia import crear_vigilante, esperar_cambios
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+RUTA_BASE = Path(".")
+FRONTERA = 'secuencia'
+MODO_SIMULACION = False
+
+# ==================================================================================
+# SIMULACIÓN
+# ==================================================================================
+
+def simular():
+    df = cargar_datos_consolidados(RUTA_BASE)
+    for frontera in METODOS_FRONTERA:
+        resultado = simular_campana(df, frontera=frontera)
+        print(f"\n  Frontera: {frontera}")
+        print(f"  {'Clase':<48} {'Ejecutadas':>10} {'Detención':>10} {'Ahorro':>8} {'Dentro':>9}")
+        print(f"  {'-' * 48} {'-' * 10} {'-' * 10} {'-' * 8} {'-' * 9}")
+        for _, fila in resultado.iterrows():
+            print(f"  {fila['test_name']:<48} {fila['ejecutadas']:>10} {fila['detencion']:>10} "
+                  f"{fila['ahorro_pct']:>7.1f}% {fila['dentro_semiancho']:>4}/{fila['celdas']:<4}")
+        ahorro = 100 * (1 - resultado['detencion'].sum() / resultado['ejecutadas'].sum())
+        dentro = resultado['dentro_semiancho'].sum() / resultado['celdas'].sum()
+        print(f"  Iteraciones ahorradas: {ahorro:.1f}% | media final dentro del semiancho "
+              f"al detenerse: {100 * dentro:.1f}% de las celdas")
+
+# ==================================================================================
+# CONTROL EN LÍNEA
+# ==================================================================================
+
+def revisar(controlador):
+    """Incorpora las filas nuevas, muestra el estado y señala las clases cumplidas"""
+    nuevas = controlador.actualizar()
+    resumen = controlador.resumen_clases()
+    print(f"  ✓ {nuevas} filas nuevas, {len(resumen)} clases en curso")
+    for _, fila in resumen.iterrows():
+        if fila['cumple']:
+            if controlador.senalar(fila['test_name'], {'iteraciones': int(fila['iteraciones'])}):
+                print(f"  ⏹ {fila['test_name']}: precisión alcanzada en {fila['iteraciones']} iteraciones, "
+                      f"detención señalada")
+        else:
+            print(f"    {fila['test_name']:<48} {fila['iteraciones']:>3} iteraciones, "
+                  f"{fila['pendientes']} celdas sin precisión")
+
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("DETENCIÓN SECUENCIAL DE LA CAMPAÑA")
+    print("=" * 80)
+    print(f"  Frontera: {FRONTERA} (confianza {NIVEL_CONFIANZA:.0%}), "
+          f"iteraciones entre {MIN_ITERACIONES} y {MAX_ITERACIONES}")
+    for metrica, (absoluto, relativo) in OBJETIVOS.items():
+        print(f"    {metrica:<16} semiancho ≤ max({absoluto}, {relativo:.0%} de la media)")
+
+    if MODO_SIMULACION:
+        simular()
+    else:
+        controlador = ControladorSecuencial(RUTA_BASE, frontera=FRONTERA)
+        print(f"\n[{time.strftime('%H:%M:%S')}] Estado inicial")
+        revisar(controlador)
+
+        carpetas = [directorio_metricas(RUTA_BASE, carpeta) for carpeta in CATEGORIAS]
+        vigilante = crear_vigilante(carpetas)
+        print(f"  ✓ Vigilando: {', '.join(str(c) for c in carpetas)} (Ctrl+C para salir)")
+        try:
+            while True:
+                esperar_cambios(vigilante)
+                print(f"\n[{time.strftime('%H:%M:%S')}] Filas nuevas")
+                revisar(controlador)
+        except KeyboardInterrupt:
+            print("\nDetención secuencial finalizada")
+        finally:
+            vigilante.cerrar()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+INGESTA DE REPORTES JACOCO POR ITERACIÓN
+=========================================
+Parsea (en paralelo y solo los nuevos) los <group>_<Clase>-iter<N>-jacoco.xml
+de coverage_reports/ y coverage_reports_functional/ hacia .cache_jacoco/,
+comprueba que los porcentajes globales coinciden con los del CSV consolidado
+y exporta la cobertura por reporte y por método.
+"""
+
+from pathlib import Path
+
+from comun.carga import cargar_datos_consolidados
+from comun.jacoco import cargar_jacoco, cobertura_por_reporte
+
+RUTA_BASE = Path(".")
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("INGESTA DE REPORTES JACOCO")
+    print("=" * 80)
+
+    # ==================================================================================
+    # 1. INGESTA
+    # ==================================================================================
+
+    print("\n[1] Ingiriendo reportes JaCoCo...")
+    reportes, contadores, lineas = cargar_jacoco(RUTA_BASE)
+    print(f"  ✓ Reportes: {len(reportes):,}")
+    print(f"  ✓ Contadores: {len(contadores):,}")
+    print(f"  ✓ Líneas: {len(lineas):,}")
+    if reportes.empty:
+        raise SystemExit("  ✗ No se encontraron reportes *-jacoco.xml")
+
+    # ==================================================================================
+    # 2. COBERTURA GLOBAL POR REPORTE (COMPARACIÓN CON EL CSV)
+    # ==================================================================================
+
+    print("\n[2] Cobertura global por reporte...")
+    cobertura = cobertura_por_reporte(reportes, contadores)
+
+    try:
+        df = cargar_datos_consolidados(RUTA_BASE)
+    except FileNotFoundError:
+        df = None
+
+    if df is not None:
+        claves = ['group', 'test_class', 'iteration']
+        csv = (df.groupby(claves, observed=True)[['instr_pct', 'branch_pct']].first()
+               .reset_index().astype({'group': str, 'test_class': str, 'iteration': int}))
+        comparacion = cobertura.astype({'group': str, 'test_class': str}).merge(
+            csv, on=claves, how='inner', suffixes=('', '_csv'))
+        difieren = ((comparacion['instr_pct'] - comparacion['instr_pct_csv']).abs() > 0.01) \
+            | ((comparacion['branch_pct'] - comparacion['branch_pct_csv']).abs() > 0.01)
+        print(f"  ✓ Reportes con fila en el CSV: {len(comparacion):,}")
+        print(f"  {'✓' if not difieren.any() else '!'} Porcentajes distintos del CSV: {int(difieren.sum())}")
+
+    cobertura.to_csv(RUTA_BASE / 'JACOCO_COBERTURA_POR_REPORTE.csv', index=False)
+    print("  ✓ JACOCO_COBERTURA_POR_REPORTE.csv")
+
+    # ==================================================================================
+    # 3. COBERTURA POR MÉTODO (MEDIA ENTRE ITERACIONES)
+    # ==================================================================================
+
+    print("\n[3] Cobertura por método...")
+    metodos = contadores[(contadores['nivel'] == 'method') & (contadores['tipo'] == 'INSTRUCTION')]
+    metodos = metodos.merge(reportes[['id', 'category', 'group', 'test_class']],
+                            left_on='reporte', right_on='id')
+    metodos['instr_pct'] = 100 * metodos['covered'] / (metodos['covered'] + metodos['missed'])
+    tabla = (metodos.groupby(['category', 'group', 'test_class', 'clase', 'metodo'], observed=True)
+             ['instr_pct'].agg(['count', 'mean', 'std', 'min', 'max']).reset_index())
+    tabla.to_csv(RUTA_BASE / 'JACOCO_COBERTURA_POR_METODO.csv', index=False)
+    print(f"  ✓ JACOCO_COBERTURA_POR_METODO.csv ({len(tabla):,} filas)")
+
+    print("\n" + "=" * 80)
+    print("INGESTA JACOCO COMPLETADA")
+    print("=" * 80)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+INGESTA DE REPORTES PIT POR ITERACIÓN
+======================================
+Parsea (en paralelo y solo los nuevos) los <group>_<Clase>-iter<N>-mutations.xml
+de mutation_reports/ y mutation_reports_functional/ hacia .cache_pit/,
+comprueba que los conteos por reporte coinciden con los del CSV consolidado
+y exporta la mutación por reporte y el desglose por mutador y estado.
+"""
+
+from pathlib import Path
+
+from comun.carga import cargar_datos_consolidados
+from comun.pit import cargar_pit, mutacion_por_reporte
+
+RUTA_BASE = Path(".")
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("INGESTA DE REPORTES PIT")
+    print("=" * 80)
+
+    # ==================================================================================
+    # 1. INGESTA
+    # ==================================================================================
+
+    print("\n[1] Ingiriendo reportes PIT...")
+    reportes, mutantes = cargar_pit(RUTA_BASE)
+    print(f"  ✓ Reportes: {len(reportes):,}")
+    print(f"  ✓ Mutantes: {len(mutantes):,}")
+    if reportes.empty:
+        raise SystemExit("  ✗ No se encontraron reportes *-mutations.xml / *-mutations.csv")
+
+    # ==================================================================================
+    # 2. MUTACIÓN POR REPORTE (COMPARACIÓN CON EL CSV)
+    # ==================================================================================
+
+    print("\n[2] Mutación por reporte...")
+    mutacion = mutacion_por_reporte(reportes, mutantes)
+
+    try:
+        df = cargar_datos_consolidados(RUTA_BASE)
+    except FileNotFoundError:
+        df = None
+
+    if df is not None:
+        claves = ['group', 'test_class', 'iteration']
+        csv = (df.groupby(claves, observed=True)[['total_mutations', 'mutations_killed']].first()
+               .reset_index().astype({'group': str, 'test_class': str, 'iteration': int}))
+        comparacion = mutacion.astype({'group': str, 'test_class': str}).merge(
+            csv, on=claves, how='inner', suffixes=('', '_csv'))
+        difieren = (comparacion['total_mutations'] != comparacion['total_mutations_csv']) \
+            | (comparacion['mutations_killed'] != comparacion['mutations_killed_csv'])
+        print(f"  ✓ Reportes con fila en el CSV: {len(comparacion):,}")
+        print(f"  {'✓' if not difieren.any() else '!'} Conteos distintos del CSV: {int(difieren.sum())}")
+
+    mutacion.to_csv(RUTA_BASE / 'PIT_MUTACION_POR_REPORTE.csv', index=False)
+    print("  ✓ PIT_MUTACION_POR_REPORTE.csv")
+
+    # ==================================================================================
+    # 3. DESGLOSE POR MUTADOR Y ESTADO
+    # ==================================================================================
+
+    print("\n[3] Desglose por mutador...")
+    datos = mutantes.merge(reportes[['id', 'category', 'group', 'test_class']],
+                           left_on='reporte', right_on='id')
+    tabla = (datos.groupby(['category', 'group', 'test_class', 'mutador', 'estado'], observed=True)
+             .size().unstack('estado', fill_value=0).reset_index())
+    tabla.columns.name = None
+    tabla.to_csv(RUTA_BASE / 'PIT_MUTANTES_POR_MUTADOR.csv', index=False)
+    print(f"  ✓ PIT_MUTANTES_POR_MUTADOR.csv ({len(tabla):,} filas)")
+
+    print("\n" + "=" * 80)
+    print("INGESTA PIT COMPLETADA")
+    print("=" * 80)
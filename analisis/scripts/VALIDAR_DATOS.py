@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+VALIDACIÓN DEL DATASET CONSOLIDADO
+===================================
+Ejecuta comun.validacion sobre todos los registros (rangos de porcentajes,
+mutations_killed <= total_mutations, consistencia de mutation_score y
+huecos en la secuencia de iteraciones 1..40 por test) y exporta el reporte
+de violaciones. Termina con código 1 si hay alguna violación.
+"""
+
+import sys
+from pathlib import Path
+
+from comun.carga import cargar_datos_consolidados
+from comun.validacion import imprimir_violaciones, validar_datos
+
+RUTA_BASE = Path(".")
+NOMBRE_REPORTE = 'VALIDACION_DATOS.csv'
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("VALIDACIÓN DEL DATASET CONSOLIDADO")
+    print("=" * 80)
+
+    df = cargar_datos_consolidados(RUTA_BASE, verbose=False)
+    print(f"\n  ✓ Registros: {len(df):,}")
+
+    reporte = validar_datos(df)
+    imprimir_violaciones(reporte, max_filas=len(reporte))
+    reporte.to_csv(RUTA_BASE / NOMBRE_REPORTE, index=False)
+    print(f"  ✓ {NOMBRE_REPORTE}")
+
+    sys.exit(1 if len(reporte) else 0)
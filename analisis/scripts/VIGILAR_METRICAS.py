@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+VIGILANCIA CONTINUA DE MÉTRICAS - REGENERA SOLO LOS PASOS AFECTADOS
+====================================================================
+Proceso de larga duración para usar durante una campaña de recolección:
+
+  1. Vigila unit_tests_metrics/ y functional_tests_metrics/ (inotify en
+     Linux, sondeo en Windows).
+  2. Al llegar un lote de filas, ingiere solo las filas nuevas en la caché
+     columnar (comun.ingesta).
+  3. Calcula la firma de entrada de cada paso: huella por métrica de los
+     datos que consume (crudos N=2,480 y/o promedios N=12), huella de los
+     artefactos que lee de pasos anteriores y huella del propio script.
+  4. Ejecuta únicamente los pasos cuya firma cambió (o cuyas salidas no
+     existen), nivel a nivel del grafo de dependencias y en paralelo dentro
+     de cada nivel.
+
+Si un paso se reejecuta pero su salida queda idéntica (mismo contenido del
+xlsx), los pasos que dependen de ella no se vuelven a ejecutar.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comun.carga import CATEGORIAS, cargar_datos_consolidados, cargar_promedios, directorio_metricas
+from comun.validacion import imprimir_violaciones, validar_datos
+from comun.vigilancia import crear_vigilante, esperar_cambios
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+RUTA_BASE = Path(".")
+DIR_SCRIPTS = Path(__file__).resolve().parent
+NOMBRE_ESTADO = '.vigilancia_estado.json'
+METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+MAX_PASOS_PARALELOS = 4
+
+# Grafo de pasos. 'datos': niveles de datos que consume ('crudos' = N=2,480,
+# 'promedios' = N=12 por test). 'entradas' / 'salidas': artefactos en disco.
+# 'tras': pasos que deben terminar antes aunque no se lea su salida.
+# Los pasos se ejecutan con cwd=RUTA_BASE y escriben en su RUTA_BASE = Path(".");
+# los scripts 04_PLOT, 06 y 07 leen y escriben junto a sí mismos (ROOT).
+#
+# REGENERAR_ARCHIVOS_EXCEL reescribe también los Excel de PASO 1, 2, 3 y 3B
+# con menos hojas: corre antes que ellos, que publican la versión completa, y
+# solo se le atribuye ESTADISTICA_DESCRIPTIVA.xlsx.
+REGENERAR = 'REGENERAR_ARCHIVOS_EXCEL.py'
+PASOS = [
+    {'script': REGENERAR,
+     'datos': ['crudos', 'promedios'], 'entradas': [],
+     'salidas': [RUTA_BASE / 'ESTADISTICA_DESCRIPTIVA.xlsx']},
+    {'script': '01_PASO1_NORMALIDAD_SHAPIRO_WILK.py',
+     'datos': ['crudos', 'promedios'], 'entradas': [], 'tras': [REGENERAR],
+     'salidas': [RUTA_BASE / '01_PASO1_NORMALIDAD_SHAPIRO_WILK.xlsx']},
+    {'script': '02_PASO2_LEVENE_HOMOGENEIDAD_VARIANZAS.py',
+     'datos': ['crudos', 'promedios'], 'entradas': [], 'tras': [REGENERAR],
+     'salidas': [RUTA_BASE / '02_PASO2_LEVENE_HOMOGENEIDAD_VARIANZAS.xlsx']},
+    {'script': '03_PASO3_HIPOTESIS_T_STUDENT.py',
+     'datos': ['promedios'], 'entradas': [], 'tras': [REGENERAR],
+     'salidas': [RUTA_BASE / '03_PASO3_HIPOTESIS_T_STUDENT.xlsx']},
+    {'script': '03_PASO3B_MANN_WHITNEY_U_N2480.py',
+     'datos': ['crudos'], 'entradas': [RUTA_BASE / '03_PASO3_HIPOTESIS_T_STUDENT.xlsx'], 'tras': [REGENERAR],
+     'salidas': [RUTA_BASE / '03_PASO3B_MANN_WHITNEY_U_N2480.xlsx']},
+    {'script': '03_PASO3C_CUBO_ESTRATIFICADO.py',
+     'datos': ['crudos'], 'entradas': [],
+     'salidas': [RUTA_BASE / '03_PASO3C_CUBO_ESTRATIFICADO.xlsx']},
+    {'script': '03_PASO3D_METAANALISIS_PARES.py',
+     'datos': ['crudos'], 'entradas': [],
+     'salidas': [RUTA_BASE / '03_PASO3D_METAANALISIS_PARES.xlsx']},
+    {'script': '03_PASO3E_COMPONENTES_VARIANZA.py',
+     'datos': ['crudos'], 'entradas': [],
+     'salidas': [RUTA_BASE / '03_PASO3E_COMPONENTES_VARIANZA.xlsx']},
+    {'script': 'VERIFICACION_RIGUROSA_PASO_1_2_3.py',
+     'datos': ['crudos', 'promedios'],
+     'entradas': [RUTA_BASE / f'{nombre}.xlsx' for nombre in
+                  ('01_PASO1_NORMALIDAD_SHAPIRO_WILK', '02_PASO2_LEVENE_HOMOGENEIDAD_VARIANZAS',
+                   '03_PASO3_HIPOTESIS_T_STUDENT')],
+     'salidas': []},
+    {'script': '04_PASO4_GRAFICOS_PUBLICACION.py',
+     'datos': ['crudos', 'promedios'], 'entradas': [RUTA_BASE / '03_PASO3_HIPOTESIS_T_STUDENT.xlsx'],
+     'salidas': [RUTA_BASE / f'Figura_{n}.png' for n in
+                 ('1_Histogramas', '2_BoxPlots', '3_QQPlots', '4_Levene', '6_BarplotsIC95', '7_CohenD')]},
+    {'script': '05_PASO5_CONSOLIDADO_EXCEL.py',
+     'datos': ['crudos', 'promedios'], 'entradas': [RUTA_BASE / '03_PASO3_HIPOTESIS_T_STUDENT.xlsx'],
+     'salidas': [RUTA_BASE / '05_PASO5_CONSOLIDADO_CAPITULO4.xlsx']},
+    {'script': '04_PLOT_PASO3B_MANN_WHITNEY.py',
+     'datos': ['crudos'], 'entradas': [],
+     'salidas': [DIR_SCRIPTS / 'figures' / 'paso3b_mannwhitney.png']},
+    {'script': '06_PLOT_t_Student_2x2.py',
+     'datos': ['promedios'], 'entradas': [DIR_SCRIPTS / '03_PASO3_HIPOTESIS_T_STUDENT.xlsx'],
+     'salidas': [DIR_SCRIPTS / 'figures' / '06_t_Student_2x2.png']},
+    {'script': '07_PLOT_Mann_Whitney_2x2.py',
+     'datos': ['crudos'], 'entradas': [DIR_SCRIPTS / '03_PASO3B_MANN_WHITNEY_U_N2480.xlsx'],
+     'salidas': [DIR_SCRIPTS / 'figures' / '07_Mann_Whitney_2x2.png']},
+]
+
+# ==================================================================================
+# HUELLAS
+# ==================================================================================
+
+def sha256(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte if isinstance(parte, bytes) else str(parte).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def huella_archivo(ruta):
+    """
+    SHA-256 del contenido o None si el archivo no existe. Para los .xlsx se
+    usan los valores de las celdas: openpyxl guarda la fecha de creación en
+    cada escritura y el archivo nunca sería idéntico byte a byte.
+    """
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return None
+    if ruta.suffix == '.xlsx':
+        hojas = pd.read_excel(ruta, sheet_name=None)
+        return sha256(*(f'{nombre}\n{hoja.to_csv(index=False)}' for nombre, hoja in hojas.items()))
+    return sha256(ruta.read_bytes())
+
+
+def huellas_de_datos(ruta_base):
+    """
+    Ingiere las filas nuevas y devuelve, por nivel y métrica, la huella de
+    los valores que consume cada paso:
+      crudos[m]    → grupo + valor de cada fila (N=2,480)
+      promedios[m] → media por (group, test_name) (N=12)
+    junto con el número de filas y el reporte de validación del lote.
+    """
+    df = cargar_datos_consolidados(ruta_base, incremental=True, verbose=False)
+    df_promedios = cargar_promedios(ruta_base, METRICAS)
+    grupos = df['group'].astype(str).to_numpy()
+
+    huellas = {'crudos': {}, 'promedios': {}}
+    for metrica in METRICAS:
+        huellas['crudos'][metrica] = sha256(
+            '|'.join(grupos), np.ascontiguousarray(df[metrica].to_numpy(dtype=np.float64)).tobytes())
+        huellas['promedios'][metrica] = sha256(
+            df_promedios[['group', 'test_name', metrica]].round(10).to_csv(index=False))
+    return huellas, len(df), validar_datos(df)
+
+
+def firma_paso(paso, huellas, estado):
+    """
+    Firma de todo lo que determina la salida de un paso. Incluye la firma
+    de los pasos 'tras': si uno se reejecuta, este también.
+    """
+    partes = [huella_archivo(DIR_SCRIPTS / paso['script'])]
+    for nivel in paso['datos']:
+        partes += [huellas[nivel][m] for m in METRICAS]
+    partes += [huella_archivo(entrada) for entrada in paso['entradas']]
+    partes += [estado.get(previo) for previo in paso.get('tras', [])]
+    return sha256(*partes)
+
+# ==================================================================================
+# GRAFO Y EJECUCIÓN
+# ==================================================================================
+
+def niveles_de_pasos(pasos):
+    """Agrupa los pasos en niveles: cada uno solo depende de niveles anteriores"""
+    productor = {str(Path(s).resolve()): p['script'] for p in pasos for s in p['salidas']}
+    dependencias = {p['script']: {productor[str(Path(e).resolve())] for e in p['entradas']
+                                  if str(Path(e).resolve()) in productor} | set(p.get('tras', []))
+                    for p in pasos}
+    niveles, hechos = [], set()
+    while len(hechos) < len(pasos):
+        nivel = [p for p in pasos if p['script'] not in hechos and dependencias[p['script']] <= hechos]
+        if not nivel:
+            raise ValueError("El grafo de pasos tiene un ciclo")
+        niveles.append(nivel)
+        hechos |= {p['script'] for p in nivel}
+    return niveles
+
+
+def ejecutar_paso(paso):
+    """Ejecuta un script en un subproceso; devuelve (código, segundos, salida)"""
+    inicio = time.perf_counter()
+    entorno = dict(os.environ, MPLBACKEND='Agg')
+    proceso = subprocess.run([sys.executable, str(DIR_SCRIPTS / paso['script'])],
+                             cwd=RUTA_BASE, env=entorno, capture_output=True, text=True,
+                             encoding='utf-8', errors='replace')
+    return proceso.returncode, time.perf_counter() - inicio, proceso.stdout + proceso.stderr
+
+
+def leer_estado():
+    ruta = RUTA_BASE / NOMBRE_ESTADO
+    return json.loads(ruta.read_text(encoding='utf-8')) if ruta.exists() else {}
+
+
+def guardar_estado(estado):
+    (RUTA_BASE / NOMBRE_ESTADO).write_text(json.dumps(estado, indent=2), encoding='utf-8')
+
+
+def ejecutar_pendientes(estado):
+    """Reejecuta solo los pasos cuya firma de entrada cambió"""
+    huellas, n_filas, reporte = huellas_de_datos(RUTA_BASE)
+    print(f"  ✓ Datos consolidados: {n_filas:,} registros")
+    imprimir_violaciones(reporte)
+
+    ejecutados = 0
+    with ThreadPoolExecutor(max_workers=MAX_PASOS_PARALELOS) as executor:
+        for nivel in niveles_de_pasos(PASOS):
+            # La firma se calcula después de terminar el nivel anterior, con sus salidas nuevas
+            firmas = {p['script']: firma_paso(p, huellas, estado) for p in nivel}
+            pendientes = [p for p in nivel
+                          if estado.get(p['script']) != firmas[p['script']]
+                          or not all(Path(s).exists() for s in p['salidas'])]
+            for paso, (codigo, segundos, salida) in zip(pendientes, executor.map(ejecutar_paso, pendientes)):
+                ejecutados += 1
+                if codigo == 0:
+                    estado[paso['script']] = firmas[paso['script']]
+                    print(f"  ✓ {paso['script']} ({segundos:.1f} s)")
+                else:
+                    estado.pop(paso['script'], None)
+                    print(f"  ✗ {paso['script']} terminó con código {codigo}:")
+                    for linea in salida.strip().splitlines()[-5:]:
+                        print(f"      {linea}")
+            guardar_estado(estado)
+
+    if ejecutados == 0:
+        print("  ✓ Ningún paso afectado, todo está al día")
+
+# ==================================================================================
+# BUCLE PRINCIPAL
+# ==================================================================================
+
+if __name__ == '__main__':
+    print("=" * 80)
+    print("VIGILANCIA CONTINUA DE MÉTRICAS")
+    print("=" * 80)
+
+    estado = leer_estado()
+    print("\n[INICIO] Poniendo al día los pasos...")
+    ejecutar_pendientes(estado)
+
+    carpetas = [directorio_metricas(RUTA_BASE, carpeta) for carpeta in CATEGORIAS]
+    vigilante = crear_vigilante(carpetas)
+    print(f"  ✓ Vigilando: {', '.join(str(c) for c in carpetas)} (Ctrl+C para salir)")
+
+    try:
+        while True:
+            cambiados = esperar_cambios(vigilante)
+            nombres = ', '.join(sorted(a.name for a in cambiados))
+            print(f"\n[{time.strftime('%H:%M:%S')}] {len(cambiados)} CSV cambiados: {nombres}")
+            ejecutar_pendientes(estado)
+    except KeyboardInterrupt:
+        print("\nVigilancia detenida")
+    finally:
+        vigilante.cerrar()
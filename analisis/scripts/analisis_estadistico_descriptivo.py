@@ -8,9 +8,11 @@ import numpy as np
 from pathlib import Path
 import os
 
-# Configurar ruta
-BASE_PATH = Path("./unit_tests_metrics")
-FUNCTIONAL_PATH = Path("./functional_tests_metrics")
+from comun.carga import cargar_datos_consolidados, listar_archivos_metricas
+from comun.descriptiva import descriptiva_por_conjuntos, ordenar_filas
+
+# Configurar ruta (unit_tests_metrics/ y functional_tests_metrics/ se descubren por glob)
+RUTA_BASE = Path(".")
 
 # ============================================================================
 # 1. CARGAR TODOS LOS ARCHIVOS CSV
@@ -21,51 +23,10 @@ print("ANÁLISIS ESTADÍSTICO DESCRIPTIVO - 40 ITERACIONES")
 print("=" * 80)
 print("\nCargando datos...")
 
-# Cargar todos los CSVs
-dfs = []
-
-# Unitarias
-unitarias_files = [
-    "IA_OwnerAddPetDiffblueTest.csv",
-    "IA_OwnerGetPetDiffblueTest.csv",
-    "IA_PetValidatorDiffblueTest.csv",
-    "Manual_OwnerAddPetUnitManualTest.csv",
-    "Manual_OwnerGetPetUnitManualTest.csv",
-    "Manual_PetValidatorUnitManualTest.csv",
-]
-
-for file in unitarias_files:
-    filepath = BASE_PATH / file
-    if filepath.exists():
-        df = pd.read_csv(filepath)
-        df['category'] = 'Unitarias'
-        dfs.append(df)
-        print(f"[OK] {file} ({len(df)-1} registros)")
-    else:
-        print(f"[ERROR] {file} NO ENCONTRADO")
-
-# Funcionales
-funcionales_files = [
-    "IA_OwnerControllerShowOwnerTestIA.csv",
-    "IA_PetControllerProcessCreationFormTestIA.csv",
-    "IA_VisitControllerProcessNewVisitFormTestIA.csv",
-    "Manual_ShowOwnerManualTest.csv",
-    "Manual_ProcessCreationFormManualTest.csv",
-    "Manual_ProcessNewVisitFormManualTest.csv",
-]
-
-for file in funcionales_files:
-    filepath = FUNCTIONAL_PATH / file
-    if filepath.exists():
-        df = pd.read_csv(filepath)
-        df['category'] = 'Funcionales'
-        dfs.append(df)
-        print(f"[OK] {file} ({len(df)-1} registros)")
-    else:
-        print(f"[ERROR] {file} NO ENCONTRADO")
-
-# Consolidar
-df_consolidated = pd.concat(dfs, ignore_index=True)
+# Lectura concurrente de todos los CSV por clase + esquema compacto
+for archivo, categoria in listar_archivos_metricas(RUTA_BASE):
+    print(f"[OK] {archivo.name} ({categoria})")
+df_consolidated = cargar_datos_consolidados(RUTA_BASE)
 print(f"\n[OK] Total de registros consolidados: {len(df_consolidated)}")
 print(f"[OK] Grupos: {df_consolidated['group'].unique()}")
 print(f"[OK] Categorías: {df_consolidated['category'].unique()}")
@@ -81,29 +42,26 @@ print("=" * 80)
 # Métricas a analizar
 metricas = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
 
+GRUPOS = ['Manual', 'IA']
+CATEGORIAS = ['Unitarias', 'Funcionales']
+
+# Un solo kernel para las tres agrupaciones (cada métrica se ordena una vez)
+tablas = descriptiva_por_conjuntos(
+    df_consolidated, [['group'], ['category', 'group'], ['test_class', 'group']], metricas)
+
 # Crear tabla de resumen
-resumen_stats = []
+df_stats = ordenar_filas(tablas[('group',)], [('metrica', metricas), ('group', GRUPOS)])
+df_stats = df_stats.rename(columns={
+    'metrica': 'Métrica', 'group': 'Grupo', 'media': 'Media', 'mediana': 'Mediana',
+    'desv_est': 'Desv.Est', 'min': 'Min', 'max': 'Max', 'q1': 'Q1', 'q3': 'Q3', 'iqr': 'IQR',
+})[['Métrica', 'Grupo', 'n', 'Media', 'Mediana', 'Desv.Est', 'Min', 'Max', 'Q1', 'Q3', 'IQR']]
 
-for metrica in metricas:
-    for grupo in ['Manual', 'IA']:
-        datos = df_consolidated[df_consolidated['group'] == grupo][metrica]
-        
-        stats_row = {
-            'Métrica': metrica,
-            'Grupo': grupo,
-            'n': len(datos),
-            'Media': datos.mean(),
-            'Mediana': datos.median(),
-            'Desv.Est': datos.std(),
-            'Min': datos.min(),
-            'Max': datos.max(),
-            'Q1': datos.quantile(0.25),
-            'Q3': datos.quantile(0.75),
-            'IQR': datos.quantile(0.75) - datos.quantile(0.25),
-        }
-        resumen_stats.append(stats_row)
-
-df_stats = pd.DataFrame(resumen_stats)
+
+def imprimir_filas(filas):
+    """Una línea por grupo (Manual, IA) de una tabla descriptiva ya filtrada"""
+    for _, row in filas.iterrows():
+        print(f"{row['group']:<10} {row['n']:>5.0f} {row['media']:>10.4f} {row['mediana']:>10.4f} "
+              f"{row['desv_est']:>10.4f} {row['min']:>8.4f} {row['max']:>8.4f}")
 
 # Mostrar por métrica
 for metrica in metricas:
@@ -139,24 +97,22 @@ print("\n\n" + "=" * 80)
 print("ESTADÍSTICA DESCRIPTIVA POR CATEGORÍA (Unitarias vs Funcionales)")
 print("=" * 80)
 
-for categoria in ['Unitarias', 'Funcionales']:
+por_categoria = ordenar_filas(tablas[('category', 'group')],
+                              [('category', CATEGORIAS), ('metrica', metricas), ('group', GRUPOS)])
+
+for categoria in CATEGORIAS:
     print(f"\n\n{'='*80}")
     print(f"CATEGORÍA: {categoria}")
     print(f"{'='*80}")
     
-    df_cat = df_consolidated[df_consolidated['category'] == categoria]
-    
     for metrica in metricas:
         print(f"\n📊 MÉTRICA: {metrica}")
         print("-" * 80)
         print(f"{'Grupo':<10} {'n':>5} {'Media':>10} {'Mediana':>10} {'Desv.Est':>10} {'Min':>8} {'Max':>8}")
         print("-" * 80)
         
-        for grupo in ['Manual', 'IA']:
-            datos = df_cat[df_cat['group'] == grupo][metrica]
-            if len(datos) > 0:
-                print(f"{grupo:<10} {len(datos):>5.0f} {datos.mean():>10.4f} {datos.median():>10.4f} "
-                      f"{datos.std():>10.4f} {datos.min():>8.4f} {datos.max():>8.4f}")
+        imprimir_filas(por_categoria[(por_categoria['category'] == categoria)
+                                     & (por_categoria['metrica'] == metrica)])
 
 # ============================================================================
 # 4. ESTADÍSTICA DESCRIPTIVA POR CLASE DE TEST
@@ -166,11 +122,10 @@ print("\n\n" + "=" * 80)
 print("ESTADÍSTICA DESCRIPTIVA POR CLASE DE TEST")
 print("=" * 80)
 
-test_classes = df_consolidated['test_class'].unique()
+por_clase = ordenar_filas(tablas[('test_class', 'group')],
+                          [('test_class', None), ('metrica', metricas), ('group', GRUPOS)])
 
-for test_class in sorted(test_classes):
-    df_test = df_consolidated[df_consolidated['test_class'] == test_class]
-    
+for test_class, filas_clase in por_clase.groupby('test_class', sort=False):
     print(f"\n\n{'='*80}")
     print(f"CLASE: {test_class}")
     print(f"{'='*80}")
@@ -181,11 +136,7 @@ for test_class in sorted(test_classes):
         print(f"{'Grupo':<10} {'n':>5} {'Media':>10} {'Mediana':>10} {'Desv.Est':>10} {'Min':>8} {'Max':>8}")
         print("-" * 80)
         
-        for grupo in ['Manual', 'IA']:
-            datos = df_test[df_test['group'] == grupo][metrica]
-            if len(datos) > 0:
-                print(f"{grupo:<10} {len(datos):>5.0f} {datos.mean():>10.4f} {datos.median():>10.4f} "
-                      f"{datos.std():>10.4f} {datos.min():>8.4f} {datos.max():>8.4f}")
+        imprimir_filas(filas_clase[filas_clase['metrica'] == metrica])
 
 # ============================================================================
 # 5. EXPORTAR A EXCEL PARA ANÁLISIS POSTERIOR
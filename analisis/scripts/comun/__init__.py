@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+COMUN - UTILIDADES COMPARTIDAS DEL ANÁLISIS
+============================================
+Código reutilizado por los scripts numerados (PASO 1..7) y los scripts de
+estadística descriptiva. Los scripts se ejecutan desde su propia carpeta, por
+lo que basta con `from comun.carga import cargar_datos_consolidados`.
+"""
+
+from comun.carga import cargar_datos_consolidados
+from comun.almacen import abrir_almacen
+from comun.indice import IndiceCompuesto
+
+__all__ = ['cargar_datos_consolidados', 'abrir_almacen', 'IndiceCompuesto']
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+ALMACÉN COLUMNAR MAPEADO EN MEMORIA
+====================================
+Copia del dataset consolidado pensada para compartirse entre procesos sin
+multiplicar la memoria: un .npy por columna, abierto con np.load(mmap_mode='r'),
+más un índice JSON pequeño.
+
+  • Las filas se guardan ordenadas por (group, test_name, iteration), así que
+    cada grupo y cada test ocupan un tramo contiguo [inicio, fin).
+  • Las columnas de texto se guardan como códigos int32 + lista de categorías.
+  • El índice registra la huella de los CSV de origen, los tramos por grupo y
+    por test, y el dtype de cada columna.
+
+Todos los procesos que abren el almacén comparten las mismas páginas de la
+caché del sistema operativo; un AlmacenColumnar se serializa (pickle) solo
+como su ruta, de modo que puede pasarse a un ProcessPoolExecutor sin copiar
+datos:
+
+    almacen = abrir_almacen('.')
+    ia = almacen.valores('time_seconds', group='IA')    # vista, sin copia
+
+Un .npy publicado nunca se reescribe: otro proceso puede tenerlo mapeado
+(en Windows np.save fallaría con PermissionError y en POSIX el lector vería
+datos a medias). Cada publicación escribe una generación nueva de archivos
+(seg<gen>_<columna>.npy) y el índice pasa a ella con os.replace.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comun.carga import (REINTENTOS_LECTURA, archivo_columna, bloqueo_escritura, calcular_huella,
+                         cargar_datos_consolidados, escribir_manifiesto, listar_fuentes,
+                         retirar_segmentos, siguiente_segmento)
+
+NOMBRE_ALMACEN = '.almacen_columnar'
+NOMBRE_INDICE = 'indice.json'
+VERSION_ALMACEN = 2
+
+# Orden físico de las filas: cada (group, test_name) queda contiguo
+ORDEN = ['group', 'test_name', 'iteration']
+
+# ==================================================================================
+# ESCRITURA
+# ==================================================================================
+
+def tramos_contiguos(*codigos):
+    """
+    Límites [inicio, fin) de cada combinación de códigos en arrays ya
+    ordenados. Devuelve (inicios, fines).
+    """
+    n = len(codigos[0])
+    if n == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    cambio = np.zeros(n, dtype=bool)
+    cambio[0] = True
+    for c in codigos:
+        cambio[1:] |= c[1:] != c[:-1]
+    inicios = np.flatnonzero(cambio)
+    fines = np.append(inicios[1:], n)
+    return inicios, fines
+
+
+def leer_indice(dir_almacen):
+    """Índice publicado del almacén o None si no existe o es de otra versión"""
+    ruta = Path(dir_almacen) / NOMBRE_INDICE
+    if not ruta.exists():
+        return None
+    indice = json.loads(ruta.read_text(encoding='utf-8'))
+    return indice if indice.get('version') == VERSION_ALMACEN else None
+
+
+def publicar_almacen(df, dir_almacen, huella):
+    """
+    Escribe el almacén completo como una generación nueva y publica el
+    índice al final (atómico), dentro de bloqueo_escritura(dir_almacen). La
+    generación anterior se conserva hasta la siguiente publicación para los
+    lectores que la estén abriendo.
+    """
+    dir_almacen.mkdir(parents=True, exist_ok=True)
+    anterior = leer_indice(dir_almacen)
+    generacion = siguiente_segmento(dir_almacen)
+
+    df = df.copy()
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]) and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    claves = [df[col].cat.codes.to_numpy() if isinstance(df[col].dtype, pd.CategoricalDtype)
+              else df[col].to_numpy() for col in ORDEN]
+    orden = np.lexsort(claves[::-1])
+
+    columnas = []
+    for col in df.columns:
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            valores = serie.cat.codes.to_numpy().astype(np.int32)[orden]
+            columnas.append({'nombre': col, 'tipo': 'texto', 'dtype': 'int32',
+                             'categorias': [str(c) for c in serie.cat.categories]})
+        else:
+            valores = serie.to_numpy()[orden]
+            columnas.append({'nombre': col, 'tipo': 'numerico', 'dtype': str(valores.dtype)})
+        np.save(dir_almacen / archivo_columna(generacion, col), valores)
+
+    grupos = df['group'].cat
+    tests = df['test_name'].cat
+    codigos_grupo = grupos.codes.to_numpy()[orden]
+    codigos_test = tests.codes.to_numpy()[orden]
+
+    inicios, fines = tramos_contiguos(codigos_grupo)
+    tramos_grupo = {str(grupos.categories[codigos_grupo[i]]): [int(i), int(f)]
+                    for i, f in zip(inicios, fines)}
+    inicios, fines = tramos_contiguos(codigos_grupo, codigos_test)
+    tramos_test = [{'group': str(grupos.categories[codigos_grupo[i]]),
+                    'test_name': str(tests.categories[codigos_test[i]]),
+                    'inicio': int(i), 'fin': int(f)}
+                   for i, f in zip(inicios, fines)]
+
+    escribir_manifiesto(dir_almacen, {
+        'version': VERSION_ALMACEN,
+        'huella': huella,
+        'generacion': generacion,
+        'n_filas': len(df),
+        'orden': ORDEN,
+        'columnas': columnas,
+        'grupos': tramos_grupo,
+        'tests': tramos_test,
+    }, nombre=NOMBRE_INDICE)
+    retirar_segmentos(dir_almacen, {generacion} | ({anterior['generacion']} if anterior else set()))
+    if anterior is None:
+        # Columnas <columna>.npy de un almacén de la versión 1
+        for viejo in dir_almacen.glob('*.npy'):
+            if not viejo.name.startswith('seg'):
+                try:
+                    viejo.unlink()
+                except OSError:
+                    pass
+
+# ==================================================================================
+# LECTURA
+# ==================================================================================
+
+class AlmacenColumnar:
+    """
+    Vista de solo lectura sobre un almacén publicado. Todas las columnas de
+    su generación se mapean al abrirlo (np.memmap, sin leer datos): la vista
+    sigue siendo coherente aunque después se publique otra generación.
+    """
+
+    def __init__(self, dir_almacen):
+        self.directorio = Path(dir_almacen)
+        for intento in range(REINTENTOS_LECTURA):
+            self.indice = json.loads((self.directorio / NOMBRE_INDICE).read_text(encoding='utf-8'))
+            try:
+                self._columnas = {
+                    col['nombre']: np.load(self.directorio / archivo_columna(self.indice['generacion'], col['nombre']),
+                                           mmap_mode='r')
+                    for col in self.indice['columnas']}
+                break
+            except FileNotFoundError:
+                # Se retiró la generación entre leer el índice y mapearla: se relee el índice
+                if intento == REINTENTOS_LECTURA - 1:
+                    raise
+        self.esquema = {col['nombre']: col for col in self.indice['columnas']}
+        self._tests = {(t['group'], t['test_name']): (t['inicio'], t['fin'])
+                       for t in self.indice['tests']}
+
+    def __reduce__(self):
+        # Entre procesos solo viaja la ruta; cada proceso mapea los mismos archivos
+        return (AlmacenColumnar, (str(self.directorio),))
+
+    def __len__(self):
+        return self.indice['n_filas']
+
+    @property
+    def huella(self):
+        return self.indice['huella']
+
+    def columna(self, nombre):
+        """Array mapeado de la columna (códigos int32 si es de texto)"""
+        return self._columnas[nombre]
+
+    def categorias(self, nombre):
+        return self.esquema[nombre].get('categorias')
+
+    def tramo(self, group=None, test_name=None):
+        """slice de las filas de un grupo, de un test o de todo el almacén"""
+        if test_name is not None:
+            if group is None:
+                group = next(g for g, t in self._tests if t == test_name)
+            inicio, fin = self._tests[(group, test_name)]
+        elif group is not None:
+            inicio, fin = self.indice['grupos'][group]
+        else:
+            inicio, fin = 0, len(self)
+        return slice(inicio, fin)
+
+    def valores(self, nombre, group=None, test_name=None):
+        """Vista sin copia de una columna restringida a un grupo o test"""
+        return self.columna(nombre)[self.tramo(group, test_name)]
+
+    def tests(self):
+        """Tabla de tramos por test: group, test_name, inicio, fin"""
+        return pd.DataFrame(self.indice['tests'], columns=['group', 'test_name', 'inicio', 'fin'])
+
+    def dataframe(self, columnas=None, group=None, test_name=None):
+        """
+        DataFrame sobre las columnas mapeadas: las numéricas no se copian y
+        las de texto se exponen como category sobre los códigos mapeados.
+        """
+        tramo = self.tramo(group, test_name)
+        datos = {}
+        for nombre in columnas or list(self.esquema):
+            valores = self.columna(nombre)[tramo]
+            if self.esquema[nombre]['tipo'] == 'texto':
+                datos[nombre] = pd.Categorical.from_codes(valores, categories=self.categorias(nombre))
+            else:
+                datos[nombre] = pd.Series(valores, copy=False)
+        return pd.DataFrame(datos, copy=False)
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def abrir_almacen(ruta_base, verbose=True):
+    """
+    Abre el almacén de ruta_base, publicándolo antes si no existe o si los
+    CSV de origen cambiaron desde la última publicación.
+    """
+    ruta_base = Path(ruta_base)
+    dir_almacen = ruta_base / NOMBRE_ALMACEN
+    _, fuentes = listar_fuentes(ruta_base)
+    huella = calcular_huella(fuentes)
+
+    indice = leer_indice(dir_almacen)
+    if indice is None or indice['huella'] != huella:
+        with bloqueo_escritura(dir_almacen):
+            # Otro proceso pudo publicarlo mientras se esperaba el bloqueo
+            indice = leer_indice(dir_almacen)
+            if indice is None or indice['huella'] != huella:
+                df = cargar_datos_consolidados(ruta_base, verbose=verbose)
+                publicar_almacen(df, dir_almacen, huella)
+                if verbose:
+                    print(f"  ✓ Almacén mapeado publicado ({huella[:12]}): {dir_almacen}")
+                return AlmacenColumnar(dir_almacen)
+
+    if verbose:
+        print(f"  ✓ Almacén mapeado vigente ({huella[:12]}): {dir_almacen}")
+    return AlmacenColumnar(dir_almacen)
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+INTERVALOS DE CONFIANZA BOOTSTRAP (PERCENTIL Y BCa)
+====================================================
+Con N=12 (6 tests por grupo) los IC que asumen normalidad (media ± 1.96·SE)
+no son fiables. Este motor remuestrea ambos grupos de forma vectorizada:
+
+  • Cada bloque genera de una vez las matrices de índices (B × n_manual,
+    B × n_ia) y las aplica a la matriz (n × métricas) de cada grupo, así
+    que todas las métricas se remuestrean juntas con los mismos índices.
+  • Los estadísticos (media de cada grupo, diferencia de medias, d de
+    Cohen y diferencia de medianas) se calculan sobre el eje del tamaño de
+    muestra: un bloque de B remuestreos son unas pocas operaciones NumPy.
+  • Los bloques se reparten entre hilos y cada uno usa su propio flujo
+    SeedSequence(semilla).spawn(): el resultado es reproducible e
+    independiente del número de hilos.
+  • BCa: sesgo z0 a partir de la distribución bootstrap y aceleración a
+    por jackknife (dejando fuera una observación de cualquiera de los dos
+    grupos), también vectorizado.
+
+Convención de signo igual que PASO 3: diferencia = Manual − IA.
+
+    ic = intervalos_por_grupo(df_promedios, METRICAS)
+    inf, sup = intervalo(ic, 'mutation_score', 'cohens_d')
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from comun.esquema import COLUMNAS_METRICAS
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+N_REMUESTREOS = 10_000
+NIVEL_CONFIANZA = 0.95
+SEMILLA = 20240601
+
+# Tamaño de bloque: remuestreos × observaciones × métricas por bloque
+ELEMENTOS_POR_BLOQUE = 4_000_000
+
+# None = valor por defecto de ThreadPoolExecutor
+MAX_HILOS = None
+
+ESTADISTICOS = ['media_manual', 'media_ia', 'diferencia_medias', 'cohens_d', 'diferencia_medianas']
+
+# ==================================================================================
+# ESTADÍSTICOS (VECTORIZADOS SOBRE EL EJE DE LA MUESTRA)
+# ==================================================================================
+
+def estadisticos(manual, ia, eje=-2):
+    """
+    Estadísticos de dos muestras a lo largo de `eje`. Con matrices
+    (n × métricas) devuelve un valor por métrica; con (B × n × métricas),
+    uno por remuestreo y métrica.
+    """
+    n1, n2 = manual.shape[eje], ia.shape[eje]
+    media_manual = manual.mean(axis=eje)
+    media_ia = ia.mean(axis=eje)
+    var_manual = manual.var(axis=eje, ddof=1)
+    var_ia = ia.var(axis=eje, ddof=1)
+
+    pooled_std = np.sqrt(((n1 - 1) * var_manual + (n2 - 1) * var_ia) / (n1 + n2 - 2))
+    diferencia = media_manual - media_ia
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cohens_d = np.where(pooled_std > 0, diferencia / pooled_std, 0.0)
+
+    return {
+        'media_manual': media_manual,
+        'media_ia': media_ia,
+        'diferencia_medias': diferencia,
+        'cohens_d': cohens_d,
+        'diferencia_medianas': np.median(manual, axis=eje) - np.median(ia, axis=eje),
+    }
+
+
+def apilar_estadisticos(partes):
+    """Concatena por el primer eje una lista de dicts de estadísticos"""
+    return {nombre: np.concatenate([p[nombre] for p in partes]) for nombre in ESTADISTICOS}
+
+# ==================================================================================
+# REMUESTREO POR BLOQUES
+# ==================================================================================
+
+def tamano_de_bloque(n_observaciones, n_metricas):
+    return max(1, ELEMENTOS_POR_BLOQUE // max(1, n_observaciones * n_metricas))
+
+
+def remuestrear_bloque(manual, ia, semilla, n_bloque):
+    """n_bloque remuestreos con un flujo de números aleatorios propio"""
+    rng = np.random.default_rng(semilla)
+    indices_manual = rng.integers(0, len(manual), size=(n_bloque, len(manual)))
+    indices_ia = rng.integers(0, len(ia), size=(n_bloque, len(ia)))
+    return estadisticos(manual[indices_manual], ia[indices_ia])
+
+
+def distribucion_bootstrap(manual, ia, n_remuestreos=N_REMUESTREOS, semilla=SEMILLA,
+                           max_hilos=MAX_HILOS):
+    """
+    {estadístico: array (n_remuestreos × métricas)}. Cada bloque recibe un
+    hijo de SeedSequence(semilla), así que el resultado no depende de cómo
+    se repartan los bloques entre hilos.
+    """
+    bloque = tamano_de_bloque(len(manual) + len(ia), manual.shape[1])
+    tamanos = [min(bloque, n_remuestreos - inicio) for inicio in range(0, n_remuestreos, bloque)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+
+    def ejecutar(tarea):
+        return remuestrear_bloque(manual, ia, *tarea)
+
+    tareas = list(zip(semillas, tamanos))
+    hilos = max_hilos or os.cpu_count() or 1
+    if hilos <= 1 or len(tareas) <= 1:
+        partes = [ejecutar(tarea) for tarea in tareas]
+    else:
+        with ThreadPoolExecutor(max_workers=max_hilos) as executor:
+            partes = list(executor.map(ejecutar, tareas))
+    return apilar_estadisticos(partes)
+
+
+def indices_sin_uno(n):
+    """Matriz (n × n-1): la fila i son los índices 0..n-1 sin i"""
+    base = np.arange(n - 1)
+    return base[None, :] + (base[None, :] >= np.arange(n)[:, None])
+
+
+def jackknife(manual, ia):
+    """
+    {estadístico: array ((n_manual + n_ia) × métricas)}: el estadístico
+    dejando fuera cada observación de Manual y luego cada una de IA.
+    """
+    partes = []
+    for muestra, otra, es_manual in [(manual, ia, True), (ia, manual, False)]:
+        sin_uno = indices_sin_uno(len(muestra))
+        bloque = tamano_de_bloque(len(manual) + len(ia), manual.shape[1])
+        for inicio in range(0, len(muestra), bloque):
+            reducida = muestra[sin_uno[inicio:inicio + bloque]]
+            completa = np.broadcast_to(otra, (len(reducida),) + otra.shape)
+            partes.append(estadisticos(reducida, completa) if es_manual else estadisticos(completa, reducida))
+    return apilar_estadisticos(partes)
+
+# ==================================================================================
+# INTERVALOS
+# ==================================================================================
+
+def cuantiles_por_columna(distribucion, probabilidades):
+    """
+    Cuantil de cada columna con su propia probabilidad (interpolación lineal,
+    igual que np.quantile): distribucion (B × M), probabilidades (M,).
+    """
+    ordenada = np.sort(distribucion, axis=0)
+    h = (len(ordenada) - 1) * np.clip(probabilidades, 0, 1)
+    bajo = np.floor(h).astype(np.int64)
+    alto = np.minimum(bajo + 1, len(ordenada) - 1)
+    columnas = np.arange(ordenada.shape[1])
+    v_bajo = ordenada[bajo, columnas]
+    return v_bajo + (h - bajo) * (ordenada[alto, columnas] - v_bajo)
+
+
+def intervalo_percentil(distribucion, confianza=NIVEL_CONFIANZA):
+    alfa = (1 - confianza) / 2
+    inf, sup = np.quantile(distribucion, [alfa, 1 - alfa], axis=0)
+    return inf, sup
+
+
+def intervalo_bca(distribucion, estimado, valores_jackknife, confianza=NIVEL_CONFIANZA):
+    """
+    IC BCa por columna. Si el sesgo o la aceleración no están definidos
+    (distribución degenerada), la columna usa el intervalo percentil.
+    """
+    alfa = (1 - confianza) / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z0 = norm.ppf(np.mean(distribucion < estimado, axis=0))
+        desvios = valores_jackknife.mean(axis=0) - valores_jackknife
+        aceleracion = (desvios ** 3).sum(axis=0) / (6 * ((desvios ** 2).sum(axis=0)) ** 1.5)
+
+        probabilidades = []
+        for z in norm.ppf([alfa, 1 - alfa]):
+            probabilidades.append(norm.cdf(z0 + (z0 + z) / (1 - aceleracion * (z0 + z))))
+
+    inf_p, sup_p = intervalo_percentil(distribucion, confianza)
+    inf = cuantiles_por_columna(distribucion, np.nan_to_num(probabilidades[0]))
+    sup = cuantiles_por_columna(distribucion, np.nan_to_num(probabilidades[1]))
+    definido = np.isfinite(probabilidades[0]) & np.isfinite(probabilidades[1])
+    return np.where(definido, inf, inf_p), np.where(definido, sup, sup_p)
+
+
+def intervalos_bootstrap(manual, ia, metricas, n_remuestreos=N_REMUESTREOS,
+                         confianza=NIVEL_CONFIANZA, semilla=SEMILLA, max_hilos=MAX_HILOS):
+    """
+    IC percentil y BCa de todos los ESTADISTICOS para todas las métricas a
+    la vez. `manual` e `ia` son matrices (n × métricas) sin NaN.
+
+    Devuelve una fila por (metrica, estadistico) con: estimado,
+    error_estandar, ic_inf_percentil, ic_sup_percentil, ic_inf_bca,
+    ic_sup_bca, n_remuestreos.
+    """
+    manual = np.asarray(manual, dtype=np.float64)
+    ia = np.asarray(ia, dtype=np.float64)
+    estimados = estadisticos(manual, ia)
+    distribuciones = distribucion_bootstrap(manual, ia, n_remuestreos, semilla, max_hilos)
+    valores_jackknife = jackknife(manual, ia)
+
+    partes = []
+    for nombre in ESTADISTICOS:
+        inf_p, sup_p = intervalo_percentil(distribuciones[nombre], confianza)
+        inf_bca, sup_bca = intervalo_bca(distribuciones[nombre], estimados[nombre],
+                                         valores_jackknife[nombre], confianza)
+        partes.append(pd.DataFrame({
+            'metrica': metricas,
+            'estadistico': nombre,
+            'estimado': estimados[nombre],
+            'error_estandar': distribuciones[nombre].std(axis=0, ddof=1),
+            'ic_inf_percentil': inf_p,
+            'ic_sup_percentil': sup_p,
+            'ic_inf_bca': inf_bca,
+            'ic_sup_bca': sup_bca,
+            'n_remuestreos': n_remuestreos,
+        }))
+    resultado = pd.concat(partes, ignore_index=True)
+    orden = {m: i for i, m in enumerate(metricas)}
+    return resultado.sort_values('metrica', key=lambda s: s.map(orden), kind='stable').reset_index(drop=True)
+
+
+def intervalos_por_grupo(df, metricas=COLUMNAS_METRICAS, columna_grupo='group', **opciones):
+    """intervalos_bootstrap de las filas Manual frente a IA de `df` (p. ej. los promedios N=12)"""
+    manual = df.loc[df[columna_grupo] == 'Manual', metricas].to_numpy(dtype=np.float64)
+    ia = df.loc[df[columna_grupo] == 'IA', metricas].to_numpy(dtype=np.float64)
+    return intervalos_bootstrap(manual, ia, metricas, **opciones)
+
+
+def fila_intervalo(resultados, metrica, estadistico):
+    """Fila de intervalos_bootstrap de una métrica y un estadístico"""
+    fila = resultados[(resultados['metrica'] == metrica) & (resultados['estadistico'] == estadistico)]
+    if len(fila) != 1:
+        raise KeyError(f"Se esperaba una fila para {(metrica, estadistico)}, hay {len(fila)}")
+    return fila.iloc[0]
+
+
+def intervalo(resultados, metrica, estadistico, metodo='bca'):
+    """(inferior, superior) de una fila de intervalos_bootstrap"""
+    fila = fila_intervalo(resultados, metrica, estadistico)
+    return fila[f'ic_inf_{metodo}'], fila[f'ic_sup_{metodo}']
@@ -0,0 +1,537 @@
+# -*- coding: utf-8 -*-
+"""
+CARGA DE DATOS CONSOLIDADOS CON CACHÉ COLUMNAR
+===============================================
+Consolida los CSV por clase de unit_tests_metrics/ y functional_tests_metrics/
+igual que 01_PASO1 (category, group y test_name derivados del nombre del
+archivo) y guarda el resultado como una columna .npy por campo.
+
+La caché está indexada por una huella SHA-256 del contenido de los CSV de
+entrada: si cualquier archivo cambia, se agrega o se elimina, la caché se
+reconstruye automáticamente; en caso contrario se carga sin parsear CSV.
+
+Las columnas se guardan en segmentos (seg0000_<col>.npy, seg0001_<col>.npy...)
+para que la ingesta incremental (comun.ingesta) solo tenga que añadir un
+segmento con las filas nuevas. El manifiesto guarda además el offset en bytes
+de cada CSV y los acumuladores por test (conteo y suma por métrica).
+
+Varios procesos pueden cargar la misma caché a la vez (VIGILAR_METRICAS
+ejecuta pasos en paralelo). Las escrituras se serializan con un archivo
+.bloqueo y nunca pisan un segmento existente: cada reescritura usa ids
+nuevos y el manifiesto se reemplaza con os.replace, así que un lector ve la
+caché anterior completa o la nueva completa.
+
+El DataFrame devuelto sigue el esquema compacto de comun.esquema: columnas
+de texto como category, iteration como int16 y contadores de mutantes como
+int32.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comun.esquema import aplicar_esquema
+from comun.validacion import imprimir_violaciones, validar_datos
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+CATEGORIAS = {
+    'unit_tests_metrics': 'Unitarias',
+    'functional_tests_metrics': 'Funcionales',
+}
+
+# Métricas cuyos acumuladores por (group, test_name) se mantienen en el manifiesto
+COLUMNAS_AGREGADAS = ['time_seconds', 'instr_pct', 'branch_pct',
+                      'total_mutations', 'mutations_killed', 'mutation_score']
+
+NOMBRE_CSV_CONSOLIDADO = 'datos_consolidados.csv'
+NOMBRE_CACHE = '.cache_consolidado'
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+VERSION_CACHE = 3
+
+# Bytes previos al offset usados para detectar CSV reescritos (no solo ampliados)
+BYTES_COLA = 256
+
+# Hilos para leer los CSV por clase (None = valor por defecto de ThreadPoolExecutor)
+MAX_HILOS = None
+
+# Exclusión entre procesos al escribir la caché
+NOMBRE_BLOQUEO = '.bloqueo'
+ESPERA_BLOQUEO = 0.1
+# Segundos tras los que un .bloqueo se considera de un proceso que terminó sin liberarlo
+BLOQUEO_ABANDONADO = 600
+# Cargas que se reintentan si un escritor retira segmentos mientras se leen
+REINTENTOS_LECTURA = 3
+# Reintentos de os.replace: en Windows falla mientras otro proceso tiene abierto el destino
+REINTENTOS_REEMPLAZO = 50
+
+PATRON_SEGMENTO = re.compile(r'seg(\d+)_')
+
+# ==================================================================================
+# DESCUBRIMIENTO DE ARCHIVOS
+# ==================================================================================
+
+def directorio_metricas(ruta_base, nombre):
+    """
+    Devuelve la carpeta de métricas `nombre` bajo ruta_base.
+    Admite también el layout del repositorio (numerical_data/<nombre>).
+    """
+    for candidato in (ruta_base / nombre, ruta_base / 'numerical_data' / nombre):
+        if candidato.is_dir():
+            return candidato
+    return ruta_base / nombre
+
+
+def listar_archivos_metricas(ruta_base):
+    """Lista (archivo, categoria) de todos los CSV por clase en orden estable"""
+    ruta_base = Path(ruta_base)
+    archivos = []
+    for carpeta, categoria in CATEGORIAS.items():
+        for archivo in sorted(directorio_metricas(ruta_base, carpeta).glob('*.csv')):
+            archivos.append((archivo, categoria))
+    return archivos
+
+
+def grupo_desde_archivo(archivo):
+    """Extrae el grupo (IA / Manual) del prefijo del nombre del archivo"""
+    return 'IA' if archivo.stem.startswith('IA_') else 'Manual'
+
+
+def clave_archivo(archivo):
+    """Clave estable de un CSV dentro del manifiesto (carpeta/archivo)"""
+    return f'{archivo.parent.name}/{archivo.name}'
+
+# ==================================================================================
+# LECTURA DE CSV POR CLASE
+# ==================================================================================
+
+def huella_cola(datos):
+    """SHA-256 de los últimos BYTES_COLA bytes de `datos`"""
+    return hashlib.sha256(datos[-BYTES_COLA:]).hexdigest()
+
+
+def leer_csv_clase(archivo, categoria, estado=None):
+    """
+    Lee un CSV por clase y añade category, group y test_name como 01_PASO1.
+    El test_name original del CSV (método de prueba) pasa a test_method.
+
+    Solo se parsean líneas completas (terminadas en salto de línea): una
+    última línea a medio escribir por el runner se leerá en la siguiente
+    pasada. Si se recibe el `estado` de una lectura anterior, se parsean
+    únicamente los bytes añadidos desde su offset.
+
+    Devuelve (df, estado_nuevo). Si el prefijo ya leído no coincide con el
+    del estado (archivo truncado o reescrito) devuelve (None, None).
+    """
+    desde = estado['offset'] if estado else 0
+    inicio = max(0, desde - BYTES_COLA)
+
+    with open(archivo, 'rb') as f:
+        f.seek(inicio)
+        datos = f.read()
+
+    previo, datos = datos[:desde - inicio], datos[desde - inicio:]
+    if estado and (len(previo) != desde - inicio or huella_cola(previo) != estado['cola']):
+        return None, None
+    datos = datos[:datos.rfind(b'\n') + 1]
+
+    if estado:
+        cabecera = estado['cabecera']
+        contenido = cabecera.encode('utf-8') + b'\n' + datos
+    else:
+        cabecera = datos.split(b'\n', 1)[0].decode('utf-8-sig').strip()
+        contenido = datos
+
+    df = pd.read_csv(io.BytesIO(contenido), encoding='utf-8-sig') if contenido else pd.DataFrame()
+    df['category'] = categoria
+    df['group'] = grupo_desde_archivo(archivo)
+    # 01_PASO1 usa el nombre del archivo como test_name; el método original se conserva aparte
+    if 'test_name' in df.columns:
+        df['test_method'] = df['test_name']
+    df['test_name'] = archivo.stem
+
+    estado_nuevo = {
+        'cabecera': cabecera,
+        'offset': desde + len(datos),
+        'filas': (estado['filas'] if estado else 0) + len(df),
+        'cola': huella_cola(previo + datos),
+    }
+    return df, estado_nuevo
+
+
+def leer_archivos_en_paralelo(archivos, estados=None, max_hilos=MAX_HILOS):
+    """
+    Lee concurrentemente los CSV por clase con un pool de hilos (el parser
+    de pandas libera el GIL). Devuelve [(df, estado_nuevo), ...] en el mismo
+    orden que `archivos`; `estados` (clave_archivo → estado) permite leer
+    solo los bytes añadidos, como leer_csv_clase.
+    """
+    estados = estados or {}
+
+    def leer(item):
+        archivo, categoria = item
+        return leer_csv_clase(archivo, categoria, estados.get(clave_archivo(archivo)))
+
+    if len(archivos) <= 1:
+        return [leer(item) for item in archivos]
+    with ThreadPoolExecutor(max_workers=max_hilos) as executor:
+        return list(executor.map(leer, archivos))
+
+# ==================================================================================
+# ACUMULADORES POR TEST
+# ==================================================================================
+
+def acumular_agregados(previos, df):
+    """
+    Suma a `previos` el conteo y la suma por (group, test_name) de cada
+    métrica de COLUMNAS_AGREGADAS presente en `df`.
+    """
+    agregados = {(a['group'], a['test_name']): a for a in (previos or [])}
+    metricas = [c for c in COLUMNAS_AGREGADAS if c in df.columns]
+    if len(df) == 0 or not metricas:
+        return list(agregados.values())
+
+    grupos = df.groupby(['group', 'test_name'], sort=False, observed=True)[metricas]
+    conteos, sumas = grupos.count(), grupos.sum()
+
+    for (grupo, test_name), fila_n in conteos.iterrows():
+        fila_suma = sumas.loc[(grupo, test_name)]
+        actual = agregados.setdefault((grupo, test_name), {
+            'group': grupo, 'test_name': test_name, 'n': {}, 'suma': {}})
+        for metrica in metricas:
+            actual['n'][metrica] = actual['n'].get(metrica, 0) + int(fila_n[metrica])
+            actual['suma'][metrica] = actual['suma'].get(metrica, 0.0) + float(fila_suma[metrica])
+
+    return list(agregados.values())
+
+
+def promedios_desde_agregados(agregados, metricas):
+    """
+    Equivalente a df.groupby(['group', 'test_name'])[metricas].mean().reset_index()
+    calculado a partir de los acumuladores del manifiesto.
+    """
+    filas = []
+    for a in agregados:
+        fila = {'group': a['group'], 'test_name': a['test_name']}
+        for metrica in metricas:
+            n = a['n'].get(metrica, 0)
+            fila[metrica] = a['suma'][metrica] / n if n else np.nan
+        filas.append(fila)
+    df = pd.DataFrame(filas, columns=['group', 'test_name'] + list(metricas))
+    return df.sort_values(['group', 'test_name']).reset_index(drop=True)
+
+# ==================================================================================
+# CACHE COLUMNAR
+# ==================================================================================
+
+def calcular_huella(rutas):
+    """Huella SHA-256 del nombre y contenido de cada archivo de entrada"""
+    h = hashlib.sha256(f'v{VERSION_CACHE}'.encode())
+    for ruta in rutas:
+        h.update(f'{clave_archivo(ruta)}\0'.encode('utf-8'))
+        with open(ruta, 'rb') as f:
+            for bloque in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloque)
+    return h.hexdigest()
+
+
+def archivo_columna(id_segmento, columna):
+    return f'seg{id_segmento:04d}_{columna}.npy'
+
+
+@contextmanager
+def bloqueo_escritura(directorio):
+    """
+    Exclusión entre procesos para escribir en `directorio`: el .bloqueo se
+    crea con O_EXCL y se borra al salir; quien lo encuentra espera. Un
+    bloqueo con más de BLOQUEO_ABANDONADO segundos se descarta.
+    """
+    directorio.mkdir(parents=True, exist_ok=True)
+    ruta = directorio / NOMBRE_BLOQUEO
+    while True:
+        try:
+            os.close(os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            pass
+        except PermissionError:
+            # En Windows un .bloqueo que se está borrando da PermissionError
+            if os.name != 'nt':
+                raise
+        try:
+            if time.time() - ruta.stat().st_mtime > BLOQUEO_ABANDONADO:
+                ruta.unlink()
+                continue
+        except OSError:
+            continue
+        time.sleep(ESPERA_BLOQUEO)
+    try:
+        yield
+    finally:
+        ruta.unlink(missing_ok=True)
+
+
+def reemplazar(temporal, ruta):
+    """os.replace reintentando mientras otro proceso tenga abierto el destino (Windows)"""
+    for _ in range(REINTENTOS_REEMPLAZO - 1):
+        try:
+            os.replace(temporal, ruta)
+            return
+        except PermissionError:
+            time.sleep(ESPERA_BLOQUEO)
+    os.replace(temporal, ruta)
+
+
+def temporal_para(ruta):
+    """Ruta temporal junto a `ruta`, distinta en cada proceso"""
+    return ruta.with_name(f'{ruta.name}.{os.getpid()}.tmp')
+
+
+def siguiente_segmento(dir_cache):
+    """Id mayor que el de cualquier segmento en disco: nunca se pisa uno que otro proceso lea"""
+    ids = [int(m.group(1)) for m in (PATRON_SEGMENTO.match(r.name) for r in dir_cache.glob('seg*.npy')) if m]
+    return max(ids, default=-1) + 1
+
+
+def retirar_segmentos(dir_cache, conservar):
+    """
+    Borra los segmentos cuyo id no está en `conservar`. Los que Windows no
+    deja borrar (aún abiertos por otro proceso) quedan para la siguiente
+    reescritura.
+    """
+    for ruta in dir_cache.glob('seg*.npy'):
+        m = PATRON_SEGMENTO.match(ruta.name)
+        if m and int(m.group(1)) not in conservar:
+            try:
+                ruta.unlink()
+            except OSError:
+                pass
+
+
+def describir_columnas(df):
+    """Esquema de columnas del manifiesto: nombre, tipo y dtype numérico"""
+    columnas = []
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            columnas.append({'nombre': col, 'tipo': 'numerico', 'dtype': str(df[col].dtype)})
+        else:
+            columnas.append({'nombre': col, 'tipo': 'texto'})
+    return columnas
+
+
+def guardar_segmento(df, dir_cache, id_segmento, columnas):
+    """
+    Guarda las filas de `df` como un segmento: un .npy por columna. Las
+    columnas de texto se codifican por diccionario (códigos int32 + lista
+    de categorías del segmento, que se guarda en el manifiesto).
+    """
+    categorias = {}
+    for col in columnas:
+        nombre = col['nombre']
+        ruta = dir_cache / archivo_columna(id_segmento, nombre)
+        if col['tipo'] == 'numerico':
+            np.save(ruta, df[nombre].to_numpy().astype(col['dtype'], copy=False))
+        else:
+            codigos, valores = pd.factorize(df[nombre], sort=True)
+            np.save(ruta, codigos.astype(np.int32))
+            categorias[nombre] = [str(v) for v in valores]
+    return {'id': id_segmento, 'n_filas': len(df), 'categorias': categorias}
+
+
+def leer_manifiesto(dir_cache, version=VERSION_CACHE):
+    """Devuelve el manifiesto de la caché o None si no existe o es de otra versión"""
+    ruta = dir_cache / NOMBRE_MANIFIESTO
+    if not ruta.exists():
+        return None
+    manifiesto = json.loads(ruta.read_text(encoding='utf-8'))
+    if manifiesto.get('version') != version:
+        return None
+    return manifiesto
+
+
+def escribir_manifiesto(dir_cache, manifiesto, nombre=NOMBRE_MANIFIESTO):
+    """Escritura atómica: una caché a medio escribir nunca se considera válida"""
+    ruta = dir_cache / nombre
+    temporal = temporal_para(ruta)
+    temporal.write_text(json.dumps(manifiesto, ensure_ascii=False), encoding='utf-8')
+    reemplazar(temporal, ruta)
+
+
+def cargar_columnas(dir_cache, manifiesto):
+    """
+    Reconstruye el DataFrame concatenando todos los segmentos de la caché.
+    Las columnas de texto se devuelven como category sin pasar por objetos
+    Python: los códigos de cada segmento se reasignan al diccionario común.
+    """
+    datos = {}
+    for col in manifiesto['columnas']:
+        nombre = col['nombre']
+        segmentos = manifiesto['segmentos']
+        partes = [np.load(dir_cache / archivo_columna(s['id'], nombre)) for s in segmentos]
+
+        if col['tipo'] == 'texto':
+            categorias = sorted(set().union(*(s['categorias'][nombre] for s in segmentos)))
+            for i, segmento in enumerate(segmentos):
+                mapa = np.searchsorted(categorias, segmento['categorias'][nombre]).astype(np.int32)
+                partes[i] = np.where(partes[i] >= 0, mapa[partes[i]] if len(mapa) else -1, -1)
+            codigos = np.concatenate(partes) if len(partes) != 1 else partes[0]
+            datos[nombre] = pd.Categorical.from_codes(codigos, categories=categorias)
+        else:
+            datos[nombre] = np.concatenate(partes) if len(partes) != 1 else partes[0]
+    return pd.DataFrame(datos)
+
+
+def leer_cache(dir_cache, huella):
+    """
+    Carga la caché si existe y su huella coincide; si no, devuelve None. Si
+    un escritor retira un segmento durante la carga se relee el manifiesto.
+    """
+    for _ in range(REINTENTOS_LECTURA):
+        manifiesto = leer_manifiesto(dir_cache)
+        if manifiesto is None or manifiesto.get('huella') != huella:
+            return None
+        try:
+            return cargar_columnas(dir_cache, manifiesto)
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def guardar_cache(df, dir_cache, huella, estados=None, bytes_csv=None):
+    """
+    Reescribe la caché completa como un único segmento con id nuevo, dentro
+    de bloqueo_escritura(dir_cache). Los segmentos del manifiesto reemplazado
+    se conservan una reescritura más para los lectores que aún los cargan.
+    `bytes_csv` es el tamaño de datos_consolidados.csv que corresponde a
+    estas filas (lo usa la ingesta incremental).
+    """
+    dir_cache.mkdir(parents=True, exist_ok=True)
+    anterior = leer_manifiesto(dir_cache)
+
+    columnas = describir_columnas(df)
+    segmento = guardar_segmento(df, dir_cache, siguiente_segmento(dir_cache), columnas)
+    escribir_manifiesto(dir_cache, {
+        'version': VERSION_CACHE,
+        'huella': huella,
+        'n_filas': len(df),
+        'columnas': columnas,
+        'segmentos': [segmento],
+        'archivos': estados or {},
+        'agregados': acumular_agregados(None, df),
+        'bytes_csv': bytes_csv,
+    })
+    retirar_segmentos(dir_cache, {segmento['id']} | {s['id'] for s in (anterior or {}).get('segmentos', [])})
+
+
+def reconstruir_cache(ruta_base, archivos, dir_cache, huella):
+    """Consolida todos los CSV por clase desde cero y reescribe caché y CSV"""
+    leidos = leer_archivos_en_paralelo(archivos)
+    estados = {clave_archivo(archivo): estado for (archivo, _), (_, estado) in zip(archivos, leidos)}
+
+    # Una sola concatenación: pandas reserva cada bloque de columnas con el tamaño final
+    df = aplicar_esquema(pd.concat([df for df, _ in leidos], ignore_index=True))
+    csv_consolidado = ruta_base / NOMBRE_CSV_CONSOLIDADO
+    temporal = temporal_para(csv_consolidado)
+    df.to_csv(temporal, index=False)
+    reemplazar(temporal, csv_consolidado)
+    guardar_cache(df, dir_cache, huella, estados, csv_consolidado.stat().st_size)
+    return df
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def listar_fuentes(ruta_base):
+    """
+    Devuelve (archivos, fuentes): los CSV por clase y los archivos sobre los
+    que se calcula la huella (los CSV por clase o, si no hay, el consolidado).
+    """
+    ruta_base = Path(ruta_base)
+    archivos = listar_archivos_metricas(ruta_base)
+    csv_consolidado = ruta_base / NOMBRE_CSV_CONSOLIDADO
+
+    if archivos:
+        return archivos, [archivo for archivo, _ in archivos]
+    if csv_consolidado.exists():
+        return archivos, [csv_consolidado]
+    raise FileNotFoundError(
+        f"No se encontraron CSV de métricas ni {NOMBRE_CSV_CONSOLIDADO} en {ruta_base}")
+
+
+def cargar_datos_consolidados(ruta_base, incremental=False, verbose=True, float32=False):
+    """
+    Devuelve el DataFrame consolidado (una fila por test e iteración).
+
+    Si existen CSV por clase, la huella se calcula sobre ellos y, al
+    reconstruir, también se regenera datos_consolidados.csv. Si solo existe
+    datos_consolidados.csv, éste se usa como única fuente de la caché.
+
+    Con incremental=True (ingesta durante una campaña) solo se parsean las
+    filas añadidas a cada CSV desde la última ejecución; ver comun.ingesta.
+
+    Con float32=True las métricas continuas se devuelven en float32 (la
+    caché siempre las guarda con la precisión original).
+
+    Cada vez que se ingieren filas (reconstrucción o ingesta incremental) se
+    imprime el reporte de comun.validacion si verbose=True.
+    """
+    ruta_base = Path(ruta_base)
+    archivos, fuentes = listar_fuentes(ruta_base)
+    csv_consolidado = ruta_base / NOMBRE_CSV_CONSOLIDADO
+    dir_cache = ruta_base / NOMBRE_CACHE
+
+    if incremental and archivos:
+        from comun.ingesta import ingerir_incremental
+        with bloqueo_escritura(dir_cache):
+            df = ingerir_incremental(ruta_base, archivos, dir_cache, verbose)
+        if df is not None:
+            if verbose:
+                imprimir_violaciones(validar_datos(df))
+            return aplicar_esquema(df, float32)
+
+    huella = calcular_huella(fuentes)
+    df = leer_cache(dir_cache, huella)
+    if df is None:
+        with bloqueo_escritura(dir_cache):
+            # Otro proceso pudo reconstruirla mientras se esperaba el bloqueo
+            df = leer_cache(dir_cache, huella)
+            if df is None:
+                if archivos:
+                    if verbose:
+                        print(f"  ! Caché ausente o desactualizada, consolidando {len(archivos)} archivos...")
+                    df = reconstruir_cache(ruta_base, archivos, dir_cache, huella)
+                else:
+                    df = aplicar_esquema(pd.read_csv(csv_consolidado))
+                    guardar_cache(df, dir_cache, huella)
+
+                if verbose:
+                    print(f"  ✓ Caché columnar reconstruida ({huella[:12]}): {dir_cache}")
+                    imprimir_violaciones(validar_datos(df))
+                return aplicar_esquema(df, float32)
+
+    if verbose:
+        print(f"  ✓ Caché columnar vigente ({huella[:12]}): {dir_cache}")
+    return aplicar_esquema(df, float32)
+
+
+def cargar_promedios(ruta_base, metricas):
+    """
+    Promedios por test (N=12) a partir de los acumuladores de la caché, sin
+    volver a agrupar el DataFrame completo. Requiere haber llamado antes a
+    cargar_datos_consolidados sobre la misma ruta_base.
+    """
+    manifiesto = leer_manifiesto(Path(ruta_base) / NOMBRE_CACHE)
+    if manifiesto is None:
+        raise FileNotFoundError(f"No existe caché consolidada en {ruta_base}")
+    return promedios_desde_agregados(manifiesto['agregados'], metricas)
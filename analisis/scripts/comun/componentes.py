@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+COMPONENTES DE VARIANZA ENTRE TESTS Y DENTRO DE CADA TEST
+==========================================================
+El análisis N=12 reduce las 40 iteraciones de cada test a su media y el
+N=2,480 trata cada iteración como independiente. Las iteraciones son
+repeticiones anidadas en el test (y el test en su grupo), así que la
+muestra efectiva está entre ambos extremos. Este motor separa la varianza
+en sus dos componentes sin volver a tocar las filas:
+
+  • Acumuladores por test: n, media y M2 (suma de cuadrados respecto a la
+    media del test) de cada métrica. Salen del DataFrame (bincount), de los
+    tramos contiguos del almacén columnar (np.add.reduceat) o de los
+    momentos en streaming (MomentosEnLinea), así que millones de filas se
+    reducen a una matriz (tests × métricas).
+  • ANOVA de un factor con los tests anidados en el grupo:
+      σ²_dentro = MS_dentro,  σ²_entre = (MS_entre − MS_dentro) / n0
+      ICC = σ²_entre / (σ²_entre + σ²_dentro)
+      efecto de diseño = 1 + (n̄ − 1)·ICC,  n efectivo = N / efecto de diseño
+    con n0 y n̄ para tamaños de test desiguales.
+  • Bootstrap por conglomerados: se remuestrean tests (no filas) dentro de
+    cada grupo. Remuestrear tests con reposición es sortear cuántas veces
+    entra cada test (multinomial), y cada estadístico es un producto
+    (remuestreos × tests) @ (tests × métricas) sobre los acumuladores.
+
+Convención de signo igual que PASO 3: diferencia = Manual − IA.
+
+    acumuladores = acumular_almacen(abrir_almacen('.'), METRICAS)
+    componentes = descomponer(acumuladores)
+    ic = bootstrap_por_test(acumuladores)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import f as distribucion_f
+
+from comun.bootstrap import (ELEMENTOS_POR_BLOQUE, N_REMUESTREOS, NIVEL_CONFIANZA, SEMILLA,
+                             intervalo_percentil)
+from comun.descriptiva import codigos_combinados
+from comun.esquema import COLUMNAS_METRICAS
+from comun.hipotesis import TOLERANCIA_CONSTANTE
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+GRUPOS = ['Manual', 'IA']
+AMBITO_CONJUNTO = 'Manual + IA'
+ESTADISTICOS_CONGLOMERADO = ['diferencia_medias', 'diferencia_medias_test', 'icc', 'efecto_diseno']
+
+# ==================================================================================
+# ACUMULADORES POR TEST
+# ==================================================================================
+
+class AcumuladoresTest:
+    """
+    Estadísticos suficientes por test: `tests` (group, test_name) y
+    matrices (tests × métricas) n, media y m2.
+    """
+
+    def __init__(self, tests, metricas, n, media, m2):
+        self.tests = tests.reset_index(drop=True)
+        self.metricas = list(metricas)
+        self.n = np.asarray(n, dtype=np.float64)
+        self.media = np.asarray(media, dtype=np.float64)
+        self.m2 = np.asarray(m2, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.tests)
+
+    def grupo(self, grupo):
+        """Máscara de los tests de `grupo`"""
+        return (self.tests['group'].astype(str) == grupo).to_numpy()
+
+
+def acumular_dataframe(df, metricas=COLUMNAS_METRICAS, columna_test='test_name', columna_grupo='group'):
+    """Acumuladores por (grupo, test) de un DataFrame de iteraciones"""
+    codigos, tests = codigos_combinados(df, [columna_grupo, columna_test])
+    n_tests = len(tests)
+    validos_test = codigos >= 0
+    n, media, m2 = (np.zeros((n_tests, len(metricas))) for _ in range(3))
+    for j, metrica in enumerate(metricas):
+        valores = df[metrica].to_numpy(dtype=np.float64)
+        filas = validos_test & ~np.isnan(valores)
+        celdas, v = codigos[filas].astype(np.int64), valores[filas]
+        n[:, j] = np.bincount(celdas, minlength=n_tests)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media[:, j] = np.bincount(celdas, weights=v, minlength=n_tests) / n[:, j]
+        desvio = v - media[celdas, j]
+        m2[:, j] = np.bincount(celdas, weights=desvio * desvio, minlength=n_tests)
+    tests = tests.rename(columns={columna_grupo: 'group', columna_test: 'test_name'})
+    return AcumuladoresTest(tests, metricas, n, media, m2)
+
+
+def acumular_almacen(almacen, metricas=COLUMNAS_METRICAS):
+    """
+    Acumuladores desde el almacén columnar: cada test es un tramo contiguo,
+    así que las sumas son np.add.reduceat sobre la columna mapeada.
+    """
+    tests = almacen.tests().sort_values('inicio', kind='stable')
+    tests = tests[tests['fin'] > tests['inicio']].reset_index(drop=True)
+    inicios = tests['inicio'].to_numpy()
+    longitudes = (tests['fin'] - tests['inicio']).to_numpy()
+    tramo = slice(int(inicios[0]), int(tests['fin'].iloc[-1])) if len(tests) else slice(0, 0)
+    # Posiciones relativas al tramo leído (los tests cubren todo el almacén)
+    relativos = inicios - tramo.start
+
+    n, media, m2 = (np.zeros((len(tests), len(metricas))) for _ in range(3))
+    for j, metrica in enumerate(metricas):
+        valores = np.asarray(almacen.columna(metrica)[tramo], dtype=np.float64)
+        validos = ~np.isnan(valores)
+        limpios = np.where(validos, valores, 0.0)
+        n[:, j] = np.add.reduceat(validos, relativos)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media[:, j] = np.add.reduceat(limpios, relativos) / n[:, j]
+        desvio = np.where(validos, valores - np.repeat(media[:, j], longitudes), 0.0)
+        m2[:, j] = np.add.reduceat(desvio * desvio, relativos)
+    return AcumuladoresTest(tests[['group', 'test_name']], metricas, n, media, m2)
+
+
+def acumular_momentos(momentos):
+    """Acumuladores desde un MomentosEnLinea (modo streaming, sin filas en memoria)"""
+    reducido = momentos.reducir(['group', 'test_name'])
+    tests = reducido.n.index.to_frame(index=False)
+    return AcumuladoresTest(tests, reducido.metricas,
+                            reducido.n[reducido.metricas].to_numpy(),
+                            reducido.media[reducido.metricas].to_numpy(),
+                            reducido.m2[reducido.metricas].to_numpy())
+
+# ==================================================================================
+# ANOVA DE COMPONENTES
+# ==================================================================================
+
+def componentes_varianza(n, media, m2, estratos, conteos=None):
+    """
+    Componentes de varianza de tests anidados en `estratos` (código por
+    test) desde matrices (tests × métricas) de acumuladores. Cada estrato
+    conserva su propia media. Con `conteos` (B × tests), cada test entra
+    conteos[b, i] veces en el remuestreo b: n, Σx, Σx² y M2 son aditivos,
+    así que repetir un test es ponderar sus sumas. Devuelve arrays
+    (métricas,) sin conteos y (B × métricas) con ellos.
+
+    Los cuadrados medios por debajo de TOLERANCIA_CONSTANTE relativa a la
+    media son residuo de redondeo (coberturas idénticas en todas las
+    iteraciones) y se toman como 0. Sin varianza dentro de los tests, F es
+    inf si hay varianza entre tests y NaN si tampoco la hay; p_f es NaN en
+    ambos casos (la prueba F no está definida).
+    """
+    _, estratos = np.unique(estratos, return_inverse=True)
+    una_vez = np.eye(estratos.max() + 1 if len(estratos) else 0)[estratos]
+    conteos_ = np.ones((1, len(estratos))) if conteos is None else conteos
+    presentes = (n > 0).astype(np.float64)
+    n = np.where(n > 0, n, 0.0)
+    m2 = np.where(n > 0, m2, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Medias centradas en la del estrato observado: Σx² − (Σx)²/n sin cancelación
+        n_observado = np.einsum('km,ks->sm', n, una_vez)
+        centro = una_vez @ np.nan_to_num(np.einsum('km,ks->sm', n * np.nan_to_num(media), una_vez)
+                                         / n_observado)
+        x = np.where(n > 0, media - centro, 0.0)
+
+        n_estrato = np.einsum('bk,km,ks->bsm', conteos_, n, una_vez)
+        suma_estrato = np.einsum('bk,km,ks->bsm', conteos_, n * x, una_vez)
+        n2_estrato = np.einsum('bk,km,ks->bsm', conteos_, n * n, una_vez)
+        k = conteos_ @ presentes
+        g = np.einsum('bk,km,ks->bsm', conteos_, presentes, una_vez).astype(bool).sum(axis=1)
+        n_total = conteos_ @ n
+
+        entre = conteos_ @ (n * x * x) - np.nansum(suma_estrato ** 2 / n_estrato, axis=1)
+        dentro = conteos_ @ m2
+        gl_entre = k - g
+        gl_dentro = n_total - k
+        ms_entre = entre / gl_entre
+        ms_dentro = dentro / gl_dentro
+        # Residuo de redondeo respecto a la media de todas las filas, no varianza
+        umbral = (TOLERANCIA_CONSTANTE * np.abs(conteos_ @ (n * np.nan_to_num(media)) / n_total)) ** 2
+        ms_entre = np.where(ms_entre <= umbral, 0.0, ms_entre)
+        ms_dentro = np.where(ms_dentro <= umbral, 0.0, ms_dentro)
+
+        # n0 para tests de distinto tamaño (con un estrato: (N − Σn²/N) / (k − 1))
+        n0 = (n_total - np.nansum(n2_estrato / n_estrato, axis=1)) / gl_entre
+        sigma2_entre = np.maximum(0.0, (ms_entre - ms_dentro) / n0)
+        icc = sigma2_entre / (sigma2_entre + ms_dentro)
+        # Tamaño medio de test ponderado por filas (Kish): Σn² / N
+        n_medio = (conteos_ @ (n * n)) / n_total
+        efecto_diseno = 1 + (n_medio - 1) * icc
+        estadistico_f = np.where(ms_dentro > 0, ms_entre / ms_dentro, np.where(ms_entre > 0, np.inf, np.nan))
+        p_f = np.where(ms_dentro > 0, distribucion_f.sf(estadistico_f, gl_entre, gl_dentro), np.nan)
+    resultado = {
+        'n': n_total,
+        'tests': k,
+        'n_medio': n_medio,
+        'n0': n0,
+        'ms_entre': ms_entre,
+        'ms_dentro': ms_dentro,
+        'sigma2_entre': sigma2_entre,
+        'sigma2_dentro': ms_dentro,
+        'icc': icc,
+        'efecto_diseno': efecto_diseno,
+        'n_efectivo': n_total / efecto_diseno,
+        'f': estadistico_f,
+        'p_f': p_f,
+    }
+    return resultado if conteos is not None else {clave: valor[0] for clave, valor in resultado.items()}
+
+
+def descomponer(acumuladores, grupos=GRUPOS):
+    """
+    Una fila por (ámbito, métrica): cada grupo por separado y ambos juntos
+    con los tests anidados en su grupo (AMBITO_CONJUNTO).
+    """
+    codigo_grupo = np.select([acumuladores.grupo(g) for g in grupos], range(len(grupos)), default=-1)
+    ambitos = [(grupo, codigo_grupo == i) for i, grupo in enumerate(grupos)]
+    ambitos.append((AMBITO_CONJUNTO, codigo_grupo >= 0))
+
+    partes = []
+    for ambito, mascara in ambitos:
+        resultado = componentes_varianza(acumuladores.n[mascara], acumuladores.media[mascara],
+                                         acumuladores.m2[mascara], codigo_grupo[mascara])
+        partes.append(pd.DataFrame({'ambito': ambito, 'metrica': acumuladores.metricas, **resultado}))
+    tabla = pd.concat(partes, ignore_index=True)
+    tabla[['n', 'tests']] = tabla[['n', 'tests']].astype(np.int64)
+    return tabla
+
+# ==================================================================================
+# BOOTSTRAP POR CONGLOMERADOS
+# ==================================================================================
+
+def estadisticos_conglomerado(conteos, acumuladores, codigo_grupo):
+    """
+    Estadísticos de un bloque de remuestreos de tests; `conteos` (B × tests)
+    dice cuántas veces entra cada test. Un test repetido cuenta como
+    conglomerados distintos con los mismos acumuladores.
+    """
+    n = np.where(acumuladores.n > 0, acumuladores.n, 0.0)
+    media = np.nan_to_num(acumuladores.media)
+    medias, medias_test = [], []
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(2):
+            c = np.where(codigo_grupo == i, conteos, 0.0)
+            medias.append((c @ (n * media)) / (c @ n))
+            medias_test.append((c @ media) / c.sum(axis=1)[:, None])
+    usados = codigo_grupo >= 0
+    componentes = componentes_varianza(acumuladores.n[usados], acumuladores.media[usados],
+                                       acumuladores.m2[usados], codigo_grupo[usados], conteos[:, usados])
+    return {
+        'diferencia_medias': medias[0] - medias[1],
+        'diferencia_medias_test': medias_test[0] - medias_test[1],
+        'icc': componentes['icc'],
+        'efecto_diseno': componentes['efecto_diseno'],
+    }
+
+
+def error_estandar_filas(acumuladores, codigo_grupo):
+    """Error estándar de la diferencia de medias tratando las filas como independientes"""
+    varianza_media = []
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(2):
+            mascara = codigo_grupo == i
+            n, media, m2 = acumuladores.n[mascara], acumuladores.media[mascara], acumuladores.m2[mascara]
+            n_grupo = n.sum(axis=0)
+            media_grupo = np.nansum(n * media, axis=0) / n_grupo
+            m2_total = np.nansum(m2 + n * (media - media_grupo) ** 2, axis=0)
+            varianza_media.append(m2_total / (n_grupo - 1) / n_grupo)
+    return np.sqrt(varianza_media[0] + varianza_media[1])
+
+
+def bootstrap_por_test(acumuladores, n_remuestreos=N_REMUESTREOS, confianza=NIVEL_CONFIANZA,
+                       semilla=SEMILLA, grupos=GRUPOS):
+    """
+    IC percentil remuestreando tests con reposición dentro de cada grupo.
+    Una fila por (metrica, estadistico) con estimado, error_estandar,
+    ic_inf, ic_sup y n_remuestreos; diferencia_medias lleva además
+    error_estandar_filas (filas independientes) para comparar.
+    """
+    codigo_grupo = np.select([acumuladores.grupo(g) for g in grupos], [0, 1], default=-1)
+    tests_grupo = [np.flatnonzero(codigo_grupo == i) for i in range(2)]
+    n_tests = len(acumuladores)
+    estimados = estadisticos_conglomerado((codigo_grupo >= 0)[None, :].astype(np.float64),
+                                          acumuladores, codigo_grupo)
+
+    bloque = max(1, ELEMENTOS_POR_BLOQUE // max(1, n_tests * len(acumuladores.metricas)))
+    tamanos = [min(bloque, n_remuestreos - inicio) for inicio in range(0, n_remuestreos, bloque)]
+    partes = []
+    for semilla_bloque, tamano in zip(np.random.SeedSequence(semilla).spawn(len(tamanos)), tamanos):
+        rng = np.random.default_rng(semilla_bloque)
+        conteos = np.zeros((tamano, n_tests))
+        for indices in tests_grupo:
+            k = len(indices)
+            conteos[:, indices] = rng.multinomial(k, np.full(k, 1 / k), size=tamano)
+        partes.append(estadisticos_conglomerado(conteos, acumuladores, codigo_grupo))
+
+    filas = []
+    for nombre in ESTADISTICOS_CONGLOMERADO:
+        distribucion = np.concatenate([p[nombre] for p in partes])
+        inf, sup = intervalo_percentil(distribucion, confianza)
+        parte = pd.DataFrame({
+            'metrica': acumuladores.metricas,
+            'estadistico': nombre,
+            'estimado': estimados[nombre][0],
+            'error_estandar': distribucion.std(axis=0, ddof=1),
+            'ic_inf': inf,
+            'ic_sup': sup,
+            'n_remuestreos': n_remuestreos,
+        })
+        if nombre == 'diferencia_medias':
+            parte['error_estandar_filas'] = error_estandar_filas(acumuladores, codigo_grupo)
+        filas.append(parte)
+    resultado = pd.concat(filas, ignore_index=True)
+    orden = {m: i for i, m in enumerate(acumuladores.metricas)}
+    return resultado.sort_values('metrica', key=lambda s: s.map(orden), kind='stable').reset_index(drop=True)
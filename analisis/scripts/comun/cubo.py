@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+CUBO ESTRATIFICADO: BATERÍA DE PRUEBAS POR ESTRATO Y CORRECCIÓN CONJUNTA
+=========================================================================
+Los PASOS inferenciales solo comparan Manual vs IA con Unitarias y
+Funcionales juntas; el desglose por categoría era solo descriptivo. Este
+motor recorre todos los estratos de unas claves cualesquiera (category,
+test_pair, ...) en una sola pasada por métrica, sin bucles por estrato:
+
+  • Código de celda = estrato · 2 + grupo. n, media y varianza de todas las
+    celdas salen de np.bincount (dos pasadas: media y suma de cuadrados).
+  • t de Student y Welch vectorizadas sobre los estratos (comun.hipotesis).
+  • Mann-Whitney: un lexsort por métrica da los rangos dentro de cada
+    estrato (comun.rangos); la suma de rangos de Manual por estrato es otro
+    bincount.
+  • Brown-Forsythe (Levene con mediana): comun.homogeneidad.levene_por_estrato
+    con las mismas claves, para todas las métricas en una llamada.
+
+Las filas del cubo son (estrato, métrica, prueba); los estratos donde falta
+uno de los grupos quedan con p-value NaN y no cuentan en la corrección.
+ajustar_cubo() aplica Holm y Benjamini-Hochberg a todo el cubo a la vez,
+una familia por prueba.
+
+    cubo = cubo_estratificado(df, METRICAS, ['category', 'test_pair'])
+    cubo = ajustar_cubo(pd.concat([global_, por_categoria, cubo]))
+"""
+
+import numpy as np
+import pandas as pd
+
+from comun.descriptiva import codigos_combinados
+from comun.esquema import COLUMNAS_METRICAS
+from comun.hipotesis import TOLERANCIA_CONSTANTE, pruebas_t
+from comun.homogeneidad import levene_por_estrato
+from comun.multiples import METODOS, ajustar_tabla
+from comun.rangos import MAX_N_EXACTO, mann_whitney, mann_whitney_rangos, rangos_medios
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+GRUPOS = ['Manual', 'IA']
+PRUEBAS_CUBO = ['t_student', 'welch', 'mann_whitney', 'brown_forsythe']
+TODAS = '(todas)'
+
+# ==================================================================================
+# ESTADÍSTICOS POR CELDA
+# ==================================================================================
+
+def suficientes_por_celda(valores, celdas, n_celdas):
+    """(n, media, varianza ddof=1) por celda con dos bincounts"""
+    n = np.bincount(celdas, minlength=n_celdas)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.bincount(celdas, weights=valores, minlength=n_celdas) / n
+        desvio = valores - media[celdas]
+        varianza = np.bincount(celdas, weights=desvio * desvio, minlength=n_celdas) / (n - 1)
+        # Las coberturas repetidas idénticas dejan un residuo de redondeo, no varianza
+        varianza = np.where(varianza <= (TOLERANCIA_CONSTANTE * np.abs(media)) ** 2, 0.0, varianza)
+    return n, media, varianza
+
+
+def mann_whitney_por_estrato(valores, estratos, es_manual, n_manual, n_ia, n_estratos):
+    """Mann-Whitney de cada estrato con un único lexsort de la métrica"""
+    rangos, _, empates = rangos_medios(valores, estratos)
+    empates = np.concatenate([empates, np.zeros(n_estratos - len(empates))])
+    suma_manual = np.bincount(estratos[es_manual], weights=rangos[es_manual], minlength=n_estratos)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        resultado = mann_whitney_rangos(suma_manual, n_manual, n_ia, empates)
+
+    # Estratos pequeños sin empates: p-value exacto, como comun.rangos.mann_whitney
+    exactos = np.flatnonzero(((n_manual <= MAX_N_EXACTO) | (n_ia <= MAX_N_EXACTO))
+                             & (n_manual > 0) & (n_ia > 0) & (empates == 0))
+    if len(exactos):
+        orden = np.argsort(estratos, kind='stable')
+        limites = np.searchsorted(estratos[orden], np.arange(n_estratos + 1))
+        for e in exactos:
+            filas = orden[limites[e]:limites[e + 1]]
+            resultado['p_value'][e] = mann_whitney(valores[filas][es_manual[filas]],
+                                                   valores[filas][~es_manual[filas]])['p_value']
+    return resultado
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def cubo_estratificado(df, metricas=COLUMNAS_METRICAS, claves=(), columna_grupo='group', grupos=GRUPOS):
+    """
+    Una fila por (estrato de `claves`, métrica, prueba) con n y media de
+    cada grupo, estadistico, p_value y tamaño de efecto (d de Cohen para
+    las t, biserial de rangos para Mann-Whitney). Manual = grupos[0].
+    Con claves=() el único estrato es la muestra completa.
+    """
+    claves = list(claves)
+    codigos_estrato, etiquetas = codigos_combinados(df, claves)
+    n_estratos = len(etiquetas)
+    grupo = df[columna_grupo].astype(str).to_numpy()
+    codigo_grupo = np.select([grupo == grupos[0], grupo == grupos[1]], [0, 1], default=-1)
+    base = (codigos_estrato >= 0) & (codigo_grupo >= 0)
+
+    etiquetas = etiquetas.reset_index(drop=True)
+    levene = levene_por_estrato(df, metricas, claves, columna_grupo, grupos, centros=['mediana'])
+    partes = []
+    for metrica in metricas:
+        valores = df[metrica].to_numpy(dtype=np.float64)
+        filas = np.flatnonzero(base & ~np.isnan(valores))
+        v = valores[filas]
+        estratos = codigos_estrato[filas].astype(np.int64)
+        es_manual = codigo_grupo[filas] == 0
+        celdas = estratos * 2 + codigo_grupo[filas]
+
+        n, media, varianza = suficientes_por_celda(v, celdas, n_estratos * 2)
+        n1, n2 = n[0::2], n[1::2]
+        t = pruebas_t(n1, media[0::2], varianza[0::2], n2, media[1::2], varianza[1::2])
+        mw = mann_whitney_por_estrato(v, estratos, es_manual, n1, n2, n_estratos)
+        bf = levene[levene['metrica'] == metrica]
+
+        comunes = etiquetas.assign(metrica=metrica, n_manual=n1, n_ia=n2,
+                                   media_manual=media[0::2], media_ia=media[1::2])
+        resultados = {
+            't_student': (t['t_student'], t['p_t_student'], t['cohens_d']),
+            'welch': (t['t_welch'], t['p_welch'], t['cohens_d']),
+            'mann_whitney': (mw['estadistico'], mw['p_value'], mw['biserial']),
+            'brown_forsythe': (bf['estadistico'].to_numpy(), bf['p_value'].to_numpy(), np.full(n_estratos, np.nan)),
+        }
+        for prueba in PRUEBAS_CUBO:
+            estadistico, p_value, efecto = resultados[prueba]
+            # Sin los dos grupos en el estrato no hay comparación
+            completo = (n1 > 0) & (n2 > 0)
+            partes.append(comunes.assign(prueba=prueba,
+                                         estadistico=np.where(completo, estadistico, np.nan),
+                                         p_value=np.where(completo, p_value, np.nan),
+                                         efecto=np.where(completo, efecto, np.nan)))
+    cubo = pd.concat(partes, ignore_index=True)
+    orden = claves + ['metrica', 'prueba']
+    return cubo[orden + [c for c in cubo.columns if c not in orden]]
+
+
+def ajustar_cubo(cubo, metodos=METODOS, familias=('prueba',)):
+    """Holm / Benjamini-Hochberg sobre todo el cubo, una familia por prueba"""
+    return ajustar_tabla(cubo.reset_index(drop=True), familias=familias, metodos=metodos)
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+ESTADÍSTICA DESCRIPTIVA POR CONJUNTOS DE AGRUPACIÓN (ROLLUP / CUBE)
+====================================================================
+Un solo kernel para todas las tablas descriptivas (global, por categoría,
+por clase...): en lugar de filtrar el DataFrame completo por cada
+combinación de grupo y calcular cada cuantil por separado,
+
+  1. cada métrica se ordena una sola vez por valor (argsort, O(n log n));
+  2. para cada conjunto de claves, un argsort estable de los códigos de
+     grupo sobre ese orden deja los valores ordenados dentro de cada grupo;
+  3. mínimo, máximo, mediana, Q1 y Q3 se leen por posición en cada tramo
+     (interpolación lineal, igual que pandas.Series.quantile); conteo, media
+     y M2 salen de np.add.reduceat sobre los tramos de cada grupo.
+
+El resultado de cada conjunto tiene el mismo formato que
+MomentosEnLinea.tabla(): índice (claves..., metrica) y columnas n, media,
+mediana, desv_est, min, max, q1, q3, iqr. Los NaN se ignoran como en pandas.
+
+    tablas = descriptiva_por_conjuntos(df, rollup(['category', 'group']))
+    tablas[('category', 'group')], tablas[('category',)], tablas[()]
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from comun.esquema import COLUMNAS_METRICAS
+from comun.indice import codigos_columna
+
+ESTADISTICOS = ['n', 'media', 'mediana', 'desv_est', 'min', 'max', 'q1', 'q3', 'iqr']
+
+# ==================================================================================
+# CONJUNTOS DE AGRUPACIÓN
+# ==================================================================================
+
+def rollup(claves):
+    """[a, b, c] → [a, b, c], [a, b], [a], []"""
+    claves = list(claves)
+    return [claves[:k] for k in range(len(claves), -1, -1)]
+
+
+def cubo(claves):
+    """Todos los subconjuntos de `claves`, del más fino al total"""
+    claves = list(claves)
+    return [list(c) for k in range(len(claves), -1, -1) for c in combinations(claves, k)]
+
+
+def tipo_codigo(n_grupos):
+    """Entero con signo más pequeño para n_grupos códigos (y -1): con 16 bits o
+    menos, el argsort estable de numpy es radix sort, O(n)"""
+    return np.int16 if n_grupos < np.iinfo(np.int16).max else np.int64
+
+
+def codigos_combinados(df, claves, cache=None):
+    """
+    Código denso por fila de la combinación de `claves` (-1 si alguna clave
+    es nula) y DataFrame con las etiquetas de cada código, en orden. `cache`
+    guarda los códigos de cada columna para reutilizarlos entre conjuntos.
+    """
+    if not claves:
+        return np.zeros(len(df), dtype=np.int16), pd.DataFrame(index=range(1))
+
+    cache = {} if cache is None else cache
+    combinado = np.zeros(len(df), dtype=np.int64)
+    nulos = np.zeros(len(df), dtype=bool)
+    niveles = []
+    for col in claves:
+        if col not in cache:
+            cache[col] = codigos_columna(df[col])
+        codigos, categorias = cache[col]
+        nulos |= codigos < 0
+        combinado = combinado * len(categorias) + codigos
+        niveles.append(np.asarray(categorias, dtype=object))
+
+    unicos, inversa = np.unique(combinado[~nulos], return_inverse=True)
+    codigos = np.full(len(df), -1, dtype=tipo_codigo(len(unicos)))
+    codigos[~nulos] = inversa
+
+    etiquetas, resto = {}, unicos
+    for col, categorias in reversed(list(zip(claves, niveles))):
+        resto, codigo = np.divmod(resto, len(categorias))
+        etiquetas[col] = categorias[codigo]
+    return codigos, pd.DataFrame({col: etiquetas[col] for col in claves})
+
+# ==================================================================================
+# KERNEL
+# ==================================================================================
+
+def cuantil_en_tramos(valores, inicio, n, q):
+    """Cuantil q con interpolación lineal de cada tramo ordenado [inicio, inicio + n)"""
+    h = (n - 1) * q
+    bajo = np.floor(h).astype(np.int64)
+    alto = np.minimum(bajo + 1, n - 1)
+    v_bajo = valores[inicio + bajo]
+    return v_bajo + (h - bajo) * (valores[inicio + alto] - v_bajo)
+
+
+def momentos_por_tramo(x, codigos, orden_grupos, inicios):
+    """
+    n, media y M2 de cada grupo con np.add.reduceat sobre las filas en su
+    orden original (tramos contiguos por grupo). reduceat suma por pares como
+    np.sum, así que el resultado coincide con Series.mean/std dentro de la
+    tolerancia de punto flotante (no bit a bit). Sin filas (df vacío o claves
+    todas nulas) todos los grupos quedan con n = 0.
+    """
+    if len(orden_grupos) == 0:
+        vacio = np.full(len(inicios), np.nan)
+        return np.zeros(len(inicios), dtype=np.int64), vacio, vacio.copy()
+    valores = x[orden_grupos]
+    validos = ~np.isnan(valores)
+    valores = np.where(validos, valores, 0.0)
+    n = np.add.reduceat(validos.astype(np.int64), inicios)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.add.reduceat(valores, inicios) / n
+        desvios = np.where(validos, (media[codigos[orden_grupos]] - valores) ** 2, 0.0)
+        m2 = np.add.reduceat(desvios, inicios)
+    return n, media, m2
+
+
+def estadisticos_grupo(x, orden_valor, codigos, orden_grupos, inicios):
+    """
+    Estadísticos de un conjunto de claves para una métrica. Los cuantiles se
+    leen de `orden_valor` reordenado de forma estable por código de grupo.
+    Devuelve (presentes, dict de arrays) solo para los grupos con n > 0.
+    """
+    n, media, m2 = momentos_por_tramo(x, codigos, orden_grupos, inicios)
+    presentes = n > 0
+
+    codigos_valor = codigos[orden_valor]
+    validos = codigos_valor >= 0
+    orden = orden_valor[validos][np.argsort(codigos_valor[validos], kind='stable')]
+    ordenados = x[orden]
+    fin = np.cumsum(n)
+    inicio = fin - n
+
+    n_p, inicio_p = n[presentes], inicio[presentes]
+    q1 = cuantil_en_tramos(ordenados, inicio_p, n_p, 0.25)
+    q3 = cuantil_en_tramos(ordenados, inicio_p, n_p, 0.75)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        desv_est = np.where(n > 1, np.sqrt(m2 / np.maximum(n - 1, 1)), np.nan)
+    return presentes, {
+        'n': n_p,
+        'media': media[presentes],
+        'mediana': cuantil_en_tramos(ordenados, inicio_p, n_p, 0.5),
+        'desv_est': desv_est[presentes],
+        'min': ordenados[inicio_p],
+        'max': ordenados[fin[presentes] - 1],
+        'q1': q1,
+        'q3': q3,
+        'iqr': q3 - q1,
+    }
+
+
+def descriptiva_por_conjuntos(df, conjuntos, metricas=COLUMNAS_METRICAS):
+    """
+    Tablas descriptivas de `metricas` para cada conjunto de claves de
+    `conjuntos`. Devuelve {tuple(claves): tabla}.
+    """
+    grupos, cache = {}, {}
+    for conjunto in conjuntos:
+        codigos, etiquetas = codigos_combinados(df, list(conjunto), cache)
+        orden_grupos = np.argsort(codigos, kind='stable')
+        orden_grupos = orden_grupos[codigos[orden_grupos] >= 0]
+        inicios = np.searchsorted(codigos[orden_grupos], np.arange(len(etiquetas)))
+        grupos[tuple(conjunto)] = (codigos, etiquetas, orden_grupos, inicios)
+    partes = {clave: [] for clave in grupos}
+
+    for metrica in metricas:
+        x = df[metrica].to_numpy(dtype=np.float64)
+        orden_valor = np.argsort(x, kind='stable')
+        orden_valor = orden_valor[~np.isnan(x[orden_valor])]
+
+        for clave, (codigos, etiquetas, orden_grupos, inicios) in grupos.items():
+            presentes, estadisticos = estadisticos_grupo(x, orden_valor, codigos, orden_grupos, inicios)
+            parte = etiquetas[presentes].reset_index(drop=True)
+            parte['metrica'] = metrica
+            for nombre in ESTADISTICOS:
+                parte[nombre] = estadisticos[nombre]
+            partes[clave].append(parte)
+
+    tablas = {}
+    for clave, lista in partes.items():
+        tabla = pd.concat(lista, ignore_index=True).set_index(list(clave) + ['metrica'])
+        tablas[clave] = tabla.sort_index()
+    return tablas
+
+
+def tabla_descriptiva(df, claves, metricas=COLUMNAS_METRICAS):
+    """Tabla descriptiva de un único conjunto de claves"""
+    return descriptiva_por_conjuntos(df, [claves], metricas)[tuple(claves)]
+
+
+def ordenar_filas(tabla, orden):
+    """
+    Filas de `tabla` como columnas planas, ordenadas por `orden`: lista de
+    (columna, valores) donde valores fija el orden de esa columna (las filas
+    con valores fuera de la lista se descartan) o None para el orden natural.
+    """
+    filas = tabla.reset_index()
+    rangos = []
+    for col, valores in orden:
+        columna = filas[col].astype(object)
+        rango = columna if valores is None else columna.map({v: i for i, v in enumerate(valores)})
+        rangos.append(rango.rename(f'_rango_{col}'))
+    rangos = pd.concat(rangos, axis=1).dropna()
+    orden_filas = rangos.sort_values(list(rangos.columns), kind='stable').index
+    return filas.loc[orden_filas].reset_index(drop=True)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+DELTA DE CLIFF Y TAMAÑOS DE EFECTO DE DOMINANCIA EN O(n log n)
+===============================================================
+La δ de Cliff y el tamaño de efecto de lenguaje común (CLES) comparan
+cada par (Manual, IA): con 1600 × 880 filas son 1.4 millones de pares por
+métrica. Aquí no se forma ningún par:
+
+  • Una sola ordenación de la muestra conjunta (np.unique) da la rejilla
+    de valores distintos y, por grupo, cuántas filas caen en cada valor.
+  • Con la suma acumulada de IA sobre la rejilla, cada valor de Manual sabe
+    cuántas filas de IA tiene por debajo, empatadas y por encima:
+    P(X > Y), P(X = Y) y P(X < Y) salen de tres productos escalares.
+  • El bootstrap remuestrea sobre la MISMA rejilla ordenada: remuestrear
+    filas con reposición equivale a sortear conteos por valor (multinomial),
+    así que cada remuestreo cuesta O(valores distintos) y no vuelve a
+    ordenar nada. El jackknife del BCa también es cerrado: quitar una
+    fila de un valor resta lo que ese valor aportaba.
+
+Las métricas de cobertura tienen pocos valores distintos (el mismo valor
+en cada iteración de un test), así que la rejilla es mucho menor que n.
+
+    δ = P(X > Y) − P(X < Y)            (= correlación biserial de rangos)
+    CLES = P(X > Y) + P(X = Y) / 2     (= U / (n1·n2))
+
+Convención de signo igual que PASO 3: X = Manual, Y = IA.
+
+    tabla = dominancia_por_estrato(df, METRICAS, claves=['category'])
+"""
+
+import numpy as np
+import pandas as pd
+
+from comun.bootstrap import (N_REMUESTREOS, NIVEL_CONFIANZA, SEMILLA, ELEMENTOS_POR_BLOQUE,
+                             intervalo_bca, intervalo_percentil)
+from comun.esquema import COLUMNAS_METRICAS
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+ESTADISTICOS = ['cliffs_delta', 'cles']
+
+# Se remuestrea con multinomiales si hay al menos este factor de filas por valor distinto
+FRACCION_MULTINOMIAL = 8
+
+# Umbrales de |δ| de Romano et al. (2006)
+CORTES_CLIFF = [0.147, 0.33, 0.474]
+ETIQUETAS_CLIFF = ['Negligible', 'Pequeño', 'Mediano', 'Grande']
+
+# ==================================================================================
+# REJILLA ORDENADA
+# ==================================================================================
+
+def rejilla(x, y):
+    """
+    Conteos de x e y sobre los valores distintos de la muestra conjunta
+    (ordenados). Los NaN se descartan.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x, y = x[~np.isnan(x)], y[~np.isnan(y)]
+    valores, codigos = np.unique(np.concatenate([x, y]), return_inverse=True)
+    conteo_x = np.bincount(codigos[:len(x)], minlength=len(valores)).astype(np.float64)
+    conteo_y = np.bincount(codigos[len(x):], minlength=len(valores)).astype(np.float64)
+    return valores, conteo_x, conteo_y
+
+
+def por_debajo(conteo):
+    """Para cada valor de la rejilla, cuántas filas tiene estrictamente por debajo (eje -1)"""
+    acumulado = np.cumsum(conteo, axis=-1)
+    return acumulado - conteo
+
+
+def probabilidades(conteo_x, conteo_y):
+    """
+    (P(X > Y), P(X = Y), P(X < Y)) a partir de los conteos sobre la rejilla.
+    Acepta conteos (K,) o lotes (B × K).
+    """
+    n_x = conteo_x.sum(axis=-1)
+    n_y = conteo_y.sum(axis=-1)
+    debajo_y = por_debajo(conteo_y)
+    encima_y = n_y[..., None] - debajo_y - conteo_y
+    pares = n_x * n_y
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mayor = (conteo_x * debajo_y).sum(axis=-1) / pares
+        empate = (conteo_x * conteo_y).sum(axis=-1) / pares
+        menor = (conteo_x * encima_y).sum(axis=-1) / pares
+    return mayor, empate, menor
+
+
+def estadisticos(mayor, empate, menor):
+    return {'cliffs_delta': mayor - menor, 'cles': mayor + empate / 2}
+
+# ==================================================================================
+# BOOTSTRAP SOBRE LA REJILLA
+# ==================================================================================
+
+def remuestrear_conteos(rng, conteo, n_bloque):
+    """
+    n_bloque remuestreos con reposición expresados como conteos (n_bloque × K).
+    Con pocos valores distintos se sortea una multinomial por remuestreo; si
+    casi todos son distintos es más barato sortear posiciones de la rejilla
+    y contarlas con un único bincount.
+    """
+    n, k = int(conteo.sum()), len(conteo)
+    if k * FRACCION_MULTINOMIAL <= n:
+        return rng.multinomial(n, conteo / n, size=n_bloque).astype(np.float64)
+    codigos = np.repeat(np.arange(k), conteo.astype(np.int64))
+    sorteo = codigos[rng.integers(0, n, size=(n_bloque, n))] + np.arange(n_bloque)[:, None] * k
+    return np.bincount(sorteo.ravel(), minlength=n_bloque * k).reshape(n_bloque, k).astype(np.float64)
+
+
+def distribucion_bootstrap(conteo_x, conteo_y, n_remuestreos=N_REMUESTREOS, semilla=SEMILLA):
+    """
+    {estadístico: array (n_remuestreos,)}. Cada remuestreo son conteos de x
+    e y sobre la rejilla, en bloques con su propio hijo de SeedSequence(semilla).
+    """
+    ancho = max(len(conteo_x), int(conteo_x.sum()), int(conteo_y.sum()))
+    bloque = max(1, ELEMENTOS_POR_BLOQUE // (2 * ancho))
+    tamanos = [min(bloque, n_remuestreos - inicio) for inicio in range(0, n_remuestreos, bloque)]
+    partes = {nombre: [] for nombre in ESTADISTICOS}
+    for semilla_bloque, n_bloque in zip(np.random.SeedSequence(semilla).spawn(len(tamanos)), tamanos):
+        rng = np.random.default_rng(semilla_bloque)
+        remuestreo_x = remuestrear_conteos(rng, conteo_x, n_bloque)
+        remuestreo_y = remuestrear_conteos(rng, conteo_y, n_bloque)
+        for nombre, valores in estadisticos(*probabilidades(remuestreo_x, remuestreo_y)).items():
+            partes[nombre].append(valores)
+    return {nombre: np.concatenate(valores) for nombre, valores in partes.items()}
+
+
+def jackknife(conteo_x, conteo_y):
+    """
+    {estadístico: array (n_x + n_y,)}: el estadístico dejando fuera cada fila
+    de x y luego cada fila de y. Quitar una fila de un valor solo cambia los
+    pares de ese valor, así que cada caso es una resta.
+    """
+    n_x, n_y = conteo_x.sum(), conteo_y.sum()
+    debajo_x, debajo_y = por_debajo(conteo_x), por_debajo(conteo_y)
+    encima_x, encima_y = n_x - debajo_x - conteo_x, n_y - debajo_y - conteo_y
+    mayor = (conteo_x * debajo_y).sum()
+    empate = (conteo_x * conteo_y).sum()
+    menor = (conteo_x * encima_y).sum()
+
+    # Sin una fila de x en cada valor / sin una fila de y en cada valor
+    casos = [
+        (conteo_x, mayor - debajo_y, empate - conteo_y, menor - encima_y, (n_x - 1) * n_y),
+        (conteo_y, mayor - encima_x, empate - conteo_x, menor - debajo_x, n_x * (n_y - 1)),
+    ]
+    partes = {nombre: [] for nombre in ESTADISTICOS}
+    for conteo, mayor_k, empate_k, menor_k, pares in casos:
+        repeticiones = conteo.astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valores = estadisticos(mayor_k / pares, empate_k / pares, menor_k / pares)
+        for nombre in ESTADISTICOS:
+            partes[nombre].append(np.repeat(valores[nombre], repeticiones))
+    return {nombre: np.concatenate(valores) for nombre, valores in partes.items()}
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def interpretar_cliff(delta):
+    """Etiqueta de magnitud de |δ| según CORTES_CLIFF ('N/A' si δ no es finito: grupo vacío)"""
+    if not np.isfinite(delta):
+        return 'N/A'
+    return ETIQUETAS_CLIFF[int(np.searchsorted(CORTES_CLIFF, abs(delta), side='right'))]
+
+
+def dominancia(x, y, n_remuestreos=N_REMUESTREOS, confianza=NIVEL_CONFIANZA, semilla=SEMILLA):
+    """
+    P(X > Y), P(X = Y), P(X < Y), δ de Cliff y CLES de dos muestras, con IC
+    bootstrap percentil y BCa de δ y CLES (n_remuestreos=0 los omite).
+    """
+    _, conteo_x, conteo_y = rejilla(x, y)
+    mayor, empate, menor = probabilidades(conteo_x, conteo_y)
+    estimados = estadisticos(mayor, empate, menor)
+    fila = {
+        'n_manual': int(conteo_x.sum()),
+        'n_ia': int(conteo_y.sum()),
+        'valores_distintos': len(conteo_x),
+        'p_mayor': mayor,
+        'p_empate': empate,
+        'p_menor': menor,
+        'cliffs_delta': estimados['cliffs_delta'],
+        'cles': estimados['cles'],
+        'interpretacion': interpretar_cliff(estimados['cliffs_delta']),
+    }
+    if n_remuestreos and conteo_x.sum() > 1 and conteo_y.sum() > 1:
+        distribuciones = distribucion_bootstrap(conteo_x, conteo_y, n_remuestreos, semilla)
+        valores_jackknife = jackknife(conteo_x, conteo_y)
+        for nombre in ESTADISTICOS:
+            distribucion = distribuciones[nombre][:, None]
+            inf_p, sup_p = intervalo_percentil(distribucion, confianza)
+            inf_bca, sup_bca = intervalo_bca(distribucion, np.array([estimados[nombre]]),
+                                             valores_jackknife[nombre][:, None], confianza)
+            fila.update({
+                f'{nombre}_ic_inf_percentil': inf_p[0], f'{nombre}_ic_sup_percentil': sup_p[0],
+                f'{nombre}_ic_inf_bca': inf_bca[0], f'{nombre}_ic_sup_bca': sup_bca[0],
+            })
+    return fila
+
+
+def dominancia_por_estrato(df, metricas=COLUMNAS_METRICAS, claves=(), columna_grupo='group',
+                           **opciones):
+    """
+    Una fila por (estrato, métrica) con la dominancia de Manual frente a IA.
+    Con claves=() es la comparación global; con ['category'], una por
+    categoría. El estrato se agrupa una vez y cada métrica se ordena una vez.
+    """
+    claves = list(claves)
+    filas = []
+    estratos = df.groupby(claves, sort=False, observed=True) if claves else [((), df)]
+    for estrato, datos in estratos:
+        estrato = estrato if isinstance(estrato, tuple) else (estrato,)
+        es_manual = (datos[columna_grupo] == 'Manual').to_numpy()
+        es_ia = (datos[columna_grupo] == 'IA').to_numpy()
+        for metrica in metricas:
+            valores = datos[metrica].to_numpy(dtype=np.float64)
+            fila = dict(zip(claves, estrato), metrica=metrica)
+            fila.update(dominancia(valores[es_manual], valores[es_ia], **opciones))
+            filas.append(fila)
+    return pd.DataFrame(filas)
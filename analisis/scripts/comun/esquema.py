@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+ESQUEMA CANÓNICO DE LOS REGISTROS DE ITERACIÓN
+===============================================
+Tipos compactos para el DataFrame consolidado:
+
+  • test_class, group, test_name, category, test_method → category
+    (códigos enteros + diccionario); los filtros `df['group'] == 'IA'`
+    comparan códigos.
+  • iteration → int16; total_mutations, mutations_killed → int32
+    (se amplían automáticamente si algún valor no cabe).
+  • Métricas → float64 por defecto, float32 opcional.
+
+Las pruebas estadísticas deben seguir calculándose sobre float64 cuando se
+usa float32 para almacenar (scipy promociona internamente).
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS = ['test_class', 'group', 'test_name', 'iteration', 'time_seconds', 'instr_pct',
+            'branch_pct', 'total_mutations', 'mutations_killed', 'mutation_score', 'category']
+
+# Método de prueba original del CSV por clase (test_name es el nombre del archivo, como
+# en 01_PASO1); no existe en consolidados antiguos, por eso no forma parte de COLUMNAS
+COLUMNA_METODO = 'test_method'
+
+COLUMNAS_CATEGORICAS = ['test_class', 'group', 'test_name', 'category', COLUMNA_METODO]
+
+COLUMNAS_ENTERAS = {
+    'iteration': np.int16,
+    'total_mutations': np.int32,
+    'mutations_killed': np.int32,
+}
+
+COLUMNAS_METRICAS = ['time_seconds', 'instr_pct', 'branch_pct', 'mutation_score']
+
+# Métricas medidas una vez por clase en cada iteración (JaCoCo y PIT sobre la clase):
+# todas las filas de método de una iteración repiten el mismo valor
+METRICAS_POR_CLASE = ['instr_pct', 'branch_pct', 'mutation_score']
+UNIDAD_CLASE = ['test_class', 'iteration']
+
+# Par Manual/IA de cada clase: el componente probado, sin el sufijo del autor
+# (ShowOwnerManualTest / OwnerControllerShowOwnerTestIA → ShowOwner)
+COLUMNA_PAR = 'test_pair'
+SUFIJO_CLASE = re.compile(r'(UnitManualTest|ManualTest|DiffblueTest|TestIA|IATest|Test)$')
+PREFIJO_CONTROLADOR = re.compile(r'^[A-Z][a-z]+Controller(?=[A-Z])')
+
+
+def entero_compacto(serie, dtype):
+    """
+    Convierte a `dtype` o al siguiente entero más ancho en el que quepan
+    los valores. Si hay valores nulos o no enteros se deja la serie como está.
+    """
+    if serie.isna().any() or not pd.api.types.is_numeric_dtype(serie):
+        return serie
+    valores = serie.to_numpy()
+    if valores.dtype.kind == 'f' and not np.all(np.mod(valores, 1) == 0):
+        return serie
+    minimo, maximo = (valores.min(), valores.max()) if len(valores) else (0, 0)
+    for candidato in (dtype, np.int32, np.int64):
+        info = np.iinfo(candidato)
+        if info.min <= minimo and maximo <= info.max:
+            return serie.astype(candidato)
+    return serie
+
+
+def par_de_clase(test_class):
+    """Componente probado por una clase de test (clave común a Manual e IA)"""
+    return PREFIJO_CONTROLADOR.sub('', SUFIJO_CLASE.sub('', str(test_class)))
+
+
+def agregar_par(df):
+    """
+    Añade COLUMNA_PAR (categórica) a partir de test_class, en el lugar. Se
+    evalúa una vez por categoría, no por fila.
+    """
+    clases = df['test_class'].astype('category')
+    pares, codigo_par = np.unique([par_de_clase(c) for c in clases.cat.categories], return_inverse=True)
+    codigos = clases.cat.codes.to_numpy()
+    codigos = np.where(codigos >= 0, codigo_par[np.maximum(codigos, 0)], -1)
+    df[COLUMNA_PAR] = pd.Categorical.from_codes(codigos, categories=pares)
+    return df
+
+
+def aplicar_esquema(df, float32=False, categoricas=True):
+    """
+    Aplica el esquema canónico a las columnas presentes en `df` (en el lugar)
+    y devuelve el mismo DataFrame.
+    """
+    if categoricas:
+        for col in COLUMNAS_CATEGORICAS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+
+    for col, dtype in COLUMNAS_ENTERAS.items():
+        if col in df.columns:
+            df[col] = entero_compacto(df[col], dtype)
+
+    if float32:
+        for col in COLUMNAS_METRICAS:
+            if col in df.columns:
+                df[col] = df[col].astype(np.float32)
+    return df
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+PRUEBAS ESTRATIFICADAS POR CATEGORÍA DE TEST
+=============================================
+03_PASO3B junta Unitarias (~0.002 s por test) y Funcionales (MockMvc, de
+otro orden de magnitud) en un solo Mann-Whitney: la diferencia de escala
+entre categorías se confunde con la diferencia Manual vs IA. Aquí cada
+comparación se hace dentro de la categoría y luego se combina:
+
+  • van Elteren: rangos dentro de cada categoría (la caché de rangos por
+    estrato de comun.rangos, calculada una vez por versión del dataset) y
+    U de cada categoría con peso 1 / (N + 1).
+  • t estratificada: diferencia de medias de cada categoría con pesos de
+    Cochran-Mantel-Haenszel, error estándar de Welch y gl de Satterthwaite
+    (comun.hipotesis).
+
+Las sumas por estrato son bincounts sobre los tramos contiguos de cada
+grupo en el almacén columnar; no se copia ni se reordena ninguna columna.
+
+    rangos = abrir_rangos('.')
+    tabla = pruebas_estratificadas(rangos, METRICAS, 'category')
+"""
+
+import numpy as np
+import pandas as pd
+
+from comun.esquema import COLUMNAS_METRICAS
+from comun.hipotesis import t_estratificada
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+GRUPOS = ['Manual', 'IA']
+ESTRATO = 'category'
+
+# ==================================================================================
+# ESTADÍSTICOS POR ESTRATO
+# ==================================================================================
+
+def suficientes_por_estrato(almacen, metrica, estrato, grupo):
+    """(n, media, varianza ddof=1) de un grupo por categoría de `estrato`"""
+    n_estratos = len(almacen.categorias(estrato))
+    tramo = almacen.tramo(group=grupo)
+    valores = np.asarray(almacen.columna(metrica)[tramo], dtype=np.float64)
+    codigos = np.asarray(almacen.columna(estrato)[tramo])
+    validos = ~np.isnan(valores) & (codigos >= 0)
+    valores, codigos = valores[validos], codigos[validos]
+    n = np.bincount(codigos, minlength=n_estratos)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.bincount(codigos, weights=valores, minlength=n_estratos) / n
+        desvio = valores - media[codigos]
+        varianza = np.bincount(codigos, weights=desvio * desvio, minlength=n_estratos) / (n - 1)
+    return n, media, varianza
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def pruebas_estratificadas(rangos, metricas=COLUMNAS_METRICAS, estrato=ESTRATO, grupos=GRUPOS):
+    """
+    Una fila por métrica con van Elteren y la t estratificada por `estrato`,
+    junto al Mann-Whitney sin estratificar para comparar. `rangos` es un
+    RangosAlmacen (comun.rangos.abrir_rangos).
+    """
+    almacen = rangos.almacen
+    filas = []
+    for metrica in metricas:
+        global_ = rangos.mann_whitney(metrica, *grupos)
+        ve = rangos.van_elteren(metrica, estrato, *grupos)
+        n1, media1, var1 = suficientes_por_estrato(almacen, metrica, estrato, grupos[0])
+        n2, media2, var2 = suficientes_por_estrato(almacen, metrica, estrato, grupos[1])
+        t = t_estratificada(n1, media1, var1, n2, media2, var2)
+        filas.append({
+            'metrica': metrica,
+            'estrato': estrato,
+            'n_estratos': int(ve['estratos_validos']),
+            'n_manual': int(n1.sum()),
+            'n_ia': int(n2.sum()),
+            'p_mann_whitney': global_['p_value'],
+            'biserial': global_['biserial'],
+            'van_elteren': ve['estadistico'],
+            'z_van_elteren': ve['z'],
+            'p_van_elteren': ve['p_value'],
+            'biserial_estratificada': ve['biserial'],
+            'diferencia_estratificada': t['diferencia'],
+            'error_estandar': t['error_estandar'],
+            't_estratificada': t['t'],
+            'gl': t['gl'],
+            'p_t_estratificada': t['p_value'],
+        })
+    return pd.DataFrame(filas)
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+ETAPA DE HIPÓTESIS MULTI-MÉTRICA CON SELECCIÓN DE PRUEBA POR LOS DATOS
+=======================================================================
+03_PASO3 elegía Welch con `if metrica == 'time_seconds'`, copiando a mano
+lo que 01_PASO1 y 02_PASO2 imprimían en sus matrices de decisiones. Aquí
+la decisión sale de los datos, para todas las métricas a la vez:
+
+  1. Supuestos una sola vez: Shapiro-Wilk por grupo (comun.normalidad) y
+     Levene centrado en la mediana (comun.homogeneidad).
+  2. Ruta por métrica, la misma regla de las matrices de PASO 1 y PASO 2:
+       ambos grupos normales + varianzas iguales  → t-Student
+       ambos grupos normales + varianzas distintas → t-Student Welch
+       algún grupo no normal                       → Mann-Whitney U
+  3. Las tres pruebas se calculan sobre los bloques (métricas × filas) de
+     cada grupo: las t con los estadísticos suficientes de cada fila
+     (n, media, varianza) y Mann-Whitney con un único lexsort de todas las
+     métricas (comun.rangos, una métrica por estrato). La tabla guarda las
+     tres y marca la seleccionada.
+
+    contraste = contrastar(df_promedios, METRICAS)
+    contraste[['metrica', 'prueba', 'estadistico', 'p_value']]
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as distribucion_t
+
+from comun.esquema import COLUMNAS_METRICAS
+from comun.homogeneidad import levene_por_estrato
+from comun.normalidad import pruebas_normalidad
+from comun.rangos import MAX_N_EXACTO, mann_whitney, mann_whitney_rangos, rangos_medios
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+ALFA = 0.05
+GRUPOS = ['Manual', 'IA']
+PRUEBAS_HIPOTESIS = ['t_student', 'welch', 'mann_whitney']
+NOMBRES_PRUEBA = {
+    't_student': 't-Student (estándar)',
+    'welch': 't-Student Welch',
+    'mann_whitney': 'Mann-Whitney U',
+}
+SIMBOLOS_ESTADISTICO = {'t_student': 't', 'welch': 't', 'mann_whitney': 'U'}
+TOLERANCIA_CONSTANTE = 1e-9
+
+# ==================================================================================
+# BLOQUES Y ESTADÍSTICOS SUFICIENTES
+# ==================================================================================
+
+def bloques_grupo(df, metricas, columna_grupo='group', grupos=GRUPOS):
+    """{grupo: bloque (métricas × filas)} con las filas de cada grupo"""
+    datos = df[list(metricas)].to_numpy(dtype=np.float64)
+    etiquetas = df[columna_grupo].astype(str).to_numpy()
+    return {grupo: np.ascontiguousarray(datos[etiquetas == grupo].T) for grupo in grupos}
+
+
+def suficientes(bloque):
+    """(n, media, varianza ddof=1) de cada fila, sin NaN"""
+    validos = ~np.isnan(bloque)
+    n = validos.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(validos, bloque, 0.0).sum(axis=1) / n
+        desvio = np.where(validos, bloque - media[:, None], 0.0)
+        varianza = (desvio * desvio).sum(axis=1) / (n - 1)
+    return n, media, varianza
+
+# ==================================================================================
+# PRUEBAS VECTORIZADAS
+# ==================================================================================
+
+def pruebas_t(n1, media1, var1, n2, media2, var2):
+    """
+    t de Student (varianza combinada) y de Welch, bilaterales, y d de Cohen
+    para arrays de estadísticos suficientes. Mismos valores que
+    scipy.stats.ttest_ind con equal_var=True / False; una varianza por
+    debajo de TOLERANCIA_CONSTANTE relativa a la media es residuo de
+    redondeo y cuenta como 0.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        var1 = np.where(var1 <= (TOLERANCIA_CONSTANTE * np.abs(media1)) ** 2, 0.0, var1)
+        var2 = np.where(var2 <= (TOLERANCIA_CONSTANTE * np.abs(media2)) ** 2, 0.0, var2)
+        diferencia = media1 - media2
+        # Dos grupos constantes con la misma media: no hay nada que contrastar
+        identicos = ((var1 == 0) & (var2 == 0)
+                     & (np.abs(diferencia) <= TOLERANCIA_CONSTANTE * np.maximum(np.abs(media1), np.abs(media2))))
+        diferencia = np.where(identicos, np.nan, diferencia)
+        gl_student = n1 + n2 - 2
+        var_combinada = ((n1 - 1) * var1 + (n2 - 1) * var2) / gl_student
+        t_student = diferencia / np.sqrt(var_combinada * (1 / n1 + 1 / n2))
+
+        e1, e2 = var1 / n1, var2 / n2
+        t_welch = diferencia / np.sqrt(e1 + e2)
+        gl_welch = (e1 + e2) ** 2 / (e1 ** 2 / (n1 - 1) + e2 ** 2 / (n2 - 1))
+        # Sin varianza en ningún grupo los gl quedan 0/0. Con medias distintas t = ±inf y p = 0
+        # con cualquier gl; con medias iguales t y p quedan NaN y no entran en la corrección
+        gl_welch = np.where((e1 + e2) > 0, gl_welch, gl_student)
+
+        desv_combinada = np.sqrt(var_combinada)
+        cohens_d = np.where(desv_combinada > 0, diferencia / desv_combinada, 0.0)
+    return {
+        't_student': t_student,
+        'p_t_student': 2 * distribucion_t.sf(np.abs(t_student), gl_student),
+        'gl_t_student': gl_student,
+        't_welch': t_welch,
+        'p_welch': 2 * distribucion_t.sf(np.abs(t_welch), gl_welch),
+        'gl_welch': gl_welch,
+        'cohens_d': cohens_d,
+    }
+
+
+def t_estratificada(n1, media1, var1, n2, media2, var2):
+    """
+    Diferencia de medias ponderada por estrato (último eje) con pesos
+    n1·n2 / (n1 + n2), los de Cochran-Mantel-Haenszel, y su t con error
+    estándar de Welch por estrato y gl de Satterthwaite. Los estratos con
+    menos de 2 valores en algún grupo no aportan.
+    """
+    validos = (n1 >= 2) & (n2 >= 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        peso = np.where(validos, n1 * n2 / (n1 + n2), 0.0)
+        peso = peso / peso.sum(axis=-1, keepdims=True)
+        componente_1 = np.where(validos, peso ** 2 * var1 / n1, 0.0)
+        componente_2 = np.where(validos, peso ** 2 * var2 / n2, 0.0)
+        diferencia = np.where(validos, peso * (media1 - media2), 0.0).sum(axis=-1)
+        varianza = (componente_1 + componente_2).sum(axis=-1)
+        gl = varianza ** 2 / np.where(validos, componente_1 ** 2 / (n1 - 1) + componente_2 ** 2 / (n2 - 1),
+                                      0.0).sum(axis=-1)
+        error_estandar = np.sqrt(varianza)
+        t = diferencia / error_estandar
+    return {
+        'diferencia': diferencia,
+        'error_estandar': error_estandar,
+        't': t,
+        'gl': gl,
+        'p_value': 2 * distribucion_t.sf(np.abs(t), gl),
+    }
+
+
+def mann_whitney_bloques(bloque_1, bloque_2):
+    """
+    Mann-Whitney de cada fila de dos bloques (métricas × filas) con un solo
+    lexsort: cada métrica es un estrato de comun.rangos. Con muestras
+    pequeñas sin empates el p-value es el exacto, como mann_whitney().
+    """
+    n_metricas = len(bloque_1)
+    conjunto = np.concatenate([bloque_1, bloque_2], axis=1)
+    estratos = np.repeat(np.arange(n_metricas), conjunto.shape[1])
+    rangos, n, empates = rangos_medios(conjunto.ravel(), estratos)
+    rangos = rangos.reshape(conjunto.shape)
+
+    n1 = (~np.isnan(bloque_1)).sum(axis=1)
+    n2 = n - n1
+    resultado = mann_whitney_rangos(np.nansum(rangos[:, :bloque_1.shape[1]], axis=1), n1, n2, empates)
+    exactas = np.flatnonzero(((n1 <= MAX_N_EXACTO) | (n2 <= MAX_N_EXACTO)) & (empates == 0))
+    for j in exactas:
+        muestra_1, muestra_2 = bloque_1[j], bloque_2[j]
+        resultado['p_value'][j] = mann_whitney(muestra_1[~np.isnan(muestra_1)],
+                                               muestra_2[~np.isnan(muestra_2)])['p_value']
+    return resultado
+
+# ==================================================================================
+# SUPUESTOS Y SELECCIÓN
+# ==================================================================================
+
+def elegir_prueba(ambos_normal, varianzas_iguales):
+    """Clave de PRUEBAS_HIPOTESIS por métrica según los supuestos (arrays de bool)"""
+    return np.select([~np.asarray(ambos_normal), np.asarray(varianzas_iguales)],
+                     ['mann_whitney', 't_student'], default='welch')
+
+
+def supuestos(df, metricas=COLUMNAS_METRICAS, columna_grupo='group', grupos=GRUPOS, alfa=ALFA):
+    """
+    Una fila por métrica con los p-values de Shapiro-Wilk de cada grupo, el
+    de Levene (centro mediana) y la prueba elegida.
+    """
+    normalidad = pruebas_normalidad(df, metricas, columna_grupo, pruebas=['shapiro'], alfa=alfa)
+    normalidad = normalidad.pivot(index='metrica', columns='grupo', values='p_value')
+    levene = levene_por_estrato(df, metricas, columna_grupo=columna_grupo, grupos=grupos,
+                                centros=['mediana']).set_index('metrica')
+
+    tabla = pd.DataFrame({'metrica': list(metricas)})
+    for grupo in grupos:
+        tabla[f'p_shapiro_{grupo.lower()}'] = normalidad.reindex(metricas)[grupo].to_numpy()
+    tabla['p_levene'] = levene.reindex(metricas)['p_value'].to_numpy()
+    # NaN (muestra insuficiente) no cuenta como supuesto cumplido
+    tabla['ambos_normal'] = np.all([tabla[f'p_shapiro_{g.lower()}'] >= alfa for g in grupos], axis=0)
+    tabla['varianzas_iguales'] = tabla['p_levene'] >= alfa
+    tabla['prueba'] = elegir_prueba(tabla['ambos_normal'], tabla['varianzas_iguales'])
+    return tabla
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def contrastar(df, metricas=COLUMNAS_METRICAS, columna_grupo='group', grupos=GRUPOS, alfa=ALFA):
+    """
+    Supuestos, las tres pruebas y la seleccionada para cada métrica de `df`
+    (Manual = muestra 1, IA = muestra 2). Columnas de la prueba elegida:
+    prueba, nombre_prueba, estadistico (t o U según simbolo_estadistico),
+    p_value y es_significativo.
+    """
+    tabla = supuestos(df, metricas, columna_grupo, grupos, alfa)
+    bloques = bloques_grupo(df, metricas, columna_grupo, grupos)
+    manual, ia = bloques[grupos[0]], bloques[grupos[1]]
+
+    n1, media1, var1 = suficientes(manual)
+    n2, media2, var2 = suficientes(ia)
+    t = pruebas_t(n1, media1, var1, n2, media2, var2)
+    mw = mann_whitney_bloques(manual, ia)
+
+    tabla['n_manual'], tabla['n_ia'] = n1, n2
+    tabla['media_manual'], tabla['media_ia'] = media1, media2
+    tabla['var_manual'], tabla['var_ia'] = var1, var2
+    for clave, valores in t.items():
+        tabla[clave] = valores
+    tabla['u_mann_whitney'] = mw['estadistico']
+    tabla['p_mann_whitney'] = mw['p_value']
+    tabla['z_mann_whitney'] = mw['z']
+
+    estadisticos = {'t_student': t['t_student'], 'welch': t['t_welch'], 'mann_whitney': mw['estadistico']}
+    p_values = {'t_student': t['p_t_student'], 'welch': t['p_welch'], 'mann_whitney': mw['p_value']}
+    eleccion = tabla['prueba'].to_numpy()
+    tabla['nombre_prueba'] = [NOMBRES_PRUEBA[p] for p in eleccion]
+    tabla['simbolo_estadistico'] = [SIMBOLOS_ESTADISTICO[p] for p in eleccion]
+    tabla['estadistico'] = np.select([eleccion == p for p in PRUEBAS_HIPOTESIS],
+                                     [estadisticos[p] for p in PRUEBAS_HIPOTESIS])
+    tabla['p_value'] = np.select([eleccion == p for p in PRUEBAS_HIPOTESIS],
+                                 [p_values[p] for p in PRUEBAS_HIPOTESIS])
+    tabla['es_significativo'] = tabla['p_value'] < alfa
+    return tabla
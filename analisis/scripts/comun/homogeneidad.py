@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+HOMOGENEIDAD DE VARIANZAS: LEVENE / BROWN-FORSYTHE VECTORIZADO
+===============================================================
+02_PASO2, la Figura 4 de 04_PASO4, la Tabla 4.4 de 05_PASO5 y REGENERAR
+(vía comun.motor) llamaban a scipy.stats.levene métrica a métrica y nivel
+a nivel, cada uno por su cuenta. Este kernel:
+
+  1. Reparte las filas en un bloque (métricas × filas) por (estrato, grupo)
+     con un argsort estable de los códigos combinados (radix sort).
+  2. Ordena cada bloque una vez: de esa única pasada salen los tres centros
+     de cada métrica (media → Levene, mediana → Brown-Forsythe, media
+     recortada al 5 %), además de n y varianza.
+  3. Forma las desviaciones absolutas |x − centro| como array 2D por bloque
+     y calcula F y su p-value (F de k−1 y N−k gl) para todas las métricas
+     a la vez. El estadístico es el de scipy.stats.levene.
+
+tabla_levene(ruta_base) guarda el resultado de ambos niveles (N=2480 y los
+promedios N=12), global y por categoría, en .cache_homogeneidad/ con la
+huella de los CSV de origen: los scripts lo leen en lugar de recalcularlo.
+
+    tabla = tabla_levene('.')
+    n12 = seleccionar_levene(tabla, 'N=12')         # Brown-Forsythe, global
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import f as distribucion_f
+
+from comun.carga import (bloqueo_escritura, calcular_huella, cargar_datos_consolidados,
+                         escribir_manifiesto, leer_manifiesto, listar_fuentes, reemplazar,
+                         temporal_para)
+from comun.descriptiva import codigos_combinados, tipo_codigo
+from comun.esquema import COLUMNAS_METRICAS
+from comun.indice import IndiceCompuesto
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+# 'mediana' es el valor por defecto de scipy.stats.levene (Brown-Forsythe)
+CENTROS = ['mediana', 'media', 'recortada']
+PROPORCION_RECORTE = 0.05
+
+GRUPOS = ['Manual', 'IA']
+NIVELES = ['N=2480', 'N=12']
+ESTRATOS = [[], ['category']]
+TODAS = '(todas)'
+
+NOMBRE_CACHE_HOMOGENEIDAD = '.cache_homogeneidad'
+NOMBRE_TABLA = 'levene.csv'
+VERSION_HOMOGENEIDAD = 1
+
+# ==================================================================================
+# KERNEL
+# ==================================================================================
+
+def bloques_por_codigo(datos, codigos, n_codigos):
+    """
+    Lista de bloques (métricas × filas), uno por código, a partir de `datos`
+    (métricas × filas). Las filas con código -1 se descartan.
+    """
+    orden = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[orden], np.arange(n_codigos + 1))
+    return [datos[:, orden[limites[c]:limites[c + 1]]] for c in range(n_codigos)]
+
+
+def centros_bloque(bloque, proporcion=PROPORCION_RECORTE):
+    """
+    Ordena `bloque` en sitio y devuelve n, varianza (ddof=1) y los CENTROS
+    de cada fila. Los NaN quedan al final de cada fila y no cuentan.
+    """
+    bloque.sort(axis=1)
+    n = (~np.isnan(bloque)).sum(axis=1)
+    filas = np.arange(len(bloque))
+    acumulado = np.zeros((len(bloque), bloque.shape[1] + 1))
+    np.cumsum(np.nan_to_num(bloque), axis=1, out=acumulado[:, 1:])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = acumulado[filas, n] / n
+        validos = np.arange(bloque.shape[1]) < n[:, None]
+        desvio = np.where(validos, bloque - media[:, None], 0.0)
+        varianza = (desvio * desvio).sum(axis=1) / (n - 1)
+
+        # Con n = 0 no hay mediana: se indexa la columna NaN añadida al final
+        relleno = np.concatenate([bloque, np.full((len(bloque), 1), np.nan)], axis=1)
+        bajo = np.where(n > 0, (n - 1) // 2, bloque.shape[1])
+        alto = np.where(n > 0, n // 2, bloque.shape[1])
+        mediana = (relleno[filas, bajo] + relleno[filas, alto]) / 2
+
+        # Media recortada como scipy.stats.trimboth: int(proporción · n) por cada lado
+        corte = (proporcion * n).astype(np.int64)
+        recortada = (acumulado[filas, n - corte] - acumulado[filas, corte]) / (n - 2 * corte)
+    centros = {'media': media, 'mediana': mediana, 'recortada': recortada}
+    return n, varianza, centros
+
+
+def levene_bloques(bloques, centros, n):
+    """
+    F de Levene con centros dados: `bloques` son k arrays (métricas × n_g)
+    ordenados, `centros` y `n` arrays (k × métricas). Devuelve (F, p) por
+    métrica, NaN si algún grupo tiene menos de 2 valores.
+    """
+    k = len(bloques)
+    n_total = n.sum(axis=0)
+    medias_z, dispersion = [], []
+    for g, bloque in enumerate(bloques):
+        validos = np.arange(bloque.shape[1]) < n[g][:, None]
+        z = np.where(validos, np.abs(bloque - centros[g][:, None]), 0.0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media_z = z.sum(axis=1) / n[g]
+        desvio = np.where(validos, z - media_z[:, None], 0.0)
+        medias_z.append(media_z)
+        dispersion.append((desvio * desvio).sum(axis=1))
+    medias_z = np.array(medias_z)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_global = (n * medias_z).sum(axis=0) / n_total
+        numerador = (n_total - k) * (n * (medias_z - media_global) ** 2).sum(axis=0)
+        denominador = (k - 1) * np.sum(dispersion, axis=0)
+        estadistico = numerador / denominador
+    estadistico = np.where((n >= 2).all(axis=0), estadistico, np.nan)
+    return estadistico, distribucion_f.sf(estadistico, k - 1, n_total - k)
+
+
+def levene_dos_grupos(manual, ia, centro='mediana'):
+    """(F, p) de dos arrays 1D: el equivalente de scipy.stats.levene(manual, ia)"""
+    bloques = [np.array(manual, dtype=np.float64)[None, :], np.array(ia, dtype=np.float64)[None, :]]
+    partes = [centros_bloque(bloque) for bloque in bloques]
+    n = np.array([p[0] for p in partes])
+    centros = np.array([p[2][centro] for p in partes])
+    estadistico, p_value = levene_bloques(bloques, centros, n)
+    return estadistico[0], p_value[0]
+
+# ==================================================================================
+# POR ESTRATO
+# ==================================================================================
+
+def levene_por_estrato(df, metricas=COLUMNAS_METRICAS, claves=(), columna_grupo='group',
+                       grupos=GRUPOS, centros=CENTROS):
+    """
+    Una fila por (estrato, métrica, centro) con n, media, mediana y varianza
+    de cada grupo, estadistico (F) y p_value. Un solo reparto en bloques y
+    una ordenación por bloque para todas las métricas y centros.
+    """
+    claves = list(claves)
+    codigos_estrato, etiquetas = codigos_combinados(df, claves)
+    codigos_grupo, etiquetas_grupo = codigos_combinados(df, [columna_grupo])
+    posicion = {g: i for i, g in enumerate(etiquetas_grupo[columna_grupo])}
+    remapeo = np.array([grupos.index(g) if g in grupos else -1 for g in posicion], dtype=np.int64)
+
+    grupo = np.where(codigos_grupo >= 0, remapeo[np.maximum(codigos_grupo, 0)], -1)
+    validas = (codigos_estrato >= 0) & (grupo >= 0)
+    n_estratos = len(etiquetas)
+    combinado = np.where(validas, codigos_estrato.astype(np.int64) * len(grupos) + grupo, -1)
+    combinado = combinado.astype(tipo_codigo(n_estratos * len(grupos)))
+
+    datos = np.ascontiguousarray(df[list(metricas)].to_numpy(dtype=np.float64).T)
+    bloques = bloques_por_codigo(datos, combinado, n_estratos * len(grupos))
+
+    filas = []
+    for e in range(n_estratos):
+        bloques_e = bloques[e * len(grupos):(e + 1) * len(grupos)]
+        partes = [centros_bloque(bloque) for bloque in bloques_e]
+        n = np.array([p[0] for p in partes])
+        varianza = np.array([p[1] for p in partes])
+        estrato = dict(zip(claves, etiquetas.iloc[e])) if claves else {}
+        resultados = {centro: levene_bloques(bloques_e, np.array([p[2][centro] for p in partes]), n)
+                      for centro in centros}
+        for j, metrica in enumerate(metricas):
+            for centro in centros:
+                fila = dict(estrato, metrica=metrica, centro=centro)
+                for g, nombre in enumerate(grupos):
+                    sufijo = nombre.lower()
+                    fila[f'n_{sufijo}'] = int(n[g, j])
+                    fila[f'media_{sufijo}'] = partes[g][2]['media'][j]
+                    fila[f'mediana_{sufijo}'] = partes[g][2]['mediana'][j]
+                    fila[f'var_{sufijo}'] = varianza[g, j]
+                fila['estadistico'] = resultados[centro][0][j]
+                fila['p_value'] = resultados[centro][1][j]
+                filas.append(fila)
+    return pd.DataFrame(filas)
+
+# ==================================================================================
+# CACHÉ POR VERSIÓN DEL DATASET
+# ==================================================================================
+
+def calcular_tabla_levene(df, metricas=COLUMNAS_METRICAS):
+    """Ambos NIVELES, global (category = TODAS) y por categoría"""
+    indice = IndiceCompuesto(df)
+    promedios = indice.medias_por_test(metricas)
+    categoria_test = df.groupby('test_name', observed=True)['category'].first()
+    promedios['category'] = promedios['test_name'].map(categoria_test)
+    datos = {'N=2480': df, 'N=12': promedios}
+
+    partes = []
+    for nivel in NIVELES:
+        for claves in ESTRATOS:
+            tabla = levene_por_estrato(datos[nivel], metricas, claves)
+            if not claves:
+                tabla.insert(0, 'category', TODAS)
+            tabla.insert(0, 'nivel', nivel)
+            partes.append(tabla)
+    return pd.concat(partes, ignore_index=True)
+
+
+def tabla_levene(ruta_base, metricas=COLUMNAS_METRICAS, df=None, verbose=True):
+    """
+    Tabla de calcular_tabla_levene() desde .cache_homogeneidad/ si la huella
+    de los CSV de origen no cambió; si no, se calcula (con `df` si se pasa)
+    y se guarda. Como en comun.carga, la tabla y el manifiesto se publican
+    dentro de bloqueo_escritura(dir_cache) por un temporal del proceso y
+    os.replace: ningún lector ve un levene.csv a medio escribir.
+    """
+    ruta_base = Path(ruta_base)
+    dir_cache = ruta_base / NOMBRE_CACHE_HOMOGENEIDAD
+    huella = calcular_huella(listar_fuentes(ruta_base)[1])
+    tabla = leer_tabla_levene(dir_cache, huella, metricas)
+    if tabla is not None:
+        if verbose:
+            print(f"  ✓ Levene en caché ({huella[:12]}): {dir_cache}")
+        return tabla
+
+    if df is None:
+        df = cargar_datos_consolidados(ruta_base, verbose=verbose)
+    tabla = calcular_tabla_levene(df, metricas)
+    with bloqueo_escritura(dir_cache):
+        ruta = dir_cache / NOMBRE_TABLA
+        temporal = temporal_para(ruta)
+        tabla.to_csv(temporal, index=False)
+        reemplazar(temporal, ruta)
+        escribir_manifiesto(dir_cache, {'version': VERSION_HOMOGENEIDAD, 'huella': huella,
+                                        'metricas': list(metricas)})
+    if verbose:
+        print(f"  ✓ Levene calculado y guardado ({huella[:12]}): {dir_cache}")
+    return tabla
+
+
+def leer_tabla_levene(dir_cache, huella, metricas):
+    """levene.csv si el manifiesto corresponde a `huella` y `metricas`, o None"""
+    manifiesto = leer_manifiesto(dir_cache, version=VERSION_HOMOGENEIDAD)
+    if (manifiesto is None or manifiesto.get('huella') != huella
+            or manifiesto.get('metricas') != list(metricas)):
+        return None
+    try:
+        tabla = pd.read_csv(dir_cache / NOMBRE_TABLA, float_precision='round_trip')
+    except (OSError, pd.errors.ParserError, pd.errors.EmptyDataError):
+        return None
+    # Otro proceso pudo publicar la tabla de otras métricas entre ambas lecturas
+    return tabla if set(tabla['metrica']) == set(metricas) else None
+
+
+def seleccionar_levene(tabla, nivel, centro='mediana', categoria=TODAS):
+    """Filas de un nivel, centro y categoría, indexadas por métrica"""
+    seleccion = tabla[(tabla['nivel'] == nivel) & (tabla['centro'] == centro)
+                      & (tabla['category'] == categoria)]
+    return seleccion.set_index('metrica')
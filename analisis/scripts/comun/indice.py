@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+ÍNDICE COMPUESTO (group, test_class, test_method, iteration)
+=============================================================
+Los CSV por clase tienen una fila por método de prueba e iteración, pero
+01_PASO1 sustituye test_name por el nombre del archivo, así que una media
+"por test" mezcla todos los métodos de la clase. Este índice ordena una sola
+vez las filas por (group, test_class, test_method, iteration) y registra los
+tramos contiguos de cada prefijo:
+
+    indice = IndiceCompuesto(df)
+    indice.tramo('IA')                                   # slice del grupo
+    indice.tramo('IA', 'OwnerGetPetDiffblueTest')        # slice de la clase
+    indice.valores('time_seconds', 'IA', 'OwnerGetPetDiffblueTest', 'testGetPet', 3)
+
+Las filas repetidas para la misma clave completa (un método ejecutado dos
+veces en la misma iteración) se conservan juntas dentro de su tramo y se
+cuentan en `n_duplicados`.
+
+Los reductores explícitos sustituyen al groupby sobre el DataFrame completo:
+  • tiempo_por_clase_iteracion(): suma de time_seconds por clase e iteración.
+  • medias_por_metodo(): media de cada métrica por método (entre iteraciones).
+  • medias_por_test(): equivalente exacto al df_promedios de los PASOS
+    (media por group y test_name = archivo, N=12).
+
+Si el DataFrame no trae test_method (consolidado antiguo), el nivel de
+método usa test_name.
+"""
+
+import numpy as np
+import pandas as pd
+
+from comun.almacen import tramos_contiguos
+from comun.esquema import COLUMNA_METODO
+
+NIVELES = ['group', 'test_class', COLUMNA_METODO, 'iteration']
+
+
+def codigos_columna(serie):
+    """(códigos, etiquetas) ordenados de una columna category o de cualquier otra"""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), list(serie.cat.categories)
+    codigos, etiquetas = pd.factorize(serie, sort=True)
+    return codigos, list(etiquetas)
+
+
+class IndiceCompuesto:
+    """Filas ordenadas por NIVELES con tramos O(1) por cualquier prefijo"""
+
+    def __init__(self, df):
+        metodo = COLUMNA_METODO if COLUMNA_METODO in df.columns else 'test_name'
+        self.columnas_nivel = ['group', 'test_class', metodo, 'iteration']
+
+        codigos, self.etiquetas = [], []
+        for col in self.columnas_nivel:
+            c, e = codigos_columna(df[col])
+            codigos.append(c)
+            self.etiquetas.append(e)
+
+        # lexsort es estable: las filas duplicadas conservan su orden de llegada
+        self.orden = np.lexsort(codigos[::-1])
+        self.df = df.iloc[self.orden].reset_index(drop=True)
+        self.codigos = [c[self.orden] for c in codigos]
+        self._tramos = {}
+
+        inicios, fines = self.limites(len(NIVELES))
+        self.n_duplicados = int((fines - inicios - 1).sum())
+
+        # test_class → group, para poder omitir el grupo al pedir una clase
+        inicios, _ = self.limites(2)
+        self._grupo_de_clase = {self.etiqueta(1, i): self.etiqueta(0, i) for i in inicios}
+
+    def __len__(self):
+        return len(self.df)
+
+    # ------------------------------------------------------------------------------
+    # TRAMOS
+    # ------------------------------------------------------------------------------
+
+    def etiqueta(self, nivel, fila):
+        valor = self.etiquetas[nivel][self.codigos[nivel][fila]]
+        return valor.item() if isinstance(valor, np.generic) else valor
+
+    def limites(self, profundidad):
+        """(inicios, fines) de cada combinación de los primeros `profundidad` niveles"""
+        return tramos_contiguos(*self.codigos[:profundidad])
+
+    def tramos(self, profundidad):
+        """{prefijo: (inicio, fin)} de una profundidad; se construye en el primer uso"""
+        if profundidad not in self._tramos:
+            inicios, fines = self.limites(profundidad)
+            self._tramos[profundidad] = {
+                tuple(self.etiqueta(n, i) for n in range(profundidad)): (int(i), int(f))
+                for i, f in zip(inicios, fines)}
+        return self._tramos[profundidad]
+
+    def tramo(self, group=None, test_class=None, test_method=None, iteration=None):
+        """
+        slice de las filas de un prefijo (group, test_class, test_method,
+        iteration). Los niveles se fijan de izquierda a derecha; el grupo
+        puede omitirse si se indica la clase.
+        """
+        if group is None and test_class is not None:
+            group = self._grupo_de_clase[test_class]
+        prefijo = [group, test_class, test_method, iteration]
+        profundidad = next((n for n, v in enumerate(prefijo) if v is None), len(prefijo))
+        if any(v is not None for v in prefijo[profundidad:]):
+            raise ValueError(f"El prefijo debe fijar los niveles en orden {NIVELES}: {prefijo}")
+        if profundidad == 0:
+            return slice(0, len(self))
+        inicio, fin = self.tramos(profundidad)[tuple(prefijo[:profundidad])]
+        return slice(inicio, fin)
+
+    def valores(self, columna, group=None, test_class=None, test_method=None, iteration=None):
+        """Vista sin copia de una columna numérica restringida a un prefijo"""
+        return self.df[columna].to_numpy()[self.tramo(group, test_class, test_method, iteration)]
+
+    def dataframe(self, group=None, test_class=None, test_method=None, iteration=None):
+        return self.df.iloc[self.tramo(group, test_class, test_method, iteration)]
+
+    # ------------------------------------------------------------------------------
+    # REDUCTORES
+    # ------------------------------------------------------------------------------
+
+    def _prefijos(self, profundidad, inicios):
+        return pd.DataFrame({col: [self.etiqueta(n, i) for i in inicios]
+                             for n, col in enumerate(self.columnas_nivel[:profundidad])})
+
+    def _reducir_tramos(self, profundidad, metricas):
+        """Suma y conteo (sin NaN) de cada métrica por tramo con np.add.reduceat"""
+        inicios, fines = self.limites(profundidad)
+        sumas, conteos = {}, {}
+        for metrica in metricas:
+            x = self.df[metrica].to_numpy(dtype=np.float64)
+            validos = ~np.isnan(x)
+            if len(inicios):
+                sumas[metrica] = np.add.reduceat(np.where(validos, x, 0.0), inicios)
+                conteos[metrica] = np.add.reduceat(validos.astype(np.int64), inicios)
+            else:
+                sumas[metrica] = conteos[metrica] = np.array([])
+        return inicios, fines, sumas, conteos
+
+    def medias(self, profundidad, metricas):
+        """Media de cada métrica por prefijo de `profundidad` niveles, con n_filas"""
+        inicios, fines, sumas, conteos = self._reducir_tramos(profundidad, metricas)
+        resultado = self._prefijos(profundidad, inicios)
+        resultado['n_filas'] = fines - inicios
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for metrica in metricas:
+                resultado[metrica] = sumas[metrica] / conteos[metrica]
+        return resultado
+
+    def medias_por_metodo(self, metricas):
+        """Media entre iteraciones de cada método: group, test_class, test_method"""
+        return self.medias(3, metricas)
+
+    def tiempo_por_clase_iteracion(self, columna='time_seconds'):
+        """
+        Suma de `columna` por (group, test_class, iteration): el tiempo de
+        ejecutar la clase completa en cada iteración. Un solo bincount sobre
+        (tramo de clase × código de iteración).
+        """
+        inicios, fines = self.limites(2)
+        clase = np.repeat(np.arange(len(inicios)), fines - inicios)
+        n_iteraciones = len(self.etiquetas[3])
+        clave = clase * n_iteraciones + self.codigos[3]
+        x = self.df[columna].to_numpy(dtype=np.float64)
+        validos = ~np.isnan(x)
+
+        total = len(inicios) * n_iteraciones
+        sumas = np.bincount(clave, weights=np.where(validos, x, 0.0), minlength=total)
+        filas = np.bincount(clave, minlength=total)
+        presentes = np.flatnonzero(filas)
+
+        resultado = self._prefijos(2, inicios[presentes // n_iteraciones])
+        resultado['iteration'] = np.asarray(self.etiquetas[3])[presentes % n_iteraciones]
+        resultado['n_filas'] = filas[presentes]
+        resultado[columna] = sumas[presentes]
+        return resultado
+
+    def medias_por_test(self, metricas):
+        """
+        Igual que df.groupby(['group', 'test_name'])[metricas].mean().reset_index()
+        (promedios N=12 de los PASOS), con bincount sobre los códigos de test_name.
+        """
+        codigos, etiquetas = codigos_columna(self.df['test_name'])
+        codigos_grupo = self.codigos[0]
+        n = len(etiquetas)
+        filas = np.bincount(codigos, minlength=n)
+        presentes = np.flatnonzero(filas)
+
+        # Grupo de cada test: el de su primera fila
+        primera = np.full(n, len(codigos), dtype=np.int64)
+        np.minimum.at(primera, codigos, np.arange(len(codigos)))
+
+        resultado = pd.DataFrame({
+            'group': [self.etiquetas[0][codigos_grupo[primera[t]]] for t in presentes],
+            'test_name': [etiquetas[t] for t in presentes],
+        })
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for metrica in metricas:
+                x = self.df[metrica].to_numpy(dtype=np.float64)
+                validos = ~np.isnan(x)
+                suma = np.bincount(codigos, weights=np.where(validos, x, 0.0), minlength=n)
+                cuenta = np.bincount(codigos, weights=validos, minlength=n)
+                resultado[metrica] = (suma / cuenta)[presentes]
+        return resultado.sort_values(['group', 'test_name']).reset_index(drop=True)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+INGESTA INCREMENTAL (SOLO AÑADIDOS)
+====================================
+Durante una campaña de 36-48 horas, run-test-metrics.ps1 y
+run_pitest_isolated_complete.ps1 añaden una fila por test e iteración al
+final de cada CSV por clase. Esta ingesta recuerda, por archivo, el offset en
+bytes y el número de filas ya consolidadas, y en cada pasada:
+
+  1. Parsea solo los bytes añadidos desde el último offset.
+  2. Añade esas filas como un nuevo segmento de la caché columnar.
+  3. Actualiza los acumuladores por (group, test_name) del manifiesto.
+  4. Añade las filas al final de datos_consolidados.csv.
+
+El manifiesto (offsets incluidos) se escribe después de añadir al CSV y
+guarda su tamaño en bytes. Si una pasada se interrumpe entre ambos pasos,
+la siguiente recorta el CSV a ese tamaño antes de volver a añadir las
+mismas filas, así que el consolidado nunca queda con filas duplicadas.
+
+Si algún CSV fue truncado, reescrito o eliminado, o datos_consolidados.csv
+es más corto que lo registrado, se devuelve None y
+cargar_datos_consolidados reconstruye la caché completa.
+"""
+
+import numpy as np
+import pandas as pd
+
+from comun.carga import (NOMBRE_CSV_CONSOLIDADO, acumular_agregados, calcular_huella,
+                         cargar_columnas, clave_archivo, guardar_cache,
+                         guardar_segmento, leer_archivos_en_paralelo, leer_manifiesto,
+                         escribir_manifiesto, siguiente_segmento)
+from comun.esquema import aplicar_esquema
+
+# A partir de este número de segmentos se compactan en uno solo
+MAX_SEGMENTOS = 64
+
+
+def leer_filas_nuevas(archivos, estados):
+    """
+    Lee las filas añadidas a cada CSV desde su offset registrado.
+    Devuelve (lista de DataFrames nuevos, estados actualizados) o
+    (None, None) si algún archivo no es una ampliación del ya consolidado.
+    """
+    estados = dict(estados)
+    vigentes = {clave_archivo(archivo) for archivo, _ in archivos}
+    if set(estados) - vigentes:
+        return None, None
+
+    # Un estado sin cabecera (CSV vacío en la pasada anterior) se relee entero
+    previos = {clave: estado for clave, estado in estados.items() if estado and estado['cabecera']}
+
+    nuevos = []
+    for (archivo, _), (df, estado_nuevo) in zip(archivos, leer_archivos_en_paralelo(archivos, previos)):
+        if df is None:
+            return None, None
+        estados[clave_archivo(archivo)] = estado_nuevo
+        if len(df):
+            nuevos.append(df)
+
+    return nuevos, estados
+
+
+def compactar(dir_cache, manifiesto):
+    """Reescribe todos los segmentos como uno solo conservando los offsets por archivo"""
+    df = cargar_columnas(dir_cache, manifiesto)
+    guardar_cache(df, dir_cache, manifiesto['huella'], manifiesto['archivos'], manifiesto.get('bytes_csv'))
+    return df
+
+
+def restaurar_csv(csv_consolidado, bytes_csv):
+    """
+    Deja datos_consolidados.csv con el tamaño registrado en el manifiesto:
+    recorta lo añadido por una pasada interrumpida antes de escribir el
+    manifiesto. False si el CSV falta o es más corto (hay que reconstruir).
+    """
+    if bytes_csv is None:
+        return True
+    if not csv_consolidado.exists() or csv_consolidado.stat().st_size < bytes_csv:
+        return False
+    if csv_consolidado.stat().st_size > bytes_csv:
+        with open(csv_consolidado, 'r+b') as f:
+            f.truncate(bytes_csv)
+    return True
+
+
+def ingerir_incremental(ruta_base, archivos, dir_cache, verbose=True):
+    """
+    Incorpora a la caché solo las filas nuevas de cada CSV por clase, dentro
+    de comun.carga.bloqueo_escritura(dir_cache). Devuelve el DataFrame
+    consolidado actualizado, o None si hace falta una reconstrucción completa.
+    """
+    manifiesto = leer_manifiesto(dir_cache)
+    if manifiesto is None or not manifiesto.get('archivos'):
+        return None
+    csv_consolidado = ruta_base / NOMBRE_CSV_CONSOLIDADO
+    if not restaurar_csv(csv_consolidado, manifiesto.get('bytes_csv')):
+        if verbose:
+            print(f"  ! {NOMBRE_CSV_CONSOLIDADO} no coincide con la caché, se requiere consolidación completa")
+        return None
+
+    # La huella se toma antes de leer: si un CSV crece durante la lectura,
+    # la siguiente carga no incremental detectará el cambio y reconstruirá
+    huella = calcular_huella([archivo for archivo, _ in archivos])
+    nuevos, estados = leer_filas_nuevas(archivos, manifiesto['archivos'])
+    if nuevos is None:
+        if verbose:
+            print("  ! Algún CSV fue reescrito o eliminado, se requiere consolidación completa")
+        return None
+
+    n_nuevas = 0
+    if nuevos:
+        df_nuevo = pd.concat(nuevos, ignore_index=True)
+        nombres = [col['nombre'] for col in manifiesto['columnas']]
+        if sorted(df_nuevo.columns) != sorted(nombres):
+            return None
+        df_nuevo = aplicar_esquema(df_nuevo[nombres])
+
+        # Las filas nuevas deben caber en el dtype ya guardado (p. ej. una
+        # iteración fuera de int16 o un NaN en un contador fuerzan reconstruir)
+        for col in manifiesto['columnas']:
+            if col['tipo'] != 'numerico':
+                continue
+            serie = df_nuevo[col['nombre']]
+            if not pd.api.types.is_numeric_dtype(serie) \
+                    or not np.can_cast(serie.dtype, col['dtype'], casting='safe'):
+                return None
+
+        id_segmento = siguiente_segmento(dir_cache)
+        manifiesto['segmentos'].append(
+            guardar_segmento(df_nuevo, dir_cache, id_segmento, manifiesto['columnas']))
+        manifiesto['n_filas'] += len(df_nuevo)
+        manifiesto['agregados'] = acumular_agregados(manifiesto['agregados'], df_nuevo)
+
+        df_nuevo.to_csv(csv_consolidado, mode='a', header=False, index=False)
+        n_nuevas = len(df_nuevo)
+
+    # Tras el CSV: si la pasada se corta antes, los offsets anteriores siguen
+    # vigentes y la siguiente recorta el CSV a bytes_csv antes de repetirla
+    manifiesto['archivos'] = estados
+    manifiesto['huella'] = huella
+    if csv_consolidado.exists():
+        manifiesto['bytes_csv'] = csv_consolidado.stat().st_size
+    escribir_manifiesto(dir_cache, manifiesto)
+
+    if verbose:
+        print(f"  ✓ Ingesta incremental: {n_nuevas} filas nuevas "
+              f"({manifiesto['n_filas']} en total, {len(manifiesto['segmentos'])} segmentos)")
+
+    if len(manifiesto['segmentos']) > MAX_SEGMENTOS:
+        return compactar(dir_cache, manifiesto)
+    return cargar_columnas(dir_cache, manifiesto)
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+INGESTA DE REPORTES JACOCO POR ITERACIÓN
+=========================================
+run-test-metrics.ps1 y run_pitest_isolated_complete.ps1 copian el jacoco.xml
+de cada iteración como <group>_<Clase>-iter<N>-jacoco.xml en
+coverage_reports/ (unitarias) y coverage_reports_functional/ (funcionales),
+pero al CSV solo llegan los dos porcentajes globales. Este módulo extrae
+todos los contadores de esos reportes:
+
+  • contadores: un registro por <counter> a nivel report, package, class,
+    method y sourcefile (tipo INSTRUCTION, BRANCH, LINE, COMPLEXITY, METHOD,
+    CLASS; missed y covered).
+  • lineas: un registro por <line> de cada sourcefile (mi, ci, mb, cb).
+
+Cada XML se recorre con iterparse liberando los elementos ya procesados,
+por lo que la memoria por reporte es constante. El paralelismo, los
+diccionarios y los segmentos de .cache_jacoco/ vienen de comun.reportes:
+los nombres de paquete, clase, método y archivo fuente se guardan como
+códigos enteros y solo se parsean los reportes nuevos.
+"""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+
+from comun.carga import leer_manifiesto
+from comun.reportes import (MAX_PROCESOS, REPORTES_POR_SEGMENTO, CodificadorLocal, cargar_tablas,
+                            ingerir_reportes, listar_reportes)
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+CARPETAS_COBERTURA = {
+    'coverage_reports': 'Unitarias',
+    'coverage_reports_functional': 'Funcionales',
+}
+
+SUFIJO_REPORTE = 'jacoco.xml'
+
+NOMBRE_CACHE_JACOCO = '.cache_jacoco'
+VERSION_JACOCO = 1
+
+NIVELES = ['report', 'package', 'class', 'method', 'sourcefile']
+TIPOS = ['INSTRUCTION', 'BRANCH', 'LINE', 'COMPLEXITY', 'METHOD', 'CLASS']
+DICCIONARIOS = ['paquete', 'clase', 'metodo', 'fuente']
+
+COLUMNAS = {
+    'contadores': {'reporte': np.int32, 'nivel': np.int8, 'tipo': np.int8, 'paquete': np.int32,
+                   'clase': np.int32, 'metodo': np.int32, 'fuente': np.int32,
+                   'linea_metodo': np.int32, 'missed': np.int32, 'covered': np.int32},
+    'lineas': {'reporte': np.int32, 'paquete': np.int32, 'fuente': np.int32, 'linea': np.int32,
+               'mi': np.int32, 'ci': np.int32, 'mb': np.int32, 'cb': np.int32},
+}
+
+# ==================================================================================
+# DESCUBRIMIENTO
+# ==================================================================================
+
+def listar_reportes_jacoco(ruta_base):
+    """Lista (archivo, categoria, group, test_class, iteration) en orden estable"""
+    return listar_reportes(ruta_base, CARPETAS_COBERTURA, SUFIJO_REPORTE)
+
+# ==================================================================================
+# PARSEO EN STREAMING (SE EJECUTA EN LOS PROCESOS DEL POOL)
+# ==================================================================================
+
+def parsear_reporte(ruta):
+    """
+    Recorre un jacoco.xml con iterparse y devuelve sus contadores y líneas
+    como arrays enteros, con cadenas codificadas contra diccionarios locales.
+    """
+    locales = CodificadorLocal(DICCIONARIOS)
+    codigo = locales.codigo
+
+    contadores = {col: [] for col in COLUMNAS['contadores'] if col != 'reporte'}
+    lineas = {col: [] for col in COLUMNAS['lineas'] if col != 'reporte'}
+    pila = []
+    paquete = clase = metodo = fuente = None
+    linea_metodo = -1
+    raiz = None
+
+    for evento, elem in ET.iterparse(ruta, events=('start', 'end')):
+        etiqueta = elem.tag
+        if evento == 'start':
+            if raiz is None:
+                raiz = elem
+            pila.append(etiqueta)
+            if etiqueta == 'package':
+                paquete = elem.get('name')
+            elif etiqueta == 'class':
+                clase, fuente = elem.get('name'), None
+            elif etiqueta == 'method':
+                metodo = elem.get('name', '') + elem.get('desc', '')
+                linea_metodo = int(elem.get('line', -1))
+            elif etiqueta == 'sourcefile':
+                fuente = elem.get('name')
+            continue
+
+        pila.pop()
+        if etiqueta == 'counter' and pila and pila[-1] in NIVELES and elem.get('type') in TIPOS:
+            nivel = pila[-1]
+            en_metodo = nivel == 'method'
+            contadores['nivel'].append(NIVELES.index(nivel))
+            contadores['tipo'].append(TIPOS.index(elem.get('type')))
+            contadores['paquete'].append(codigo('paquete', paquete if nivel != 'report' else None))
+            contadores['clase'].append(codigo('clase', clase if nivel in ('class', 'method') else None))
+            contadores['metodo'].append(codigo('metodo', metodo if en_metodo else None))
+            contadores['fuente'].append(codigo('fuente', fuente if nivel == 'sourcefile' else None))
+            contadores['linea_metodo'].append(linea_metodo if en_metodo else -1)
+            contadores['missed'].append(int(elem.get('missed', 0)))
+            contadores['covered'].append(int(elem.get('covered', 0)))
+        elif etiqueta == 'line':
+            lineas['paquete'].append(codigo('paquete', paquete))
+            lineas['fuente'].append(codigo('fuente', fuente))
+            lineas['linea'].append(int(elem.get('nr', -1)))
+            for atributo in ('mi', 'ci', 'mb', 'cb'):
+                lineas[atributo].append(int(elem.get(atributo, 0)))
+        elif etiqueta in ('method', 'class', 'sourcefile', 'package'):
+            if etiqueta == 'method':
+                metodo, linea_metodo = None, -1
+            elif etiqueta == 'class':
+                clase = None
+            elif etiqueta == 'sourcefile':
+                fuente = None
+            else:
+                paquete = None
+                raiz.clear()
+            elem.clear()
+
+    return {
+        'cadenas': locales.cadenas(),
+        'contadores': {c: np.asarray(v, dtype=COLUMNAS['contadores'][c]) for c, v in contadores.items()},
+        'lineas': {c: np.asarray(v, dtype=COLUMNAS['lineas'][c]) for c, v in lineas.items()},
+    }
+
+# ==================================================================================
+# INGESTA Y LECTURA
+# ==================================================================================
+
+def ingerir_jacoco(ruta_base, max_procesos=MAX_PROCESOS, reportes_por_segmento=REPORTES_POR_SEGMENTO,
+                   verbose=True):
+    """Parsea en paralelo los reportes JaCoCo nuevos y devuelve el manifiesto"""
+    ruta_base = Path(ruta_base)
+    return ingerir_reportes(ruta_base / NOMBRE_CACHE_JACOCO, listar_reportes_jacoco(ruta_base),
+                            parsear_reporte, COLUMNAS, DICCIONARIOS, VERSION_JACOCO, 'JaCoCo',
+                            max_procesos, reportes_por_segmento, verbose)
+
+
+def cargar_jacoco(ruta_base, ingerir=True, verbose=True):
+    """
+    Devuelve (reportes, contadores, lineas) como DataFrames. Las columnas de
+    texto son category sobre los diccionarios globales; `reporte` enlaza con
+    reportes['id'] (category, group, test_class, iteration).
+    """
+    ruta_base = Path(ruta_base)
+    dir_cache = ruta_base / NOMBRE_CACHE_JACOCO
+    manifiesto = (ingerir_jacoco(ruta_base, verbose=verbose) if ingerir
+                  else leer_manifiesto(dir_cache, VERSION_JACOCO))
+    if manifiesto is None:
+        raise FileNotFoundError(f"No existe caché JaCoCo en {ruta_base}")
+
+    reportes, tablas = cargar_tablas(dir_cache, manifiesto, COLUMNAS, DICCIONARIOS,
+                                     {'nivel': NIVELES, 'tipo': TIPOS})
+    return reportes, tablas['contadores'], tablas['lineas']
+
+
+def cobertura_por_reporte(reportes, contadores):
+    """
+    instr_pct y branch_pct por reporte a partir de los contadores de nivel
+    report, calculados igual que Get-JaCoCoMetrics (redondeo a 2 decimales).
+    """
+    globales = contadores[(contadores['nivel'] == 'report')
+                          & contadores['tipo'].isin(['INSTRUCTION', 'BRANCH'])]
+    tabla = globales.pivot_table(index='reporte', columns='tipo', values=['missed', 'covered'],
+                                 aggfunc='sum', observed=True)
+    resultado = reportes.set_index('id')[['category', 'group', 'test_class', 'iteration']].copy()
+    for tipo, columna in (('INSTRUCTION', 'instr_pct'), ('BRANCH', 'branch_pct')):
+        if ('covered', tipo) not in tabla.columns:
+            resultado[columna] = 0.0
+            continue
+        cubiertos = tabla[('covered', tipo)]
+        total = cubiertos + tabla[('missed', tipo)]
+        pct = (100 * cubiertos / total.where(total > 0)).round(2).fillna(0.0)
+        resultado[columna] = pct.reindex(resultado.index).fillna(0.0)
+    return resultado.reset_index(names='reporte')
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+METAANÁLISIS DE EFECTOS ALEATORIOS SOBRE LOS PARES MANUAL / IA
+==============================================================
+df_promedios (N=12) promedia cada test y olvida que las clases vienen en
+pares: cada componente (OwnerAddPet, ShowOwner, ...) tiene una clase Manual
+y una IA que lo prueban. Aquí cada par es un "estudio" con su propio efecto
+Manual − IA y su varianza, calculados desde las iteraciones:
+
+  • n, media y varianza de cada celda (par × grupo) con dos bincounts por
+    métrica (comun.cubo), para cualquier número de pares a la vez. Las
+    métricas de clase (coberturas y mutation score) se repiten en cada
+    método de una iteración: cuentan una sola observación por (test_class,
+    iteration), no una por método, para no inflar n.
+  • Medidas de efecto por par:
+      hedges_g    d de Cohen con corrección de Hedges, var = 1/n1 + 1/n2 + g²/(2(n1+n2))
+      diferencia  media Manual − media IA,           var = s1²/n1 + s2²/n2
+      log_razon   log(media Manual / media IA),      var = s1²/(n1·m1²) + s2²/(n2·m2²)
+  • Combinación con efecto fijo (inverso de la varianza) y efectos
+    aleatorios con τ² de DerSimonian-Laird o REML (punto fijo de
+    Viechtbauer partiendo de DL). Todo vectorizado sobre una matriz
+    (métricas × estudios); los estudios sin varianza (coberturas idénticas
+    en todas las iteraciones) o con efecto no finito no aportan.
+
+La tabla de estudios lleva el intervalo de cada par y su peso (%) en cada
+modelo; forest() le agrega las filas combinadas: son los datos del forest
+plot, en el orden en que se dibujan.
+
+    estudios, combinado = metaanalisis(df, METRICAS, medida='hedges_g')
+    datos_forest = forest(estudios, combinado)
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2, norm
+from scipy.stats import t as distribucion_t
+
+from comun.cubo import suficientes_por_celda
+from comun.descriptiva import codigos_combinados
+from comun.esquema import COLUMNA_PAR, COLUMNAS_METRICAS, METRICAS_POR_CLASE, UNIDAD_CLASE
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+GRUPOS = ['Manual', 'IA']
+MEDIDAS = ['hedges_g', 'diferencia', 'log_razon']
+METODOS_TAU2 = ['DL', 'REML']
+MODELO_FIJO = 'fijo'
+NIVEL_CONFIANZA = 0.95
+MAX_ITERACIONES_REML = 100
+TOLERANCIA_REML = 1e-10
+
+# ==================================================================================
+# EFECTOS POR ESTUDIO
+# ==================================================================================
+
+def efecto_y_varianza(n1, media1, var1, n2, media2, var2, medida='hedges_g'):
+    """Efecto Manual − IA de cada estudio y su varianza muestral (arrays)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if medida == 'hedges_g':
+            gl = n1 + n2 - 2
+            desv_combinada = np.sqrt(((n1 - 1) * var1 + (n2 - 1) * var2) / gl)
+            j = 1 - 3 / (4 * gl - 1)
+            efecto = j * (media1 - media2) / desv_combinada
+            varianza = (n1 + n2) / (n1 * n2) + efecto ** 2 / (2 * (n1 + n2))
+        elif medida == 'diferencia':
+            efecto = media1 - media2
+            varianza = var1 / n1 + var2 / n2
+        elif medida == 'log_razon':
+            efecto = np.log(media1 / media2)
+            varianza = var1 / (n1 * media1 ** 2) + var2 / (n2 * media2 ** 2)
+        else:
+            raise ValueError(f"Medida desconocida: {medida} (opciones: {MEDIDAS})")
+    # Sin varianza muestral el estudio tendría peso infinito: no aporta
+    validos = np.isfinite(efecto) & np.isfinite(varianza) & (varianza > 0) & (n1 >= 2) & (n2 >= 2)
+    return np.where(validos, efecto, np.nan), np.where(validos, varianza, np.nan)
+
+
+def efectos_por_estudio(df, metricas=COLUMNAS_METRICAS, columna_estudio=COLUMNA_PAR,
+                        columna_grupo='group', grupos=GRUPOS, medida='hedges_g',
+                        metricas_por_clase=METRICAS_POR_CLASE):
+    """
+    Etiquetas de los estudios y, por métrica, los suficientes de cada grupo
+    y el efecto y la varianza de cada estudio: {metrica: {clave: array}}.
+    Las métricas de `metricas_por_clase` usan la primera fila de cada
+    (test_class, iteration) como única observación.
+    """
+    codigos_estudio, etiquetas = codigos_combinados(df, [columna_estudio])
+    codigos_unidad = codigos_combinados(df, UNIDAD_CLASE)[0] if metricas_por_clase else None
+    n_estudios = len(etiquetas)
+    grupo = df[columna_grupo].astype(str).to_numpy()
+    codigo_grupo = np.select([grupo == grupos[0], grupo == grupos[1]], [0, 1], default=-1)
+    base = (codigos_estudio >= 0) & (codigo_grupo >= 0)
+
+    por_metrica = {}
+    for metrica in metricas:
+        valores = df[metrica].to_numpy(dtype=np.float64)
+        filas = np.flatnonzero(base & ~np.isnan(valores))
+        if metrica in metricas_por_clase:
+            filas = filas[codigos_unidad[filas] >= 0]
+            filas = filas[np.unique(codigos_unidad[filas], return_index=True)[1]]
+        celdas = codigos_estudio[filas].astype(np.int64) * 2 + codigo_grupo[filas]
+        n, media, varianza = suficientes_por_celda(valores[filas], celdas, n_estudios * 2)
+        efecto, var_efecto = efecto_y_varianza(n[0::2], media[0::2], varianza[0::2],
+                                               n[1::2], media[1::2], varianza[1::2], medida)
+        por_metrica[metrica] = {'n_manual': n[0::2], 'n_ia': n[1::2],
+                                'media_manual': media[0::2], 'media_ia': media[1::2],
+                                'efecto': efecto, 'varianza': var_efecto}
+    return etiquetas[columna_estudio].astype(str).to_numpy(), por_metrica
+
+# ==================================================================================
+# ESTIMADORES DE τ²
+# ==================================================================================
+
+def tau2_dersimonian_laird(efectos, varianzas):
+    """τ² de DerSimonian-Laird por fila de una matriz (filas × estudios) con NaN"""
+    w = np.where(np.isnan(efectos), 0.0, 1 / varianzas)
+    y = np.nan_to_num(efectos)
+    suma_w = w.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = (w * y).sum(axis=-1) / suma_w
+        q = (w * (y - media[..., None]) ** 2).sum(axis=-1)
+        k = (w > 0).sum(axis=-1)
+        c = suma_w - (w * w).sum(axis=-1) / suma_w
+        tau2 = np.maximum(0.0, (q - (k - 1)) / c)
+    return np.where(k > 1, tau2, 0.0)
+
+
+def tau2_reml(efectos, varianzas, max_iteraciones=MAX_ITERACIONES_REML, tolerancia=TOLERANCIA_REML):
+    """
+    τ² de máxima verosimilitud restringida por fila, con la iteración de
+    punto fijo de Viechtbauer (2005) desde DL; todas las filas a la vez,
+    cada una se congela al converger.
+    """
+    presentes = ~np.isnan(efectos)
+    y = np.nan_to_num(efectos)
+    v = np.where(presentes, varianzas, 1.0)
+    tau2 = tau2_dersimonian_laird(efectos, varianzas)
+    activas = presentes.sum(axis=-1) > 1
+    for _ in range(max_iteraciones):
+        if not activas.any():
+            break
+        w = np.where(presentes, 1 / (v + tau2[..., None]), 0.0)
+        suma_w = w.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media = (w * y).sum(axis=-1) / suma_w
+            nuevo = ((w * w * ((y - media[..., None]) ** 2 - v)).sum(axis=-1) / (w * w).sum(axis=-1)
+                     + 1 / suma_w)
+        nuevo = np.where(activas, np.maximum(0.0, np.nan_to_num(nuevo)), tau2)
+        activas &= np.abs(nuevo - tau2) > tolerancia * np.maximum(1.0, tau2)
+        tau2 = nuevo
+    return tau2
+
+
+ESTIMADORES_TAU2 = {
+    'DL': tau2_dersimonian_laird,
+    'REML': tau2_reml,
+}
+
+# ==================================================================================
+# COMBINACIÓN
+# ==================================================================================
+
+def combinar(efectos, varianzas, tau2, nivel=NIVEL_CONFIANZA):
+    """
+    Media ponderada por 1 / (v + τ²) de cada fila (τ² = 0 es efecto fijo),
+    con error estándar, IC, z, p, intervalo de predicción y pesos (%).
+    """
+    presentes = ~np.isnan(efectos)
+    k = presentes.sum(axis=-1)
+    tau2 = np.broadcast_to(np.asarray(tau2, dtype=np.float64), k.shape)
+    w = np.where(presentes, 1 / (np.where(presentes, varianzas, 1.0) + tau2[..., None]), 0.0)
+    suma_w = w.sum(axis=-1)
+    z_critico = norm.ppf(0.5 + nivel / 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        efecto = (w * np.nan_to_num(efectos)).sum(axis=-1) / suma_w
+        error_estandar = np.sqrt(1 / suma_w)
+        z = efecto / error_estandar
+        # Predicción de un par nuevo: t con k − 2 gl (necesita al menos 3 estudios)
+        t_critico = distribucion_t.ppf(0.5 + nivel / 2, k - 2)
+        semiancho_prediccion = np.where(k >= 3, t_critico * np.sqrt(tau2 + error_estandar ** 2), np.nan)
+        pesos = 100 * w / suma_w[..., None]
+    return {
+        'k': k,
+        'efecto': efecto,
+        'error_estandar': error_estandar,
+        'ic_inferior': efecto - z_critico * error_estandar,
+        'ic_superior': efecto + z_critico * error_estandar,
+        'z': z,
+        'p_value': 2 * norm.sf(np.abs(z)),
+        'tau2': tau2,
+        'prediccion_inferior': efecto - semiancho_prediccion,
+        'prediccion_superior': efecto + semiancho_prediccion,
+        'pesos': np.where(presentes, pesos, np.nan),
+    }
+
+
+def heterogeneidad(efectos, varianzas):
+    """Q de Cochran, su p-value e I² (%) de cada fila"""
+    presentes = ~np.isnan(efectos)
+    k = presentes.sum(axis=-1)
+    w = np.where(presentes, 1 / np.where(presentes, varianzas, 1.0), 0.0)
+    y = np.nan_to_num(efectos)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = (w * y).sum(axis=-1) / w.sum(axis=-1)
+        q = (w * (y - media[..., None]) ** 2).sum(axis=-1)
+        i2 = np.where(q > 0, 100 * np.maximum(0.0, (q - (k - 1)) / q), 0.0)
+    return {
+        'q': np.where(k > 1, q, np.nan),
+        'gl_q': k - 1,
+        'p_q': np.where(k > 1, chi2.sf(q, k - 1), np.nan),
+        'i2': np.where(k > 1, i2, np.nan),
+    }
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def metaanalisis(df, metricas=COLUMNAS_METRICAS, medida='hedges_g', metodos=METODOS_TAU2,
+                 columna_estudio=COLUMNA_PAR, columna_grupo='group', grupos=GRUPOS,
+                 nivel=NIVEL_CONFIANZA, metricas_por_clase=METRICAS_POR_CLASE):
+    """
+    (estudios, combinado):
+      estudios   una fila por (métrica, estudio) con n, medias, efecto,
+                 varianza, IC y peso (%) en el modelo fijo y en cada método
+      combinado  una fila por (métrica, modelo) con k, efecto combinado, IC,
+                 z, p, τ², intervalo de predicción, Q e I²
+    Manual = grupos[0]; efecto > 0 significa Manual mayor que IA.
+    """
+    metricas = list(metricas)
+    nombres, por_metrica = efectos_por_estudio(df, metricas, columna_estudio, columna_grupo, grupos, medida,
+                                               metricas_por_clase)
+    efectos = np.array([por_metrica[m]['efecto'] for m in metricas]).reshape(len(metricas), len(nombres))
+    varianzas = np.array([por_metrica[m]['varianza'] for m in metricas]).reshape(efectos.shape)
+
+    modelos = {MODELO_FIJO: combinar(efectos, varianzas, 0.0, nivel)}
+    for metodo in metodos:
+        modelos[metodo] = combinar(efectos, varianzas, ESTIMADORES_TAU2[metodo](efectos, varianzas), nivel)
+    q = heterogeneidad(efectos, varianzas)
+
+    z_critico = norm.ppf(0.5 + nivel / 2)
+    partes = []
+    for i, metrica in enumerate(metricas):
+        error_estandar = np.sqrt(varianzas[i])
+        parte = pd.DataFrame({'metrica': metrica, 'medida': medida, 'estudio': nombres,
+                              **{clave: valores for clave, valores in por_metrica[metrica].items()},
+                              'ic_inferior': efectos[i] - z_critico * error_estandar,
+                              'ic_superior': efectos[i] + z_critico * error_estandar})
+        for modelo, resultado in modelos.items():
+            parte[f'peso_{modelo}'] = resultado['pesos'][i]
+        partes.append(parte)
+    estudios = pd.concat(partes, ignore_index=True)
+
+    filas = []
+    for i, metrica in enumerate(metricas):
+        for modelo, resultado in modelos.items():
+            fila = {'metrica': metrica, 'medida': medida, 'modelo': modelo}
+            fila.update({clave: valores[i] for clave, valores in resultado.items() if clave != 'pesos'})
+            fila.update({clave: valores[i] for clave, valores in q.items()})
+            filas.append(fila)
+    return estudios, pd.DataFrame(filas)
+
+
+def forest(estudios, combinado):
+    """
+    Datos del forest plot: por métrica, los estudios (efecto, IC, peso) y
+    debajo una fila por modelo combinado, con tipo = 'estudio' / 'combinado'.
+    El peso de los estudios es el del último modelo de `combinado` (REML
+    con los métodos por defecto).
+    """
+    columnas = ['metrica', 'medida', 'tipo', 'etiqueta', 'efecto', 'ic_inferior', 'ic_superior',
+                'peso', 'prediccion_inferior', 'prediccion_superior']
+    modelo_pesos = combinado['modelo'].iloc[-1] if len(combinado) else MODELO_FIJO
+    partes = []
+    for metrica, grupo_estudios in estudios.groupby('metrica', sort=False):
+        partes.append(pd.DataFrame({
+            'metrica': metrica, 'medida': grupo_estudios['medida'], 'tipo': 'estudio',
+            'etiqueta': grupo_estudios['estudio'], 'efecto': grupo_estudios['efecto'],
+            'ic_inferior': grupo_estudios['ic_inferior'], 'ic_superior': grupo_estudios['ic_superior'],
+            'peso': grupo_estudios[f'peso_{modelo_pesos}'],
+        }))
+        filas_combinado = combinado[combinado['metrica'] == metrica]
+        partes.append(filas_combinado.assign(tipo='combinado', etiqueta=filas_combinado['modelo'], peso=100.0))
+    return pd.concat(partes, ignore_index=True)[columnas]
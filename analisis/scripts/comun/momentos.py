@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+MOMENTOS EN LÍNEA (MODO STREAMING)
+===================================
+Estadística descriptiva sin materializar el archivo completo: los CSV por
+clase se leen en bloques y, en una sola pasada, se mantienen por celda
+(group, category, test_class, test_name) y métrica:
+
+  • conteo, media y M2 (Welford / Chan, combinables entre bloques)
+  • mínimo y máximo
+  • histograma de valores distintos (opcional) para mediana, Q1 y Q3 exactos
+
+Las métricas de cobertura se repiten en cada iteración y los tiempos vienen
+redondeados a milisegundos, así que el número de valores distintos por celda
+es pequeño y los cuantiles salen exactos (interpolación lineal, igual que
+pandas.Series.quantile) con memoria acotada.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from comun.carga import MAX_HILOS, grupo_desde_archivo, listar_archivos_metricas
+
+CLAVES = ['group', 'category', 'test_class', 'test_name']
+METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+TAMANO_BLOQUE = 500_000
+
+# Modo streaming: --streaming / --sin-streaming en la línea de comandos o la
+# variable de entorno ANALISIS_STREAMING=1/0. Si no se indica, se activa
+# cuando los CSV por clase suman más de UMBRAL_STREAMING bytes
+VARIABLE_STREAMING = 'ANALISIS_STREAMING'
+UMBRAL_STREAMING = 512 * 1024 ** 2
+
+# ==================================================================================
+# SELECCIÓN DEL MODO
+# ==================================================================================
+
+def modo_streaming(ruta_base, argv=None, umbral=UMBRAL_STREAMING):
+    """
+    True si la descriptiva debe salir de acumuladores por bloques: opción de
+    línea de comandos, después la variable de entorno y, si no hay ninguna,
+    tamaño total de los CSV por clase por encima de `umbral`.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if '--streaming' in argv:
+        return True
+    if '--sin-streaming' in argv:
+        return False
+    valor = os.environ.get(VARIABLE_STREAMING, '').strip().lower()
+    if valor:
+        return valor not in ('0', 'no', 'false')
+    return sum(archivo.stat().st_size for archivo, _ in listar_archivos_metricas(ruta_base)) > umbral
+
+# ==================================================================================
+# LECTURA EN BLOQUES
+# ==================================================================================
+
+def leer_bloques_archivo(archivo, categoria, tamano_bloque=TAMANO_BLOQUE):
+    """Itera un CSV por clase en bloques, con las columnas que añade 01_PASO1"""
+    for bloque in pd.read_csv(archivo, chunksize=tamano_bloque):
+        bloque['category'] = categoria
+        bloque['group'] = grupo_desde_archivo(archivo)
+        bloque['test_name'] = archivo.stem
+        yield bloque
+
+
+def leer_en_bloques(ruta_base, tamano_bloque=TAMANO_BLOQUE):
+    """Itera todos los CSV por clase en bloques, en orden estable"""
+    for archivo, categoria in listar_archivos_metricas(ruta_base):
+        yield from leer_bloques_archivo(archivo, categoria, tamano_bloque)
+
+# ==================================================================================
+# CUANTILES DESDE HISTOGRAMAS
+# ==================================================================================
+
+def cuantiles_desde_histograma(histograma, qs):
+    """
+    Cuantiles exactos por grupo a partir de un histograma de valores.
+
+    `histograma` es una Series de conteos indexada por (claves..., valor).
+    Para cada grupo de n elementos y cada q se busca la posición
+    h = (n - 1) * q en el acumulado de conteos y se interpola linealmente
+    entre los valores de rango floor(h) y floor(h) + 1.
+    """
+    histograma = histograma[histograma > 0].sort_index()
+    valores = histograma.index.get_level_values(-1).to_numpy(dtype=float)
+    conteos = histograma.to_numpy(dtype=np.int64)
+    codigos, grupos = pd.factorize(histograma.index.droplevel(-1))
+
+    n = np.bincount(codigos, weights=conteos).astype(np.int64)
+    acumulado = np.cumsum(conteos)
+    base = np.concatenate([[0], np.cumsum(n)[:-1]])
+
+    resultado = {}
+    for q in qs:
+        h = (n - 1) * q
+        bajo = np.floor(h).astype(np.int64)
+        alto = np.minimum(bajo + 1, n - 1)
+        v_bajo = valores[np.searchsorted(acumulado, base + bajo, side='right')]
+        v_alto = valores[np.searchsorted(acumulado, base + alto, side='right')]
+        resultado[q] = v_bajo + (h - bajo) * (v_alto - v_bajo)
+    return pd.DataFrame(resultado, index=grupos)
+
+# ==================================================================================
+# ACUMULADOR
+# ==================================================================================
+
+class MomentosEnLinea:
+    """
+    Acumulador por celda de claves y métrica.
+
+    Uso:
+        momentos = MomentosEnLinea()
+        for bloque in leer_en_bloques(ruta_base):
+            momentos.actualizar(bloque)
+        tabla = momentos.reducir(['group']).tabla()
+    """
+
+    def __init__(self, claves=CLAVES, metricas=METRICAS, cuantiles=True):
+        self.claves = list(claves)
+        self.metricas = list(metricas)
+        self.cuantiles = cuantiles
+        self.n = self.media = self.m2 = self.minimo = self.maximo = None
+        self.histogramas = {}
+
+    def actualizar(self, bloque):
+        """Incorpora un bloque de filas (fórmula de Chan para combinar momentos)"""
+        grupos = bloque.groupby(self.claves, sort=False, observed=True)[self.metricas]
+        n = grupos.count()
+        media = grupos.mean()
+        m2 = (grupos.var(ddof=0) * n).fillna(0.0)
+        self._fusionar(n, media, m2, grupos.min(), grupos.max())
+
+        if self.cuantiles:
+            for metrica in self.metricas:
+                conteo = bloque.groupby(self.claves + [metrica], observed=True).size()
+                previo = self.histogramas.get(metrica)
+                self.histogramas[metrica] = conteo if previo is None else previo.add(conteo, fill_value=0)
+        return self
+
+    def fusionar(self, otro):
+        """Incorpora otro acumulador con las mismas claves y métricas"""
+        if otro.n is None:
+            return self
+        self._fusionar(otro.n, otro.media, otro.m2, otro.minimo, otro.maximo)
+        for metrica, conteo in otro.histogramas.items():
+            previo = self.histogramas.get(metrica)
+            self.histogramas[metrica] = conteo if previo is None else previo.add(conteo, fill_value=0)
+        return self
+
+    def _fusionar(self, n_b, media_b, m2_b, minimo_b, maximo_b):
+        if self.n is None:
+            self.n, self.media, self.m2 = n_b, media_b, m2_b
+            self.minimo, self.maximo = minimo_b, maximo_b
+            return
+
+        indice = self.n.index.union(n_b.index)
+        n_a = self.n.reindex(indice, fill_value=0)
+        n_b = n_b.reindex(indice, fill_value=0)
+        media_a = self.media.reindex(indice).fillna(0.0)
+        media_b = media_b.reindex(indice).fillna(0.0)
+
+        n = n_a + n_b
+        delta = media_b - media_a
+        peso_b = (n_b / n.where(n > 0)).fillna(0.0)
+
+        self.n = n
+        self.media = (media_a + delta * peso_b).where(n > 0)
+        self.m2 = (self.m2.reindex(indice).fillna(0.0) + m2_b.reindex(indice).fillna(0.0)
+                   + delta ** 2 * n_a * peso_b)
+        self.minimo = np.fmin(self.minimo.reindex(indice), minimo_b.reindex(indice))
+        self.maximo = np.fmax(self.maximo.reindex(indice), maximo_b.reindex(indice))
+
+    def reducir(self, claves):
+        """
+        Agrega las celdas a un conjunto de claves más grueso (p. ej. ['group']
+        o ['category', 'group']) sin volver a leer los datos.
+        """
+        claves = list(claves)
+        reducido = MomentosEnLinea(claves, self.metricas, self.cuantiles)
+
+        n = self.n.groupby(level=claves, observed=True).sum()
+        media = (self.media.fillna(0.0) * self.n).groupby(level=claves, observed=True).sum() / n.where(n > 0)
+
+        # M2 combinado = Σ [M2_i + n_i (media_i - media)²]
+        sobrantes = [c for c in self.claves if c not in claves]
+        indice_grueso = self.n.index.droplevel(sobrantes) if sobrantes else self.n.index
+        if len(claves) > 1:
+            indice_grueso = indice_grueso.reorder_levels(claves)
+        media_expandida = media.reindex(indice_grueso).to_numpy()
+        desvio = (self.media.to_numpy() - media_expandida)
+        dispersion = self.m2 + self.n * np.nan_to_num(desvio) ** 2
+
+        reducido.n = n
+        reducido.media = media
+        reducido.m2 = dispersion.groupby(level=claves, observed=True).sum()
+        reducido.minimo = self.minimo.groupby(level=claves, observed=True).min()
+        reducido.maximo = self.maximo.groupby(level=claves, observed=True).max()
+        reducido.histogramas = {m: h.groupby(level=claves + [m], observed=True).sum()
+                                for m, h in self.histogramas.items()}
+        return reducido
+
+    def tabla(self):
+        """
+        Tabla descriptiva en formato largo, indexada por (claves..., metrica):
+        n, media, mediana, desv_est (ddof=1), min, max, q1, q3, iqr.
+        """
+        partes = []
+        for metrica in self.metricas:
+            n = self.n[metrica]
+            parte = pd.DataFrame({
+                'n': n.astype(np.int64),
+                'media': self.media[metrica],
+                'desv_est': np.sqrt(self.m2[metrica] / (n - 1).where(n > 1)),
+                'min': self.minimo[metrica],
+                'max': self.maximo[metrica],
+            })
+            if self.cuantiles and metrica in self.histogramas:
+                cuantiles = cuantiles_desde_histograma(self.histogramas[metrica], [0.25, 0.5, 0.75])
+                cuantiles = cuantiles.reindex(parte.index)
+                parte['mediana'] = cuantiles[0.5].to_numpy()
+                parte['q1'] = cuantiles[0.25].to_numpy()
+                parte['q3'] = cuantiles[0.75].to_numpy()
+                parte['iqr'] = parte['q3'] - parte['q1']
+            parte = parte[parte['n'] > 0]
+            parte['metrica'] = metrica
+            partes.append(parte.set_index('metrica', append=True))
+        return pd.concat(partes).sort_index()
+
+
+def momentos_en_streaming(ruta_base, claves=CLAVES, metricas=METRICAS,
+                          tamano_bloque=TAMANO_BLOQUE, cuantiles=True, max_hilos=MAX_HILOS):
+    """
+    Una pasada por bloques sobre todos los CSV por clase. Cada archivo se
+    acumula en su propio hilo y los acumuladores se fusionan al final, de
+    modo que la memoria sigue acotada a un bloque por hilo.
+    """
+    def acumular(item):
+        archivo, categoria = item
+        parcial = MomentosEnLinea(claves, metricas, cuantiles)
+        for bloque in leer_bloques_archivo(archivo, categoria, tamano_bloque):
+            parcial.actualizar(bloque)
+        return parcial
+
+    momentos = MomentosEnLinea(claves, metricas, cuantiles)
+    with ThreadPoolExecutor(max_workers=max_hilos) as executor:
+        for parcial in executor.map(acumular, listar_archivos_metricas(ruta_base)):
+            momentos.fusionar(parcial)
+    return momentos
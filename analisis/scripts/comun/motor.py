@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE PRUEBAS ESTADÍSTICAS POR CELDAS
+=========================================
+Los PASOS recorren `for metrica in METRICAS: for grupo in ...` filtrando el
+DataFrame y llamando a shapiro, levene, ttest_ind y mannwhitneyu celda a
+celda. Este motor toma el dataset una sola vez:
+
+  1. Ordena las filas con comun.indice (un único lexsort) y obtiene los
+     promedios por test (N=12) con sus reductores.
+  2. Construye los arrays de cada celda (nivel, métrica, grupo) como vistas
+     de los tramos contiguos de cada grupo.
+  3. Reparte las celdas independientes (prueba, nivel, métrica) en un pool
+     de procesos y devuelve una única tabla larga de resultados. La
+     descriptiva no va al pool: sale del kernel de comun.descriptiva, que
+     ordena cada métrica una sola vez para todos los grupos. Levene
+     tampoco: comun.homogeneidad lo calcula para todas las métricas de un
+     nivel en una sola llamada.
+
+Cada fila de la tabla es una prueba sobre una celda: las pruebas de un
+grupo (descriptiva, shapiro) tienen grupo 'Manual' o 'IA'; las de dos
+muestras (levene, t_student, mann_whitney) tienen grupo 'Manual vs IA' y las
+columnas *_manual / *_ia. Los scripts consumidores solo seleccionan filas y
+renombran columnas:
+
+    resultados = ejecutar_pruebas(df)
+    fila = celda(resultados, 'levene', 'N=12', 'time_seconds')
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import shapiro, ttest_ind
+
+from comun.descriptiva import ordenar_filas, tabla_descriptiva
+from comun.esquema import COLUMNAS_METRICAS
+from comun.homogeneidad import levene_por_estrato
+from comun.indice import IndiceCompuesto
+from comun.rangos import mann_whitney
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+GRUPOS = ['Manual', 'IA']
+PAREJA = 'Manual vs IA'
+NIVELES = ['N=2480', 'N=12']
+PRUEBAS_UN_GRUPO = ['descriptiva', 'shapiro']
+PRUEBAS_DOS_GRUPOS = ['levene', 't_student', 'mann_whitney']
+PRUEBAS = PRUEBAS_UN_GRUPO + PRUEBAS_DOS_GRUPOS
+PRUEBAS_VECTORIZADAS = ['descriptiva', 'levene']
+
+# None = un proceso por CPU; con 1 (o una sola CPU) se calcula en serie
+MAX_PROCESOS = None
+
+# ==================================================================================
+# CELDAS
+# ==================================================================================
+
+def construir_celdas(indice, promedios, metricas=COLUMNAS_METRICAS, grupos=GRUPOS):
+    """
+    {(nivel, metrica): {grupo: array}} para los dos niveles. Los arrays de
+    N=2480 son tramos del índice ordenado (sin NaN); los de N=12 salen de
+    los promedios por (group, test_name).
+    """
+    codigos_grupo = promedios['group'].astype(str).to_numpy()
+
+    celdas = {}
+    for metrica in metricas:
+        crudos, medias = {}, {}
+        for grupo in grupos:
+            valores = indice.valores(metrica, grupo).astype(np.float64)
+            crudos[grupo] = valores[~np.isnan(valores)]
+            medias[grupo] = promedios[metrica].to_numpy()[codigos_grupo == grupo]
+        celdas[('N=2480', metrica)] = crudos
+        celdas[('N=12', metrica)] = medias
+    return celdas
+
+
+def filas_descriptivas(datos, nivel, metricas, grupos=GRUPOS):
+    """Filas 'descriptiva' de un nivel, en el orden métrica → grupo"""
+    return filas_desde_tabla(tabla_descriptiva(datos, ['group'], metricas), nivel, metricas, grupos)
+
+
+def filas_desde_tabla(tabla, nivel, metricas, grupos=GRUPOS):
+    """
+    Filas 'descriptiva' a partir de una tabla indexada por (group, metrica),
+    p. ej. la de comun.momentos en modo streaming
+    """
+    tabla = ordenar_filas(tabla, [('metrica', metricas), ('group', grupos)])
+    tabla = tabla.rename(columns={'group': 'grupo'})
+    tabla['var'] = tabla['desv_est'] ** 2
+    tabla.insert(0, 'prueba', 'descriptiva')
+    tabla.insert(1, 'nivel', nivel)
+    columnas = ['prueba', 'nivel', 'metrica', 'grupo', 'n', 'media', 'mediana', 'desv_est', 'var',
+                'min', 'max', 'q1', 'q3']
+    return tabla[columnas].to_dict('records')
+
+
+def filas_levene(datos, nivel, metricas, grupos=GRUPOS):
+    """Filas 'levene' (centro mediana, como scipy) de un nivel, en el orden de `metricas`"""
+    tabla = levene_por_estrato(datos, metricas, grupos=grupos, centros=['mediana'])
+    filas = []
+    for fila in tabla.to_dict('records'):
+        base = {'prueba': 'levene', 'nivel': nivel, 'metrica': fila['metrica'], 'grupo': PAREJA}
+        for columna in ['n', 'media', 'mediana', 'sd', 'var']:
+            for grupo in grupos:
+                sufijo = grupo.lower()
+                origen = fila[f'var_{sufijo}'] ** 0.5 if columna == 'sd' else fila[f'{columna}_{sufijo}']
+                base[f'{columna}_{sufijo}'] = origen
+        filas.append(dict(base, estadistico=fila['estadistico'], p_value=fila['p_value']))
+    return filas
+
+# ==================================================================================
+# PRUEBAS (SE EJECUTAN EN LOS PROCESOS DEL POOL)
+# ==================================================================================
+
+def prueba_shapiro(datos):
+    """W y p de Shapiro-Wilk con los descriptivos de la celda"""
+    W, p = shapiro(datos)
+    return {
+        'n': len(datos),
+        'media': np.mean(datos),
+        'mediana': np.median(datos),
+        'desv_est': np.std(datos, ddof=1),
+        'var': np.var(datos, ddof=1),
+        'min': np.min(datos),
+        'max': np.max(datos),
+        'q1': np.percentile(datos, 25),
+        'q3': np.percentile(datos, 75),
+        'estadistico': W,
+        'p_value': p,
+    }
+
+
+def comparativa(manual, ia):
+    """Columnas comunes de las pruebas de dos muestras"""
+    return {
+        'n_manual': len(manual), 'n_ia': len(ia),
+        'media_manual': np.mean(manual), 'media_ia': np.mean(ia),
+        'mediana_manual': np.median(manual), 'mediana_ia': np.median(ia),
+        'sd_manual': np.std(manual, ddof=1), 'sd_ia': np.std(ia, ddof=1),
+        'var_manual': np.var(manual, ddof=1), 'var_ia': np.var(ia, ddof=1),
+    }
+
+
+def prueba_t_student(manual, ia):
+    """t de Student (varianzas iguales) y de Welch, más d de Cohen"""
+    base = comparativa(manual, ia)
+    t_std, p_std = ttest_ind(manual, ia, equal_var=True)
+    t_welch, p_welch = ttest_ind(manual, ia, equal_var=False)
+    n1, n2 = base['n_manual'], base['n_ia']
+    pooled_std = np.sqrt(((n1 - 1) * base['sd_manual'] ** 2 + (n2 - 1) * base['sd_ia'] ** 2) / (n1 + n2 - 2))
+    cohens_d = (base['media_manual'] - base['media_ia']) / pooled_std if pooled_std > 0 else 0
+    return dict(base, estadistico=t_std, p_value=p_std,
+                estadistico_welch=t_welch, p_value_welch=p_welch, cohens_d=cohens_d)
+
+
+def prueba_mann_whitney(manual, ia):
+    """U bilateral, Z con varianza corregida por empates, r = |Z| / √N y biserial de rangos"""
+    mw = mann_whitney(manual, ia)
+    return dict(comparativa(manual, ia), estadistico=mw['estadistico'], p_value=mw['p_value'],
+                z=mw['z'], r=mw['r'], rank_biserial=mw['biserial'])
+
+
+# Las pruebas de PRUEBAS_VECTORIZADAS no pasan por aquí (filas_descriptivas, filas_levene)
+FUNCIONES = {
+    'shapiro': prueba_shapiro,
+    't_student': prueba_t_student,
+    'mann_whitney': prueba_mann_whitney,
+}
+
+
+def calcular_celda(tarea):
+    """Ejecuta una prueba sobre una celda y devuelve sus filas de resultados"""
+    prueba, nivel, metrica, datos = tarea
+    funcion = FUNCIONES[prueba]
+    clave = {'prueba': prueba, 'nivel': nivel, 'metrica': metrica}
+    if prueba in PRUEBAS_UN_GRUPO:
+        return [dict(clave, grupo=grupo, **funcion(valores)) for grupo, valores in datos.items()]
+    return [dict(clave, grupo=PAREJA, **funcion(datos['Manual'], datos['IA']))]
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def ejecutar_pruebas(df, metricas=COLUMNAS_METRICAS, pruebas=PRUEBAS, niveles=NIVELES,
+                     max_procesos=MAX_PROCESOS):
+    """
+    Calcula todas las `pruebas` para cada (nivel, métrica) y devuelve la
+    tabla larga de resultados, en el orden prueba → nivel → métrica → grupo.
+    """
+    indice = df if isinstance(df, IndiceCompuesto) else IndiceCompuesto(df)
+    promedios = indice.medias_por_test(metricas)
+    celdas = construir_celdas(indice, promedios, metricas)
+    tareas = [(prueba, nivel, metrica, celdas[(nivel, metrica)])
+              for prueba in pruebas if prueba not in PRUEBAS_VECTORIZADAS
+              for nivel in niveles for metrica in metricas]
+
+    procesos = max_procesos or os.cpu_count() or 1
+    if procesos <= 1 or len(tareas) <= 1:
+        calculadas = [calcular_celda(tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(tareas))) as executor:
+            calculadas = list(executor.map(calcular_celda, tareas))
+
+    por_prueba = {prueba: [] for prueba in pruebas}
+    for tarea, filas in zip(tareas, calculadas):
+        por_prueba[tarea[0]] += filas
+    datos = {'N=2480': indice.df, 'N=12': promedios}
+    if 'descriptiva' in pruebas:
+        por_prueba['descriptiva'] = [fila for nivel in niveles
+                                     for fila in filas_descriptivas(datos[nivel], nivel, metricas)]
+    if 'levene' in pruebas:
+        por_prueba['levene'] = [fila for nivel in niveles
+                                for fila in filas_levene(datos[nivel], nivel, metricas)]
+    return pd.DataFrame([fila for prueba in pruebas for fila in por_prueba[prueba]])
+
+
+def celda(resultados, prueba, nivel, metrica, grupo=None):
+    """Fila de resultados de una celda (grupo por defecto: 'Manual vs IA' o único)"""
+    seleccion = resultados[(resultados['prueba'] == prueba) & (resultados['nivel'] == nivel)
+                           & (resultados['metrica'] == metrica)]
+    if grupo is not None:
+        seleccion = seleccion[seleccion['grupo'] == grupo]
+    if len(seleccion) != 1:
+        raise KeyError(f"Se esperaba una fila para {(prueba, nivel, metrica, grupo)}, hay {len(seleccion)}")
+    return seleccion.iloc[0]
+
+
+def seleccionar(resultados, prueba, nivel):
+    """Filas de una prueba y un nivel, en el orden métrica → grupo"""
+    return resultados[(resultados['prueba'] == prueba) & (resultados['nivel'] == nivel)].reset_index(drop=True)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+CORRECCIÓN POR COMPARACIONES MÚLTIPLES
+=======================================
+Holm (control del error de familia) y Benjamini-Hochberg (control de la
+tasa de falsos descubrimientos) sobre arrays completos de p-values: una
+ordenación y un máximo/mínimo acumulado por familia, sin bucles por
+prueba. Los NaN (pruebas que no se pudieron calcular) no cuentan en m y
+siguen siendo NaN.
+
+    tabla = ajustar_tabla(cubo, familias=['prueba'])   # añade p_holm y p_bh
+"""
+
+import numpy as np
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+METODOS = ['holm', 'bh']
+ALFA = 0.05
+
+# ==================================================================================
+# AJUSTES
+# ==================================================================================
+
+def holm(p_values):
+    """p-values ajustados de Holm-Bonferroni (step-down)"""
+    p = np.asarray(p_values, dtype=np.float64)
+    ajustados = np.full(p.shape, np.nan)
+    validos = np.flatnonzero(~np.isnan(p))
+    m = len(validos)
+    if m == 0:
+        return ajustados
+    orden = validos[np.argsort(p[validos], kind='stable')]
+    escalados = (m - np.arange(m)) * p[orden]
+    ajustados[orden] = np.minimum(1.0, np.maximum.accumulate(escalados))
+    return ajustados
+
+
+def benjamini_hochberg(p_values):
+    """p-values ajustados de Benjamini-Hochberg (step-up)"""
+    p = np.asarray(p_values, dtype=np.float64)
+    ajustados = np.full(p.shape, np.nan)
+    validos = np.flatnonzero(~np.isnan(p))
+    m = len(validos)
+    if m == 0:
+        return ajustados
+    orden = validos[np.argsort(p[validos], kind='stable')]
+    escalados = p[orden] * m / np.arange(1, m + 1)
+    ajustados[orden] = np.minimum(1.0, np.minimum.accumulate(escalados[::-1])[::-1])
+    return ajustados
+
+
+FUNCIONES = {'holm': holm, 'bh': benjamini_hochberg}
+
+
+def ajustar(p_values, metodo='holm'):
+    return FUNCIONES[metodo](p_values)
+
+
+def ajustar_tabla(tabla, columna_p='p_value', familias=(), metodos=METODOS, alfa=ALFA):
+    """
+    Copia de `tabla` con p_<método> y significativo_<método> por cada
+    método. Cada combinación de `familias` (p. ej. ['prueba']) se corrige
+    por separado; sin familias, toda la tabla es una sola familia.
+    """
+    tabla = tabla.copy()
+    familias = list(familias)
+    p = tabla[columna_p].to_numpy(dtype=np.float64)
+    if familias:
+        grupos = tabla.groupby(familias, sort=False, observed=True).indices.values()
+    else:
+        grupos = [np.arange(len(tabla))]
+    for metodo in metodos:
+        ajustados = np.full(len(tabla), np.nan)
+        for filas in grupos:
+            ajustados[filas] = ajustar(p[filas], metodo)
+        tabla[f'p_{metodo}'] = ajustados
+        tabla[f'significativo_{metodo}'] = ajustados < alfa
+    return tabla
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE NORMALIDAD ESCALABLE
+==============================
+01_PASO1 aplica shapiro a cada grupo completo; scipy avisa de que el p-value
+de Shapiro-Wilk no es fiable por encima de N=5000 y el nivel de datos
+brutos crece con cada ejecución del runner. Este motor evalúa todas las
+columnas (métrica, grupo) a la vez con pruebas que escalan:
+
+  • Un argsort estable de los códigos de grupo (radix sort) reparte las
+    filas en un bloque (métricas × filas) por grupo, con cada métrica
+    contigua en memoria.
+  • D'Agostino-Pearson (K² = Z_asimetría² + Z_curtosis²) y Jarque-Bera
+    salen de los momentos centrales 2-4: dos pasadas de reducciones por
+    fila sobre cada bloque, todas las métricas a la vez.
+  • Anderson-Darling ordena cada bloque en sitio (una llamada por grupo).
+    El p-value usa las fórmulas de D'Agostino y Stephens (1986) con A²
+    ajustado.
+  • Shapiro-Wilk se mantiene como prueba opcional por columna para las
+    muestras pequeñas (N=12), donde las omnibus no están definidas; por
+    encima de MAX_N_SHAPIRO filas queda en NaN.
+  • Submuestreo estratificado opcional: cuota proporcional por estrato
+    (p. ej. test_name dentro de cada grupo) con una permutación aleatoria
+    y un argsort estable de los códigos, O(n).
+
+matriz_decisiones() reproduce la matriz de 01_PASO1 (t-Student si ambos
+grupos son normales, Mann-Whitney U si no) a partir de cualquier prueba.
+
+    tabla = pruebas_normalidad(df, METRICAS, n_submuestra=5000)
+    decisiones = matriz_decisiones(tabla[tabla['prueba'] == 'anderson'])
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.special import log_ndtr
+from scipy.stats import chi2, shapiro
+
+from comun.descriptiva import codigos_combinados, tipo_codigo
+from comun.esquema import COLUMNAS_METRICAS
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+PRUEBAS = ['dagostino', 'anderson', 'jarque_bera']
+PRUEBAS_DISPONIBLES = PRUEBAS + ['shapiro']
+ALFA = 0.05
+SEMILLA = 20240601
+
+# Tamaños mínimos: skewtest de scipy exige 8 observaciones; Shapiro, 3
+MIN_N_DAGOSTINO = 8
+MIN_N_SHAPIRO = 3
+
+# p-value de Anderson-Darling para A* >= 10 (cota de la aproximación)
+P_VALUE_MINIMO_ANDERSON = 3.7e-24
+
+# Por encima de este tamaño scipy ya no garantiza el p-value de Shapiro-Wilk
+MAX_N_SHAPIRO = 5000
+
+# ==================================================================================
+# SUBMUESTREO ESTRATIFICADO
+# ==================================================================================
+
+def submuestra_estratificada(codigos_estrato, n_objetivo, semilla=SEMILLA):
+    """
+    Índices (ordenados) de una submuestra de unas n_objetivo filas con
+    asignación proporcional: cada estrato aporta round(n_objetivo · n_e / n)
+    filas, al menos una. Permutación + argsort estable de los códigos: O(n).
+    """
+    n = len(codigos_estrato)
+    if n_objetivo >= n:
+        return np.arange(n)
+    rng = np.random.default_rng(semilla)
+    permutacion = rng.permutation(n)
+    codigos = codigos_estrato.astype(tipo_codigo(int(codigos_estrato.max()) + 1))
+    orden = permutacion[np.argsort(codigos[permutacion], kind='stable')]
+
+    tamanos = np.bincount(codigos_estrato)
+    cuotas = np.where(tamanos > 0, np.maximum(1, np.rint(n_objetivo * tamanos / n)), 0).astype(np.int64)
+    inicios = np.concatenate([[0], np.cumsum(tamanos)[:-1]])
+    posicion = np.arange(n) - np.repeat(inicios, tamanos)
+    elegidas = orden[posicion < np.repeat(cuotas, tamanos)]
+    return np.sort(elegidas)
+
+# ==================================================================================
+# MOMENTOS POR COLUMNA
+# ==================================================================================
+
+def momentos_centrales(bloque):
+    """
+    n, media y momentos centrales m2, m3, m4 (sesgados, como scipy.stats.skew
+    y kurtosis) de cada fila de `bloque` (métricas × observaciones de un
+    grupo). Reducciones por fila: suma por pares, sin bucles por métrica.
+    Los NaN no cuentan.
+    """
+    nulos = np.isnan(bloque)
+    if nulos.any():
+        n = (~nulos).sum(axis=1)
+        bloque = np.where(nulos, 0.0, bloque)
+    else:
+        n, nulos = np.full(len(bloque), bloque.shape[1]), None
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = bloque.sum(axis=1) / n
+        desvio = bloque - media[:, None]
+        if nulos is not None:
+            desvio[nulos] = 0.0
+        cuadrado = desvio * desvio
+        m2 = cuadrado.sum(axis=1) / n
+        m3 = (cuadrado * desvio).sum(axis=1) / n
+        m4 = (cuadrado * cuadrado).sum(axis=1) / n
+    return n, media, m2, m3, m4
+
+# ==================================================================================
+# PRUEBAS VECTORIZADAS
+# ==================================================================================
+
+def z_asimetria(n, m2, m3):
+    """Z de la prueba de asimetría de D'Agostino (scipy.stats.skewtest)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        b2 = m3 / m2 ** 1.5
+        y = b2 * np.sqrt(((n + 1) * (n + 3)) / (6.0 * (n - 2)))
+        beta2 = (3.0 * (n ** 2 + 27 * n - 70) * (n + 1) * (n + 3)
+                 / ((n - 2.0) * (n + 5) * (n + 7) * (n + 9)))
+        w2 = -1 + np.sqrt(2 * (beta2 - 1))
+        delta = 1 / np.sqrt(0.5 * np.log(w2))
+        alpha = np.sqrt(2.0 / (w2 - 1))
+        y = np.where(y == 0, 1, y)
+        return delta * np.log(y / alpha + np.sqrt((y / alpha) ** 2 + 1))
+
+
+def z_curtosis(n, m2, m4):
+    """Z de la prueba de curtosis de Anscombe-Glynn (scipy.stats.kurtosistest)"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        b2 = m4 / m2 ** 2
+        esperada = 3.0 * (n - 1) / (n + 1)
+        var_b2 = 24.0 * n * (n - 2) * (n - 3) / ((n + 1) ** 2.0 * (n + 3) * (n + 5))
+        x = (b2 - esperada) / np.sqrt(var_b2)
+        sqrt_beta1 = (6.0 * (n * n - 5 * n + 2) / ((n + 7) * (n + 9))
+                      * np.sqrt((6.0 * (n + 3) * (n + 5)) / (n * (n - 2) * (n - 3))))
+        a = 6.0 + 8.0 / sqrt_beta1 * (2.0 / sqrt_beta1 + np.sqrt(1 + 4.0 / sqrt_beta1 ** 2))
+        termino1 = 1 - 2 / (9.0 * a)
+        denominador = 1 + x * np.sqrt(2 / (a - 4.0))
+        termino2 = np.sign(denominador) * np.where(
+            denominador == 0, np.nan, ((1 - 2.0 / a) / np.abs(denominador)) ** (1 / 3.0))
+        return (termino1 - termino2) / np.sqrt(2 / (9.0 * a))
+
+
+def prueba_dagostino(n, m2, m3, m4):
+    """K² de D'Agostino-Pearson y p-value chi² con 2 gl (scipy.stats.normaltest)"""
+    k2 = z_asimetria(n, m2, m3) ** 2 + z_curtosis(n, m2, m4) ** 2
+    k2 = np.where(n >= MIN_N_DAGOSTINO, k2, np.nan)
+    return k2, chi2.sf(k2, 2)
+
+
+def prueba_jarque_bera(n, m2, m3, m4):
+    """JB = n/6 · (asimetría² + (curtosis − 3)²/4) y p-value chi² con 2 gl"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        jb = n / 6.0 * ((m3 / m2 ** 1.5) ** 2 + (m4 / m2 ** 2 - 3) ** 2 / 4)
+    jb = np.where(n >= 2, jb, np.nan)
+    return jb, chi2.sf(jb, 2)
+
+
+def p_value_anderson(a2, n):
+    """
+    p-value de A² (media y varianza estimadas), D'Agostino y Stephens (1986),
+    tabla 4.9. Por encima de A* = 10 la aproximación deja de ser monótona y
+    se devuelve su valor en ese punto como cota, igual que nortest::ad.test.
+    """
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        a = a2 * (1 + 0.75 / n + 2.25 / n ** 2)
+        return np.select(
+            [a >= 10, a >= 0.6, a >= 0.34, a >= 0.2, a < 0.2],
+            [P_VALUE_MINIMO_ANDERSON,
+             np.exp(1.2937 - 5.709 * a + 0.0186 * a ** 2),
+             np.exp(0.9177 - 4.279 * a - 1.38 * a ** 2),
+             1 - np.exp(-8.318 + 42.796 * a - 59.938 * a ** 2),
+             1 - np.exp(-13.436 + 101.14 * a - 223.73 * a ** 2)],
+            default=np.nan)
+
+
+def log_colas_normales(z):
+    """
+    (ln Φ(z), ln(1 − Φ(z))) con una sola evaluación de log_ndtr: la cola
+    pequeña se calcula con precisión y la otra como log1p(−exp(cola)).
+    """
+    cola = log_ndtr(-np.abs(z))
+    complemento = np.log1p(-np.exp(cola))
+    negativo = z < 0
+    return np.where(negativo, cola, complemento), np.where(negativo, complemento, cola)
+
+
+def prueba_anderson(bloque, media, desv_est):
+    """
+    A² de Anderson-Darling de cada fila de `bloque` (métricas × observaciones
+    de un grupo, se ordena en sitio) contra la normal con media y desviación
+    (ddof=1) estimadas. Los NaN quedan al final de cada fila y no cuentan.
+
+    Σ (2i+1)·[ln Φ(z_i) + ln(1 − Φ(z_{n−1−i}))] se reordena como
+    Σ [(2i+1)·ln Φ(z_i) + (2n−1−2i)·ln(1 − Φ(z_i))]: no hace falta invertir
+    las filas, que pueden tener distinto n.
+    """
+    bloque.sort(axis=1)
+    n = (~np.isnan(bloque)).sum(axis=1)[:, None]
+    i = np.arange(bloque.shape[1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (bloque - media[:, None]) / desv_est[:, None]
+        log_cdf, log_sf = log_colas_normales(z)
+        terminos = (2 * i + 1) * log_cdf + (2 * n - 1 - 2 * i) * log_sf
+        if (n < bloque.shape[1]).any():
+            terminos = np.where(i < n, terminos, 0.0)
+        n = n[:, 0]
+        a2 = -n - terminos.sum(axis=1) / n
+    a2 = np.where((n >= MIN_N_SHAPIRO) & (desv_est > 0), a2, np.nan)
+    return a2, p_value_anderson(a2, n)
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def pruebas_normalidad(df, metricas=COLUMNAS_METRICAS, columna_grupo='group', pruebas=PRUEBAS,
+                       alfa=ALFA, n_submuestra=None, estratos=('test_name',), semilla=SEMILLA):
+    """
+    Tabla larga con una fila por (metrica, grupo, prueba): n, estadistico,
+    p_value y es_normal (p >= alfa). Con n_submuestra, cada grupo con más
+    filas se evalúa sobre una submuestra estratificada por `estratos`.
+    """
+    codigos, etiquetas = codigos_combinados(df, [columna_grupo])
+    grupos = list(etiquetas[columna_grupo])
+    # Métricas × filas: cada métrica contigua en memoria para reducir y ordenar
+    datos = np.ascontiguousarray(df[list(metricas)].to_numpy(dtype=np.float64).T)
+
+    # Filas de cada grupo con un argsort estable de los códigos (radix sort)
+    orden = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[orden], np.arange(len(grupos) + 1))
+    filas_grupo = [orden[limites[g]:limites[g + 1]] for g in range(len(grupos))]
+    if n_submuestra is not None:
+        # Código 0 para las filas con alguna clave de estrato nula
+        estrato = codigos_combinados(df, list(estratos))[0].astype(np.int64) + 1
+        filas_grupo = [filas[submuestra_estratificada(estrato[filas], n_submuestra, semilla + g)]
+                       for g, filas in enumerate(filas_grupo)]
+    bloques = [datos[:, filas] for filas in filas_grupo]
+
+    momentos = [momentos_centrales(bloque) for bloque in bloques]
+    n, media, m2, m3, m4 = (np.array([m[k] for m in momentos]) for k in range(5))
+    resultados = {}
+    if 'dagostino' in pruebas:
+        resultados['dagostino'] = prueba_dagostino(n, m2, m3, m4)
+    if 'jarque_bera' in pruebas:
+        resultados['jarque_bera'] = prueba_jarque_bera(n, m2, m3, m4)
+    if 'shapiro' in pruebas:
+        w, p_w = np.full(n.shape, np.nan), np.full(n.shape, np.nan)
+        for g, bloque in enumerate(bloques):
+            for j, columna in enumerate(bloque):
+                columna = columna[~np.isnan(columna)]
+                if MIN_N_SHAPIRO <= len(columna) <= MAX_N_SHAPIRO:
+                    w[g, j], p_w[g, j] = shapiro(columna)
+        resultados['shapiro'] = (w, p_w)
+    if 'anderson' in pruebas:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            desv_est = np.sqrt(m2 * n / (n - 1))
+        partes = [prueba_anderson(bloque, media[g], desv_est[g]) for g, bloque in enumerate(bloques)]
+        resultados['anderson'] = (np.array([p[0] for p in partes]), np.array([p[1] for p in partes]))
+
+    tabla = []
+    for j, metrica in enumerate(metricas):
+        for g in np.argsort(np.asarray(grupos, dtype=str), kind='stable'):
+            for prueba in [nombre for nombre in PRUEBAS_DISPONIBLES if nombre in resultados]:
+                estadistico, p_value = resultados[prueba]
+                tabla.append({
+                    'metrica': metrica,
+                    'grupo': grupos[g],
+                    'prueba': prueba,
+                    'n': int(n[g, j]),
+                    'estadistico': estadistico[g, j],
+                    'p_value': p_value[g, j],
+                    'es_normal': bool(p_value[g, j] >= alfa),
+                })
+    return pd.DataFrame(tabla)
+
+
+def matriz_decisiones(resultados, metricas=COLUMNAS_METRICAS, alfa=ALFA):
+    """
+    Matriz de 01_PASO1 a partir de una tabla con metrica, grupo y p_value
+    (una prueba): por métrica, si ambos grupos son normales y qué prueba
+    usar en el PASO 3.
+    """
+    filas = []
+    for metrica in metricas:
+        datos = resultados[resultados['metrica'] == metrica]
+        manual = datos[datos['grupo'] == 'Manual']
+        ia = datos[datos['grupo'] == 'IA']
+        manual_normal = manual['p_value'].values[0] >= alfa if len(manual) > 0 else False
+        ia_normal = ia['p_value'].values[0] >= alfa if len(ia) > 0 else False
+
+        if len(ia) == 0:  # Solo Manual disponible
+            ambos_normal = f"Manual: {'✓' if manual_normal else '✗'}"
+            test_a_usar = "t-Student (asumiendo IA igual)" if manual_normal else "Mann-Whitney U (asumiendo IA igual)"
+        elif manual_normal and ia_normal:
+            ambos_normal = "✓ SÍ (ambos)"
+            test_a_usar = "t-Student"
+        else:
+            ambos_normal = "✗ NO"
+            test_a_usar = "Mann-Whitney U"
+        filas.append({'metrica': metrica, 'manual_normal': bool(manual_normal), 'ia_normal': bool(ia_normal),
+                      'ambos_normal': ambos_normal, 'test_a_usar': test_a_usar})
+    return pd.DataFrame(filas)
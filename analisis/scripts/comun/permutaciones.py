@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+PRUEBA DE PERMUTACIONES MANUAL vs IA (EXACTA Y MONTE CARLO)
+============================================================
+Con 6 + 6 promedios por test, el p-value de la t de Student depende de
+supuestos de normalidad. La prueba de permutaciones no: bajo H0 las
+etiquetas Manual/IA son intercambiables, así que el p-value es la fracción
+de reparticiones de etiquetas con una diferencia de medias al menos tan
+extrema como la observada (bilateral).
+
+  • Cada repartición es una fila de una matriz de etiquetas 0/1
+    (permutaciones × tests). Las sumas de Manual para TODAS las métricas
+    salen de un único producto matricial etiquetas @ datos.
+  • Si C(n_manual + n_ia, n_manual) <= LIMITE_EXACTO (924 con 6 + 6), se
+    enumeran todas las reparticiones: p-value exacto.
+  • Si no (cientos de tests por grupo), Monte Carlo por bloques con
+    SeedSequence y parada secuencial: tras cada bloque se calcula un IC
+    de Clopper-Pearson del p-value de cada métrica y la métrica se
+    congela en cuanto el IC queda entero por encima o por debajo de ALFA.
+
+    resultados = prueba_permutaciones_por_grupo(df_promedios, METRICAS)
+"""
+
+from itertools import combinations
+from math import comb
+
+import numpy as np
+import pandas as pd
+from scipy.stats import beta
+
+from comun.esquema import COLUMNAS_METRICAS
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+LIMITE_EXACTO = 200_000
+MAX_PERMUTACIONES = 100_000
+SEMILLA = 20240601
+ALFA = 0.05
+
+# Confianza del IC del p-value usado para detener Monte Carlo
+CONFIANZA_PARADA = 0.99
+
+# Tamaño de bloque: permutaciones × tests por bloque
+ELEMENTOS_POR_BLOQUE = 4_000_000
+
+# Comparación con tolerancia: las diferencias iguales a la observada (salvo
+# redondeo) cuentan como igual de extremas. El margen es relativo a la
+# observada más un término absoluto relativo a la escala de los datos, que
+# evita que colapse cuando la observada es ~0 (muestras idénticas)
+TOLERANCIA = 1e-12
+
+# ==================================================================================
+# MATRICES DE ETIQUETAS
+# ==================================================================================
+
+def tamano_de_bloque(n_total):
+    return max(1, ELEMENTOS_POR_BLOQUE // max(1, n_total))
+
+
+def bloques_exactos(n_manual, n_total):
+    """Todas las reparticiones (combinaciones de n_manual posiciones) por bloques"""
+    bloque = tamano_de_bloque(n_total)
+    reparticiones = combinations(range(n_total), n_manual)
+    while True:
+        posiciones = np.array([c for _, c in zip(range(bloque), reparticiones)], dtype=np.int64)
+        if len(posiciones) == 0:
+            return
+        etiquetas = np.zeros((len(posiciones), n_total))
+        np.put_along_axis(etiquetas, posiciones, 1.0, axis=1)
+        yield etiquetas
+
+
+def bloque_aleatorio(rng, n_manual, n_total, n_bloque):
+    """n_bloque reparticiones aleatorias: cada fila es una permutación de las etiquetas"""
+    etiquetas = np.zeros((n_bloque, n_total))
+    etiquetas[:, :n_manual] = 1.0
+    return rng.permuted(etiquetas, axis=1)
+
+# ==================================================================================
+# ESTADÍSTICO
+# ==================================================================================
+
+def diferencias(etiquetas, datos, total, n_manual, n_ia):
+    """Diferencia de medias (Manual − IA) de cada repartición y métrica: un solo matmul"""
+    suma_manual = etiquetas @ datos
+    return suma_manual / n_manual - (total - suma_manual) / n_ia
+
+
+def extremas(diferencias_perm, observada, escala):
+    """
+    Cuenta por métrica las reparticiones con |diferencia| >= |observada|,
+    salvo redondeo: TOLERANCIA relativa a |observada| y a `escala` (máximo
+    |valor| de cada métrica)
+    """
+    umbral = np.abs(observada) * (1 - TOLERANCIA) - TOLERANCIA * escala
+    return (np.abs(diferencias_perm) >= umbral).sum(axis=0)
+
+
+def intervalo_clopper_pearson(k, n, confianza=CONFIANZA_PARADA):
+    """IC exacto de una proporción k/n (arrays)"""
+    alfa = 1 - confianza
+    with np.errstate(invalid='ignore'):
+        inf = np.where(k > 0, beta.ppf(alfa / 2, k, n - k + 1), 0.0)
+        sup = np.where(k < n, beta.ppf(1 - alfa / 2, k + 1, n - k), 1.0)
+    return inf, sup
+
+# ==================================================================================
+# PRUEBA
+# ==================================================================================
+
+def prueba_permutaciones(manual, ia, metricas, limite_exacto=LIMITE_EXACTO,
+                         max_permutaciones=MAX_PERMUTACIONES, semilla=SEMILLA, alfa=ALFA):
+    """
+    Prueba de permutaciones bilateral de la diferencia de medias para todas
+    las métricas a la vez. `manual` e `ia` son matrices (n × métricas).
+
+    Devuelve una fila por métrica con: diferencia, p_value, metodo
+    ('exacto' o 'monte_carlo'), n_permutaciones, ic_p_inf, ic_p_sup y
+    decidido (si el IC del p-value quedó a un lado de `alfa`).
+    """
+    manual = np.asarray(manual, dtype=np.float64)
+    ia = np.asarray(ia, dtype=np.float64)
+    n_manual, n_ia = len(manual), len(ia)
+    n_total = n_manual + n_ia
+    datos = np.vstack([manual, ia])
+    total = datos.sum(axis=0)
+    observada = manual.mean(axis=0) - ia.mean(axis=0)
+    escala = np.abs(datos).max(axis=0, initial=0.0)
+    n_metricas = datos.shape[1]
+
+    n_reparticiones = comb(n_total, n_manual)
+    if n_reparticiones <= limite_exacto:
+        cuenta = np.zeros(n_metricas, dtype=np.int64)
+        for etiquetas in bloques_exactos(n_manual, n_total):
+            cuenta += extremas(diferencias(etiquetas, datos, total, n_manual, n_ia), observada, escala)
+        p_value = cuenta / n_reparticiones
+        metodo = 'exacto'
+        n_permutaciones = np.full(n_metricas, n_reparticiones)
+        ic_inf, ic_sup = p_value, p_value
+        decidido = np.ones(n_metricas, dtype=bool)
+    else:
+        cuenta = np.zeros(n_metricas, dtype=np.int64)
+        n_permutaciones = np.zeros(n_metricas, dtype=np.int64)
+        activas = np.ones(n_metricas, dtype=bool)
+        bloque = tamano_de_bloque(n_total)
+        n_bloques = -(-max_permutaciones // bloque)
+        for semilla_bloque in np.random.SeedSequence(semilla).spawn(n_bloques):
+            n_bloque = min(bloque, max_permutaciones - int(n_permutaciones.max()))
+            if n_bloque <= 0 or not activas.any():
+                break
+            etiquetas = bloque_aleatorio(np.random.default_rng(semilla_bloque), n_manual, n_total, n_bloque)
+            columnas = np.flatnonzero(activas)
+            diferencias_bloque = diferencias(etiquetas, datos[:, columnas], total[columnas], n_manual, n_ia)
+            cuenta[columnas] += extremas(diferencias_bloque, observada[columnas], escala[columnas])
+            n_permutaciones[columnas] += n_bloque
+
+            # Parada secuencial: IC del p-value entero a un lado de alfa
+            inf, sup = intervalo_clopper_pearson(cuenta, n_permutaciones)
+            activas &= ~((sup < alfa) | (inf > alfa))
+
+        # Estimador de Phipson y Smyth: la repartición observada cuenta una vez
+        p_value = (cuenta + 1) / (n_permutaciones + 1)
+        metodo = 'monte_carlo'
+        ic_inf, ic_sup = intervalo_clopper_pearson(cuenta, n_permutaciones)
+        decidido = (ic_sup < alfa) | (ic_inf > alfa)
+
+    return pd.DataFrame({
+        'metrica': metricas,
+        'diferencia': observada,
+        'p_value': p_value,
+        'metodo': metodo,
+        'n_permutaciones': n_permutaciones,
+        'ic_p_inf': ic_inf,
+        'ic_p_sup': ic_sup,
+        'decidido': decidido,
+    })
+
+
+def prueba_permutaciones_por_grupo(df, metricas=COLUMNAS_METRICAS, columna_grupo='group', **opciones):
+    """prueba_permutaciones de las filas Manual frente a IA de `df` (p. ej. los promedios N=12)"""
+    manual = df.loc[df[columna_grupo] == 'Manual', metricas].to_numpy(dtype=np.float64)
+    ia = df.loc[df[columna_grupo] == 'IA', metricas].to_numpy(dtype=np.float64)
+    return prueba_permutaciones(manual, ia, metricas, **opciones)
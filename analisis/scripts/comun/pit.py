@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+INGESTA DE REPORTES PIT POR MUTANTE
+====================================
+run-test-metrics.ps1 y run_pitest_isolated_complete.ps1 copian el
+mutations.xml de cada iteración como <group>_<Clase>-iter<N>-mutations.xml en
+mutation_reports/ (unitarias) y mutation_reports_functional/ (funcionales),
+pero al CSV solo llegan total_mutations, mutations_killed y mutation_score.
+Este módulo guarda un registro por mutante en la tabla `mutantes`:
+
+  mutador, clase, metodo (nombre + descriptor), fuente, linea, estado
+  (KILLED, SURVIVED, NO_COVERAGE, ...), detectado, pruebas_ejecutadas y
+  prueba_asesina.
+
+Se aceptan también los mutations.csv de PIT (outputFormats=CSV, sin
+cabecera). Los XML se recorren con iterparse liberando cada <mutation> ya
+leída, así que un reporte con decenas de miles de mutantes no construye el
+árbol completo. Paralelismo, diccionarios y segmentos de .cache_pit/ vienen
+de comun.reportes.
+"""
+
+import csv
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comun.carga import leer_manifiesto
+from comun.reportes import (MAX_PROCESOS, REPORTES_POR_SEGMENTO, CodificadorLocal, cargar_tablas,
+                            ingerir_reportes, listar_reportes)
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+CARPETAS_MUTACIONES = {
+    'mutation_reports': 'Unitarias',
+    'mutation_reports_functional': 'Funcionales',
+}
+
+SUFIJOS_REPORTE = ['mutations.xml', 'mutations.csv']
+
+NOMBRE_CACHE_PIT = '.cache_pit'
+VERSION_PIT = 1
+
+ESTADOS = ['KILLED', 'SURVIVED', 'NO_COVERAGE', 'TIMED_OUT', 'MEMORY_ERROR', 'RUN_ERROR', 'NON_VIABLE']
+DICCIONARIOS = ['mutador', 'clase', 'metodo', 'fuente', 'prueba_asesina']
+
+COLUMNAS = {
+    'mutantes': {'reporte': np.int32, 'mutador': np.int32, 'clase': np.int32, 'metodo': np.int32,
+                 'fuente': np.int32, 'linea': np.int32, 'estado': np.int8, 'detectado': np.int8,
+                 'pruebas_ejecutadas': np.int32, 'prueba_asesina': np.int32},
+}
+
+# ==================================================================================
+# DESCUBRIMIENTO
+# ==================================================================================
+
+def listar_reportes_pit(ruta_base):
+    """Lista (archivo, categoria, group, test_class, iteration) en orden estable"""
+    reportes = []
+    for sufijo in SUFIJOS_REPORTE:
+        reportes += listar_reportes(ruta_base, CARPETAS_MUTACIONES, sufijo)
+    return sorted(reportes, key=lambda r: (r[1], r[0].name))
+
+# ==================================================================================
+# PARSEO EN STREAMING (SE EJECUTA EN LOS PROCESOS DEL POOL)
+# ==================================================================================
+
+def codigo_estado(estado):
+    return ESTADOS.index(estado) if estado in ESTADOS else -1
+
+
+def prueba_o_nada(prueba):
+    """PIT escribe 'none' (CSV) o un elemento vacío (XML) si nadie mató al mutante"""
+    prueba = (prueba or '').strip()
+    return None if prueba in ('', 'none') else prueba
+
+
+def parsear_mutaciones(ruta):
+    """
+    Recorre un mutations.xml (iterparse) o mutations.csv (csv) y devuelve
+    sus mutantes como arrays enteros, con cadenas codificadas contra
+    diccionarios locales.
+    """
+    locales = CodificadorLocal(DICCIONARIOS)
+    codigo = locales.codigo
+    mutantes = {col: [] for col in COLUMNAS['mutantes'] if col != 'reporte'}
+
+    def agregar(mutador, clase, metodo, fuente, linea, estado, detectado, ejecutadas, prueba):
+        mutantes['mutador'].append(codigo('mutador', mutador))
+        mutantes['clase'].append(codigo('clase', clase))
+        mutantes['metodo'].append(codigo('metodo', metodo))
+        mutantes['fuente'].append(codigo('fuente', fuente))
+        mutantes['linea'].append(int(linea) if linea else -1)
+        mutantes['estado'].append(codigo_estado(estado))
+        mutantes['detectado'].append(int(detectado))
+        mutantes['pruebas_ejecutadas'].append(ejecutadas)
+        mutantes['prueba_asesina'].append(codigo('prueba_asesina', prueba_o_nada(prueba)))
+
+    if str(ruta).endswith('.csv'):
+        # sourceFile, mutatedClass, mutator, mutatedMethod, lineNumber, status, killingTest
+        with open(ruta, newline='', encoding='utf-8') as f:
+            for fila in csv.reader(f):
+                if len(fila) < 6:
+                    continue
+                prueba = fila[6] if len(fila) > 6 else None
+                agregar(fila[2], fila[1], fila[3], fila[0], fila[4], fila[5],
+                        fila[5] in ('KILLED', 'TIMED_OUT', 'MEMORY_ERROR', 'RUN_ERROR'), -1, prueba)
+    else:
+        raiz = None
+        for evento, elem in ET.iterparse(ruta, events=('start', 'end')):
+            if evento == 'start':
+                if raiz is None:
+                    raiz = elem
+                continue
+            if elem.tag != 'mutation':
+                continue
+            metodo = (elem.findtext('mutatedMethod') or '') + (elem.findtext('methodDescription') or '')
+            agregar(elem.findtext('mutator'), elem.findtext('mutatedClass'), metodo or None,
+                    elem.findtext('sourceFile'), elem.findtext('lineNumber'), elem.get('status'),
+                    elem.get('detected') == 'true', int(elem.get('numberOfTestsRun', -1)),
+                    elem.findtext('killingTest'))
+            elem.clear()
+            raiz.clear()
+
+    return {
+        'cadenas': locales.cadenas(),
+        'mutantes': {c: np.asarray(v, dtype=COLUMNAS['mutantes'][c]) for c, v in mutantes.items()},
+    }
+
+# ==================================================================================
+# INGESTA Y LECTURA
+# ==================================================================================
+
+def ingerir_pit(ruta_base, max_procesos=MAX_PROCESOS, reportes_por_segmento=REPORTES_POR_SEGMENTO,
+                verbose=True):
+    """Parsea en paralelo los reportes PIT nuevos y devuelve el manifiesto"""
+    ruta_base = Path(ruta_base)
+    return ingerir_reportes(ruta_base / NOMBRE_CACHE_PIT, listar_reportes_pit(ruta_base),
+                            parsear_mutaciones, COLUMNAS, DICCIONARIOS, VERSION_PIT, 'PIT',
+                            max_procesos, reportes_por_segmento, verbose)
+
+
+def cargar_pit(ruta_base, ingerir=True, verbose=True):
+    """
+    Devuelve (reportes, mutantes) como DataFrames. Las columnas de texto son
+    category sobre los diccionarios globales; `reporte` enlaza con
+    reportes['id'] (category, group, test_class, iteration).
+    """
+    ruta_base = Path(ruta_base)
+    dir_cache = ruta_base / NOMBRE_CACHE_PIT
+    manifiesto = (ingerir_pit(ruta_base, verbose=verbose) if ingerir
+                  else leer_manifiesto(dir_cache, VERSION_PIT))
+    if manifiesto is None:
+        raise FileNotFoundError(f"No existe caché PIT en {ruta_base}")
+
+    reportes, tablas = cargar_tablas(dir_cache, manifiesto, COLUMNAS, DICCIONARIOS, {'estado': ESTADOS})
+    return reportes, tablas['mutantes']
+
+
+def mutacion_por_reporte(reportes, mutantes):
+    """
+    total_mutations, mutations_killed y mutation_score por reporte con el
+    mismo criterio que Get-MutationMetrics: solo cuentan los mutantes sin
+    prueba asesina o muertos por una prueba cuyo nombre contiene la clase.
+    """
+    info = reportes.set_index('id')[['category', 'group', 'test_class', 'iteration']]
+    datos = mutantes[['reporte', 'detectado', 'prueba_asesina']].join(info['test_class'], on='reporte')
+    prueba = datos['prueba_asesina'].astype(object)
+    sin_prueba = prueba.isna().to_numpy()
+    de_la_clase = np.fromiter((isinstance(p, str) and c in p for p, c in zip(prueba, datos['test_class'])),
+                              dtype=bool, count=len(datos))
+
+    cuenta = pd.DataFrame({'reporte': datos['reporte'].to_numpy(),
+                           'total_mutations': sin_prueba | de_la_clase,
+                           'mutations_killed': (datos['detectado'].to_numpy() == 1) & de_la_clase})
+    tabla = cuenta.groupby('reporte')[['total_mutations', 'mutations_killed']].sum()
+
+    resultado = info.join(tabla).fillna(0).astype({'total_mutations': np.int32, 'mutations_killed': np.int32})
+    total = resultado['total_mutations']
+    resultado['mutation_score'] = (100 * resultado['mutations_killed'] / total.where(total > 0)).round(2).fillna(0.0)
+    return resultado.reset_index(names='reporte')
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""
+MOTOR DE RANGOS COMPARTIDO
+===========================
+Mann-Whitney (03_PASO3B, 04_PLOT_PASO3B, REGENERAR vía comun.motor) y las
+demás pruebas por rangos ordenaban de nuevo las mismas columnas en cada
+script, y la Z de 03_PASO3B ignoraba los empates. Las métricas de
+cobertura son casi todo empates (el mismo valor en cada iteración), así que
+la corrección importa.
+
+  • rangos_medios(valores, estratos): un único lexsort por (estrato, valor)
+    da los rangos medios dentro de cada estrato y, por estrato, el término
+    de empates Σ(t³ − t) sobre los grupos de valores repetidos.
+  • mann_whitney_rangos(): U, Z y p con la varianza corregida por empates
+    (la misma aproximación normal con corrección de continuidad que
+    scipy.stats.mannwhitneyu), r = |Z| / √N y correlación biserial de rangos.
+  • van_elteren_rangos(): Mann-Whitney estratificado (van Elteren) que suma
+    los U de cada estrato con peso 1 / (N_estrato + 1), a partir de los
+    rangos dentro de cada estrato.
+  • abrir_rangos(ruta_base): rangos de cada métrica del almacén columnar,
+    guardados en .cache_rangos/ e indexados por la huella de los CSV de
+    origen: se calculan una vez por versión del dataset y todos los
+    scripts los reutilizan. Las filas siguen el orden del almacén, así que
+    la suma de rangos de un grupo es la suma de un tramo contiguo.
+
+    rangos = abrir_rangos('.')
+    resultado = rangos.mann_whitney('branch_pct')      # Manual vs IA
+    por_categoria = rangos.van_elteren('time_seconds', 'category')
+"""
+
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import mannwhitneyu, norm
+
+from comun.almacen import abrir_almacen
+from comun.carga import bloqueo_escritura, escribir_manifiesto, leer_manifiesto, reemplazar, temporal_para
+
+NOMBRE_CACHE_RANGOS = '.cache_rangos'
+VERSION_RANGOS = 2
+
+# Por debajo de este tamaño (y sin empates) scipy usa la distribución exacta de U
+MAX_N_EXACTO = 8
+
+# ==================================================================================
+# RANGOS MEDIOS POR ESTRATO
+# ==================================================================================
+
+def rangos_medios(valores, estratos=None):
+    """
+    Rangos medios (1..n_estrato) de `valores` dentro de cada estrato.
+    Los NaN quedan con rango NaN y fuera de los conteos.
+
+    Devuelve (rangos, n_por_estrato, empates_por_estrato) con
+    empates_por_estrato = Σ(t³ − t) de los grupos de valores repetidos.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    if estratos is None:
+        estratos = np.zeros(len(valores), dtype=np.int64)
+    estratos = np.asarray(estratos, dtype=np.int64)
+    n_estratos = int(estratos.max()) + 1 if len(estratos) else 0
+
+    validos = np.flatnonzero(~np.isnan(valores))
+    orden = validos[np.lexsort((valores[validos], estratos[validos]))]
+    v, e = valores[orden], estratos[orden]
+
+    rangos = np.full(len(valores), np.nan)
+    n_por_estrato = np.bincount(e, minlength=n_estratos)
+    empates = np.zeros(n_estratos)
+    if len(orden) == 0:
+        return rangos, n_por_estrato, empates
+
+    # Inicio de cada grupo de empate (cambia el valor o el estrato)
+    nuevo_grupo = np.ones(len(orden), dtype=bool)
+    nuevo_grupo[1:] = (v[1:] != v[:-1]) | (e[1:] != e[:-1])
+    inicios = np.flatnonzero(nuevo_grupo)
+    tamanos = np.diff(np.append(inicios, len(orden)))
+
+    # Posición de cada grupo dentro de su estrato
+    inicio_estrato = np.concatenate([[0], np.cumsum(n_por_estrato)[:-1]])
+    estrato_grupo = e[inicios]
+    posicion = inicios - inicio_estrato[estrato_grupo]
+    rango_grupo = posicion + (tamanos + 1) / 2.0
+
+    rangos[orden] = np.repeat(rango_grupo, tamanos)
+    empates = np.bincount(estrato_grupo, weights=tamanos.astype(np.float64) ** 3 - tamanos,
+                          minlength=n_estratos)
+    return rangos, n_por_estrato, empates
+
+# ==================================================================================
+# MANN-WHITNEY A PARTIR DE RANGOS
+# ==================================================================================
+
+def mann_whitney_rangos(suma_rangos_1, n1, n2, empates):
+    """
+    Mann-Whitney bilateral a partir de la suma de rangos de la muestra 1 en
+    la muestra conjunta y del término de empates Σ(t³ − t).
+
+    U es el de la muestra 1 (como scipy); Z = (U − n1·n2/2) / σ con σ
+    corregida por empates y sin continuidad, r = |Z| / √N,
+    biserial = 2·U / (n1·n2) − 1 (positiva si la muestra 1 tiende a ser mayor;
+    es la δ de Cliff) y cles = U / (n1·n2). Los IC de ambas están en
+    comun.dominancia.
+    El p-value usa max(U1, U2) con corrección de continuidad, como scipy.
+    Acepta escalares o arrays (una prueba por elemento).
+    """
+    n = n1 + n2
+    u1 = suma_rangos_1 - n1 * (n1 + 1) / 2
+    u2 = n1 * n2 - u1
+    mu = n1 * n2 / 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sigma = np.sqrt(n1 * n2 / 12 * ((n + 1) - empates / (n * (n - 1))))
+        z = (u1 - mu) / sigma
+        z_p = (np.maximum(u1, u2) - mu - 0.5) / sigma
+    p_value = np.minimum(1.0, 2 * norm.sf(z_p))
+    return {
+        'estadistico': u1,
+        'p_value': p_value,
+        'z': z,
+        'r': np.abs(z) / np.sqrt(n),
+        'biserial': 2 * u1 / (n1 * n2) - 1,
+        'cles': u1 / (n1 * n2),
+        'empates': empates,
+    }
+
+
+def mann_whitney(muestra_1, muestra_2):
+    """
+    Mann-Whitney de dos arrays (sin NaN) con un solo ordenamiento. Con
+    muestras pequeñas sin empates el p-value es el exacto de scipy, igual
+    que mannwhitneyu(method='auto').
+    """
+    muestra_1 = np.asarray(muestra_1, dtype=np.float64)
+    muestra_2 = np.asarray(muestra_2, dtype=np.float64)
+    n1, n2 = len(muestra_1), len(muestra_2)
+    rangos, _, empates = rangos_medios(np.concatenate([muestra_1, muestra_2]))
+    resultado = mann_whitney_rangos(rangos[:n1].sum(), n1, n2, empates[0])
+    if (n1 <= MAX_N_EXACTO or n2 <= MAX_N_EXACTO) and empates[0] == 0:
+        resultado['p_value'] = mannwhitneyu(muestra_1, muestra_2, alternative='two-sided',
+                                            method='exact').pvalue
+    return resultado
+
+# ==================================================================================
+# VAN ELTEREN (MANN-WHITNEY ESTRATIFICADO)
+# ==================================================================================
+
+def van_elteren_rangos(suma_rangos_1, n1, n2, empates):
+    """
+    Prueba de van Elteren a partir de arrays por estrato (último eje): suma
+    de rangos de la muestra 1 dentro de su estrato, tamaños y término de
+    empates Σ(t³ − t) de cada estrato. Combina U_s con peso 1 / (N_s + 1):
+
+        T = Σ U_s / (N_s + 1),  Z = (T − E[T]) / √Var[T]
+
+    con Var[U_s] corregida por empates y sin corrección de continuidad. Los
+    estratos sin ambas muestras no aportan. biserial es la media de las
+    biseriales de cada estrato ponderada por peso · n1 · n2.
+    """
+    n = n1 + n2
+    validos = (n1 > 0) & (n2 > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        peso = np.where(validos, 1.0 / (n + 1), 0.0)
+        pares = n1 * n2
+        u1 = np.where(validos, suma_rangos_1 - n1 * (n1 + 1) / 2, 0.0)
+        varianza = np.where(validos, pares / 12 * ((n + 1) - empates / (n * (n - 1))), 0.0)
+        estadistico = (peso * u1).sum(axis=-1)
+        esperado = (peso * pares / 2).sum(axis=-1)
+        z = (estadistico - esperado) / np.sqrt((peso * peso * varianza).sum(axis=-1))
+        biserial = (peso * (2 * u1 - pares)).sum(axis=-1) / (peso * pares).sum(axis=-1)
+    return {
+        'estadistico': estadistico,
+        'z': z,
+        'p_value': 2 * norm.sf(np.abs(z)),
+        'biserial': biserial,
+        'estratos_validos': validos.sum(axis=-1),
+    }
+
+# ==================================================================================
+# CACHÉ DE RANGOS POR VERSIÓN DEL DATASET
+# ==================================================================================
+
+class RangosAlmacen:
+    """
+    Rangos medios de las métricas de un almacén columnar (muestra conjunta
+    de todos los grupos), calculados una vez por huella y guardados en disco.
+
+    Como en comun.carga y comun.almacen, el vaciado y cada publicación se
+    hacen dentro de bloqueo_escritura(dir_cache) y vuelven a comprobar la
+    huella del manifiesto: un proceso que aún trabaja con el dataset
+    anterior nunca publica rangos bajo la huella nueva. Cada .npz guarda
+    además su huella y solo se lee si coincide con la del almacén.
+    """
+
+    def __init__(self, almacen, dir_cache):
+        self.almacen = almacen
+        self.directorio = Path(dir_cache)
+        self._rangos = {}
+        if not self._vigente():
+            # Dataset nuevo: los rangos de la versión anterior dejan de valer
+            with bloqueo_escritura(self.directorio):
+                if not self._vigente():
+                    for archivo in self.directorio.glob('*.npz'):
+                        try:
+                            archivo.unlink()
+                        except OSError:
+                            pass
+                    escribir_manifiesto(self.directorio, {'version': VERSION_RANGOS, 'huella': almacen.huella})
+
+    def _vigente(self):
+        """True si el manifiesto en disco corresponde a la huella del almacén"""
+        manifiesto = leer_manifiesto(self.directorio, version=VERSION_RANGOS)
+        return manifiesto is not None and manifiesto.get('huella') == self.almacen.huella
+
+    def _leer(self, archivo, estrato):
+        """(rangos, empates) de un .npz de la misma huella, o None"""
+        try:
+            with np.load(archivo) as datos:
+                if str(datos['huella']) != self.almacen.huella:
+                    return None
+                empates = datos['empates']
+                return datos['rangos'], float(empates) if estrato is None else empates
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _publicar(self, archivo, rangos, empates):
+        """Escribe el .npz por un temporal del proceso si la huella sigue vigente"""
+        with bloqueo_escritura(self.directorio):
+            if not self._vigente():
+                return
+            temporal = temporal_para(archivo)
+            with open(temporal, 'wb') as f:
+                np.savez(f, rangos=rangos, empates=empates, huella=np.array(self.almacen.huella))
+            reemplazar(temporal, archivo)
+
+    def rangos(self, metrica, estrato=None):
+        """
+        (rangos por fila del almacén, término de empates Σ(t³ − t)). Con
+        `estrato` (columna de texto del almacén) los rangos son dentro de
+        cada categoría y los empates, un array por categoría; las filas con
+        estrato nulo quedan con rango NaN.
+        """
+        clave = (metrica, estrato)
+        if clave not in self._rangos:
+            nombre = metrica if estrato is None else f'{metrica}__{estrato}'
+            archivo = self.directorio / f'{nombre}.npz'
+            leidos = self._leer(archivo, estrato) if archivo.exists() else None
+            if leidos is not None:
+                self._rangos[clave] = leidos
+            else:
+                valores = self.almacen.columna(metrica)
+                if estrato is None:
+                    rangos, _, empates = rangos_medios(valores)
+                    empates = empates[0]
+                else:
+                    codigos = np.asarray(self.almacen.columna(estrato))
+                    n_estratos = len(self.almacen.categorias(estrato))
+                    valores = np.where(codigos >= 0, valores, np.nan)
+                    rangos, _, empates = rangos_medios(valores, np.maximum(codigos, 0))
+                    empates = np.concatenate([empates, np.zeros(n_estratos - len(empates))])
+                self._publicar(archivo, rangos, empates)
+                self._rangos[clave] = (rangos, float(empates) if estrato is None else empates)
+        return self._rangos[clave]
+
+    def suma_por_estrato(self, rangos, estrato, tramo):
+        """(suma de rangos, n) de un tramo por categoría de `estrato`, sin NaN"""
+        n_estratos = len(self.almacen.categorias(estrato))
+        r = rangos[tramo]
+        validos = ~np.isnan(r)
+        codigos = np.asarray(self.almacen.columna(estrato)[tramo])[validos]
+        return (np.bincount(codigos, weights=r[validos], minlength=n_estratos),
+                np.bincount(codigos, minlength=n_estratos))
+
+    def mann_whitney(self, metrica, grupo_1='Manual', grupo_2='IA'):
+        """
+        Mann-Whitney de dos grupos desde los rangos en caché. Si el almacén
+        tiene más grupos, se vuelve a ordenar solo la unión de los dos.
+        """
+        tramo_1, tramo_2 = self.almacen.tramo(group=grupo_1), self.almacen.tramo(group=grupo_2)
+        grupos = self.almacen.indice['grupos']
+        if len(grupos) != 2:
+            valores = self.almacen.columna(metrica)
+            return mann_whitney(*(v[~np.isnan(v)] for v in (valores[tramo_1], valores[tramo_2])))
+
+        rangos, empates = self.rangos(metrica)
+        r1, r2 = rangos[tramo_1], rangos[tramo_2]
+        n1, n2 = int(np.count_nonzero(~np.isnan(r1))), int(np.count_nonzero(~np.isnan(r2)))
+        resultado = mann_whitney_rangos(np.nansum(r1), n1, n2, empates)
+        resultado.update(n_1=n1, n_2=n2)
+        return resultado
+
+    def van_elteren(self, metrica, estrato='category', grupo_1='Manual', grupo_2='IA'):
+        """
+        van Elteren de dos grupos estratificado por `estrato`, desde los rangos
+        por estrato en caché. Añade las categorías y n_1 / n_2 por estrato.
+        """
+        if len(self.almacen.indice['grupos']) != 2:
+            raise ValueError("van_elteren requiere un almacén con exactamente dos grupos")
+        rangos, empates = self.rangos(metrica, estrato)
+        suma_1, n1 = self.suma_por_estrato(rangos, estrato, self.almacen.tramo(group=grupo_1))
+        _, n2 = self.suma_por_estrato(rangos, estrato, self.almacen.tramo(group=grupo_2))
+        resultado = van_elteren_rangos(suma_1, n1, n2, empates)
+        resultado.update(estratos=list(self.almacen.categorias(estrato)), n_1=n1, n_2=n2)
+        return resultado
+
+
+def abrir_rangos(ruta_base, verbose=True):
+    """Almacén de ruta_base (publicado si hace falta) con su caché de rangos"""
+    almacen = abrir_almacen(ruta_base, verbose=verbose)
+    return RangosAlmacen(almacen, Path(ruta_base) / NOMBRE_CACHE_RANGOS)
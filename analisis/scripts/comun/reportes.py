@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+INGESTA GENÉRICA DE REPORTES POR ITERACIÓN
+===========================================
+Base común de comun.jacoco y comun.pit: cada iteración del runner deja un
+reporte <group>_<Clase>-iter<N>-<sufijo> y cada reporte se convierte en
+filas de una o más tablas columnares.
+
+  • Los reportes nuevos se parsean en un pool de procesos con una ventana
+    acotada de trabajos en vuelo (memoria constante con miles de reportes).
+  • Cada proceso devuelve arrays enteros y sus cadenas codificadas contra
+    diccionarios locales; aquí se recodifican contra los diccionarios
+    globales del manifiesto, que solo crecen.
+  • Las filas se guardan en segmentos seg<id>_<tabla>_<columna>.npy; un
+    reporte modificado o eliminado provoca la reconstrucción completa.
+"""
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from comun.carga import NOMBRE_MANIFIESTO, directorio_metricas, escribir_manifiesto, leer_manifiesto
+
+REPORTES_POR_SEGMENTO = 500
+MAX_PROCESOS = None
+
+# ==================================================================================
+# DESCUBRIMIENTO
+# ==================================================================================
+
+def patron_reporte(sufijo):
+    """Expresión para <group>_<test_class>-iter<N>-<sufijo>"""
+    return re.compile(r'^(?P<group>[^_]+)_(?P<test_class>.+)-iter(?P<iteration>\d+)-'
+                      + re.escape(sufijo) + '$')
+
+
+def listar_reportes(ruta_base, carpetas, sufijo):
+    """Lista (archivo, categoria, group, test_class, iteration) en orden estable"""
+    ruta_base = Path(ruta_base)
+    patron = patron_reporte(sufijo)
+    reportes = []
+    for carpeta, categoria in carpetas.items():
+        for archivo in sorted(directorio_metricas(ruta_base, carpeta).glob(f'*-{sufijo}')):
+            coincidencia = patron.match(archivo.name)
+            if coincidencia:
+                reportes.append((archivo, categoria, coincidencia['group'],
+                                 coincidencia['test_class'], int(coincidencia['iteration'])))
+    return reportes
+
+
+def firma_reporte(archivo):
+    info = archivo.stat()
+    return {'archivo': f'{archivo.parent.name}/{archivo.name}',
+            'tamano': info.st_size, 'mtime_ns': info.st_mtime_ns}
+
+# ==================================================================================
+# DICCIONARIOS
+# ==================================================================================
+
+class CodificadorLocal:
+    """Diccionario de cadenas de un solo reporte (se usa dentro del proceso)"""
+
+    def __init__(self, nombres):
+        self.valores = {nombre: {} for nombre in nombres}
+
+    def codigo(self, nombre, valor):
+        if valor is None:
+            return -1
+        diccionario = self.valores[nombre]
+        return diccionario.setdefault(valor, len(diccionario))
+
+    def cadenas(self):
+        return {nombre: list(valores) for nombre, valores in self.valores.items()}
+
+
+class DiccionariosGlobales:
+    """Diccionarios de cadenas del manifiesto (solo se añaden valores)"""
+
+    def __init__(self, nombres, listas=None):
+        self.listas = {nombre: list((listas or {}).get(nombre, [])) for nombre in nombres}
+        self.indices = {nombre: {v: i for i, v in enumerate(lista)} for nombre, lista in self.listas.items()}
+
+    def recodificar(self, nombre, locales, codigos):
+        """Traduce códigos locales de un reporte a códigos globales (-1 se conserva)"""
+        indice, lista = self.indices[nombre], self.listas[nombre]
+        mapa = np.empty(len(locales), dtype=np.int32)
+        for i, valor in enumerate(locales):
+            if valor not in indice:
+                indice[valor] = len(lista)
+                lista.append(valor)
+            mapa[i] = indice[valor]
+        if len(mapa) == 0:
+            return codigos
+        return np.where(codigos >= 0, mapa[np.maximum(codigos, 0)], -1).astype(np.int32)
+
+# ==================================================================================
+# SEGMENTOS
+# ==================================================================================
+
+def archivo_columna_tabla(id_segmento, tabla, columna):
+    return f'seg{id_segmento:04d}_{tabla}_{columna}.npy'
+
+
+def guardar_segmento_tablas(dir_cache, id_segmento, partes, columnas):
+    """Concatena las partes de cada tabla y guarda un .npy por columna"""
+    segmento = {'id': id_segmento}
+    for tabla, esquema in columnas.items():
+        n = 0
+        for col, dtype in esquema.items():
+            valores = np.concatenate([p[tabla][col] for p in partes]) if partes else np.array([], dtype)
+            np.save(dir_cache / archivo_columna_tabla(id_segmento, tabla, col), valores.astype(dtype))
+            n = len(valores)
+        segmento[f'n_{tabla}'] = n
+    return segmento
+
+# ==================================================================================
+# INGESTA
+# ==================================================================================
+
+def en_paralelo(funcion, elementos, max_procesos=MAX_PROCESOS):
+    """
+    Aplica `funcion` en un pool de procesos y produce (elemento, resultado)
+    en orden, con a lo sumo 2 × procesos trabajos en vuelo.
+    """
+    procesos = max_procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        en_vuelo = deque()
+        pendientes = iter(elementos)
+
+        def enviar():
+            elemento = next(pendientes, None)
+            if elemento is not None:
+                en_vuelo.append((elemento, executor.submit(funcion, elemento[0])))
+
+        for _ in range(2 * procesos):
+            enviar()
+
+        while en_vuelo:
+            elemento, futuro = en_vuelo.popleft()
+            resultado = futuro.result()
+            enviar()
+            yield elemento, resultado
+
+
+def ingerir_reportes(dir_cache, reportes, parsear, columnas, diccionarios, version, etiqueta,
+                     max_procesos=MAX_PROCESOS, reportes_por_segmento=REPORTES_POR_SEGMENTO,
+                     verbose=True):
+    """
+    Parsea en paralelo los reportes nuevos y los añade a la caché.
+
+    `parsear(ruta)` devuelve {'cadenas': {diccionario: [...]}, <tabla>: {col: array}}
+    sin la columna 'reporte', que se añade aquí. Devuelve el manifiesto.
+    """
+    firmas = {r[0]: firma_reporte(r[0]) for r in reportes}
+    manifiesto = leer_manifiesto(dir_cache, version)
+    if manifiesto is not None:
+        vigentes = {f['archivo']: (f['tamano'], f['mtime_ns']) for f in firmas.values()}
+        if any(vigentes.get(r['archivo']) != (r['tamano'], r['mtime_ns']) for r in manifiesto['reportes']):
+            if verbose:
+                print(f"  ! Algún reporte {etiqueta} cambió o se eliminó, reconstruyendo...")
+            manifiesto = None
+
+    if manifiesto is None:
+        dir_cache.mkdir(parents=True, exist_ok=True)
+        for viejo in dir_cache.glob('seg*.npy'):
+            viejo.unlink()
+        manifiesto = {'version': version, 'diccionarios': {}, 'reportes': [], 'segmentos': []}
+
+    ya_ingeridos = {r['archivo'] for r in manifiesto['reportes']}
+    nuevos = [r for r in reportes if firmas[r[0]]['archivo'] not in ya_ingeridos]
+    globales = DiccionariosGlobales(diccionarios, manifiesto['diccionarios'])
+
+    def cerrar_segmento(partes, metadatos):
+        id_segmento = max((s['id'] for s in manifiesto['segmentos']), default=-1) + 1
+        manifiesto['segmentos'].append(guardar_segmento_tablas(dir_cache, id_segmento, partes, columnas))
+        manifiesto['reportes'].extend(metadatos)
+        manifiesto['diccionarios'] = globales.listas
+        escribir_manifiesto(dir_cache, manifiesto)
+
+    partes, metadatos = [], []
+    for (archivo, categoria, grupo, test_class, iteracion), resultado in \
+            en_paralelo(parsear, nuevos, max_procesos):
+        id_reporte = len(manifiesto['reportes']) + len(metadatos)
+        for tabla in columnas:
+            datos = resultado[tabla]
+            for nombre in diccionarios:
+                if nombre in datos:
+                    datos[nombre] = globales.recodificar(nombre, resultado['cadenas'][nombre], datos[nombre])
+            n = len(next(iter(datos.values()))) if datos else 0
+            datos['reporte'] = np.full(n, id_reporte, dtype=np.int32)
+        partes.append(resultado)
+        metadatos.append(dict(firmas[archivo], id=id_reporte, category=categoria,
+                              group=grupo, test_class=test_class, iteration=iteracion))
+
+        if len(partes) >= reportes_por_segmento:
+            cerrar_segmento(partes, metadatos)
+            partes, metadatos = [], []
+
+    if partes:
+        cerrar_segmento(partes, metadatos)
+    elif not (dir_cache / NOMBRE_MANIFIESTO).exists():
+        cerrar_segmento([], [])
+
+    if verbose:
+        print(f"  ✓ {etiqueta}: {len(nuevos)} reportes nuevos "
+              f"({len(manifiesto['reportes'])} en total, {len(manifiesto['segmentos'])} segmentos)")
+    return manifiesto
+
+# ==================================================================================
+# LECTURA
+# ==================================================================================
+
+def cargar_tablas(dir_cache, manifiesto, columnas, diccionarios, fijas=None):
+    """
+    Devuelve (reportes, {tabla: DataFrame}). Las columnas de `diccionarios`
+    se exponen como category sobre los diccionarios globales y las de
+    `fijas` ({columna: categorías}) sobre listas de categorías constantes.
+    """
+    fijas = fijas or {}
+    tablas = {}
+    for tabla, esquema in columnas.items():
+        datos = {}
+        for col, dtype in esquema.items():
+            partes = [np.load(dir_cache / archivo_columna_tabla(s['id'], tabla, col))
+                      for s in manifiesto['segmentos']]
+            valores = np.concatenate(partes) if partes else np.array([], dtype=dtype)
+            if col in diccionarios:
+                valores = pd.Categorical.from_codes(valores, categories=manifiesto['diccionarios'].get(col, []))
+            elif col in fijas:
+                valores = pd.Categorical.from_codes(valores, categories=fijas[col])
+            datos[col] = valores
+        tablas[tabla] = pd.DataFrame(datos)
+
+    reportes = pd.DataFrame(manifiesto['reportes'],
+                            columns=['id', 'archivo', 'category', 'group', 'test_class', 'iteration'])
+    return reportes, tablas
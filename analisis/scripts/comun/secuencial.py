@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+DETENCIÓN SECUENCIAL DE LA CAMPAÑA DE MEDICIÓN
+===============================================
+run_all_metrics_simple.ps1 tarda 36-48 horas porque cada clase repite 40
+iteraciones de mvnw test + jacoco:report + pitest:mutationCoverage, aunque
+las coberturas son idénticas en todas y el tiempo se estabiliza antes.
+Este controlador consume las filas a medida que el runner las añade y
+avisa cuándo una clase ya tiene la precisión pedida:
+
+  • Lectura incremental: por CSV se recuerda el offset en bytes
+    (comun.carga.leer_csv_clase) y solo se parsean las filas nuevas.
+  • Estimación en línea: n, media y M2 por (clase, método de prueba) con
+    MomentosEnLinea (fórmula de Chan), sin guardar las filas.
+  • Frontera válida en cualquier momento: el runner se revisa después de
+    cada iteración, así que un IC fijo al 95 % perdería cobertura por
+    mirar repetidamente. Dos fronteras:
+      secuencia  secuencia de confianza asintótica (Waudby-Smith et al.):
+                 σ̂ · sqrt(2(nρ² + 1)/(n²ρ²) · log(sqrt(nρ² + 1)/α)), con ρ
+                 ajustado para ser más estrecha en ITERACIONES_OBJETIVO
+      grupal     diseño secuencial por grupos con gasto de α de Bonferroni:
+                 t de Student al nivel α / (revisiones previstas)
+  • Criterio: una clase se detiene cuando, para todos sus métodos y
+    métricas, el semiancho es ≤ max(absoluto, relativo · |media|) y lleva
+    al menos MIN_ITERACIONES. La regla solo mira la precisión de cada
+    grupo por separado, nunca la diferencia Manual − IA, así que los
+    contrastes posteriores conservan su nivel.
+  • Señal: un archivo <carpeta>/.detener/<Grupo>_<Clase>.json que los
+    bucles de iteración de los .ps1 comprueban antes de cada iteración.
+
+    controlador = ControladorSecuencial('.')
+    controlador.actualizar()
+    for archivo in controlador.clases_cumplidas(): controlador.senalar(archivo)
+"""
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t as distribucion_t
+
+from comun.carga import clave_archivo, leer_archivos_en_paralelo, listar_archivos_metricas
+from comun.hipotesis import TOLERANCIA_CONSTANTE
+from comun.momentos import MomentosEnLinea
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+METRICAS = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+CLAVES = ['test_name', 'test_method']
+NIVEL_CONFIANZA = 0.95
+MIN_ITERACIONES = 10
+MAX_ITERACIONES = 40
+ITERACIONES_OBJETIVO = 15
+METODOS_FRONTERA = ['secuencia', 'grupal']
+CARPETA_DETENCION = '.detener'
+
+# Semiancho objetivo por métrica: max(absoluto, relativo · |media|). Coberturas en
+# puntos porcentuales; tiempo en segundos (la resolución de Surefire es 1 ms)
+OBJETIVOS = {
+    'instr_pct': (0.5, 0.0),
+    'branch_pct': (0.5, 0.0),
+    'mutation_score': (0.5, 0.0),
+    'time_seconds': (0.02, 0.25),
+}
+
+# ==================================================================================
+# FRONTERAS
+# ==================================================================================
+
+def semiancho_secuencia(n, desv, confianza=NIVEL_CONFIANZA, n_objetivo=ITERACIONES_OBJETIVO):
+    """Radio de la secuencia de confianza asintótica (válida para todo n a la vez)"""
+    alfa = 1 - confianza
+    rho2 = (-2 * np.log(alfa) + np.log(-2 * np.log(alfa) + 1)) / n_objetivo
+    with np.errstate(invalid='ignore', divide='ignore'):
+        factor = np.sqrt(2 * (n * rho2 + 1) / (n * n * rho2) * np.log(np.sqrt(n * rho2 + 1) / alfa))
+    return desv * factor
+
+
+def semiancho_grupal(n, desv, confianza=NIVEL_CONFIANZA, revisiones=MAX_ITERACIONES - MIN_ITERACIONES + 1):
+    """Semiancho t con α repartido (Bonferroni) entre las revisiones previstas"""
+    alfa = (1 - confianza) / revisiones
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return distribucion_t.ppf(1 - alfa / 2, n - 1) * desv / np.sqrt(n)
+
+
+FRONTERAS = {
+    'secuencia': semiancho_secuencia,
+    'grupal': semiancho_grupal,
+}
+
+
+def objetivo(metrica, media):
+    absoluto, relativo = OBJETIVOS[metrica]
+    return np.maximum(absoluto, relativo * np.abs(media))
+
+
+def evaluar(n, media, m2, metricas, frontera='secuencia', confianza=NIVEL_CONFIANZA):
+    """
+    Semiancho, objetivo y cumplimiento de arrays (celdas × métricas) de
+    acumuladores. Sin varianza (coberturas idénticas) el semiancho es 0.
+    """
+    n = np.asarray(n, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        desv = np.sqrt(np.maximum(np.asarray(m2, dtype=np.float64), 0.0) / (n - 1))
+    # Las coberturas repetidas idénticas dejan un residuo de redondeo, no varianza
+    desv = np.where(desv <= TOLERANCIA_CONSTANTE * np.abs(media), 0.0, desv)
+    semiancho = FRONTERAS[frontera](n, desv, confianza)
+    meta = np.column_stack([objetivo(m, media[:, j]) for j, m in enumerate(metricas)])
+    cumple = (n >= MIN_ITERACIONES) & (semiancho <= meta)
+    return semiancho, meta, cumple
+
+# ==================================================================================
+# CONTROLADOR EN LÍNEA
+# ==================================================================================
+
+class ControladorSecuencial:
+    """
+    Estado en línea de una campaña: offsets de lectura por CSV y momentos
+    por (clase, método). `actualizar()` incorpora las filas añadidas desde
+    la llamada anterior.
+    """
+
+    def __init__(self, ruta_base, metricas=METRICAS, frontera='secuencia', confianza=NIVEL_CONFIANZA):
+        self.ruta_base = Path(ruta_base)
+        self.metricas = list(metricas)
+        self.frontera = frontera
+        self.confianza = confianza
+        self.estados = {}
+        self.archivos = {}
+        self.momentos = MomentosEnLinea(CLAVES, self.metricas, cuantiles=False)
+
+    def actualizar(self):
+        """Lee las filas nuevas de todos los CSV; devuelve cuántas incorporó"""
+        archivos = listar_archivos_metricas(self.ruta_base)
+        self.archivos = {archivo.stem: archivo for archivo, _ in archivos}
+        leidos = leer_archivos_en_paralelo(archivos, self.estados)
+
+        # Un CSV reescrito (cabecera nueva del runner) es otra campaña: se relee entero
+        reescritos = [item for item, (df, _) in zip(archivos, leidos) if df is None]
+        if reescritos:
+            for archivo, _ in reescritos:
+                self.estados.pop(clave_archivo(archivo), None)
+            self._olvidar({archivo.stem for archivo, _ in reescritos})
+            leidos = leer_archivos_en_paralelo(archivos, self.estados)
+
+        nuevas = 0
+        for (archivo, _), (df, estado) in zip(archivos, leidos):
+            self.estados[clave_archivo(archivo)] = estado
+            if df is not None and len(df) and 'test_method' in df.columns:
+                self.momentos.actualizar(df[CLAVES + self.metricas])
+                nuevas += len(df)
+        return nuevas
+
+    def _olvidar(self, clases):
+        if self.momentos.n is None:
+            return
+        conservar = ~self.momentos.n.index.get_level_values('test_name').isin(list(clases))
+        for atributo in ('n', 'media', 'm2', 'minimo', 'maximo'):
+            setattr(self.momentos, atributo, getattr(self.momentos, atributo)[conservar])
+
+    def tabla(self):
+        """
+        Una fila por (clase, método, métrica) con n, media, semiancho,
+        objetivo y cumple.
+        """
+        if self.momentos.n is None or len(self.momentos.n) == 0:
+            return pd.DataFrame(columns=CLAVES + ['metrica', 'n', 'media', 'semiancho', 'objetivo', 'cumple'])
+        n = self.momentos.n[self.metricas].to_numpy()
+        media = self.momentos.media[self.metricas].to_numpy()
+        semiancho, meta, cumple = evaluar(n, media, self.momentos.m2[self.metricas].to_numpy(),
+                                          self.metricas, self.frontera, self.confianza)
+        celdas = self.momentos.n.index.to_frame(index=False)
+        partes = [celdas.assign(metrica=metrica, n=n[:, j].astype(np.int64), media=media[:, j],
+                                semiancho=semiancho[:, j], objetivo=meta[:, j], cumple=cumple[:, j])
+                  for j, metrica in enumerate(self.metricas)]
+        return pd.concat(partes, ignore_index=True)
+
+    def resumen_clases(self):
+        """Una fila por clase: iteraciones (mínimo entre sus métodos), pendientes y si cumple"""
+        tabla = self.tabla()
+        if tabla.empty:
+            return pd.DataFrame(columns=['test_name', 'iteraciones', 'pendientes', 'cumple'])
+        return (tabla.groupby('test_name', observed=True, sort=True)
+                .agg(iteraciones=('n', 'min'), pendientes=('cumple', lambda c: int((~c).sum())),
+                     cumple=('cumple', 'all'))
+                .reset_index())
+
+    def clases_cumplidas(self):
+        resumen = self.resumen_clases()
+        return resumen.loc[resumen['cumple'], 'test_name'].tolist()
+
+    def senalar(self, clase, detalle=None):
+        """Escribe el archivo de detención de `clase` (stem del CSV); True si es nuevo"""
+        archivo = self.archivos[clase]
+        destino = archivo.parent / CARPETA_DETENCION / f'{clase}.json'
+        if destino.exists():
+            return False
+        destino.parent.mkdir(exist_ok=True)
+        contenido = {'clase': clase, 'frontera': self.frontera, 'confianza': self.confianza,
+                     'fecha': time.strftime('%Y-%m-%d %H:%M:%S'), **(detalle or {})}
+        destino.write_text(json.dumps(contenido, indent=2), encoding='utf-8')
+        return True
+
+# ==================================================================================
+# SIMULACIÓN SOBRE UNA CAMPAÑA COMPLETA
+# ==================================================================================
+
+def simular_campana(df, metricas=METRICAS, frontera='secuencia', confianza=NIVEL_CONFIANZA):
+    """
+    Repite la regla sobre una campaña ya terminada, iteración a iteración:
+    con sumas acumuladas por (clase, método) se obtiene la media y la
+    varianza tras cada iteración sin volver a recorrer filas. Una fila por
+    clase con la iteración de detención, las ejecutadas y, con la media de
+    la campaña completa como referencia, cuántas celdas la tenían dentro de
+    su semiancho al detenerse.
+    """
+    datos = df.sort_values(CLAVES + ['iteration'], kind='stable')
+    celdas = datos.groupby(CLAVES, observed=True, sort=False)
+    # Posición de cada fila dentro de su celda: 1, 2, ... (la iteración efectiva)
+    orden = celdas.cumcount().to_numpy() + 1
+    codigos = celdas.ngroup().to_numpy()
+    n_celdas = codigos.max() + 1
+    n_max = orden.max()
+
+    x = datos[metricas].to_numpy(dtype=np.float64)
+    suma = np.zeros((n_celdas, n_max, len(metricas)))
+    cuadrados = np.zeros_like(suma)
+    np.add.at(suma, (codigos, orden - 1), x)
+    np.add.at(cuadrados, (codigos, orden - 1), x * x)
+    n_celda = np.bincount(codigos, minlength=n_celdas)
+    suma, cuadrados = suma.cumsum(axis=1), cuadrados.cumsum(axis=1)
+
+    n = np.arange(1, n_max + 1, dtype=np.float64)[None, :, None]
+    media = suma / n
+    # M2 = Σx² − n·media², con x centrado en la media final para no perder precisión
+    centro = (suma[:, -1] / n_celda[:, None])[:, None, :]
+    media_c = media - centro
+    cuadrados_c = cuadrados - 2 * centro * suma + n * centro ** 2
+    m2 = np.maximum(cuadrados_c - n * media_c ** 2, 0.0)
+
+    forma = media.shape
+    semiancho, meta, cumple = evaluar(np.broadcast_to(n, forma).reshape(-1, len(metricas)),
+                                      media.reshape(-1, len(metricas)), m2.reshape(-1, len(metricas)),
+                                      metricas, frontera, confianza)
+    cumple = cumple.reshape(forma).all(axis=2)
+    # Más allá de las iteraciones de cada celda la celda no puede detener nada
+    cumple &= n[0, :, 0][None, :] <= n_celda[:, None]
+
+    nombres = celdas.size().reset_index()[CLAVES]
+    clases = nombres['test_name'].astype(str).to_numpy()
+    filas = []
+    for clase in pd.unique(clases):
+        indices = np.flatnonzero(clases == clase)
+        ejecutadas = int(n_celda[indices].min())
+        todas = cumple[indices].all(axis=0)
+        detencion = int(np.argmax(todas) + 1) if todas.any() else ejecutadas
+        k = detencion - 1
+        # Referencia: la media en la última iteración de cada celda (las clases cortas no llegan a n_max)
+        final = media[indices, n_celda[indices] - 1]
+        dentro = np.abs(media[indices, k] - final) <= semiancho.reshape(forma)[indices, k] + 1e-12
+        filas.append({'test_name': clase, 'ejecutadas': ejecutadas, 'detencion': detencion,
+                      'ahorro_pct': 100 * (1 - detencion / ejecutadas),
+                      'celdas': len(indices) * len(metricas), 'dentro_semiancho': int(dentro.sum())})
+    return pd.DataFrame(filas)
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+VALIDACIÓN VECTORIZADA DEL DATASET CONSOLIDADO
+===============================================
+Comprueba todo el DataFrame con operaciones NumPy sobre columnas completas
+(sin bucles por fila ni por test):
+
+  • columnas: faltan columnas del esquema canónico.
+  • nulos: valores vacíos en columnas numéricas.
+  • rango: instr_pct, branch_pct y mutation_score fuera de 0-100;
+    time_seconds, total_mutations o mutations_killed negativos.
+  • conteos: mutations_killed > total_mutations.
+  • score: mutation_score distinto de round(100 × killed / total, 2)
+    (0 si total_mutations = 0, como Get-MutationMetrics).
+  • iteraciones: por (test_name, test_class), iteraciones fuera de
+    1..N_ITERACIONES, huecos en la secuencia 1..última iteración del test e
+    iteraciones con un número de filas distinto al habitual del test (falta
+    o sobra alguna fila de método) y, si existe test_method, filas repetidas
+    para el mismo método e iteración. Un test que termina antes de
+    N_ITERACIONES no es una violación: la campaña puede seguir en curso o
+    DETENCION_SECUENCIAL pudo detener la clase al alcanzar su precisión.
+
+El coste es lineal en filas salvo la factorización de la clave de test,
+por lo que puede ejecutarse en cada ingesta. El resultado es un DataFrame
+compacto con una fila por regla y columna (o por test, en las de
+iteraciones) con el número de filas afectadas y algunos ejemplos.
+"""
+
+import numpy as np
+import pandas as pd
+
+from comun.esquema import COLUMNA_METODO, COLUMNAS, COLUMNAS_CATEGORICAS
+
+# ==================================================================================
+# CONFIGURACION
+# ==================================================================================
+
+N_ITERACIONES = 40
+COLUMNAS_PORCENTAJE = ['instr_pct', 'branch_pct', 'mutation_score']
+COLUMNAS_NO_NEGATIVAS = ['time_seconds', 'total_mutations', 'mutations_killed']
+
+# mutation_score se guarda redondeado a 2 decimales
+TOLERANCIA_SCORE = 0.005 + 1e-9
+
+# Ejemplos (índices de fila o iteraciones) que se listan por violación
+MAX_EJEMPLOS = 5
+
+COLUMNAS_REPORTE = ['regla', 'columna', 'test', 'n_violaciones', 'ejemplos']
+
+# ==================================================================================
+# UTILIDADES
+# ==================================================================================
+
+def verificar_columnas(df, columnas):
+    """Lanza KeyError con todas las columnas ausentes a la vez"""
+    faltantes = [col for col in columnas if col not in df.columns]
+    if faltantes:
+        raise KeyError(f"Columnas esperadas no encontradas en los datos consolidados: {faltantes}. "
+                       f"Columnas disponibles: {list(df.columns)}")
+
+
+def comprimir_rangos(valores):
+    """[1, 2, 3, 7, 9, 10] → '1-3, 7, 9-10'"""
+    valores = np.asarray(valores)
+    if len(valores) == 0:
+        return ''
+    cortes = np.flatnonzero(np.diff(valores) != 1) + 1
+    tramos = []
+    for tramo in np.split(valores, cortes):
+        tramos.append(str(tramo[0]) if len(tramo) == 1 else f'{tramo[0]}-{tramo[-1]}')
+    return ', '.join(tramos)
+
+
+def violacion(regla, mascara, columna='', test='', indice=None):
+    """Fila del reporte para una máscara booleana por fila (None si no hay violaciones)"""
+    n = int(np.count_nonzero(mascara))
+    if n == 0:
+        return None
+    posiciones = np.flatnonzero(mascara)[:MAX_EJEMPLOS]
+    ejemplos = indice[posiciones] if indice is not None else posiciones
+    return {'regla': regla, 'columna': columna, 'test': test, 'n_violaciones': n,
+            'ejemplos': ', '.join(str(e) for e in ejemplos)}
+
+
+def valores_numericos(df, col):
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float64)
+
+
+def codificar_tests(df, claves):
+    """
+    Código entero por combinación de `claves` y sus etiquetas. Combina los
+    códigos de cada columna (baratos si es category) en vez de factorizar
+    tuplas.
+    """
+    combinado = np.zeros(len(df), dtype=np.int64)
+    niveles = []
+    for col in claves:
+        codigos, categorias = pd.factorize(df[col])
+        combinado = combinado * len(categorias) + codigos
+        niveles.append(np.asarray(categorias, dtype=object))
+    unicos, codigos = np.unique(combinado, return_inverse=True)
+
+    etiquetas = []
+    for clave in unicos:
+        partes = []
+        for categorias in reversed(niveles):
+            clave, resto = divmod(clave, len(categorias))
+            partes.append(str(categorias[resto]))
+        etiquetas.append(' / '.join(reversed(partes)))
+    return codigos, etiquetas
+
+# ==================================================================================
+# REGLAS
+# ==================================================================================
+
+def validar_filas(df):
+    """Reglas por fila: nulos, rangos, conteos y consistencia del score"""
+    indice = df.index.to_numpy()
+    filas = []
+
+    numericas = [c for c in COLUMNAS if c not in COLUMNAS_CATEGORICAS and c in df.columns]
+    valores = {col: valores_numericos(df, col) for col in numericas}
+
+    for col in numericas:
+        filas.append(violacion('nulos', np.isnan(valores[col]), col, indice=indice))
+
+    for col in COLUMNAS_PORCENTAJE:
+        if col in valores:
+            x = valores[col]
+            filas.append(violacion('rango_0_100', (x < 0) | (x > 100), col, indice=indice))
+
+    for col in COLUMNAS_NO_NEGATIVAS:
+        if col in valores:
+            filas.append(violacion('negativo', valores[col] < 0, col, indice=indice))
+
+    if {'total_mutations', 'mutations_killed'} <= valores.keys():
+        total, muertos = valores['total_mutations'], valores['mutations_killed']
+        filas.append(violacion('killed_mayor_que_total', muertos > total, 'mutations_killed',
+                               indice=indice))
+
+        if 'mutation_score' in valores:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                esperado = np.where(total > 0, np.round(100 * muertos / total, 2), 0.0)
+            distinto = np.abs(valores['mutation_score'] - esperado) > TOLERANCIA_SCORE
+            # Los nulos ya se reportan aparte
+            distinto &= ~np.isnan(esperado) & ~np.isnan(valores['mutation_score'])
+            filas.append(violacion('score_inconsistente', distinto, 'mutation_score', indice=indice))
+
+    return filas
+
+
+def validar_iteraciones(df, n_iteraciones=N_ITERACIONES):
+    """
+    Reglas de secuencia por (test_name, test_class): una matriz
+    tests × iteraciones de conteos construida con un único bincount.
+    """
+    claves = [c for c in ('test_name', 'test_class') if c in df.columns]
+    if 'iteration' not in df.columns or not claves:
+        return []
+
+    iteracion = valores_numericos(df, 'iteration')
+    codigos, tests = codificar_tests(df, claves)
+    indice = df.index.to_numpy()
+
+    filas = []
+    valida = ~np.isnan(iteracion)
+    fuera = valida & ((iteracion < 1) | (iteracion > n_iteraciones) | (np.mod(iteracion, 1) != 0))
+    filas.append(violacion('iteracion_fuera_de_rango', fuera, 'iteration', indice=indice))
+
+    dentro = valida & ~fuera
+    posicion = codigos[dentro] * n_iteraciones + iteracion[dentro].astype(np.int64) - 1
+    conteos = np.bincount(posicion, minlength=len(tests) * n_iteraciones).reshape(len(tests), n_iteraciones)
+
+    # Filas por iteración habituales de cada test: la moda de sus conteos no nulos
+    valores = np.unique(conteos[conteos > 0])
+    if len(valores):
+        frecuencias = (conteos[:, :, None] == valores).sum(axis=1)
+        habitual = valores[np.argmax(frecuencias, axis=1)]
+    else:
+        habitual = np.zeros(len(tests), dtype=np.int64)
+
+    # Solo cuentan los huecos anteriores a la última iteración registrada de cada test
+    ultima = n_iteraciones - np.argmax(conteos[:, ::-1] > 0, axis=1)
+    faltantes = (conteos == 0) & (np.arange(1, n_iteraciones + 1) < ultima[:, None])
+    desbalanceadas = (conteos > 0) & (conteos != habitual[:, None])
+
+    # Con el método original disponible, la misma (test, método, iteración) no debe repetirse
+    if COLUMNA_METODO in df.columns:
+        codigos_metodo, _ = codificar_tests(df, claves + [COLUMNA_METODO])
+        clave = codigos_metodo[dentro] * n_iteraciones + iteracion[dentro].astype(np.int64) - 1
+        _, inversa, repeticiones = np.unique(clave, return_inverse=True, return_counts=True)
+        repetida = np.zeros(len(df), dtype=bool)
+        repetida[np.flatnonzero(dentro)] = repeticiones[inversa] > 1
+        filas.append(violacion('fila_duplicada', repetida, COLUMNA_METODO, indice=indice))
+
+    for i in np.flatnonzero(faltantes.any(axis=1)):
+        ausentes = np.flatnonzero(faltantes[i]) + 1
+        filas.append({'regla': 'iteracion_faltante', 'columna': 'iteration', 'test': tests[i],
+                      'n_violaciones': len(ausentes), 'ejemplos': comprimir_rangos(ausentes)})
+
+    for i in np.flatnonzero(desbalanceadas.any(axis=1)):
+        irregulares = np.flatnonzero(desbalanceadas[i]) + 1
+        detalle = ', '.join(f'{it}:{conteos[i, it - 1]}' for it in irregulares[:MAX_EJEMPLOS])
+        filas.append({'regla': 'iteracion_desbalanceada', 'columna': 'iteration', 'test': tests[i],
+                      'n_violaciones': len(irregulares),
+                      'ejemplos': f'habitual {habitual[i]} filas; {detalle}'})
+
+    return filas
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def validar_datos(df, n_iteraciones=N_ITERACIONES):
+    """
+    Valida el DataFrame consolidado y devuelve el reporte de violaciones
+    (vacío si todo es correcto).
+    """
+    filas = []
+    faltantes = [col for col in COLUMNAS if col not in df.columns]
+    if faltantes:
+        filas.append({'regla': 'columnas_faltantes', 'columna': ', '.join(faltantes), 'test': '',
+                      'n_violaciones': len(faltantes), 'ejemplos': ''})
+
+    filas += validar_filas(df)
+    filas += validar_iteraciones(df, n_iteraciones)
+    return pd.DataFrame([f for f in filas if f is not None], columns=COLUMNAS_REPORTE)
+
+
+def imprimir_violaciones(reporte, max_filas=20):
+    """Resumen de consola del reporte de validar_datos"""
+    if reporte.empty:
+        print("  ✓ Validación: sin violaciones")
+        return
+    print(f"  ! Validación: {len(reporte)} violaciones "
+          f"({int(reporte['n_violaciones'].sum()):,} casos)")
+    for fila in reporte.head(max_filas).itertuples():
+        donde = ' '.join(p for p in (fila.columna, f'[{fila.test}]' if fila.test else '') if p)
+        print(f"      {fila.regla:<26} {donde:<50} {fila.n_violaciones:>6}  {fila.ejemplos}")
+    if len(reporte) > max_filas:
+        print(f"      ... {len(reporte) - max_filas} más")
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+VIGILANCIA DE LAS CARPETAS DE MÉTRICAS
+=======================================
+Detecta cambios en los CSV por clase de unit_tests_metrics/ y
+functional_tests_metrics/:
+
+  • En Linux usa inotify (vía ctypes, sin dependencias externas): el proceso
+    duerme hasta que el kernel notifica una escritura, creación, borrado o
+    renombrado dentro de las carpetas vigiladas.
+  • En otros sistemas (o si inotify no está disponible) compara tamaño y
+    fecha de modificación de los CSV cada INTERVALO_SONDEO segundos.
+
+esperar_cambios() agrupa las ráfagas de eventos: el runner escribe una fila
+por test, así que se espera a que las carpetas estén ESPERA_SEGUNDOS en
+silencio antes de devolver el lote de archivos cambiados.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+ESPERA_SEGUNDOS = 2.0
+INTERVALO_SONDEO = 1.0
+
+# Máscaras de inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+MASCARA = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+CABECERA_EVENTO = struct.Struct('iIII')
+
+# ==================================================================================
+# INOTIFY
+# ==================================================================================
+
+class VigilanteInotify:
+    """Eventos del kernel sobre los CSV de las carpetas indicadas"""
+
+    def __init__(self, carpetas, patron='.csv'):
+        self.patron = patron
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 falló')
+
+        self.carpetas = {}
+        for carpeta in carpetas:
+            wd = self._add_watch(self.fd, os.fsencode(carpeta), MASCARA)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f'inotify_add_watch falló: {carpeta}')
+            self.carpetas[wd] = Path(carpeta)
+
+    def leer(self, espera):
+        """CSV cambiados en los próximos `espera` segundos (vuelve en cuanto hay alguno)"""
+        limite = time.monotonic() + espera
+        cambiados = set()
+        while not cambiados:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            listos, _, _ = select.select([self.fd], [], [], restante)
+            if listos:
+                cambiados |= self._eventos()
+        return cambiados
+
+    def _eventos(self):
+        cambiados = set()
+        try:
+            datos = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return cambiados
+
+        posicion = 0
+        while posicion + CABECERA_EVENTO.size <= len(datos):
+            wd, _mascara, _cookie, largo = CABECERA_EVENTO.unpack_from(datos, posicion)
+            posicion += CABECERA_EVENTO.size
+            nombre = datos[posicion:posicion + largo].rstrip(b'\0').decode('utf-8', 'replace')
+            posicion += largo
+            if nombre.endswith(self.patron) and wd in self.carpetas:
+                cambiados.add(self.carpetas[wd] / nombre)
+        return cambiados
+
+    def cerrar(self):
+        os.close(self.fd)
+
+# ==================================================================================
+# SONDEO (RESPALDO)
+# ==================================================================================
+
+class VigilantePorSondeo:
+    """Compara (tamaño, mtime) de los CSV en cada sondeo"""
+
+    def __init__(self, carpetas, patron='.csv'):
+        self.carpetas = [Path(c) for c in carpetas]
+        self.patron = patron
+        self.firmas = self._firmas()
+
+    def _firmas(self):
+        firmas = {}
+        for carpeta in self.carpetas:
+            for archivo in carpeta.glob(f'*{self.patron}'):
+                try:
+                    info = archivo.stat()
+                except FileNotFoundError:
+                    continue
+                firmas[archivo] = (info.st_size, info.st_mtime_ns)
+        return firmas
+
+    def leer(self, espera):
+        limite = time.monotonic() + espera
+        while True:
+            time.sleep(max(0.0, min(INTERVALO_SONDEO, limite - time.monotonic())))
+            firmas = self._firmas()
+            cambiados = {a for a in set(firmas) | set(self.firmas) if firmas.get(a) != self.firmas.get(a)}
+            self.firmas = firmas
+            if cambiados or time.monotonic() >= limite:
+                return cambiados
+
+    def cerrar(self):
+        pass
+
+# ==================================================================================
+# PUNTO DE ENTRADA
+# ==================================================================================
+
+def crear_vigilante(carpetas, verbose=True):
+    """inotify en Linux; sondeo en cualquier otro caso"""
+    if sys.platform.startswith('linux'):
+        try:
+            vigilante = VigilanteInotify(carpetas)
+            if verbose:
+                print("  ✓ Vigilancia con inotify")
+            return vigilante
+        except (OSError, AttributeError, TypeError):
+            pass
+    if verbose:
+        print(f"  ✓ Vigilancia por sondeo cada {INTERVALO_SONDEO:.1f} s")
+    return VigilantePorSondeo(carpetas)
+
+
+def esperar_cambios(vigilante, espera=ESPERA_SEGUNDOS):
+    """
+    Bloquea hasta el primer cambio y sigue acumulando eventos hasta que pasen
+    `espera` segundos sin actividad. Devuelve el conjunto de CSV cambiados.
+    """
+    cambiados = set()
+    while not cambiados:
+        cambiados = vigilante.leer(3600)
+    while True:
+        nuevos = vigilante.leer(espera)
+        if not nuevos:
+            return cambiados
+        cambiados |= nuevos
@@ -7,54 +7,33 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
-BASE_PATH = Path("./unit_tests_metrics")
-FUNCTIONAL_PATH = Path("./functional_tests_metrics")
+from comun.carga import cargar_datos_consolidados
+from comun.descriptiva import descriptiva_por_conjuntos
+
+RUTA_BASE = Path(".")
 
 print("=" * 80)
 print("ESTADISTICA DESCRIPTIVA - 40 ITERACIONES")
 print("=" * 80)
 
-# Cargar todos los CSVs
-dfs = []
-
-unitarias_files = [
-    "IA_OwnerAddPetDiffblueTest.csv",
-    "IA_OwnerGetPetDiffblueTest.csv",
-    "IA_PetValidatorDiffblueTest.csv",
-    "Manual_OwnerAddPetUnitManualTest.csv",
-    "Manual_OwnerGetPetUnitManualTest.csv",
-    "Manual_PetValidatorUnitManualTest.csv",
-]
-
-funcionales_files = [
-    "IA_OwnerControllerShowOwnerTestIA.csv",
-    "IA_PetControllerProcessCreationFormTestIA.csv",
-    "IA_VisitControllerProcessNewVisitFormTestIA.csv",
-    "Manual_ShowOwnerManualTest.csv",
-    "Manual_ProcessCreationFormManualTest.csv",
-    "Manual_ProcessNewVisitFormManualTest.csv",
-]
-
+# Cargar todos los CSVs (ingesta incremental: solo filas nuevas desde la última ejecución)
 print("\nCargando archivos...")
-for file in unitarias_files:
-    filepath = BASE_PATH / file
-    if filepath.exists():
-        df = pd.read_csv(filepath)
-        df['category'] = 'Unitarias'
-        dfs.append(df)
-
-for file in funcionales_files:
-    filepath = FUNCTIONAL_PATH / file
-    if filepath.exists():
-        df = pd.read_csv(filepath)
-        df['category'] = 'Funcionales'
-        dfs.append(df)
-
-df_consolidated = pd.concat(dfs, ignore_index=True)
+df_consolidated = cargar_datos_consolidados(RUTA_BASE, incremental=True)
 print(f"Total: {len(df_consolidated)} registros cargados")
 
 # Métricas
 metricas = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+GRUPOS = ['Manual', 'IA']
+
+# Global y por categoría con un solo kernel (cada métrica se ordena una vez)
+tablas = descriptiva_por_conjuntos(df_consolidated, [['group'], ['category', 'group']], metricas)
+tabla_global = tablas[('group',)]
+tabla_categorias = tablas[('category', 'group')]
+
+
+def imprimir_fila(grupo, fila):
+    print(f"{grupo:<10} {fila['n']:>6.0f} {fila['media']:>12.4f} {fila['mediana']:>12.4f} "
+          f"{fila['desv_est']:>12.4f} {fila['min']:>10.4f} {fila['max']:>10.4f}")
 
 # RESUMEN GLOBAL
 print("\n" + "=" * 90)
@@ -67,15 +46,12 @@ for metrica in metricas:
     print(f"{'Grupo':<10} {'n':>6} {'Media':>12} {'Mediana':>12} {'Desv.Est':>12} {'Min':>10} {'Max':>10}")
     print("-" * 90)
     
-    for grupo in ['Manual', 'IA']:
-        datos = df_consolidated[df_consolidated['group'] == grupo][metrica]
-        print(f"{grupo:<10} {len(datos):>6.0f} {datos.mean():>12.4f} {datos.median():>12.4f} "
-              f"{datos.std():>12.4f} {datos.min():>10.4f} {datos.max():>10.4f}")
+    for grupo in GRUPOS:
+        imprimir_fila(grupo, tabla_global.loc[(grupo, metrica)])
     
-    manual = df_consolidated[df_consolidated['group'] == 'Manual'][metrica]
-    ia = df_consolidated[df_consolidated['group'] == 'IA'][metrica]
-    diff = ia.mean() - manual.mean()
-    pct = (diff / manual.mean() * 100) if manual.mean() != 0 else 0
+    media_manual = tabla_global.loc[('Manual', metrica), 'media']
+    diff = tabla_global.loc[('IA', metrica), 'media'] - media_manual
+    pct = (diff / media_manual * 100) if media_manual != 0 else 0
     
     print(f"\nDiferencia IA - Manual: {diff:+.4f} ({pct:+.2f}%)\n")
 
@@ -89,34 +65,36 @@ for categoria in ['Unitarias', 'Funcionales']:
     print(f"CATEGORÍA: {categoria}")
     print(f"{'='*90}")
     
-    df_cat = df_consolidated[df_consolidated['category'] == categoria]
-    
     for metrica in metricas:
         print(f"\n{metrica.upper()}")
         print("-" * 90)
         print(f"{'Grupo':<10} {'n':>6} {'Media':>12} {'Mediana':>12} {'Desv.Est':>12} {'Min':>10} {'Max':>10}")
         print("-" * 90)
         
-        for grupo in ['Manual', 'IA']:
-            datos = df_cat[df_cat['group'] == grupo][metrica]
-            if len(datos) > 0:
-                print(f"{grupo:<10} {len(datos):>6.0f} {datos.mean():>12.4f} {datos.median():>12.4f} "
-                      f"{datos.std():>12.4f} {datos.min():>10.4f} {datos.max():>10.4f}")
+        for grupo in GRUPOS:
+            if (categoria, grupo, metrica) in tabla_categorias.index:
+                imprimir_fila(grupo, tabla_categorias.loc[(categoria, grupo, metrica)])
 
 # EXPORTAR
 print("\n" + "=" * 90)
 print("EXPORTANDO...")
 print("=" * 90)
 
-df_consolidated.to_csv('datos_consolidados.csv', index=False)
-print("Guardado: datos_consolidados.csv")
+# datos_consolidados.csv lo mantiene la ingesta incremental
+print("Actualizado: datos_consolidados.csv")
+
+# Las hojas de datos conservan el test_name original del CSV (método de prueba);
+# la carga común lo reemplaza por el nombre del archivo y lo guarda en test_method
+df_datos = df_consolidated
+if 'test_method' in df_datos.columns:
+    df_datos = df_datos.assign(test_name=df_datos['test_method']).drop(columns='test_method')
 
 # Crear resumen en Excel
 with pd.ExcelWriter('ESTADISTICA_DESCRIPTIVA.xlsx', engine='openpyxl') as writer:
-    df_consolidated.to_excel(writer, sheet_name='Datos', index=False)
+    df_datos.to_excel(writer, sheet_name='Datos', index=False)
     
     for categoria in ['Unitarias', 'Funcionales']:
-        df_cat = df_consolidated[df_consolidated['category'] == categoria]
+        df_cat = df_datos[df_datos['category'] == categoria]
         df_cat.to_excel(writer, sheet_name=categoria, index=False)
 
 print("Guardado: ESTADISTICA_DESCRIPTIVA.xlsx")
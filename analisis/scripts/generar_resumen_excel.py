@@ -9,175 +9,103 @@ from openpyxl import load_workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+from comun.carga import cargar_datos_consolidados
+from comun.descriptiva import descriptiva_por_conjuntos, ordenar_filas
+from comun.momentos import modo_streaming, momentos_en_streaming
+
 # ============================================================================
 # 1. CARGAR DATOS
 # ============================================================================
 
-BASE_PATH = Path("./unit_tests_metrics")
-FUNCTIONAL_PATH = Path("./functional_tests_metrics")
-
-print("Cargando datos...")
-
-dfs = []
-
-unitarias_files = [
-    "IA_OwnerAddPetDiffblueTest.csv",
-    "IA_OwnerGetPetDiffblueTest.csv",
-    "IA_PetValidatorDiffblueTest.csv",
-    "Manual_OwnerAddPetUnitManualTest.csv",
-    "Manual_OwnerGetPetUnitManualTest.csv",
-    "Manual_PetValidatorUnitManualTest.csv",
-]
-
-funcionales_files = [
-    "IA_OwnerControllerShowOwnerTestIA.csv",
-    "IA_PetControllerProcessCreationFormTestIA.csv",
-    "IA_VisitControllerProcessNewVisitFormTestIA.csv",
-    "Manual_ShowOwnerManualTest.csv",
-    "Manual_ProcessCreationFormManualTest.csv",
-    "Manual_ProcessNewVisitFormManualTest.csv",
-]
-
-for file in unitarias_files:
-    filepath = BASE_PATH / file
-    if filepath.exists():
-        df_temp = pd.read_csv(filepath)
-        df_temp['category'] = 'Unitarias'
-        dfs.append(df_temp)
-
-for file in funcionales_files:
-    filepath = FUNCTIONAL_PATH / file
-    if filepath.exists():
-        df_temp = pd.read_csv(filepath)
-        df_temp['category'] = 'Funcionales'
-        dfs.append(df_temp)
-
-df = pd.concat(dfs, ignore_index=True)
-print(f"Total: {len(df)} registros cargados")
+RUTA_BASE = Path(".")
+
+# Modo streaming: los CSV se leen por bloques y solo se guardan acumuladores
+# por celda, sin materializar el archivo completo de iteraciones (para
+# campañas que no caben en memoria). Como no hay DataFrame completo, en este
+# modo se omite la hoja 'Datos Crudos'. Sin streaming, un único kernel
+# (comun.descriptiva) ordena cada métrica una vez y emite los tres conjuntos
+# de agrupación. Se elige con --streaming / --sin-streaming, la variable
+# ANALISIS_STREAMING o, por defecto, según el tamaño de los CSV
+# (comun.momentos.modo_streaming)
+MODO_STREAMING = modo_streaming(RUTA_BASE)
+TAMANO_BLOQUE = 500_000
 
 metricas = ['instr_pct', 'branch_pct', 'mutation_score', 'time_seconds']
+GRUPOS = ['Manual', 'IA']
+CATEGORIAS = ['Unitarias', 'Funcionales']
+CONJUNTOS = [['group'], ['category', 'group'], ['test_class', 'group']]
+
+COLUMNAS_ESTADISTICOS = {'n': 'n', 'media': 'Media', 'mediana': 'Mediana', 'desv_est': 'Desv.Est',
+                         'min': 'Min', 'max': 'Max', 'q1': 'Q1', 'q3': 'Q3', 'iqr': 'IQR'}
+
+print(f"Cargando datos{' por bloques (streaming)' if MODO_STREAMING else ''}...")
+
+if MODO_STREAMING:
+    df = None
+    momentos = momentos_en_streaming(RUTA_BASE, metricas=metricas, tamano_bloque=TAMANO_BLOQUE)
+    tablas = {tuple(claves): momentos.reducir(claves).tabla() for claves in CONJUNTOS}
+else:
+    df = cargar_datos_consolidados(RUTA_BASE)
+    tablas = descriptiva_por_conjuntos(df, CONJUNTOS, metricas)
+
+tabla_global = tablas[('group',)]
+print(f"Total: {int(tabla_global.xs(metricas[0], level='metrica')['n'].sum())} registros procesados")
+
+
+def hoja(tabla, orden, nombres):
+    """
+    Hoja descriptiva: filas de la tabla en el orden de `orden` y columnas
+    renombradas (claves de `nombres`, Metrica, Grupo, n, Media, ..., IQR)
+    """
+    filas = ordenar_filas(tabla, orden)
+    nombres = dict(nombres, metrica='Metrica', group='Grupo', **COLUMNAS_ESTADISTICOS)
+    return filas[list(nombres)].rename(columns=nombres)
 
 # ============================================================================
 # 1. CREAR RESUMEN GLOBAL
 # ============================================================================
 
-resumen_global = []
-
-for metrica in metricas:
-    for grupo in ['Manual', 'IA']:
-        datos = df[df['group'] == grupo][metrica]
-        
-        resumen_global.append({
-            'Metrica': metrica,
-            'Grupo': grupo,
-            'n': len(datos),
-            'Media': datos.mean(),
-            'Mediana': datos.median(),
-            'Desv.Est': datos.std(),
-            'Min': datos.min(),
-            'Max': datos.max(),
-            'Q1': datos.quantile(0.25),
-            'Q3': datos.quantile(0.75),
-            'IQR': datos.quantile(0.75) - datos.quantile(0.25),
-        })
-
-df_resumen_global = pd.DataFrame(resumen_global)
+df_resumen_global = hoja(tabla_global, [('metrica', metricas), ('group', GRUPOS)], {})
 
 # ============================================================================
 # 2. CREAR RESUMEN POR CATEGORÍA
 # ============================================================================
 
-resumen_categorias = []
-
-for categoria in ['Unitarias', 'Funcionales']:
-    df_cat = df[df['category'] == categoria]
-    
-    for metrica in metricas:
-        for grupo in ['Manual', 'IA']:
-            datos = df_cat[df_cat['group'] == grupo][metrica]
-            
-            if len(datos) > 0:
-                resumen_categorias.append({
-                    'Categoria': categoria,
-                    'Metrica': metrica,
-                    'Grupo': grupo,
-                    'n': len(datos),
-                    'Media': datos.mean(),
-                    'Mediana': datos.median(),
-                    'Desv.Est': datos.std(),
-                    'Min': datos.min(),
-                    'Max': datos.max(),
-                    'Q1': datos.quantile(0.25),
-                    'Q3': datos.quantile(0.75),
-                    'IQR': datos.quantile(0.75) - datos.quantile(0.25),
-                })
-
-df_resumen_categorias = pd.DataFrame(resumen_categorias)
+df_resumen_categorias = hoja(tablas[('category', 'group')],
+                             [('category', CATEGORIAS), ('metrica', metricas), ('group', GRUPOS)],
+                             {'category': 'Categoria'})
 
 # ============================================================================
 # 3. CREAR RESUMEN POR CLASE DE TEST
 # ============================================================================
 
-resumen_clases = []
-
-test_classes = sorted(df['test_class'].unique())
-
-for test_class in test_classes:
-    df_test = df[df['test_class'] == test_class]
-    
-    for metrica in metricas:
-        for grupo in ['Manual', 'IA']:
-            datos = df_test[df_test['group'] == grupo][metrica]
-            
-            if len(datos) > 0:
-                resumen_clases.append({
-                    'Clase': test_class,
-                    'Metrica': metrica,
-                    'Grupo': grupo,
-                    'n': len(datos),
-                    'Media': datos.mean(),
-                    'Mediana': datos.median(),
-                    'Desv.Est': datos.std(),
-                    'Min': datos.min(),
-                    'Max': datos.max(),
-                    'Q1': datos.quantile(0.25),
-                    'Q3': datos.quantile(0.75),
-                    'IQR': datos.quantile(0.75) - datos.quantile(0.25),
-                })
-
-df_resumen_clases = pd.DataFrame(resumen_clases)
+df_resumen_clases = hoja(tablas[('test_class', 'group')],
+                         [('test_class', None), ('metrica', metricas), ('group', GRUPOS)],
+                         {'test_class': 'Clase'})
 
 # ============================================================================
 # 4. CREAR COMPARATIVA MANUAL vs IA
 # ============================================================================
 
-comparativa = []
+manual = tabla_global.xs('Manual', level='group').reindex(metricas)
+ia = tabla_global.xs('IA', level='group').reindex(metricas)
 
-for metrica in metricas:
-    manual = df[df['group'] == 'Manual'][metrica]
-    ia = df[df['group'] == 'IA'][metrica]
-    
-    diff_media = ia.mean() - manual.mean()
-    diff_media_pct = (diff_media / manual.mean() * 100) if manual.mean() != 0 else 0
-    
-    diff_mediana = ia.median() - manual.median()
-    diff_mediana_pct = (diff_mediana / manual.median() * 100) if manual.median() != 0 else 0
-    
-    comparativa.append({
-        'Metrica': metrica,
-        'Manual_Media': manual.mean(),
-        'IA_Media': ia.mean(),
-        'Diferencia_Media': diff_media,
-        'Diferencia_Media_%': diff_media_pct,
-        'Manual_Mediana': manual.median(),
-        'IA_Mediana': ia.median(),
-        'Diferencia_Mediana': diff_mediana,
-        'Diferencia_Mediana_%': diff_mediana_pct,
-        'Manual_StdDev': manual.std(),
-        'IA_StdDev': ia.std(),
-    })
-
-df_comparativa = pd.DataFrame(comparativa)
+diff_media = ia['media'] - manual['media']
+diff_mediana = ia['mediana'] - manual['mediana']
+
+df_comparativa = pd.DataFrame({
+    'Metrica': metricas,
+    'Manual_Media': manual['media'].to_numpy(),
+    'IA_Media': ia['media'].to_numpy(),
+    'Diferencia_Media': diff_media.to_numpy(),
+    'Diferencia_Media_%': (diff_media / manual['media'] * 100).where(manual['media'] != 0, 0).to_numpy(),
+    'Manual_Mediana': manual['mediana'].to_numpy(),
+    'IA_Mediana': ia['mediana'].to_numpy(),
+    'Diferencia_Mediana': diff_mediana.to_numpy(),
+    'Diferencia_Mediana_%': (diff_mediana / manual['mediana'] * 100).where(manual['mediana'] != 0, 0).to_numpy(),
+    'Manual_StdDev': manual['desv_est'].to_numpy(),
+    'IA_StdDev': ia['desv_est'].to_numpy(),
+})
 
 # ============================================================================
 # 5. ESCRIBIR EN EXCEL (agregar a archivo existente)
@@ -204,7 +132,10 @@ except Exception as e:
         df_resumen_categorias.round(4).to_excel(writer, sheet_name='Por Categoria', index=False)
         df_resumen_clases.round(4).to_excel(writer, sheet_name='Por Clase', index=False)
         df_comparativa.round(4).to_excel(writer, sheet_name='Comparativa Manual vs IA', index=False)
-        df.to_excel(writer, sheet_name='Datos Crudos', index=False)
+        if df is not None:
+            df.to_excel(writer, sheet_name='Datos Crudos', index=False)
+        else:
+            print("AVISO: MODO_STREAMING activo, se omite la hoja 'Datos Crudos'")
     
     print("OK: Archivo ESTADISTICA_DESCRIPTIVA.xlsx creado")
 
@@ -283,5 +214,8 @@ print("   - Hoja 'Resumen Global': Todas las métricas, ambos grupos")
 print("   - Hoja 'Por Categoria': Unitarias y Funcionales")
 print("   - Hoja 'Por Clase': Cada clase de test (OwnerAddPet, OwnerGetPet, etc.)")
 print("   - Hoja 'Comparativa Manual vs IA': Diferencias y porcentajes")
-print("   - Hoja 'Datos Crudos': Todos los 2,480 registros")
+if df is not None:
+    print("   - Hoja 'Datos Crudos': Todos los registros de iteraciones")
+else:
+    print("   - Hoja 'Datos Crudos': omitida (MODO_STREAMING)")
 print("\nCompleto.")
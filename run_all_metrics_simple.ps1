@@ -37,6 +37,9 @@ Write-Host "⚠️  INFORMACIÓN:" -ForegroundColor Yellow
 Write-Host "   1. Se ejecutarán PRUEBAS UNITARIAS (puede tomar 12-18 horas)" -ForegroundColor Yellow
 Write-Host "   2. Luego PRUEBAS FUNCIONALES (puede tomar 24-30 horas)" -ForegroundColor Yellow
 Write-Host "   3. TIEMPO TOTAL ESTIMADO: 36-48 HORAS" -ForegroundColor Yellow
+Write-Host "   Detención anticipada: en otra terminal, desde esta carpeta," -ForegroundColor Yellow
+Write-Host "   python analisis/scripts/DETENCION_SECUENCIAL.py pasa a la siguiente clase" -ForegroundColor Yellow
+Write-Host "   en cuanto sus métricas alcanzan la precisión objetivo" -ForegroundColor Yellow
 Write-Host ""
 
 $response = Read-Host "¿Continuar? (s/n)"
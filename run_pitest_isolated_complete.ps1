@@ -17,6 +17,8 @@ Write-Host "╚═════════════════════
 $Iteraciones = 40  # 10 iteraciones por clase de prueba
 $OutputDir = "unit_tests_metrics"  # Directorio para guardar CSVs
 $CoverageDir = "coverage_reports"  # Directorio para guardar reportes JaCoCo individuales
+$MutationDir = "mutation_reports"  # Directorio para guardar reportes PIT (mutations.xml) individuales
+$StopDir = "$OutputDir/.detener"  # Señales de detención anticipada por clase (analisis/scripts/DETENCION_SECUENCIAL.py)
 
 # Rutas donde buscar pruebas unitarias
 $TestPaths = @(
@@ -37,6 +39,10 @@ if (-not (Test-Path $CoverageDir)) {
     New-Item -ItemType Directory -Path $CoverageDir -Force | Out-Null
 }
 
+if (-not (Test-Path $MutationDir)) {
+    New-Item -ItemType Directory -Path $MutationDir -Force | Out-Null
+}
+
 # ================================
 # FUNCIÓN: Extraer nombre de clase Java desde archivo .java
 # ================================
@@ -226,6 +232,11 @@ if (-not (Test-Path $OutputDir)) {
 }
 Write-Host "   Directorio: $OutputDir" -ForegroundColor Cyan
 
+# Las señales de detención de una campaña anterior no aplican a los CSV nuevos
+if (Test-Path $StopDir) {
+    Remove-Item -Path $StopDir -Recurse -Force -ErrorAction SilentlyContinue | Out-Null
+}
+
 # Crear un CSV para cada clase de prueba
 $csvFiles = @{}
 foreach ($testClass in $testClasses) {
@@ -261,6 +272,12 @@ foreach ($testClass in $testClasses) {
     Write-Host "🧪 $classSimpleName [$group]" -ForegroundColor Magenta
     
     for ($iter = 1; $iter -le $Iteraciones; $iter++) {
+        # Detención anticipada: DETENCION_SECUENCIAL.py ya tiene la precisión pedida para esta clase
+        if (Test-Path "$StopDir/$($group)_$classSimpleName.json") {
+            Write-Host "   ⏹ Precisión alcanzada tras $($iter - 1) iteraciones, siguiente clase" -ForegroundColor Cyan
+            break
+        }
+
         $testCounter++
         Write-Host "   Iteración $iter/$Iteraciones..." -NoNewline -ForegroundColor Gray
         
@@ -308,6 +325,14 @@ foreach ($testClass in $testClasses) {
         
         # Extraer mutation metrics (del reporte individual de PITest)
         $mutationMetrics = Get-MutationMetrics -FullClassName $className -SimpleClassName $classSimpleName -Group $group
+        
+        # Guardar reporte PIT individual con nombre único (detalle por mutante)
+        $pitFile = Get-ChildItem "target/pit-reports" -Filter "mutations.xml" -Recurse -ErrorAction SilentlyContinue |
+            Sort-Object -Property LastWriteTime -Descending |
+            Select-Object -First 1 -ExpandProperty FullName
+        if ($pitFile) {
+            Copy-Item -Path $pitFile -Destination "$MutationDir/$($group)_$classSimpleName-iter$iter-mutations.xml" -Force | Out-Null
+        }
         $totalMutations = $mutationMetrics.totalMutations
         $killedMutations = $mutationMetrics.killedMutations
         $mutationScore = $mutationMetrics.mutationScore